@@ -3,10 +3,20 @@ from typing import Dict, Any, Optional
 import time
 from app.core.config import settings
 from app.core.logging import LogManager
-from app.core.security import get_current_user
-from app.core.metrics import MetricsCollector
+from app.core.security import get_current_user, principal_id
+from app.core.metrics import APIMetric, MetricsCollector
 from app.services.claude_service import get_claude_service
-from app.schemas.claude import ClaudeRequest, ClaudeResponse, ClaudeAnalysis
+from app.services.incremental_analysis import get_incremental_analysis_service
+from app.services.session_service import get_session_service
+from app.core.exceptions import ResourceNotFoundError
+from app.schemas.claude import (
+    ClaudeRequest,
+    ClaudeResponse,
+    ClaudeAnalysis,
+    SessionCreateRequest,
+    SessionMessageRequest,
+    SessionMessageResponse
+)
 
 router = APIRouter(prefix="/claude", tags=["claude"])
 logger = LogManager.get_logger("claude_endpoints")
@@ -25,23 +35,23 @@ async def claude_status() -> Dict[str, Any]:
         status = await service.get_status()
         
         # Registrar métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="claude_status",
             method="GET",
             status_code=200,
             response_time=time.time() - start_time
-        )
+        ))
         
         return status
         
     except Exception as e:
         # Registrar error en métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="claude_status",
             method="GET",
             status_code=500,
             response_time=time.time() - start_time
-        )
+        ))
         
         logger.error(f"Error al obtener estado de Claude: {str(e)}")
         raise HTTPException(
@@ -79,12 +89,12 @@ async def mcp_completion(
         response = await service.mcp_completion(request)
         
         # Registrar métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="mcp_completion",
             method="POST",
             status_code=200,
             response_time=time.time() - start_time
-        )
+        ))
         
         return response
         
@@ -92,12 +102,12 @@ async def mcp_completion(
         raise
     except Exception as e:
         # Registrar error en métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="mcp_completion",
             method="POST",
             status_code=500,
             response_time=time.time() - start_time
-        )
+        ))
         
         logger.error(f"Error al procesar solicitud de completado: {str(e)}")
         raise HTTPException(
@@ -137,12 +147,12 @@ async def analyze_text(
         analysis = await service.analyze_text(text, analysis_type)
         
         # Registrar métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="analyze_text",
             method="POST",
             status_code=200,
             response_time=time.time() - start_time
-        )
+        ))
         
         return analysis
         
@@ -150,15 +160,224 @@ async def analyze_text(
         raise
     except Exception as e:
         # Registrar error en métricas
-        await metrics.record_api_call(
+        await metrics.record_api_call(APIMetric(
             endpoint="analyze_text",
             method="POST",
             status_code=500,
             response_time=time.time() - start_time
-        )
+        ))
         
         logger.error(f"Error al analizar texto: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al analizar texto"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/analyze-file")
+async def analyze_file(
+    filename: str,
+    analysis_type: str = "summary",
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Analiza un archivo de DATA_DIR de forma incremental
+    
+    Solo los fragmentos nuevos o modificados desde el último análisis
+    se envían a Claude; el resto se recupera de la caché.
+    
+    Args:
+        filename: Nombre del archivo a analizar
+        analysis_type: Tipo de análisis a realizar
+        current_user: Usuario actual autenticado
+        
+    Returns:
+        Dict con el análisis combinado y estadísticas de fragmentos
+    """
+    start_time = time.time()
+    
+    try:
+        # Verificar API key
+        if not current_user.get("api_key"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="API key no proporcionada"
+            )
+        
+        # Analizar archivo
+        service = get_incremental_analysis_service()
+        result = await service.analyze_file(filename, analysis_type)
+        
+        # Registrar métricas
+        await metrics.record_api_call(APIMetric(
+            endpoint="analyze_file",
+            method="POST",
+            status_code=200,
+            response_time=time.time() - start_time
+        ))
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        # Registrar error en métricas
+        await metrics.record_api_call(APIMetric(
+            endpoint="analyze_file",
+            method="POST",
+            status_code=500,
+            response_time=time.time() - start_time
+        ))
+        
+        logger.error(f"Error al analizar archivo: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al analizar archivo"
+        )
+
+@router.post("/sessions")
+async def create_session(
+    request: SessionCreateRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Crea una sesión de conversación almacenada en el servidor
+    
+    Args:
+        request: Configuración de la sesión
+        current_user: Usuario actual autenticado
+        
+    Returns:
+        Dict con los metadatos de la sesión creada
+    """
+    try:
+        service = get_session_service()
+        return await service.create_session(system=request.system, owner=principal_id(current_user))
+    except Exception as e:
+        logger.error(f"Error al crear sesión: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al crear sesión"
+        )
+
+@router.get("/sessions/{session_id}")
+async def get_session(
+    session_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Obtiene el resumen y los turnos vigentes de una sesión
+    
+    Args:
+        session_id: Identificador de la sesión
+        current_user: Usuario actual autenticado
+        
+    Returns:
+        Dict con metadatos y mensajes de la sesión
+    """
+    try:
+        service = get_session_service()
+        return await service.get_session(session_id, owner=principal_id(current_user))
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except Exception as e:
+        logger.error(f"Error al obtener sesión: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener sesión"
+        )
+
+@router.post("/sessions/{session_id}/messages", response_model=SessionMessageResponse)
+async def send_session_message(
+    session_id: str,
+    request: SessionMessageRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> SessionMessageResponse:
+    """
+    Envía un mensaje dentro de una sesión
+    
+    Solo se transmite el nuevo mensaje; el historial y su resumen se
+    reconstruyen en el servidor.
+    
+    Args:
+        session_id: Identificador de la sesión
+        request: Mensaje a enviar
+        current_user: Usuario actual autenticado
+        
+    Returns:
+        SessionMessageResponse con la respuesta de Claude
+    """
+    start_time = time.time()
+    
+    try:
+        service = get_session_service()
+        result = await service.send_message(
+            session_id,
+            request.message,
+            max_tokens=request.max_tokens,
+            owner=principal_id(current_user)
+        )
+        
+        # Registrar métricas
+        await metrics.record_api_call(APIMetric(
+            endpoint="session_message",
+            method="POST",
+            status_code=200,
+            response_time=time.time() - start_time
+        ))
+        
+        return SessionMessageResponse(**result)
+        
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except Exception as e:
+        # Registrar error en métricas
+        await metrics.record_api_call(APIMetric(
+            endpoint="session_message",
+            method="POST",
+            status_code=500,
+            response_time=time.time() - start_time
+        ))
+        
+        logger.error(f"Error al enviar mensaje de sesión: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al enviar mensaje de sesión"
+        )
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(
+    session_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Elimina una sesión y su historial
+    
+    Args:
+        session_id: Identificador de la sesión
+        current_user: Usuario actual autenticado
+        
+    Returns:
+        Dict con el resultado de la operación
+    """
+    try:
+        service = get_session_service()
+        deleted = await service.delete_session(session_id, owner=principal_id(current_user))
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Sesión no encontrada: {session_id}"
+            )
+        return {"session_id": session_id, "deleted": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al eliminar sesión: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al eliminar sesión"
+        )
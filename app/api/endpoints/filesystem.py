@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+import json
+import asyncio
+from dataclasses import asdict
+from typing import AsyncIterator, List, Optional
+from app.core.config import settings
 from app.core.security import verify_api_key
-from app.services.filesystem_service import FileSystemService
+from app.services.filesystem_service import FileSystemService, get_artifact_store
+from app.services.data_watcher import get_data_watcher
+from app.utils.http_cache import http_date, is_not_modified, validator_headers
+from app.utils.range_response import RangeFileResponse
+from app.utils.streaming_upload import UploadTooLargeError
 from app.schemas.filesystem import (
+    BulkFileRequest,
+    BulkFileResponse,
     FileOperation,
     FileResponse,
-    FileListResponse
+    FileListResponse,
+    FileChange,
+    FileChangesResponse,
+    FilePatchRequest,
+    FileSearchResponse,
+    FileUploadResponse
 )
 from app.core.logging import LogManager
 
@@ -40,16 +56,216 @@ async def create_file(
             detail=f"Error al crear archivo: {str(e)}"
         )
 
+@router.get("/search", response_model=FileSearchResponse)
+async def search_files(
+    q: str = Query(..., min_length=1, description="Consulta de texto completo"),
+    limit: int = Query(10, ge=1, description="Máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Resultados a saltar"),
+    match_all: bool = Query(False, description="Exigir todos los términos"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Busca texto en los documentos almacenados.
+    
+    Args:
+        q: Consulta en español o inglés
+        limit: Máximo de resultados
+        offset: Resultados a saltar
+        match_all: Exigir todos los términos
+        api_key: API key para autenticación
+        
+    Returns:
+        FileSearchResponse: Documentos ordenados por relevancia con fragmentos
+    """
+    try:
+        return await FileSystemService().search_files(q, limit=limit, offset=offset, match_all=match_all)
+    except Exception as e:
+        LogManager.log_error("filesystem", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al buscar en archivos: {str(e)}"
+        )
+
+@router.get("/changes", response_model=FileChangesResponse)
+async def list_changes(
+    since: int = Query(0, ge=0, description="Última secuencia leída"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Devuelve los cambios de DATA_DIR posteriores a una secuencia.
+    
+    Args:
+        since: Última secuencia leída por el cliente
+        api_key: API key para autenticación
+        
+    Returns:
+        FileChangesResponse: Cambios, secuencia actual y si hay que volver a listar
+    """
+    watcher = get_data_watcher()
+    changes, seq, reset = watcher.changes_since(since)
+    return FileChangesResponse(
+        changes=[FileChange(**asdict(change)) for change in changes],
+        seq=seq,
+        reset=reset,
+        backend=watcher.get_status()["backend"]
+    )
+
+@router.get("/artifacts")
+async def artifact_status(
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Devuelve el estado del almacén deduplicado de artefactos generados
+    (nombres, blobs, bytes lógicos y almacenados, razón de deduplicación)
+    """
+    return await asyncio.to_thread(get_artifact_store().get_status)
+
+@router.post("/bulk", response_model=BulkFileResponse)
+async def bulk_operations(
+    request: BulkFileRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Ejecuta muchas operaciones de archivo en una sola petición.
+    
+    Las operaciones se ejecutan en paralelo (las de un mismo archivo, en
+    orden) y cada una tiene su propio resultado. Con stream=true la
+    respuesta es NDJSON: una línea "result" por operación según termina y
+    una línea "summary" al final.
+    
+    Args:
+        request: Operaciones y opciones del lote
+        api_key: API key para autenticación
+        
+    Returns:
+        BulkFileResponse: Resultados en el orden de la petición
+    """
+    service = FileSystemService()
+    
+    if not request.stream:
+        try:
+            return await service.bulk(request.operations, request.concurrency)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Validar antes de empezar a transmitir para poder responder 400
+    iterator = service.iter_bulk(request.operations, request.concurrency)
+    try:
+        first = await iterator.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def stream() -> AsyncIterator[str]:
+        succeeded = 0
+        total = 0
+        try:
+            result = first
+            while True:
+                total += 1
+                succeeded += int(result.success)
+                yield json.dumps({"type": "result", **result.dict()}, ensure_ascii=False, default=str) + "\n"
+                try:
+                    result = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            yield json.dumps({
+                "type": "summary",
+                "total": total,
+                "succeeded": succeeded,
+                "failed": total - succeeded
+            }) + "\n"
+        finally:
+            await iterator.aclose()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/upload", response_model=FileUploadResponse)
+async def upload_files(
+    request: Request,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Sube uno o varios archivos (multipart/form-data) a UPLOAD_DIR.
+    
+    El cuerpo se procesa a medida que llega: los archivos nunca se cargan
+    enteros en memoria y la subida se corta en cuanto supera MAX_FILE_SIZE.
+    
+    Args:
+        request: Petición con el cuerpo multipart
+        api_key: API key para autenticación
+        
+    Returns:
+        FileUploadResponse: Archivos guardados con su hash y tipo MIME
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_REQUEST_SIZE:
+        raise HTTPException(status_code=413, detail="Petición demasiado grande")
+    
+    try:
+        files = await FileSystemService().save_upload(
+            request.stream(),
+            request.headers.get("content-type", "")
+        )
+        return FileUploadResponse(
+            success=True,
+            message=f"{len(files)} archivo(s) subido(s) correctamente",
+            files=files
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        LogManager.log_error("filesystem", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al subir archivos: {str(e)}"
+        )
+
+@router.api_route("/{filename}/raw", methods=["GET", "HEAD"], response_class=RangeFileResponse)
+async def read_file_raw(
+    filename: str,
+    download: bool = Query(False, description="Servir como adjunto"),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Sirve el contenido de un archivo en crudo.
+    
+    Admite peticiones Range (206 / 416) e If-Range. El archivo se envía por
+    bloques sin cargarlo entero en memoria.
+    
+    Args:
+        filename: Nombre del archivo
+        download: Si se sirve como adjunto
+        api_key: API key para autenticación
+        
+    Returns:
+        RangeFileResponse: Contenido del archivo
+    """
+    try:
+        return FileSystemService().stream_file(filename, download=download)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{filename}", response_model=FileResponse)
 async def read_file(
     filename: str,
+    request: Request,
+    response: Response,
     api_key: str = Depends(verify_api_key)
 ):
     """
     Lee un archivo existente.
     
+    La respuesta incluye ETag y Last-Modified; con If-None-Match o
+    If-Modified-Since que coinciden se responde 304 sin leer el archivo.
+    
     Args:
         filename: Nombre del archivo a leer
+        request: Petición, para las cabeceras condicionales
+        response: Respuesta, para añadir las cabeceras de validación
         api_key: API key para autenticación
         
     Returns:
@@ -57,8 +273,18 @@ async def read_file(
     """
     try:
         service = FileSystemService()
-        response = await service.read_file(filename)
-        return response
+        try:
+            _, file_stat = service.stat_file(filename)
+        except (FileNotFoundError, ValueError):
+            file_stat = None
+        if file_stat is not None and is_not_modified(request.headers, file_stat):
+            return Response(status_code=304, headers=validator_headers(file_stat))
+        
+        result = await service.read_file(filename)
+        if result.etag:
+            response.headers["ETag"] = result.etag
+            response.headers["Last-Modified"] = http_date(result.file_info.modified_at.timestamp())
+        return result
     except Exception as e:
         LogManager.log_error("filesystem", str(e))
         raise HTTPException(
@@ -68,21 +294,44 @@ async def read_file(
 
 @router.get("/", response_model=FileListResponse)
 async def list_files(
+    pattern: Optional[str] = Query(None, description="Patrón tipo glob sobre el nombre"),
+    extension: Optional[str] = Query(None, description="Extensión exacta"),
+    content_type: Optional[str] = Query(None, description="Prefijo del tipo MIME"),
+    sort_by: str = Query("filename", description="Campo de orden"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sentido del orden"),
+    offset: int = Query(0, ge=0, description="Archivos a saltar"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página"),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Lista todos los archivos disponibles.
+    Lista los archivos disponibles con filtros, orden y paginación.
     
     Args:
+        pattern: Patrón tipo glob sobre el nombre
+        extension: Extensión exacta
+        content_type: Prefijo del tipo MIME
+        sort_by: Campo de orden (filename, size, created_at, modified_at, content_type)
+        order: asc o desc
+        offset: Archivos a saltar
+        limit: Tamaño de página
         api_key: API key para autenticación
         
     Returns:
-        FileListResponse: Lista de archivos
+        FileListResponse: Página de archivos y total filtrado
     """
     try:
         service = FileSystemService()
-        response = await service.list_files()
-        return response
+        return await service.list_files(
+            pattern=pattern,
+            extension=extension,
+            content_type=content_type,
+            sort_by=sort_by,
+            descending=order == "desc",
+            offset=offset,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         LogManager.log_error("filesystem", str(e))
         raise HTTPException(
@@ -121,6 +370,54 @@ async def update_file(
             detail=f"Error al actualizar archivo: {str(e)}"
         )
 
+PATCH_ERROR_STATUS = {
+    "FILE_NOT_FOUND": 404,
+    "PRECONDITION_FAILED": 412,
+    "INVALID_FILENAME": 400,
+    "INVALID_PATCH": 400
+}
+
+@router.patch("/{filename}", response_model=FileResponse)
+async def patch_file(
+    filename: str,
+    patch: FilePatchRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Modifica parcialmente un archivo existente.
+    
+    Acepta un diff unificado, la sustitución de un rango de bytes o un
+    texto a añadir al final. Con If-Match el cambio solo se aplica si el
+    archivo conserva ese ETag (412 en otro caso).
+    
+    Args:
+        filename: Nombre del archivo a modificar
+        patch: Parche a aplicar
+        response: Respuesta, para añadir el nuevo ETag
+        if_match: ETag esperado del archivo
+        api_key: API key para autenticación
+        
+    Returns:
+        FileResponse: Archivo modificado y su nuevo ETag
+    """
+    try:
+        result = await FileSystemService().patch_file(filename, patch, if_match=if_match)
+    except Exception as e:
+        LogManager.log_error("filesystem", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al modificar archivo: {str(e)}"
+        )
+    
+    if not result.success:
+        status_code = PATCH_ERROR_STATUS.get(result.error, 500)
+        headers = {"ETag": result.etag} if result.etag else None
+        raise HTTPException(status_code=status_code, detail=result.message, headers=headers)
+    response.headers["ETag"] = result.etag
+    return result
+
 @router.delete("/{filename}", response_model=FileResponse)
 async def delete_file(
     filename: str,
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 from app.core.security import verify_api_key
 from app.core.logging import LogManager
-from app.services.brave_search import BraveSearchService
+from app.services.brave_search import get_brave_search
 from app.services.claude_service import ClaudeService
 from app.services.filesystem_service import FileSystemService
 import psutil
@@ -26,7 +26,7 @@ async def health_check():
         disk = psutil.disk_usage('/')
         
         # Verificar servicios
-        brave_search = BraveSearchService()
+        brave_search = get_brave_search()
         claude = ClaudeService()
         filesystem = FileSystemService()
         
@@ -95,7 +95,7 @@ async def check_services(
     """
     try:
         # Inicializar servicios
-        brave_search = BraveSearchService()
+        brave_search = get_brave_search()
         claude = ClaudeService()
         filesystem = FileSystemService()
         
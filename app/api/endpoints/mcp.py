@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
-from typing import Dict, List, Optional, Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
+import json
 import time
+import asyncio
 import logging
 
 from app.schemas.mcp import (
     MCPRequest, MCPResponse, MCPError, MCPStatus, 
-    MCPOperation, MCPExecuteRequest, MCPExecuteResponse
+    MCPOperation, MCPExecuteRequest, MCPExecuteResponse,
+    MCPAgentRequest, MCPAgentResponse
 )
 from app.services.mcp_service import MCPService
+from app.services.mcp_protocol import (
+    INTERNAL_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, JSONRPCError, MCPProtocol
+)
+from app.services.agent_service import AgentService
+from app.core.config import settings
 from app.core.logging import LogManager
+from app.core.security import principal_id
+from app.utils.jsonrpc_batch import InvalidBatchEntry, message_id, parse_entry, run_batch
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 mcp_service = MCPService()
+agent_service = AgentService(mcp_service)
+mcp_protocol = MCPProtocol(mcp_service)
 logger = logging.getLogger(__name__)
 
+# Peticiones en curso por el transporte SSE, para notifications/cancelled,
+# por (usuario, Mcp-Session-Id, id): los ids solo son únicos por cliente
+_stream_tasks: Dict[Tuple[str, str, Any], asyncio.Task] = {}
+
 @router.get("/status", response_model=MCPStatus)
 async def mcp_status():
     """
@@ -29,21 +45,209 @@ async def mcp_status():
         LogManager.log_error("mcp", f"Error al obtener estado: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/execute", response_model=MCPResponse)
-async def execute_mcp(request: MCPRequest):
+@router.post("/execute", response_model=Union[MCPResponse, List[MCPResponse]])
+async def execute_mcp(request: Union[MCPRequest, List[Any]] = Body(...)):
     """
-    Ejecuta una solicitud MCP
+    Ejecuta una solicitud MCP o un lote JSON-RPC (array de solicitudes)
+    
+    Las solicitudes de un lote se ejecutan en paralelo (hasta
+    MCP_BATCH_CONCURRENCY) y se responde con un array en el mismo orden,
+    cada respuesta con el id de su solicitud. El fallo de una no afecta a
+    las demás: p. ej. status, list_resources y dos execute en un solo viaje.
+    Las notificaciones (sin id) no se responden; si el lote solo tiene
+    notificaciones la respuesta es 202 sin cuerpo.
     """
+    if isinstance(request, list):
+        return await _execute_batch(request)
     try:
-        LogManager.log_info(f"Ejecutando solicitud MCP: {request}")
+        logger.info(f"Ejecutando solicitud MCP: {request}")
         start_time = time.time()
         response = await mcp_service.process_request(request)
         execution_time = time.time() - start_time
         response.execution_time = execution_time
-        LogManager.log_info(f"Respuesta MCP: {response}")
+        logger.info(f"Respuesta MCP: {response}")
+        return response
+    except Exception as e:
+        logger.error(f"Error al ejecutar solicitud: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _batch_error(message: Any, error: Exception) -> MCPResponse:
+    if isinstance(error, InvalidBatchEntry):
+        return MCPResponse(
+            id=message_id(message),
+            error=MCPError(code=INVALID_REQUEST, message=f"Solicitud no válida: {str(error)}"),
+            execution_time=0.0
+        )
+    logger.error(f"Error en solicitud del lote: {str(error)}")
+    return MCPResponse(id=message_id(message), error=MCPError(code=INTERNAL_ERROR, message=str(error)), execution_time=0.0)
+
+async def _execute_batch(messages: List[Any]) -> Union[MCPResponse, List[MCPResponse], Response]:
+    """
+    Ejecuta un lote JSON-RPC de /mcp/execute
+    """
+    if not messages or len(messages) > settings.MCP_BATCH_MAX_REQUESTS:
+        # Según JSON-RPC un lote no válido se responde con un único error
+        return MCPResponse(
+            error=MCPError(
+                code=INVALID_REQUEST,
+                message=f"El lote debe tener entre 1 y {settings.MCP_BATCH_MAX_REQUESTS} solicitudes"
+            ),
+            execution_time=0.0
+        )
+    responses = await run_batch(
+        messages,
+        lambda message: mcp_service.process_request(parse_entry(message, MCPRequest)),
+        _batch_error,
+        settings.MCP_BATCH_CONCURRENCY
+    )
+    return responses or Response(status_code=202)
+
+def _jsonrpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+def _sse(message: Dict[str, Any]) -> str:
+    return f"event: message\ndata: {json.dumps(message, ensure_ascii=False, default=str)}\n\n"
+
+def _valid_id(request_id: Any) -> bool:
+    return request_id is None or (isinstance(request_id, (str, int)) and not isinstance(request_id, bool))
+
+def _stream_scope(request: Request) -> Tuple[str, str]:
+    """
+    Ámbito de las peticiones SSE de un cliente: el usuario (por su API key)
+    y la sesión MCP de la cabecera Mcp-Session-Id
+    """
+    return (
+        principal_id({"api_key": request.headers.get("X-API-Key", "")}),
+        request.headers.get("Mcp-Session-Id", "")
+    )
+
+async def _run_streamed(request_id: Any, method: str, params: Dict[str, Any], queue: asyncio.Queue) -> None:
+    """
+    Ejecuta una petición del transporte SSE dejando en `queue` sus
+    notificaciones, la respuesta final y None si se cancela
+    """
+    try:
+        result = await mcp_protocol.handle(method, params, notify=queue.put_nowait, progress_token=request_id)
+        queue.put_nowait({"jsonrpc": "2.0", "id": request_id, "result": result})
+    except asyncio.CancelledError:
+        # Cancelada por el cliente: se cierra el flujo sin respuesta
+        queue.put_nowait(None)
+    except JSONRPCError as e:
+        queue.put_nowait(_jsonrpc_error(request_id, e.code, e.message))
+    except Exception as e:
+        logger.error(f"Error en petición SSE {request_id}: {str(e)}")
+        queue.put_nowait(_jsonrpc_error(request_id, INTERNAL_ERROR, str(e)))
+
+async def _stream_events(task: asyncio.Task, queue: asyncio.Queue) -> AsyncIterator[str]:
+    """
+    Emite como SSE los mensajes de una petición hasta su respuesta
+
+    Si el cliente se desconecta, la tarea se cancela y libera la llamada a
+    Claude o Brave en curso.
+    """
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.MCP_SSE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                # Comentario SSE para que proxies y clientes no cierren la conexión
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield _sse(message)
+            if "id" in message:
+                break
+    finally:
+        if not task.done():
+            task.cancel()
+
+@router.post("/stream")
+async def stream_mcp(request: Request):
+    """
+    Transporte MCP por HTTP con Server-Sent Events
+    
+    El cuerpo es un mensaje JSON-RPC del protocolo MCP (tools/call,
+    tools/list, resources/*...). Las peticiones responden con un flujo SSE
+    con las notificaciones de progreso (notifications/progress), los
+    resultados parciales (notifications/partial_result, p. ej. el Markdown
+    según se genera) y al final la respuesta con el mismo id. El
+    progressToken es _meta.progressToken o, si no se indica, el id.
+    
+    Una notificación notifications/cancelled con el requestId cancela la
+    petición en curso (respuesta 202) si llega del mismo usuario y con la
+    misma cabecera Mcp-Session-Id; cerrar la conexión también la cancela.
+    """
+    try:
+        message = json.loads(await request.body())
+    except ValueError:
+        return JSONResponse(_jsonrpc_error(None, PARSE_ERROR, "JSON inválido"), status_code=400)
+    if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+        return JSONResponse(_jsonrpc_error(None, INVALID_REQUEST, "Se esperaba un mensaje JSON-RPC"), status_code=400)
+    
+    method = message["method"]
+    params = message.get("params") or {}
+    scope = _stream_scope(request)
+    if "id" not in message:
+        if method == "notifications/cancelled" and isinstance(params, dict) and _valid_id(params.get("requestId")):
+            task = _stream_tasks.get((*scope, params.get("requestId")))
+            if task is not None:
+                task.cancel()
+        return Response(status_code=202)
+    
+    request_id = message["id"]
+    if not _valid_id(request_id):
+        return JSONResponse(
+            _jsonrpc_error(None, INVALID_REQUEST, "El id debe ser texto, número entero o null"),
+            status_code=400
+        )
+    if not mcp_protocol.supports(method):
+        return JSONResponse(_jsonrpc_error(request_id, METHOD_NOT_FOUND, f"Método no soportado: {method}"))
+    task_key = (*scope, request_id)
+    if task_key in _stream_tasks:
+        return JSONResponse(
+            _jsonrpc_error(request_id, INVALID_REQUEST, f"Ya hay una petición en curso con id {request_id}"),
+            status_code=409
+        )
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(_run_streamed(request_id, method, params, queue))
+
+    def on_done(t: asyncio.Task) -> None:
+        if _stream_tasks.get(task_key) is t:
+            del _stream_tasks[task_key]
+        # Cancelada antes de empezar: _run_streamed no llega a cerrar el flujo
+        if t.cancelled():
+            queue.put_nowait(None)
+
+    task.add_done_callback(on_done)
+    _stream_tasks[task_key] = task
+    return StreamingResponse(
+        _stream_events(task, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/agent", response_model=MCPAgentResponse)
+async def run_agent(request: MCPAgentRequest):
+    """
+    Ejecuta en el servidor el bucle de herramientas de Claude
+    
+    Las herramientas que Claude solicita en cada ronda se ejecutan en
+    paralelo y sus resultados se le devuelven hasta obtener la respuesta final.
+    """
+    try:
+        LogManager.log_info(f"Ejecutando bucle de agente: {request.prompt[:100]}")
+        response = await agent_service.run(request)
+        LogManager.log_info(
+            f"Bucle de agente completado en {response.iterations} rondas "
+            f"con {len(response.tool_calls)} herramientas"
+        )
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        LogManager.log_error("mcp", f"Error al ejecutar solicitud: {str(e)}")
+        LogManager.log_error("mcp", f"Error en bucle de agente: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/operations", response_model=List[MCPOperation])
@@ -8,6 +8,7 @@ from app.schemas.resources import (
     ResourceDefinition
 )
 from app.services.resources_service import ResourcesService
+from app.utils.range_response import RangeFileResponse
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 resources_service = ResourcesService()
@@ -25,6 +26,18 @@ async def list_resources(api_key: str = Depends(verify_api_key)):
         LogManager.log_error("resources", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.api_route("/filesystem/files/{filename}", methods=["GET", "HEAD"], response_class=RangeFileResponse)
+async def stream_filesystem_resource(filename: str, api_key: str = Depends(verify_api_key)):
+    """
+    Sirve en crudo un archivo del recurso filesystem, con soporte de Range
+    """
+    try:
+        return resources_service.filesystem_service.stream_file(filename)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{name}", response_model=ResourceDefinition)
 async def get_resource(name: str, api_key: str = Depends(verify_api_key)):
     """
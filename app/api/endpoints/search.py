@@ -1,10 +1,13 @@
+import json
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Dict, Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional, AsyncIterator
 # from app.services.brave_search import BraveSearch
+from app.services.brave_search import get_brave_search
 from app.services.claude_service import ClaudeService
 from app.core.logging import LogManager
 from app.core.security import verify_api_key
-from app.schemas.search import SearchResponse, SearchAnalysis
+from app.schemas.search import SearchResponse, SearchAnalysis, BatchSearchRequest, BatchSearchResponse
 from app.core.markdown_logger import MarkdownLogger
 
 router = APIRouter()
@@ -27,4 +30,92 @@ async def search_web(
     raise HTTPException(
         status_code=501,
         detail="El servicio de búsqueda está temporalmente deshabilitado"
-    ) 
\ No newline at end of file
+    )
+
+@router.get("/search/quota")
+async def search_quota(
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Devuelve la última cuota de Brave Search conocida por este worker
+    """
+    return get_brave_search().quota.get_status()
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def batch_search(
+    request: BatchSearchRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Ejecuta varias búsquedas en paralelo y combina sus resultados
+    
+    Los resultados se deduplican por URL canónica y descripción casi
+    idéntica y se ordenan por Reciprocal Rank Fusion. Con stream=true la
+    respuesta es NDJSON: una línea "partial" por consulta completada y una
+    línea "final" con los resultados combinados.
+    """
+    brave_search = get_brave_search()
+    
+    if not request.stream:
+        try:
+            return await brave_search.batch_search(
+                request.queries,
+                num_results=request.num_results,
+                country=request.country,
+                language=request.language,
+                max_results=request.max_results
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Validar antes de empezar a transmitir para poder responder 400
+    iterator = brave_search.iter_search_many(
+        request.queries,
+        num_results=request.num_results,
+        country=request.country,
+        language=request.language
+    )
+    try:
+        first = await iterator.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def stream() -> AsyncIterator[str]:
+        completed = {}
+        errors = {}
+        
+        def partial(query, response, error) -> str:
+            if error is not None:
+                errors[query] = error
+            else:
+                completed[query] = response
+            return json.dumps({
+                "type": "partial",
+                "query": query,
+                "results": [r.dict() for r in response.results] if response else [],
+                "error": error,
+                "completed": len(completed) + len(errors)
+            }, ensure_ascii=False) + "\n"
+        
+        try:
+            yield partial(*first)
+            async for item in iterator:
+                yield partial(*item)
+            
+            # Fusionar en el orden de las consultas para que el resultado sea determinista
+            executed = [q for q in dict.fromkeys(request.queries) if q in completed or q in errors]
+            results = brave_search.merge_responses(
+                [(q, completed[q]) for q in executed if q in completed],
+                request.max_results
+            )
+            final = BatchSearchResponse(
+                queries=executed,
+                results=results,
+                total_results=len(results),
+                errors=errors
+            )
+            yield json.dumps({"type": "final", **final.dict()}, ensure_ascii=False) + "\n"
+        finally:
+            await iterator.aclose()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
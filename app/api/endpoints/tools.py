@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any, Optional
+import time
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from typing import List, Dict, Any, Optional, Union
 from app.core.security import verify_api_key
 from app.schemas.mcp import ToolDefinition, MCPToolsResponse, MCPRequest, MCPResponse, MCPError
-from app.services.brave_search import BraveSearch
+from app.schemas.filesystem import BulkFileOperation, FilePatchRequest
+from app.services.brave_search import get_brave_search
 from app.services.filesystem_service import FileSystemService
-from app.services.claude_service import ClaudeService
+from app.services.claude_service import get_claude_service
+from app.core.config import settings
 from app.core.logging import LogManager
+from app.utils.jsonrpc_batch import message_id, parse_entry, run_batch
 
 router = APIRouter(prefix="/tools", tags=["tools"])
+logger = LogManager.get_logger("tools")
 
 # Definición de herramientas disponibles
 AVAILABLE_TOOLS = [
@@ -45,16 +50,41 @@ AVAILABLE_TOOLS = [
             "required": ["query"]
         }
     ),
+    ToolDefinition(
+        name="buscar_en_brave_multiple",
+        description="Ejecuta varias búsquedas en Brave en paralelo y combina los resultados sin duplicados",
+        parameters={
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Consultas relacionadas a ejecutar"
+                },
+                "num_results": {
+                    "type": "integer",
+                    "description": "Número de resultados por consulta",
+                    "default": 5
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Número máximo de resultados combinados",
+                    "default": 20
+                }
+            },
+            "required": ["queries"]
+        }
+    ),
     ToolDefinition(
         name="gestionar_archivo",
-        description="Realiza operaciones CRUD en archivos Markdown",
+        description="Realiza operaciones CRUD y modificaciones parciales (diff, rango, append) en archivos Markdown",
         parameters={
             "type": "object",
             "properties": {
                 "operation": {
                     "type": "string",
-                    "description": "Tipo de operación (create, read, update, delete)",
-                    "enum": ["create", "read", "update", "delete"]
+                    "description": "Tipo de operación (create, read, update, delete, patch, replace, append)",
+                    "enum": ["create", "read", "update", "delete", "patch", "replace", "append"]
                 },
                 "filename": {
                     "type": "string",
@@ -62,12 +92,80 @@ AVAILABLE_TOOLS = [
                 },
                 "content": {
                     "type": "string",
-                    "description": "Contenido del archivo (para create/update)"
+                    "description": "Contenido del archivo (para create/update) o texto a insertar (para replace/append)"
+                },
+                "diff": {
+                    "type": "string",
+                    "description": "Diff unificado a aplicar (para patch)"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Byte inicial del rango a sustituir (para replace)"
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Bytes del rango a sustituir (para replace)"
+                },
+                "if_match": {
+                    "type": "string",
+                    "description": "ETag esperado del archivo; el cambio se rechaza si no coincide"
                 }
             },
             "required": ["operation", "filename"]
         }
     ),
+    ToolDefinition(
+        name="gestionar_archivos_lote",
+        description="Ejecuta muchas operaciones de archivo (create, read, update, delete) en una sola llamada",
+        parameters={
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "operation": {"type": "string", "enum": ["create", "read", "update", "delete"]},
+                            "filename": {"type": "string"},
+                            "content": {"type": "string"}
+                        },
+                        "required": ["operation", "filename"]
+                    },
+                    "description": "Operaciones a ejecutar"
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": "Operaciones simultáneas",
+                    "default": 16
+                }
+            },
+            "required": ["operations"]
+        }
+    ),
+    ToolDefinition(
+        name="buscar_en_archivos",
+        description="Busca texto en los documentos guardados y devuelve fragmentos ordenados por relevancia",
+        parameters={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Consulta de texto completo"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Número máximo de resultados",
+                    "default": 10
+                },
+                "match_all": {
+                    "type": "boolean",
+                    "description": "Exigir todos los términos",
+                    "default": False
+                }
+            },
+            "required": ["query"]
+        }
+    ),
     ToolDefinition(
         name="generar_markdown",
         description="Genera contenido en formato Markdown usando Claude",
@@ -133,36 +231,80 @@ async def list_tools(
     """
     try:
         # Registrar operación
-        LogManager.log_operation(
-            "tools",
-            "list_tools",
-            {"count": len(AVAILABLE_TOOLS)}
-        )
+        logger.info(f"list_tools: {len(AVAILABLE_TOOLS)} herramientas")
         
         return MCPToolsResponse(tools=AVAILABLE_TOOLS)
         
     except Exception as e:
-        LogManager.log_error("tools", str(e))
+        logger.error(str(e))
         raise HTTPException(
             status_code=500,
             detail=f"Error al listar herramientas: {str(e)}"
         )
 
-@router.post("/execute", response_model=MCPResponse)
+@router.post("/execute", response_model=Union[MCPResponse, List[MCPResponse]])
 async def execute_tool(
-    request: MCPRequest,
+    request: Union[MCPRequest, List[Any]] = Body(...),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Ejecuta una herramienta MCP específica.
+    Ejecuta una herramienta MCP específica o un lote JSON-RPC de llamadas.
+    
+    Las llamadas de un lote se ejecutan en paralelo (hasta
+    MCP_BATCH_CONCURRENCY) y se responden en el mismo orden, cada una con
+    su id; el fallo de una no cancela las demás. Las notificaciones (sin
+    id) no se responden.
     
     Args:
-        request: Solicitud MCP con el método y parámetros
+        request: Solicitud MCP con el método y parámetros, o array de solicitudes
         api_key: API key para autenticación
         
+    Returns:
+        MCPResponse: Resultado de la ejecución de la herramienta (array de
+        MCPResponse para un lote, 202 sin cuerpo si solo hay notificaciones)
+    """
+    if not isinstance(request, list):
+        return await _execute_single(request)
+    
+    if not request or len(request) > settings.MCP_BATCH_MAX_REQUESTS:
+        # Según JSON-RPC un lote no válido se responde con un único error
+        return MCPResponse(
+            jsonrpc="2.0",
+            error=MCPError(
+                code=-32600,
+                message=f"El lote debe tener entre 1 y {settings.MCP_BATCH_MAX_REQUESTS} solicitudes"
+            ),
+            id=None,
+            execution_time=0.0
+        )
+    responses = await run_batch(
+        request,
+        lambda message: _execute_single(parse_entry(message, MCPRequest)),
+        _batch_error,
+        settings.MCP_BATCH_CONCURRENCY
+    )
+    return responses or Response(status_code=202)
+
+def _batch_error(message: Any, error: Exception) -> MCPResponse:
+    # _execute_single no lanza excepciones: solo llegan aquí las de validación
+    return MCPResponse(
+        jsonrpc="2.0",
+        error=MCPError(code=-32600, message=f"Solicitud no válida: {str(error)}"),
+        id=message_id(message),
+        execution_time=0.0
+    )
+
+async def _execute_single(request: MCPRequest) -> MCPResponse:
+    """
+    Ejecuta una llamada execute_tool; los errores se devuelven en la respuesta.
+    
+    Args:
+        request: Solicitud MCP con el método y parámetros
+        
     Returns:
         MCPResponse: Resultado de la ejecución de la herramienta
     """
+    start_time = time.time()
     try:
         # Validar que el método sea execute_tool
         if request.method != "execute_tool":
@@ -172,7 +314,8 @@ async def execute_tool(
                     code=-32601,
                     message=f"Método no soportado: {request.method}"
                 ),
-                id=request.id
+                id=request.id,
+                execution_time=time.time() - start_time
             )
         
         # Extraer parámetros
@@ -180,11 +323,7 @@ async def execute_tool(
         parameters = request.params.get("parameters", {})
         
         # Registrar operación
-        LogManager.log_operation(
-            "tools",
-            "execute_tool",
-            {"tool": tool_name, "parameters": parameters}
-        )
+        logger.info(f"execute_tool: {tool_name} {parameters}")
         
         # Ejecutar herramienta según su nombre
         result = await _execute_tool_by_name(tool_name, parameters)
@@ -192,18 +331,20 @@ async def execute_tool(
         return MCPResponse(
             jsonrpc="2.0",
             result=result,
-            id=request.id
+            id=request.id,
+            execution_time=time.time() - start_time
         )
         
     except Exception as e:
-        LogManager.log_error("tools", str(e))
+        logger.error(str(e))
         return MCPResponse(
             jsonrpc="2.0",
             error=MCPError(
                 code=-32000,
                 message=f"Error al ejecutar herramienta: {str(e)}"
             ),
-            id=request.id if hasattr(request, 'id') else None
+            id=request.id if hasattr(request, 'id') else None,
+            execution_time=time.time() - start_time
         )
 
 async def _execute_tool_by_name(tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -218,15 +359,23 @@ async def _execute_tool_by_name(tool_name: str, parameters: Dict[str, Any]) -> D
         Dict[str, Any]: Resultado de la ejecución
     """
     if tool_name == "buscar_en_brave":
-        search_service = BraveSearch()
-        return await search_service.search(
+        return await get_brave_search().search(
             query=parameters.get("query", ""),
-            num_results=parameters.get("num_results", 5),
-            country=parameters.get("country", "es"),
-            language=parameters.get("language", "es"),
+            num_results=parameters.get("num_results"),
+            country=parameters.get("country"),
+            language=parameters.get("language"),
             analyze=parameters.get("analyze", False)
         )
         
+    elif tool_name == "buscar_en_brave_multiple":
+        return await get_brave_search().batch_search(
+            queries=parameters.get("queries", []),
+            num_results=parameters.get("num_results"),
+            country=parameters.get("country"),
+            language=parameters.get("language"),
+            max_results=parameters.get("max_results")
+        )
+        
     elif tool_name == "gestionar_archivo":
         filesystem_service = FileSystemService()
         operation = parameters.get("operation", "")
@@ -241,11 +390,33 @@ async def _execute_tool_by_name(tool_name: str, parameters: Dict[str, Any]) -> D
             return await filesystem_service.update_file(filename, content)
         elif operation == "delete":
             return await filesystem_service.delete_file(filename)
+        elif operation in ("patch", "replace", "append"):
+            patch = FilePatchRequest(
+                type="diff" if operation == "patch" else operation,
+                diff=parameters.get("diff"),
+                offset=parameters.get("offset"),
+                length=parameters.get("length"),
+                content=parameters.get("content")
+            )
+            return await filesystem_service.patch_file(filename, patch, if_match=parameters.get("if_match"))
         else:
             raise ValueError(f"Operación no válida: {operation}")
             
+    elif tool_name == "gestionar_archivos_lote":
+        return await FileSystemService().bulk(
+            [BulkFileOperation(**op) for op in parameters.get("operations", [])],
+            concurrency=parameters.get("concurrency")
+        )
+        
+    elif tool_name == "buscar_en_archivos":
+        return await FileSystemService().search_files(
+            parameters.get("query", ""),
+            limit=parameters.get("limit", 10),
+            match_all=parameters.get("match_all", False)
+        )
+        
     elif tool_name == "generar_markdown":
-        claude_service = ClaudeService()
+        claude_service = get_claude_service()
         return await claude_service.generate_markdown(
             content=parameters.get("content", ""),
             format_type=parameters.get("format_type", "article"),
@@ -254,7 +425,7 @@ async def _execute_tool_by_name(tool_name: str, parameters: Dict[str, Any]) -> D
         )
         
     elif tool_name == "analizar_texto":
-        claude_service = ClaudeService()
+        claude_service = get_claude_service()
         return await claude_service.analyze_text(
             text=parameters.get("text", ""),
             analysis_type=parameters.get("analysis_type", "summary")
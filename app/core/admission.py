@@ -0,0 +1,186 @@
+import asyncio
+import math
+import time
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Clase de llamada por defecto (las que no indican ninguna)
+DEFAULT_CALL_CLASS = "default"
+
+class AdmissionController:
+    """
+    Control de admisión para las llamadas a Claude.
+
+    Limita las llamadas simultáneas y mantiene medias móviles exponenciales
+    (EWMA) de su latencia: una global, que estima la espera en la cola, y
+    otra por clase de llamada (p. ej. un análisis corto frente a un
+    Markdown largo en streaming), que estima la ejecución. Si una nueva
+    solicitud tendría que esperar en la cola y la estimación supera el SLO,
+    los llamadores pueden servir una respuesta degradada local en lugar de
+    encolarse. Cada `probe_interval` segundos se deja pasar una solicitud
+    de la clase degradada para que su media se actualice.
+    """
+    def __init__(
+        self,
+        max_concurrency: int,
+        latency_slo: float,
+        initial_latency: float = 2.0,
+        alpha: float = 0.2,
+        enabled: bool = True,
+        probe_interval: float = 30.0
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        self.max_concurrency = max_concurrency
+        self.latency_slo = latency_slo
+        self.enabled = enabled
+        self.probe_interval = probe_interval
+        self._alpha = alpha
+        self._initial_latency = initial_latency
+        self._latency = initial_latency
+        self._class_latency: Dict[str, float] = {}
+        self._last_admitted: Dict[str, float] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._degraded_total = 0
+        self._probes_total = 0
+
+    @property
+    def latency(self) -> float:
+        """Latencia media estimada de una llamada de cualquier clase (EWMA, segundos)"""
+        return self._latency
+
+    def class_latency(self, call_class: str = DEFAULT_CALL_CLASS) -> float:
+        """
+        Latencia media estimada de una llamada de la clase indicada
+
+        Args:
+            call_class: Clase de llamada
+
+        Returns:
+            EWMA de la clase, o la latencia inicial si aún no hay muestras
+        """
+        return self._class_latency.get(call_class, self._initial_latency)
+
+    def record_latency(self, seconds: float, call_class: str = DEFAULT_CALL_CLASS) -> None:
+        """
+        Actualiza las medias móviles con la latencia de una llamada completada
+
+        Args:
+            seconds: Duración de la llamada
+            call_class: Clase de la llamada
+        """
+        self._latency = self._alpha * seconds + (1 - self._alpha) * self._latency
+        self._class_latency[call_class] = self._alpha * seconds + (1 - self._alpha) * self.class_latency(call_class)
+
+    def _ahead(self) -> int:
+        return max(0, self._in_flight + self._waiting + 1 - self.max_concurrency)
+
+    def estimated_latency(self, call_class: str = DEFAULT_CALL_CLASS) -> float:
+        """
+        Estima el tiempo de respuesta de una solicitud admitida ahora
+
+        Cada tanda de `max_concurrency` solicitudes por delante en la cola
+        añade una latencia media global de espera; la ejecución se estima
+        con la media de la clase.
+
+        Args:
+            call_class: Clase de la solicitud
+
+        Returns:
+            Segundos estimados (espera + ejecución)
+        """
+        return math.ceil(self._ahead() / self.max_concurrency) * self._latency + self.class_latency(call_class)
+
+    def should_degrade(self, call_class: str = DEFAULT_CALL_CLASS) -> bool:
+        """
+        Indica si una nueva solicitud incumpliría el SLO de latencia
+
+        Solo se degrada si la solicitud tendría que esperar en la cola: con
+        un hueco libre se ejecuta siempre. Tampoco se degrada la sonda
+        periódica de la clase.
+
+        Args:
+            call_class: Clase de la solicitud
+
+        Returns:
+            True si se debe servir la respuesta degradada
+        """
+        if not self.enabled or self._ahead() == 0:
+            return False
+        if self.estimated_latency(call_class) <= self.latency_slo:
+            return False
+        now = time.monotonic()
+        if now - self._last_admitted.setdefault(call_class, now) >= self.probe_interval:
+            # Sonda: sin ella la media de la clase no bajaría nunca
+            self._last_admitted[call_class] = now
+            self._probes_total += 1
+            return False
+        self._degraded_total += 1
+        logger.warning(
+            f"Admisión degradada ({call_class}): latencia estimada {self.estimated_latency(call_class):.2f}s "
+            f"> SLO {self.latency_slo:.2f}s ({self._in_flight} en curso, {self._waiting} en cola)"
+        )
+        return True
+
+    @asynccontextmanager
+    async def slot(self, call_class: str = DEFAULT_CALL_CLASS) -> AsyncIterator[None]:
+        """
+        Reserva un hueco de concurrencia y mide la duración de la llamada
+
+        Args:
+            call_class: Clase de la llamada, para su media de latencia
+        """
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._last_admitted[call_class] = time.monotonic()
+        start_time = time.time()
+        try:
+            yield
+            self.record_latency(time.time() - start_time, call_class)
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado actual del control de admisión
+
+        Returns:
+            Dict con concurrencia, cola, latencia estimada y degradaciones
+        """
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "latency_ewma": round(self._latency, 3),
+            "latency_ewma_by_class": {name: round(latency, 3) for name, latency in self._class_latency.items()},
+            "latency_slo": self.latency_slo,
+            "degraded_total": self._degraded_total,
+            "probes_total": self._probes_total
+        }
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """
+    Obtiene el control de admisión compartido de las llamadas a Claude
+    """
+    return AdmissionController(
+        max_concurrency=settings.CLAUDE_MAX_CONCURRENCY,
+        latency_slo=settings.CLAUDE_LATENCY_SLO,
+        initial_latency=settings.CLAUDE_LATENCY_INITIAL,
+        enabled=settings.CLAUDE_DEGRADE_ENABLED,
+        probe_interval=settings.CLAUDE_DEGRADE_PROBE_INTERVAL
+    )
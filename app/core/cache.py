@@ -364,6 +364,123 @@ class Cache:
             logger.error(f"Error al actualizar TTL en caché: {str(e)}")
             raise CacheOperationError(f"Error al actualizar TTL en caché: {str(e)}")
 
+    @on_exception(expo, RedisError, max_tries=3, max_time=5)
+    def append_to_list(self, key: str, values: List[Any], ttl: Optional[int] = None) -> int:
+        """
+        Añade valores al final de una lista y renueva su tiempo de vida.
+        
+        Args:
+            key: Clave de la lista
+            values: Valores a añadir
+            ttl: Tiempo de vida en segundos (opcional)
+            
+        Returns:
+            Longitud de la lista tras la operación
+            
+        Raises:
+            CacheOperationError: Si hay un error en la operación
+        """
+        try:
+            full_key = f"{self.prefix}{key}"
+            pipe = self.redis.pipeline()
+            pipe.rpush(full_key, *[json.dumps(value, separators=(",", ":")) for value in values])
+            pipe.expire(full_key, ttl or self.default_ttl)
+            length, _ = pipe.execute()
+            return length
+        except (RedisError, TypeError) as e:
+            logger.error(f"Error al añadir a lista en caché: {str(e)}")
+            raise CacheOperationError(f"Error al añadir a lista en caché: {str(e)}")
+    
+    @on_exception(expo, RedisError, max_tries=3, max_time=5)
+    def append_to_list_and_set(
+        self,
+        list_key: str,
+        values: List[Any],
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        trim_start: int = 0
+    ) -> int:
+        """
+        Añade valores a una lista y guarda un valor asociado en una sola
+        transacción (MULTI/EXEC): o se aplican ambos cambios o ninguno.
+        
+        Args:
+            list_key: Clave de la lista
+            values: Valores a añadir
+            key: Clave del valor asociado (p. ej. metadatos de la lista)
+            value: Valor asociado
+            ttl: Tiempo de vida en segundos de ambas claves (opcional)
+            trim_start: Elementos a descartar del inicio de la lista tras añadir
+        
+        Returns:
+            Longitud de la lista tras la operación
+        
+        Raises:
+            CacheOperationError: Si hay un error en la operación
+        """
+        try:
+            full_list_key = f"{self.prefix}{list_key}"
+            ttl = ttl or self.default_ttl
+            serialized = json.dumps(value)
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.rpush(full_list_key, *[json.dumps(v, separators=(",", ":")) for v in values])
+            if trim_start:
+                pipe.ltrim(full_list_key, trim_start, -1)
+            pipe.expire(full_list_key, ttl)
+            pipe.set(f"{self.prefix}{key}", serialized, ex=ttl)
+            length = pipe.execute()[0]
+            return length - trim_start
+        except (RedisError, TypeError) as e:
+            logger.error(f"Error al actualizar lista y valor en caché: {str(e)}")
+            raise CacheOperationError(f"Error al actualizar lista y valor en caché: {str(e)}")
+    
+    @on_exception(expo, RedisError, max_tries=3, max_time=5)
+    def get_list(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        """
+        Obtiene un rango de valores de una lista.
+        
+        Args:
+            key: Clave de la lista
+            start: Índice inicial
+            end: Índice final (inclusive, -1 para el último)
+            
+        Returns:
+            Lista de valores deserializados
+            
+        Raises:
+            CacheOperationError: Si hay un error en la operación
+        """
+        try:
+            full_key = f"{self.prefix}{key}"
+            return [json.loads(value) for value in self.redis.lrange(full_key, start, end)]
+        except (RedisError, json.JSONDecodeError) as e:
+            logger.error(f"Error al obtener lista de caché: {str(e)}")
+            raise CacheOperationError(f"Error al obtener lista de caché: {str(e)}")
+    
+    @on_exception(expo, RedisError, max_tries=3, max_time=5)
+    def trim_list(self, key: str, start: int, end: int = -1) -> bool:
+        """
+        Conserva solo el rango indicado de una lista.
+        
+        Args:
+            key: Clave de la lista
+            start: Índice inicial a conservar
+            end: Índice final a conservar (inclusive, -1 para el último)
+            
+        Returns:
+            True si se recortó correctamente
+            
+        Raises:
+            CacheOperationError: Si hay un error en la operación
+        """
+        try:
+            full_key = f"{self.prefix}{key}"
+            return bool(self.redis.ltrim(full_key, start, end))
+        except RedisError as e:
+            logger.error(f"Error al recortar lista en caché: {str(e)}")
+            raise CacheOperationError(f"Error al recortar lista en caché: {str(e)}")
+
 # Instancia global de caché con decorador lru_cache para evitar múltiples instancias
 @lru_cache()
 def get_cache() -> Cache:
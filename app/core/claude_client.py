@@ -2,7 +2,7 @@ import os
 import time
 import json
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 import backoff
 from functools import lru_cache
 import httpx
@@ -10,6 +10,17 @@ from app.core.config import settings
 from app.core.logging import LogManager
 from app.core.cache import get_cache
 
+def _is_permanent_error(error: Exception) -> bool:
+    """
+    Indica si un error de la API no se resuelve reintentando: las respuestas
+    4xx salvo 429 (petición inválida, credenciales, tamaño). Los 429, los 5xx
+    y los errores de transporte sí se reintentan.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code != 429 and status_code < 500
+    return False
+
 class ClaudeClient:
     """
     Cliente para interactuar con Claude API con soporte para caché y reintentos
@@ -30,6 +41,16 @@ class ClaudeClient:
             }
         )
         
+        # Cliente asíncrono reutilizable para conversaciones multi-turno
+        self.async_http_client = httpx.AsyncClient(
+            timeout=60.0,
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            }
+        )
+        
         self.model = settings.CLAUDE_MODEL
         self.max_tokens = settings.CLAUDE_MAX_TOKENS
         self.temperature = settings.CLAUDE_TEMPERATURE
@@ -121,6 +142,145 @@ class ClaudeClient:
             # Cerrar el cliente HTTP
             self.http_client.close()
     
+    @backoff.on_exception(
+        backoff.expo,
+        httpx.HTTPError,
+        max_tries=3,
+        max_time=30,
+        giveup=_is_permanent_error
+    )
+    async def create_message(self, messages: List[Dict[str, Any]],
+                             system: Optional[str] = None,
+                             max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None,
+                             **extra: Any) -> Dict[str, Any]:
+        """
+        Envía una lista completa de mensajes a Claude API
+        
+        Args:
+            messages: Mensajes en formato de la API (role/content)
+            system: Prompt de sistema (opcional)
+            max_tokens: Número máximo de tokens (opcional)
+            temperature: Temperatura para la generación (opcional)
+            **extra: Campos adicionales de la petición
+            
+        Returns:
+            Dict con la respuesta sin procesar de la API
+        """
+        if not messages:
+            raise ValueError("La lista de mensajes no puede estar vacía")
+        
+        data = {
+            "model": self.model,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature if temperature is None else temperature,
+            "messages": messages,
+            **extra
+        }
+        if system:
+            data["system"] = system
+        
+        response = await self.async_http_client.post(
+            "https://api.anthropic.com/v1/messages",
+            json=data
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def stream_message(self, messages: List[Dict[str, Any]],
+                             system: Optional[str] = None,
+                             max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Envía mensajes a Claude API y devuelve el texto según se genera
+        
+        Si el consumidor deja de iterar (p. ej. porque el cliente canceló),
+        la conexión con la API se cierra y la generación se interrumpe.
+        
+        Args:
+            messages: Mensajes en formato de la API (role/content)
+            system: Prompt de sistema (opcional)
+            max_tokens: Número máximo de tokens (opcional)
+            temperature: Temperatura para la generación (opcional)
+            
+        Returns:
+            Iterador asíncrono de fragmentos de texto
+        """
+        if not messages:
+            raise ValueError("La lista de mensajes no puede estar vacía")
+        
+        data = {
+            "model": self.model,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature if temperature is None else temperature,
+            "messages": messages,
+            "stream": True
+        }
+        if system:
+            data["system"] = system
+        
+        async with self.async_http_client.stream(
+            "POST",
+            "https://api.anthropic.com/v1/messages",
+            json=data
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                if event.get("type") == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    yield event["delta"]["text"]
+                elif event.get("type") == "error":
+                    raise ValueError(f"Error de Claude API: {event['error'].get('message')}")
+    
+    async def generate_chat_response(self, messages: List[Dict[str, Any]],
+                                     system: Optional[str] = None,
+                                     max_tokens: Optional[int] = None,
+                                     temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Genera una respuesta para una conversación multi-turno
+        
+        Args:
+            messages: Historial de mensajes alternando user/assistant
+            system: Prompt de sistema (opcional)
+            max_tokens: Número máximo de tokens (opcional)
+            temperature: Temperatura para la generación (opcional)
+            
+        Returns:
+            Dict con la respuesta de Claude
+        """
+        start_time = time.time()
+        try:
+            result = await self.create_message(
+                messages,
+                system=system,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            usage = result.get("usage", {})
+            
+            formatted_result = {
+                "content": "".join(
+                    block.get("text", "") for block in result["content"] if block.get("type") == "text"
+                ),
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+                "tokens_used": usage.get("input_tokens", 0) + usage.get("output_tokens", 0),
+                "model": self.model,
+                "execution_time": time.time() - start_time
+            }
+            
+            self.logger.info(
+                f"Respuesta de conversación generada en {formatted_result['execution_time']:.2f}s "
+                f"usando {formatted_result['tokens_used']} tokens"
+            )
+            return formatted_result
+            
+        except Exception as e:
+            self.logger.error(f"Error al generar respuesta de conversación: {str(e)}")
+            raise
+    
     @backoff.on_exception(
         backoff.expo,
         Exception,
@@ -152,7 +312,7 @@ class ClaudeClient:
             prompt = f"Analiza el siguiente texto según el tipo '{analysis_type}' y proporciona resultados detallados:\n\n{text}"
         
         # Generar respuesta
-        response = await self.generate_response(prompt, cache_enabled=False)
+        response = await self.generate_chat_response([{"role": "user", "content": prompt}])
         
         # Formatear resultado
         result = {
@@ -32,6 +32,7 @@ class Settings:
     REDIS_SSL: bool = os.getenv("REDIS_SSL", "false").lower() == "true"
     REDIS_TIMEOUT: int = int(os.getenv("REDIS_TIMEOUT", "5"))
     REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "10"))
+    CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))
     
     # Configuración de directorios
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
@@ -44,15 +45,121 @@ class Settings:
     CLAUDE_MAX_TOKENS: int = int(os.getenv("CLAUDE_MAX_TOKENS", "4096"))
     CLAUDE_TEMPERATURE: float = float(os.getenv("CLAUDE_TEMPERATURE", "0.7"))
     
+    # Micro-batching de análisis pequeños
+    CLAUDE_MICROBATCH_ENABLED: bool = os.getenv("CLAUDE_MICROBATCH_ENABLED", "false").lower() == "true"
+    CLAUDE_MICROBATCH_WINDOW_MS: float = float(os.getenv("CLAUDE_MICROBATCH_WINDOW_MS", "10"))
+    CLAUDE_MICROBATCH_MAX_SIZE: int = int(os.getenv("CLAUDE_MICROBATCH_MAX_SIZE", "16"))
+    CLAUDE_MICROBATCH_MAX_TOKENS: int = int(os.getenv("CLAUDE_MICROBATCH_MAX_TOKENS", "200"))
+    
+    # Control de admisión: resumen extractivo local si se incumpliría el SLO
+    CLAUDE_MAX_CONCURRENCY: int = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8"))
+    CLAUDE_LATENCY_SLO: float = float(os.getenv("CLAUDE_LATENCY_SLO", "15"))
+    CLAUDE_LATENCY_INITIAL: float = float(os.getenv("CLAUDE_LATENCY_INITIAL", "3"))
+    CLAUDE_DEGRADE_ENABLED: bool = os.getenv("CLAUDE_DEGRADE_ENABLED", "true").lower() == "true"
+    CLAUDE_DEGRADE_PROBE_INTERVAL: float = float(os.getenv("CLAUDE_DEGRADE_PROBE_INTERVAL", "30"))
+    EXTRACTIVE_SUMMARY_SENTENCES: int = int(os.getenv("EXTRACTIVE_SUMMARY_SENTENCES", "5"))
+    
+    # Edición parcial de Markdown: documentos menores se reescriben completos
+    EDIT_TARGETED_MIN_SIZE: int = int(os.getenv("EDIT_TARGETED_MIN_SIZE", "4000"))
+    EDIT_TARGETED_MAX_SECTIONS: int = int(os.getenv("EDIT_TARGETED_MAX_SECTIONS", "3"))
+    
+    # Configuración de sesiones de conversación
+    SESSION_TTL: int = int(os.getenv("SESSION_TTL", "86400"))
+    SESSION_MAX_CONTEXT_TOKENS: int = int(os.getenv("SESSION_MAX_CONTEXT_TOKENS", "8000"))
+    SESSION_KEEP_RECENT_TURNS: int = int(os.getenv("SESSION_KEEP_RECENT_TURNS", "4"))
+    SESSION_SUMMARY_MAX_TOKENS: int = int(os.getenv("SESSION_SUMMARY_MAX_TOKENS", "512"))
+    
+    # Configuración del bucle de agente (tool_use en el servidor)
+    AGENT_MAX_ITERATIONS: int = int(os.getenv("AGENT_MAX_ITERATIONS", "8"))
+    AGENT_DEFAULT_TOOL_CONCURRENCY: int = int(os.getenv("AGENT_DEFAULT_TOOL_CONCURRENCY", "4"))
+    AGENT_MAX_TOOL_RESULT_CHARS: int = int(os.getenv("AGENT_MAX_TOOL_RESULT_CHARS", "20000"))
+    
+    # Transportes MCP nativos: stdio (Claude Desktop) y SSE (/mcp/stream)
+    MCP_STDIO_MAX_CONCURRENCY: int = int(os.getenv("MCP_STDIO_MAX_CONCURRENCY", "16"))
+    MCP_SSE_KEEPALIVE_INTERVAL: float = float(os.getenv("MCP_SSE_KEEPALIVE_INTERVAL", "15"))
+    
+    # Lotes JSON-RPC en /mcp/execute y /tools/execute
+    MCP_BATCH_MAX_REQUESTS: int = int(os.getenv("MCP_BATCH_MAX_REQUESTS", "50"))
+    MCP_BATCH_CONCURRENCY: int = int(os.getenv("MCP_BATCH_CONCURRENCY", "8"))
+    
+    # Configuración de Brave Search
+    BRAVE_SEARCH_API_KEY: str = os.getenv("BRAVE_SEARCH_API_KEY", "")
+    BRAVE_SEARCH_BASE_URL: str = os.getenv("BRAVE_SEARCH_BASE_URL", "https://api.search.brave.com/res/v1/web/search")
+    BRAVE_POOL_LIMIT: int = int(os.getenv("BRAVE_POOL_LIMIT", "100"))
+    BRAVE_POOL_LIMIT_PER_HOST: int = int(os.getenv("BRAVE_POOL_LIMIT_PER_HOST", "20"))
+    BRAVE_DNS_CACHE_TTL: int = int(os.getenv("BRAVE_DNS_CACHE_TTL", "300"))
+    BRAVE_KEEPALIVE_TIMEOUT: float = float(os.getenv("BRAVE_KEEPALIVE_TIMEOUT", "30"))
+    BRAVE_CONNECT_TIMEOUT: float = float(os.getenv("BRAVE_CONNECT_TIMEOUT", "5"))
+    BRAVE_REQUEST_TIMEOUT: float = float(os.getenv("BRAVE_REQUEST_TIMEOUT", "15"))
+    BRAVE_MAX_CONCURRENCY: int = int(os.getenv("BRAVE_MAX_CONCURRENCY", "4"))
+    BRAVE_RATE_LIMIT_PER_SECOND: float = float(os.getenv("BRAVE_RATE_LIMIT_PER_SECOND", "1"))
+    BRAVE_RATE_LIMIT_BURST: int = int(os.getenv("BRAVE_RATE_LIMIT_BURST", "1"))
+    BRAVE_QUOTA_MAX_WAIT: float = float(os.getenv("BRAVE_QUOTA_MAX_WAIT", "3"))
+    
     # Configuración de búsqueda
     DEFAULT_SEARCH_RESULTS: int = int(os.getenv("DEFAULT_SEARCH_RESULTS", "5"))
     DEFAULT_SEARCH_COUNTRY: str = os.getenv("DEFAULT_SEARCH_COUNTRY", "ES")
     DEFAULT_SEARCH_LANGUAGE: str = os.getenv("DEFAULT_SEARCH_LANGUAGE", "es")
     
+    # Caché de resultados de búsqueda (stale-while-revalidate)
+    SEARCH_CACHE_ENABLED: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "600"))
+    SEARCH_CACHE_STALE_TTL: int = int(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
+    SEARCH_CACHE_NEGATIVE_TTL: int = int(os.getenv("SEARCH_CACHE_NEGATIVE_TTL", "60"))
+    SEARCH_CACHE_ERROR_TTL: int = int(os.getenv("SEARCH_CACHE_ERROR_TTL", "10"))
+    
+    # Búsqueda múltiple (fan-out y fusión de resultados)
+    SEARCH_BATCH_MAX_QUERIES: int = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "10"))
+    SEARCH_FUSION_K: int = int(os.getenv("SEARCH_FUSION_K", "60"))
+    SEARCH_DEDUP_THRESHOLD: float = float(os.getenv("SEARCH_DEDUP_THRESHOLD", "0.8"))
+    
+    # Cola de persistencia en segundo plano (análisis de búsqueda)
+    PERSIST_QUEUE_MAX_SIZE: int = int(os.getenv("PERSIST_QUEUE_MAX_SIZE", "1000"))
+    PERSIST_BATCH_SIZE: int = int(os.getenv("PERSIST_BATCH_SIZE", "50"))
+    PERSIST_FLUSH_INTERVAL: float = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5"))
+    PERSIST_PUT_TIMEOUT: float = float(os.getenv("PERSIST_PUT_TIMEOUT", "1"))
+    PERSIST_SHUTDOWN_TIMEOUT: float = float(os.getenv("PERSIST_SHUTDOWN_TIMEOUT", "10"))
+    
     # Configuración del sistema de archivos
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))
     ALLOWED_EXTENSIONS: List[str] = os.getenv("ALLOWED_EXTENSIONS", "md,txt,json").split(",")
     UPLOAD_DIR: Path = BASE_DIR / os.getenv("UPLOAD_DIR", "uploads")
+    MAX_UPLOAD_REQUEST_SIZE: int = int(os.getenv("MAX_UPLOAD_REQUEST_SIZE", "104857600"))
+    FILE_LIST_DEFAULT_LIMIT: int = int(os.getenv("FILE_LIST_DEFAULT_LIMIT", "100"))
+    FILE_LIST_MAX_LIMIT: int = int(os.getenv("FILE_LIST_MAX_LIMIT", "1000"))
+    FILE_STREAM_CHUNK_SIZE: int = int(os.getenv("FILE_STREAM_CHUNK_SIZE", "65536"))
+    FILE_BULK_MAX_OPERATIONS: int = int(os.getenv("FILE_BULK_MAX_OPERATIONS", "1000"))
+    FILE_BULK_CONCURRENCY: int = int(os.getenv("FILE_BULK_CONCURRENCY", "16"))
+    
+    # Disposición de DATA_DIR: "flat" o "sharded" (subdirectorios por hash + manifiesto)
+    DATA_DIR_LAYOUT: str = os.getenv("DATA_DIR_LAYOUT", "flat")
+    DATA_SHARD_DEPTH: int = int(os.getenv("DATA_SHARD_DEPTH", "2"))
+    DATA_SHARD_WIDTH: int = int(os.getenv("DATA_SHARD_WIDTH", "2"))
+    
+    # Compresión zstd en reposo de DATA_DIR ("none" o "zstd")
+    DATA_COMPRESSION: str = os.getenv("DATA_COMPRESSION", "none")
+    DATA_COMPRESSION_LEVEL: int = int(os.getenv("DATA_COMPRESSION_LEVEL", "3"))
+    DATA_COMPRESSION_FRAME_SIZE: int = int(os.getenv("DATA_COMPRESSION_FRAME_SIZE", "65536"))
+    DATA_COMPRESSION_MIN_SIZE: int = int(os.getenv("DATA_COMPRESSION_MIN_SIZE", "4096"))
+    DATA_DECOMPRESSION_CACHE_SIZE: int = int(os.getenv("DATA_DECOMPRESSION_CACHE_SIZE", "67108864"))
+    
+    # Índice de texto completo de DATA_DIR
+    DOCUMENT_INDEX_PATH: Path = BASE_DIR / os.getenv("DOCUMENT_INDEX_PATH", "index/documents.sqlite3")
+    DOCUMENT_INDEX_SYNC_INTERVAL: float = float(os.getenv("DOCUMENT_INDEX_SYNC_INTERVAL", "30"))
+    
+    # Feed de cambios de DATA_DIR (inotify en Linux, sondeo en otro caso)
+    DATA_WATCHER_ENABLED: bool = os.getenv("DATA_WATCHER_ENABLED", "true").lower() == "true"
+    DATA_WATCHER_BACKEND: str = os.getenv("DATA_WATCHER_BACKEND", "auto")
+    DATA_WATCHER_POLL_INTERVAL: float = float(os.getenv("DATA_WATCHER_POLL_INTERVAL", "2"))
+    DATA_WATCHER_DEBOUNCE: float = float(os.getenv("DATA_WATCHER_DEBOUNCE", "0.2"))
+    DATA_WATCHER_HISTORY: int = int(os.getenv("DATA_WATCHER_HISTORY", "1000"))
+    
+    # Configuración de análisis incremental (fragmentación por contenido)
+    CHUNK_MIN_SIZE: int = int(os.getenv("CHUNK_MIN_SIZE", "1024"))
+    CHUNK_AVG_SIZE: int = int(os.getenv("CHUNK_AVG_SIZE", "4096"))
+    CHUNK_MAX_SIZE: int = int(os.getenv("CHUNK_MAX_SIZE", "16384"))
+    CHUNK_ANALYSIS_CACHE_TTL: int = int(os.getenv("CHUNK_ANALYSIS_CACHE_TTL", "604800"))
+    CHUNK_ANALYSIS_CONCURRENCY: int = int(os.getenv("CHUNK_ANALYSIS_CONCURRENCY", "4"))
     
     # Configuración de CORS
     CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "http://127.0.0.1:3000,http://127.0.0.1:8000").split(",")
@@ -83,6 +83,20 @@ class SearchAPIError(MCPClaudeError):
     ):
         super().__init__(message, error_code, status_code, details)
 
+class SearchRateLimitError(SearchAPIError):
+    """Error de cuota o límite de tasa de la API de búsqueda"""
+    def __init__(
+        self,
+        message: str = "Rate limit exceeded for Brave Search API",
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message,
+            "SEARCH_RATE_LIMIT_ERROR",
+            429,
+            details
+        )
+
 class FileSystemError(MCPClaudeError):
     """Error en operaciones de sistema de archivos"""
     def __init__(
@@ -35,18 +35,31 @@ class MarkdownLogger:
             num_results: Número de resultados
             results: Resultados de la búsqueda
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.log_searches([{"query": query, "num_results": num_results, "results": results}])
+    
+    def log_searches(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Registra varias operaciones de búsqueda con una sola escritura.
         
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(f"### Búsqueda: {query} ({timestamp})\n\n")
-            f.write(f"- **Consulta**: {query}\n")
-            f.write(f"- **Resultados**: {num_results}\n\n")
+        Args:
+            entries: Dicts con query, num_results, results y opcionalmente timestamp
+        """
+        lines = []
+        for entry in entries:
+            query = entry["query"]
+            timestamp = entry.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            lines.append(f"### Búsqueda: {query} ({timestamp})\n\n")
+            lines.append(f"- **Consulta**: {query}\n")
+            lines.append(f"- **Resultados**: {entry['num_results']}\n\n")
             
-            for i, result in enumerate(results, 1):
-                f.write(f"{i}. [{result.get('title', 'Sin título')}]({result.get('url', '#')})\n")
-                f.write(f"   - {result.get('description', 'Sin descripción')}\n\n")
+            for i, result in enumerate(entry["results"], 1):
+                lines.append(f"{i}. [{result.get('title', 'Sin título')}]({result.get('url', '#')})\n")
+                lines.append(f"   - {result.get('description', 'Sin descripción')}\n\n")
             
-            f.write("---\n\n")
+            lines.append("---\n\n")
+        
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
     
     def log_file_operation(self, operation: str, filename: str, details: Optional[Dict[str, Any]] = None) -> None:
         """
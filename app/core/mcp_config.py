@@ -109,6 +109,23 @@ class MCPToolConfig(BaseModel):
     cache_ttl: Optional[int] = Field(None, description="Tiempo de vida de caché en segundos")
     rate_limit: Optional[int] = Field(None, description="Límite de solicitudes por minuto")
     timeout: Optional[int] = Field(None, description="Tiempo de espera en segundos")
+    max_concurrency: Optional[int] = Field(None, description="Ejecuciones simultáneas máximas en el bucle de agente")
+
+def tool_input_schema(config: MCPToolConfig) -> Dict[str, Any]:
+    """
+    Convierte los parámetros de una herramienta a JSON Schema
+
+    Los parámetros sin valor por defecto se consideran obligatorios.
+    """
+    properties = {
+        name: {k: v for k, v in spec.items() if k in ("type", "description", "enum", "default", "items")}
+        for name, spec in config.parameters.items()
+    }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name, spec in config.parameters.items() if "default" not in spec]
+    }
 
 # Configuración global
 mcp_config = MCPConfig()
@@ -180,7 +197,60 @@ mcp_tools: Dict[str, MCPToolConfig] = {
         required_resources=["search"],
         cache_enabled=True,
         cache_ttl=1800,  # 30 minutos
-        rate_limit=20  # 20 solicitudes por minuto
+        rate_limit=20,  # 20 solicitudes por minuto
+        timeout=30,
+        max_concurrency=4
+    ),
+    "buscar_en_brave_multiple": MCPToolConfig(
+        name="buscar_en_brave_multiple",
+        description="Ejecuta varias búsquedas en Brave en paralelo y combina los resultados sin duplicados",
+        parameters={
+            "queries": {"type": "array", "items": {"type": "string"}, "description": "Consultas relacionadas a ejecutar"},
+            "num_results": {"type": "integer", "description": "Número de resultados por consulta", "default": 5},
+            "max_results": {"type": "integer", "description": "Número máximo de resultados combinados", "default": 20}
+        },
+        required_resources=["search"],
+        cache_enabled=False,  # Cada consulta ya se cachea en BraveSearch
+        rate_limit=10,
+        timeout=60,
+        max_concurrency=2
+    ),
+    "gestionar_archivos_lote": MCPToolConfig(
+        name="gestionar_archivos_lote",
+        description="Ejecuta muchas operaciones de archivo (create, read, update, delete) en una sola llamada",
+        parameters={
+            "operations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "operation": {"type": "string", "enum": ["create", "read", "update", "delete"]},
+                        "filename": {"type": "string"},
+                        "content": {"type": "string"}
+                    },
+                    "required": ["operation", "filename"]
+                },
+                "description": "Operaciones a ejecutar"
+            },
+            "concurrency": {"type": "integer", "description": "Operaciones simultáneas", "default": 16}
+        },
+        required_resources=["filesystem"],
+        cache_enabled=False,
+        timeout=120,
+        max_concurrency=2
+    ),
+    "buscar_en_archivos": MCPToolConfig(
+        name="buscar_en_archivos",
+        description="Busca texto en los documentos guardados y devuelve fragmentos ordenados por relevancia",
+        parameters={
+            "query": {"type": "string", "description": "Consulta de texto completo"},
+            "limit": {"type": "integer", "description": "Número máximo de resultados", "default": 10},
+            "match_all": {"type": "boolean", "description": "Exigir todos los términos", "default": False}
+        },
+        required_resources=["filesystem"],
+        cache_enabled=False,  # El índice cambia con cada escritura
+        timeout=10,
+        max_concurrency=8
     ),
     "generar_markdown": MCPToolConfig(
         name="generar_markdown",
@@ -193,7 +263,9 @@ mcp_tools: Dict[str, MCPToolConfig] = {
         },
         required_resources=["claude", "filesystem"],
         cache_enabled=True,
-        cache_ttl=3600  # 1 hora
+        cache_ttl=3600,  # 1 hora
+        timeout=120,
+        max_concurrency=2
     ),
     "analizar_texto": MCPToolConfig(
         name="analizar_texto",
@@ -204,6 +276,8 @@ mcp_tools: Dict[str, MCPToolConfig] = {
         },
         required_resources=["claude"],
         cache_enabled=True,
-        cache_ttl=3600  # 1 hora
+        cache_ttl=3600,  # 1 hora
+        timeout=60,
+        max_concurrency=4
     )
 } 
\ No newline at end of file
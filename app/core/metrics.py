@@ -405,4 +405,53 @@ class ClaudeMetrics:
         self.logger.warning(f"Error en solicitud a {endpoint} con modelo {model}: {error_type}")
 
 # Singleton instance
-claude_metrics = ClaudeMetrics() 
\ No newline at end of file
+claude_metrics = ClaudeMetrics()
+
+class SearchMetrics:
+    """Sistema de métricas para Brave Search API"""
+    
+    def __init__(self):
+        self.logger = LogManager.get_logger("search_metrics")
+        
+        # Cuota informada por las cabeceras X-RateLimit-* de Brave
+        self.quota_limit = Gauge(
+            'brave_quota_limit',
+            'Límite de solicitudes de Brave Search por ventana',
+            ['window']
+        )
+        self.quota_remaining = Gauge(
+            'brave_quota_remaining',
+            'Solicitudes restantes de Brave Search por ventana',
+            ['window']
+        )
+        
+        # Espera local en el token bucket y respuestas 429
+        self.quota_wait = Histogram(
+            'brave_quota_wait_seconds',
+            'Tiempo de espera por cuota antes de llamar a Brave Search',
+            buckets=[0.01, 0.1, 0.5, 1.0, 2.0, 5.0]
+        )
+        self.rate_limited_total = Counter(
+            'brave_rate_limited_total',
+            'Solicitudes a Brave Search rechazadas por cuota',
+            ['reason']
+        )
+    
+    def update_quota(self, window: str, limit: Optional[int], remaining: Optional[int]) -> None:
+        """Actualiza la cuota de una ventana (second o month)"""
+        if limit is not None:
+            self.quota_limit.labels(window=window).set(limit)
+        if remaining is not None:
+            self.quota_remaining.labels(window=window).set(remaining)
+        self.logger.debug(f"Cuota de Brave ({window}): {remaining}/{limit}")
+    
+    def track_wait(self, seconds: float) -> None:
+        """Registra la espera en el token bucket"""
+        self.quota_wait.observe(seconds)
+    
+    def track_rate_limited(self, reason: str) -> None:
+        """Registra una solicitud rechazada por cuota"""
+        self.rate_limited_total.labels(reason=reason).inc()
+
+# Singleton instance
+search_metrics = SearchMetrics()
@@ -106,6 +106,17 @@ Para cada concepto:
     Por favor, proporciona el análisis en formato Markdown.
     """
     
+    # Prompts para análisis de varios textos pequeños en una sola llamada
+    TEXT_BATCH_ANALYSIS = """
+    Realiza un análisis de tipo "{analysis_type}" de cada uno de los textos siguientes,
+    de forma independiente:
+    
+    {items}
+    
+    Responde ÚNICAMENTE con un objeto JSON con esta forma, con un resultado por id:
+    {{"results": [{{"id": 0, "result": "análisis del texto 0"}}]}}
+    """
+    
     # Prompts para generación de Markdown
     MARKDOWN_GENERATION = """
     Genera contenido en formato Markdown para el siguiente texto, 
@@ -148,6 +159,40 @@ Para cada concepto:
     Mantén el formato Markdown y asegúrate de preservar la estructura original.
     """
     
+    # Prompts para edición parcial de archivos (parche estructurado)
+    FILE_PATCH = """
+    Vas a editar solo algunas secciones de un documento Markdown más grande.
+    
+    Secciones del documento (el resto no se muestra y no debe modificarse):
+    {sections}
+    
+    Instrucciones de edición:
+    {instructions}
+    
+    Responde ÚNICAMENTE con un objeto JSON con esta forma:
+    {{"edits": [{{"search": "texto exacto a reemplazar", "replace": "texto nuevo"}}]}}
+    
+    Reglas:
+    1. "search" debe copiarse literalmente de las secciones mostradas y ser único
+    2. Incluye el contexto mínimo necesario para que "search" no sea ambiguo
+    3. No incluyas ediciones fuera de las secciones mostradas
+    4. Si no hace falta ningún cambio, responde {{"edits": []}}
+    """
+    
+    # Prompts para resumir conversaciones largas
+    CONVERSATION_SUMMARY = """
+    Resume la siguiente conversación para poder continuarla sin el historial completo.
+    
+    Resumen previo:
+    {summary}
+    
+    Nuevos turnos:
+    {transcript}
+    
+    Conserva hechos, decisiones, preferencias del usuario y preguntas pendientes.
+    Responde solo con el resumen, sin introducciones.
+    """
+    
     @classmethod
     def get_text_analysis_prompt(cls, text: str, analysis_type: str) -> str:
         """
@@ -159,6 +204,17 @@ Para cada concepto:
             analysis_type=analysis_type
         )
     
+    @classmethod
+    def get_batch_analysis_prompt(cls, analysis_type: str, items: str) -> str:
+        """
+        Genera un prompt para analizar un lote de textos con salida JSON
+        """
+        return cls.format_prompt(
+            cls.TEXT_BATCH_ANALYSIS,
+            analysis_type=analysis_type,
+            items=items
+        )
+    
     @classmethod
     def get_markdown_generation_prompt(cls, content: str, format_type: str) -> str:
         """
@@ -181,6 +237,28 @@ Para cada concepto:
             results=results
         )
     
+    @classmethod
+    def get_file_patch_prompt(cls, sections: str, instructions: str) -> str:
+        """
+        Genera un prompt para edición parcial mediante parche estructurado
+        """
+        return cls.format_prompt(
+            cls.FILE_PATCH,
+            sections=sections,
+            instructions=instructions
+        )
+    
+    @classmethod
+    def get_conversation_summary_prompt(cls, summary: str, transcript: str) -> str:
+        """
+        Genera un prompt para resumir turnos antiguos de una conversación
+        """
+        return cls.format_prompt(
+            cls.CONVERSATION_SUMMARY,
+            summary=summary or "(sin resumen previo)",
+            transcript=transcript
+        )
+    
     @classmethod
     def get_file_edit_prompt(cls, content: str, instructions: str) -> str:
         """
@@ -130,6 +130,13 @@ def get_current_user(token: str = Depends(verify_api_key)) -> dict:
     """
     return {"api_key": token}
 
+def principal_id(current_user: Dict[str, Any]) -> str:
+    """
+    Identificador estable del usuario autenticado para asociarle recursos
+    (sesiones, peticiones en curso) sin guardar su credencial
+    """
+    return hashlib.sha256(str(current_user.get("api_key", "")).encode("utf-8")).hexdigest()[:32]
+
 def validate_api_key(api_key: str, expected_key: str) -> bool:
     """Valida una clave API."""
     return api_key == expected_key
@@ -1,11 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.services.brave_search import get_brave_search
+from app.services.data_watcher import get_data_watcher
+from app.services.document_index import get_document_index
+from app.services.file_index import get_file_index
+from app.services.persistence_queue import get_persistence_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Abre los clientes compartidos al arrancar y los cierra al apagar
+    """
+    brave_search = get_brave_search()
+    persistence_queue = get_persistence_queue()
+    await brave_search.start()
+    persistence_queue.start()
+    document_index = get_document_index()
+    file_index = get_file_index(str(settings.DATA_DIR))
+    
+    # Mantener índices y listados al día con el feed de cambios de DATA_DIR;
+    # el watcher arranca antes de sincronizar para no perder cambios
+    watcher = get_data_watcher()
+    if settings.DATA_WATCHER_ENABLED:
+        for consumer in (file_index, document_index):
+            watcher.subscribe(consumer.apply_changes)
+        await watcher.start()
+        file_index.set_live(True)
+        document_index.set_live(True)
+    
+    # Recoger los documentos añadidos o modificados mientras la API estaba parada
+    await asyncio.to_thread(document_index.sync)
+    try:
+        yield
+    finally:
+        await watcher.stop()
+        file_index.set_live(False)
+        document_index.set_live(False)
+        # Persistir los artefactos pendientes antes de cerrar
+        await persistence_queue.stop(timeout=settings.PERSIST_SHUTDOWN_TIMEOUT)
+        await brave_search.close()
 
 app = FastAPI(
     title="MCP-Claude API",
     description="API para integración con Claude Desktop usando el protocolo MCP",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -0,0 +1,199 @@
+import sys
+import json
+import asyncio
+import threading
+from typing import Any, BinaryIO, Dict, Optional
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.mcp_config import mcp_config
+from app.services.mcp_protocol import (
+    INTERNAL_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, JSONRPCError, MCPProtocol
+)
+from app.services.persistence_queue import get_persistence_queue
+
+class MCPStdioServer:
+    """
+    Servidor MCP nativo sobre stdio (JSON-RPC 2.0, un mensaje por línea).
+
+    Es el transporte que usa Claude Desktop al lanzar el proyecto como
+    subproceso: las llamadas van directamente a MCPService, con el mismo
+    registro de herramientas (mcp_tools) y recursos, sin pasar por HTTP,
+    middleware de autenticación ni modelos de respuesta.
+
+    Cada petición con id se ejecuta en su propia tarea, así que varias
+    pueden estar en curso a la vez (hasta MCP_STDIO_MAX_CONCURRENCY) y las
+    respuestas salen según terminan. `notifications/cancelled` cancela la
+    tarea de la petición indicada. Cada línea se decodifica una sola vez
+    y los parámetros se pasan sin validarlos con modelos intermedios.
+    """
+    def __init__(
+        self,
+        service: Optional[Any] = None,
+        output: Optional[BinaryIO] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        self.logger = LogManager.get_logger("mcp_stdio")
+        self.protocol = MCPProtocol(service)
+        self._output = output or sys.stdout.buffer
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.MCP_STDIO_MAX_CONCURRENCY)
+        self._tasks: Dict[Any, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Peticiones en curso"""
+        return len(self._tasks)
+
+    def _write(self, message: Dict[str, Any]) -> None:
+        # Todas las escrituras se hacen desde el event loop: las líneas no se mezclan
+        self._output.write(json.dumps(message, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        self._output.flush()
+
+    def _send_result(self, request_id: Any, result: Any) -> None:
+        self._write({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def _send_error(self, request_id: Any, code: int, message: str) -> None:
+        self._write({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+    def handle_line(self, line: bytes) -> None:
+        """
+        Procesa una línea recibida por stdin
+
+        Las peticiones se lanzan como tareas y la función vuelve enseguida;
+        las notificaciones se atienden en el momento.
+
+        Args:
+            line: Mensaje JSON-RPC codificado en UTF-8
+        """
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self._send_error(None, PARSE_ERROR, "JSON inválido")
+            return
+        if not isinstance(message, dict):
+            self._send_error(None, INVALID_REQUEST, "Se esperaba un objeto JSON-RPC")
+            return
+
+        method = message.get("method")
+        if method is None:
+            # Respuesta del cliente a una petición nuestra: no enviamos ninguna
+            return
+        if "id" not in message:
+            self._handle_notification(method, message.get("params") or {})
+            return
+
+        request_id = message["id"]
+        if request_id is not None and (isinstance(request_id, bool) or not isinstance(request_id, (str, int))):
+            # Un id lista u objeto no se puede usar como clave de _tasks
+            self._send_error(None, INVALID_REQUEST, "El id debe ser texto, número entero o null")
+            return
+        if not self.protocol.supports(method):
+            self._send_error(request_id, METHOD_NOT_FOUND, f"Método no soportado: {method}")
+            return
+        if request_id in self._tasks:
+            self._send_error(request_id, INVALID_REQUEST, f"Ya hay una petición en curso con id {request_id}")
+            return
+        self._tasks[request_id] = asyncio.get_running_loop().create_task(
+            self._run(request_id, method, message.get("params") or {})
+        )
+
+    def _handle_notification(self, method: str, params: Dict[str, Any]) -> None:
+        if method == "notifications/cancelled" and isinstance(params, dict):
+            request_id = params.get("requestId")
+            task = self._tasks.get(request_id) if isinstance(request_id, (str, int)) else None
+            if task is not None:
+                task.cancel()
+        # notifications/initialized y el resto no requieren acción
+
+    async def _run(self, request_id: Any, method: str, params: Dict[str, Any]) -> None:
+        try:
+            async with self._semaphore:
+                # Progreso solo si el cliente envía _meta.progressToken
+                result = await self.protocol.handle(method, params, notify=self._write)
+            self._send_result(request_id, result)
+        except asyncio.CancelledError:
+            # Petición cancelada por el cliente: no se responde
+            pass
+        except JSONRPCError as e:
+            self._send_error(request_id, e.code, e.message)
+        except Exception as e:
+            self.logger.error(f"Error procesando {request_id}: {str(e)}")
+            self._send_error(request_id, INTERNAL_ERROR, str(e))
+        finally:
+            self._tasks.pop(request_id, None)
+
+    async def serve(self, reader: asyncio.StreamReader) -> None:
+        """
+        Atiende mensajes hasta el fin de la entrada y espera a las
+        peticiones que sigan en curso
+
+        Args:
+            reader: Flujo de entrada con un mensaje JSON-RPC por línea
+        """
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Línea mayor que el límite del lector: se descarta hasta el salto de línea
+                self._send_error(None, INVALID_REQUEST, "Mensaje demasiado grande")
+                continue
+            if not line:
+                break
+            if line.strip():
+                self.handle_line(line)
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        """
+        Cierra los clientes compartidos si se llegaron a crear
+        """
+        if self.protocol.started:
+            from app.services.brave_search import get_brave_search
+            await get_brave_search().close()
+
+async def _stdin_reader(limit: int) -> asyncio.StreamReader:
+    """
+    Conecta stdin a un StreamReader (con un hilo lector si el event loop no
+    admite pipes, como el Proactor de Windows)
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=limit)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+        return reader
+    except (NotImplementedError, ValueError, OSError):
+        pass
+
+    def pump() -> None:
+        for line in iter(sys.stdin.buffer.readline, b""):
+            loop.call_soon_threadsafe(reader.feed_data, line)
+        loop.call_soon_threadsafe(reader.feed_eof)
+
+    threading.Thread(target=pump, name="mcp-stdin", daemon=True).start()
+    return reader
+
+async def run_stdio(output: BinaryIO) -> None:
+    """
+    Ejecuta el servidor stdio con la cola de persistencia en marcha
+    """
+    persistence_queue = get_persistence_queue()
+    persistence_queue.start()
+    server = MCPStdioServer(output=output)
+    try:
+        await server.serve(await _stdin_reader(mcp_config.max_request_size))
+    finally:
+        await persistence_queue.stop(timeout=settings.PERSIST_SHUTDOWN_TIMEOUT)
+        await server.close()
+
+def main() -> None:
+    """
+    Punto de entrada: python -m app.mcp_stdio
+    """
+    output = sys.stdout.buffer
+    # stdout queda reservado al protocolo; cualquier print va a stderr
+    sys.stdout = sys.stderr
+    LogManager.get_logger("mcp_stdio").info("Iniciando servidor MCP por stdio...")
+    asyncio.run(run_stdio(output))
+
+if __name__ == "__main__":
+    main()
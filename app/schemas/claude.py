@@ -96,6 +96,8 @@ class ClaudeAnalysis(BaseModel):
     sentiment: str = Field(..., description="Sentimiento detectado (positivo, negativo, neutral)")
     topics: List[str] = Field(default_factory=list, description="Temas principales identificados")
     suggestions: List[str] = Field(default_factory=list, description="Sugerencias generadas")
+    degraded: bool = Field(False, description="Respuesta degradada generada localmente sin Claude")
+    source: str = Field("claude", description="Origen del análisis (claude o extractive)")
     
     @validator("summary")
     def validate_summary(cls, v):
@@ -149,4 +151,37 @@ class ClaudeToolSchema(BaseModel):
         """
         if not isinstance(v, dict):
             raise ValueError("Los parámetros deben ser un diccionario")
-        return v 
\ No newline at end of file
+        return v
+
+class SessionCreateRequest(BaseModel):
+    """
+    Esquema para crear una sesión de conversación
+    """
+    system: Optional[str] = Field(None, description="Prompt de sistema para toda la sesión", max_length=20000)
+
+class SessionMessageRequest(BaseModel):
+    """
+    Esquema para enviar un mensaje dentro de una sesión
+    """
+    message: str = Field(..., description="Nuevo mensaje del usuario", min_length=1, max_length=100000)
+    max_tokens: Optional[int] = Field(None, description="Número máximo de tokens", ge=1, le=100000)
+    
+    @validator("message")
+    def validate_message(cls, v):
+        """
+        Valida que el mensaje no esté vacío
+        """
+        if not v.strip():
+            raise ValueError("El mensaje no puede estar vacío")
+        return v
+
+class SessionMessageResponse(BaseModel):
+    """
+    Esquema para la respuesta a un mensaje de sesión
+    """
+    session_id: str = Field(..., description="Identificador de la sesión")
+    content: str = Field(..., description="Respuesta de Claude")
+    tokens_used: int = Field(..., description="Tokens utilizados en la llamada", ge=0)
+    model: str = Field(..., description="Modelo utilizado")
+    context_tokens: int = Field(..., description="Tokens estimados del contexto almacenado", ge=0)
+    summarized: bool = Field(False, description="Si se resumieron turnos antiguos en esta llamada")
@@ -9,11 +9,26 @@ class FileInfo(BaseModel):
     filename: str = Field(..., description="Nombre del archivo")
     path: str = Field(..., description="Ruta del archivo")
     size: int = Field(..., description="Tamaño del archivo en bytes")
+    stored_size: Optional[int] = Field(None, description="Tamaño en disco en bytes (menor que size si está comprimido)")
     created_at: datetime = Field(..., description="Fecha de creación")
     modified_at: datetime = Field(..., description="Fecha de última modificación")
     content_type: str = Field(..., description="Tipo de contenido")
     extension: str = Field(..., description="Extensión del archivo")
 
+class UploadedFile(FileInfo):
+    """
+    Archivo subido
+    """
+    sha256: str = Field(..., description="Hash SHA-256 del contenido")
+
+class FileUploadResponse(BaseModel):
+    """
+    Respuesta de subida de archivos
+    """
+    success: bool = Field(..., description="Si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje de la operación")
+    files: List[UploadedFile] = Field(default_factory=list, description="Archivos guardados")
+
 class FileOperation(BaseModel):
     """
     Operación de archivo
@@ -32,6 +47,18 @@ class FileResponse(BaseModel):
     file_info: Optional[FileInfo] = Field(None, description="Información del archivo")
     content: Optional[str] = Field(None, description="Contenido del archivo")
     error: Optional[str] = Field(None, description="Mensaje de error si ocurre")
+    etag: Optional[str] = Field(None, description="ETag del archivo tras la operación")
+
+class FilePatchRequest(BaseModel):
+    """
+    Modificación parcial de un archivo
+    """
+    type: str = Field(..., pattern="^(diff|replace|append)$", description="Tipo de parche (diff, replace, append)")
+    diff: Optional[str] = Field(None, description="Diff unificado (para diff)")
+    offset: Optional[int] = Field(None, ge=0, description="Byte inicial del rango (para replace)")
+    length: Optional[int] = Field(None, ge=0, description="Bytes del rango a sustituir (para replace)")
+    content: Optional[str] = Field(None, description="Texto a insertar (para replace/append)")
+    if_match: Optional[str] = Field(None, description="ETag esperado; alternativa a la cabecera If-Match")
 
 class FileListResponse(BaseModel):
     """
@@ -40,6 +67,82 @@ class FileListResponse(BaseModel):
     files: List[FileInfo] = Field(..., description="Lista de archivos")
     total: int = Field(..., description="Número total de archivos")
     path: str = Field(..., description="Ruta actual")
+    offset: int = Field(0, description="Archivos saltados")
+    limit: Optional[int] = Field(None, description="Tamaño de página")
+
+class BulkFileOperation(BaseModel):
+    """
+    Operación individual de una petición en lote
+    """
+    operation: str = Field(..., pattern="^(create|read|update|delete)$", description="Operación (create, read, update, delete)")
+    filename: str = Field(..., description="Nombre del archivo")
+    content: Optional[str] = Field(None, description="Contenido (para create/update)")
+
+class BulkFileRequest(BaseModel):
+    """
+    Petición de operaciones de archivo en lote
+    """
+    operations: List[BulkFileOperation] = Field(..., min_length=1, description="Operaciones a ejecutar")
+    concurrency: Optional[int] = Field(None, ge=1, description="Operaciones simultáneas (por defecto FILE_BULK_CONCURRENCY)")
+    stream: bool = Field(False, description="Devolver cada resultado en NDJSON según termina")
+
+class BulkFileResult(BaseModel):
+    """
+    Resultado de una operación del lote
+    """
+    index: int = Field(..., description="Posición de la operación en la petición")
+    operation: str = Field(..., description="Operación ejecutada")
+    filename: str = Field(..., description="Nombre del archivo")
+    success: bool = Field(..., description="Si la operación fue exitosa")
+    message: str = Field(..., description="Mensaje de la operación")
+    file_info: Optional[FileInfo] = Field(None, description="Información del archivo")
+    content: Optional[str] = Field(None, description="Contenido (para read)")
+    error: Optional[str] = Field(None, description="Mensaje de error si ocurre")
+
+class BulkFileResponse(BaseModel):
+    """
+    Respuesta de operaciones de archivo en lote
+    """
+    results: List[BulkFileResult] = Field(..., description="Resultados en el orden de la petición")
+    total: int = Field(..., description="Número de operaciones")
+    succeeded: int = Field(..., description="Operaciones exitosas")
+    failed: int = Field(..., description="Operaciones fallidas")
+
+class FileSearchHit(BaseModel):
+    """
+    Documento encontrado en la búsqueda de texto completo
+    """
+    filename: str = Field(..., description="Nombre del archivo")
+    score: float = Field(..., description="Relevancia BM25 (mayor es mejor)")
+    snippet: str = Field(..., description="Fragmento con los términos resaltados")
+
+class FileSearchResponse(BaseModel):
+    """
+    Respuesta de búsqueda de texto completo
+    """
+    query: str = Field(..., description="Consulta realizada")
+    results: List[FileSearchHit] = Field(..., description="Documentos ordenados por relevancia")
+    total: int = Field(..., description="Número total de coincidencias")
+    offset: int = Field(0, description="Resultados saltados")
+    limit: int = Field(..., description="Tamaño de página")
+
+class FileChange(BaseModel):
+    """
+    Cambio de un archivo del directorio de datos
+    """
+    seq: int = Field(..., description="Número de secuencia del cambio")
+    kind: str = Field(..., description="Tipo de cambio (changed, deleted, rescan)")
+    filename: Optional[str] = Field(None, description="Nombre del archivo (None en rescan)")
+    timestamp: float = Field(..., description="Instante del cambio (epoch)")
+
+class FileChangesResponse(BaseModel):
+    """
+    Respuesta del feed de cambios
+    """
+    changes: List[FileChange] = Field(..., description="Cambios posteriores a la secuencia pedida")
+    seq: int = Field(..., description="Secuencia actual; usar como `since` en la siguiente consulta")
+    reset: bool = Field(False, description="El historial no cubre la secuencia pedida; volver a listar")
+    backend: Optional[str] = Field(None, description="Mecanismo de vigilancia activo")
 
 class FileSystemToolSchema(BaseModel):
     """
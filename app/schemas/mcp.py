@@ -27,7 +27,7 @@ class MCPRequest(BaseModel):
     jsonrpc: str = Field("2.0", description="Versión de JSON-RPC")
     method: str = Field(..., description="Método a ejecutar")
     params: Dict[str, Any] = Field(..., description="Parámetros del método")
-    id: Optional[str] = Field(None, description="Identificador de la solicitud")
+    id: Optional[Union[str, int]] = Field(None, description="Identificador de la solicitud")
     version: MCPVersion = Field(MCPVersion.V1_1, description="Versión del protocolo MCP")
 
 class MCPResponse(BaseModel):
@@ -37,7 +37,7 @@ class MCPResponse(BaseModel):
     jsonrpc: str = Field("2.0", description="Versión de JSON-RPC")
     result: Optional[Any] = Field(None, description="Resultado de la operación")
     error: Optional["MCPError"] = Field(None, description="Error de la operación")
-    id: Optional[str] = Field(None, description="Identificador de la solicitud")
+    id: Optional[Union[str, int]] = Field(None, description="Identificador de la solicitud")
     execution_time: float = Field(..., description="Tiempo de ejecución en segundos")
 
 class MCPError(BaseModel):
@@ -56,8 +56,8 @@ class MCPStatus(BaseModel):
     features: List[str] = Field(..., description="Características soportadas")
     resource_types: List[str] = Field(..., description="Tipos de recursos soportados")
     access_levels: List[str] = Field(..., description="Niveles de acceso soportados")
-    resources: List[str] = Field(..., description="Recursos disponibles")
-    tools: List[str] = Field(..., description="Herramientas disponibles")
+    resources: Dict[str, Dict[str, Any]] = Field(..., description="Recursos disponibles, por nombre")
+    tools: Dict[str, Dict[str, Any]] = Field(..., description="Herramientas disponibles, por nombre")
     timestamp: str = Field(..., description="Marca de tiempo del estado")
 
 class MCPOperation(BaseModel):
@@ -121,4 +121,36 @@ class MCPToolsResponse(BaseModel):
     Respuesta con lista de herramientas disponibles
     """
     tools: List[ToolDefinition] = Field(..., description="Lista de herramientas disponibles")
-    version: str = Field("1.1", description="Versión del protocolo MCP") 
\ No newline at end of file
+    version: str = Field("1.1", description="Versión del protocolo MCP")
+
+class MCPAgentRequest(BaseModel):
+    """
+    Solicitud de ejecución del bucle de agente en el servidor
+    """
+    prompt: str = Field(..., description="Tarea a resolver", min_length=1)
+    system: Optional[str] = Field(None, description="Prompt de sistema (opcional)")
+    tools: Optional[List[str]] = Field(None, description="Subconjunto de herramientas permitidas (todas por defecto)")
+    max_iterations: Optional[int] = Field(None, description="Número máximo de rondas con Claude", ge=1, le=50)
+    max_tokens: Optional[int] = Field(None, description="Número máximo de tokens por ronda", ge=1)
+
+class MCPAgentToolCall(BaseModel):
+    """
+    Registro de una llamada a herramienta dentro del bucle de agente
+    """
+    id: str = Field(..., description="Identificador del bloque tool_use")
+    name: str = Field(..., description="Nombre de la herramienta")
+    input: Dict[str, Any] = Field(default_factory=dict, description="Parámetros enviados por Claude")
+    is_error: bool = Field(False, description="Si la ejecución falló")
+    execution_time: float = Field(..., description="Tiempo de ejecución en segundos")
+    iteration: int = Field(..., description="Ronda en la que se ejecutó")
+
+class MCPAgentResponse(BaseModel):
+    """
+    Respuesta del bucle de agente
+    """
+    content: str = Field(..., description="Respuesta final de Claude")
+    stop_reason: Optional[str] = Field(None, description="Motivo de finalización")
+    iterations: int = Field(..., description="Rondas realizadas con Claude")
+    tool_calls: List[MCPAgentToolCall] = Field(default_factory=list, description="Herramientas ejecutadas")
+    tokens_used: int = Field(0, description="Tokens totales utilizados")
+    execution_time: float = Field(..., description="Tiempo de ejecución en segundos")
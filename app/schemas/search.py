@@ -22,6 +22,17 @@ class SearchRequest(BaseModel):
     language: Optional[str] = Field("es", description="Idioma de la búsqueda")
     analyze: Optional[bool] = Field(False, description="Si se debe analizar los resultados con Claude")
 
+class BatchSearchRequest(BaseModel):
+    """
+    Solicitud de búsqueda múltiple
+    """
+    queries: List[str] = Field(..., min_length=1, description="Consultas a ejecutar en paralelo")
+    num_results: Optional[int] = Field(None, description="Número de resultados por consulta")
+    country: Optional[str] = Field(None, description="País para la búsqueda")
+    language: Optional[str] = Field(None, description="Idioma de la búsqueda")
+    max_results: Optional[int] = Field(None, description="Número máximo de resultados combinados")
+    stream: bool = Field(False, description="Devolver resultados parciales en NDJSON según terminan las consultas")
+
 class SearchResponse(BaseModel):
     """
     Respuesta de búsqueda
@@ -30,6 +41,7 @@ class SearchResponse(BaseModel):
     results: List[SearchResult] = Field(..., description="Resultados de la búsqueda")
     total_results: int = Field(..., description="Número total de resultados")
     analysis: Optional[Dict[str, Any]] = Field(None, description="Análisis de los resultados por Claude")
+    cache_status: Optional[str] = Field(None, description="Origen de los resultados: hit, stale, miss o bypass")
 
 class SearchAnalysis(BaseModel):
     """
@@ -39,6 +51,24 @@ class SearchAnalysis(BaseModel):
     key_points: List[str] = Field(..., description="Puntos clave encontrados")
     relevance_score: float = Field(..., description="Puntuación de relevancia (0-1)")
     suggested_queries: List[str] = Field(..., description="Consultas sugeridas relacionadas")
+    degraded: bool = Field(False, description="Análisis degradado generado localmente sin Claude")
+    source: str = Field("claude", description="Origen del análisis (claude o extractive)")
+
+class MergedSearchResult(SearchResult):
+    """
+    Resultado combinado de una búsqueda múltiple
+    """
+    score: float = Field(..., description="Puntuación de Reciprocal Rank Fusion")
+    queries: List[str] = Field(default_factory=list, description="Consultas que devolvieron el resultado")
+
+class BatchSearchResponse(BaseModel):
+    """
+    Respuesta de búsqueda múltiple
+    """
+    queries: List[str] = Field(..., description="Consultas ejecutadas")
+    results: List[MergedSearchResult] = Field(..., description="Resultados deduplicados y ordenados")
+    total_results: int = Field(..., description="Número de resultados combinados")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Errores por consulta")
 
 class SearchToolSchema(BaseModel):
     """
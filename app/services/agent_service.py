@@ -0,0 +1,178 @@
+import asyncio
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.claude_client import get_claude_client
+from app.core.mcp_config import mcp_tools, MCPToolConfig, tool_input_schema
+from app.schemas.mcp import MCPRequest, MCPAgentRequest, MCPAgentResponse, MCPAgentToolCall
+
+class AgentService:
+    """
+    Bucle de agente ejecutado en el servidor.
+
+    Envía a Claude las herramientas registradas en mcp_tools, ejecuta en
+    paralelo los bloques tool_use de cada respuesta (con un límite de
+    concurrencia por herramienta) y devuelve los resultados a Claude hasta
+    que termina. Una tarea de varios pasos cuesta una sola petición del cliente.
+    """
+    def __init__(self, mcp_service):
+        self.logger = LogManager.get_logger("agent_service")
+        self.client = get_claude_client()
+        self.mcp_service = mcp_service
+        self._semaphores: Dict[str, asyncio.Semaphore] = {
+            name: asyncio.Semaphore(config.max_concurrency or settings.AGENT_DEFAULT_TOOL_CONCURRENCY)
+            for name, config in mcp_tools.items()
+        }
+
+    @staticmethod
+    def _tool_schema(config: MCPToolConfig) -> Dict[str, Any]:
+        """
+        Convierte la configuración de una herramienta al formato de Claude API
+        """
+        return {
+            "name": config.name,
+            "description": config.description,
+            "input_schema": tool_input_schema(config)
+        }
+
+    def get_tools(self, allowed: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene las definiciones de herramientas a enviar a Claude
+
+        Args:
+            allowed: Nombres permitidos (todas las registradas si es None)
+
+        Returns:
+            Lista de herramientas en formato de Claude API
+        """
+        if allowed is not None:
+            unknown = set(allowed) - set(mcp_tools)
+            if unknown:
+                raise ValueError(f"Herramientas no encontradas: {', '.join(sorted(unknown))}")
+        return [
+            self._tool_schema(config)
+            for name, config in mcp_tools.items()
+            if allowed is None or name in allowed
+        ]
+
+    async def _run_tool_use(self, block: Dict[str, Any], iteration: int) -> Tuple[Dict[str, Any], MCPAgentToolCall]:
+        """
+        Ejecuta un bloque tool_use a través de MCPService
+
+        Returns:
+            Tupla con el bloque tool_result para Claude y el registro de la llamada
+        """
+        name = block["name"]
+        tool_input = block.get("input") or {}
+        start_time = time.time()
+        is_error = False
+
+        try:
+            if name not in mcp_tools:
+                raise ValueError(f"Herramienta no encontrada: {name}")
+
+            timeout = mcp_tools[name].timeout
+            async with self._semaphores[name]:
+                response = await asyncio.wait_for(
+                    self.mcp_service.process_request(MCPRequest(
+                        method="execute",
+                        params={"tool": name, "params": tool_input},
+                        id=block["id"]
+                    )),
+                    timeout=timeout
+                )
+
+            if response.error:
+                is_error = True
+                content = response.error.message
+            else:
+                content = json.dumps(response.result, ensure_ascii=False, default=str)
+
+        except asyncio.TimeoutError:
+            is_error = True
+            content = f"Tiempo de espera agotado ejecutando {name}"
+        except Exception as e:
+            is_error = True
+            content = f"Error ejecutando {name}: {str(e)}"
+
+        if len(content) > settings.AGENT_MAX_TOOL_RESULT_CHARS:
+            content = content[:settings.AGENT_MAX_TOOL_RESULT_CHARS] + "\n[resultado truncado]"
+
+        result_block = {"type": "tool_result", "tool_use_id": block["id"], "content": content}
+        if is_error:
+            result_block["is_error"] = True
+
+        return result_block, MCPAgentToolCall(
+            id=block["id"],
+            name=name,
+            input=tool_input,
+            is_error=is_error,
+            execution_time=time.time() - start_time,
+            iteration=iteration
+        )
+
+    async def run(self, request: MCPAgentRequest) -> MCPAgentResponse:
+        """
+        Ejecuta el bucle de agente hasta que Claude deja de pedir herramientas
+
+        Args:
+            request: Tarea y opciones del bucle
+
+        Returns:
+            MCPAgentResponse con la respuesta final y las herramientas usadas
+        """
+        start_time = time.time()
+        tools = self.get_tools(request.tools)
+        max_iterations = request.max_iterations or settings.AGENT_MAX_ITERATIONS
+        messages: List[Dict[str, Any]] = [{"role": "user", "content": request.prompt}]
+        tool_calls: List[MCPAgentToolCall] = []
+        tokens_used = 0
+        stop_reason = None
+        content = ""
+
+        try:
+            for iteration in range(1, max_iterations + 1):
+                response = await self.client.create_message(
+                    messages,
+                    system=request.system,
+                    max_tokens=request.max_tokens,
+                    tools=tools
+                )
+                usage = response.get("usage", {})
+                tokens_used += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                stop_reason = response.get("stop_reason")
+                blocks = response.get("content", [])
+                content = "".join(b.get("text", "") for b in blocks if b.get("type") == "text")
+
+                tool_uses = [b for b in blocks if b.get("type") == "tool_use"]
+                if stop_reason != "tool_use" or not tool_uses:
+                    break
+
+                # Ejecutar en paralelo todas las herramientas pedidas en esta ronda
+                messages.append({"role": "assistant", "content": blocks})
+                executed = await asyncio.gather(*[
+                    self._run_tool_use(block, iteration) for block in tool_uses
+                ])
+                messages.append({"role": "user", "content": [result for result, _ in executed]})
+                tool_calls.extend(call for _, call in executed)
+
+                self.logger.info(
+                    f"Ronda {iteration} del agente: {len(tool_uses)} herramientas ejecutadas"
+                )
+            else:
+                stop_reason = "max_iterations"
+
+            return MCPAgentResponse(
+                content=content,
+                stop_reason=stop_reason,
+                iterations=iteration,
+                tool_calls=tool_calls,
+                tokens_used=tokens_used,
+                execution_time=time.time() - start_time
+            )
+
+        except Exception as e:
+            LogManager.log_error("agent", str(e))
+            raise
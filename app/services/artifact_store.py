@@ -0,0 +1,232 @@
+import os
+import time
+import shutil
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+from app.core.logging import LogManager
+from app.services.data_layout import FlatLayout
+from app.utils.seekable_zstd import write_atomic
+
+BLOB_DIR = ".blobs"
+INDEX_NAME = ".artifacts.sqlite3"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Resultado de put()
+STORED = "stored"
+DEDUPLICATED = "deduplicated"
+UNCHANGED = "unchanged"
+
+def detach(path: str) -> bool:
+    """
+    Separa un archivo de su blob antes de modificarlo en el sitio
+
+    Los artefactos son enlaces duros al blob compartido: una escritura en
+    el sitio (truncado, O_APPEND) alteraría todos los nombres con ese
+    contenido. Si el archivo tiene más de un enlace se sustituye por una
+    copia propia. Las escrituras por reemplazo atómico no lo necesitan.
+
+    Args:
+        path: Ruta física del archivo
+
+    Returns:
+        True si el archivo estaba enlazado
+    """
+    try:
+        if os.stat(path).st_nlink <= 1:
+            return False
+    except FileNotFoundError:
+        return False
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as dst, open(path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return True
+
+class ArtifactStore:
+    """
+    Almacén direccionado por contenido para los artefactos generados.
+
+    Cada contenido distinto se guarda una sola vez como blob en
+    DATA_DIR/.blobs/<ab>/<sha256>, y el nombre visible del artefacto es un
+    enlace duro a ese blob: el resto del servicio (lecturas, listados,
+    índices, Range) lo ve como un archivo normal. Un índice SQLite con
+    recuento de referencias asocia nombres y blobs; el blob se borra
+    cuando ningún nombre lo referencia.
+
+    Guardar un contenido que ya existe no escribe datos: si el nombre ya
+    apunta al blob no se hace nada, y si no basta con crear el enlace.
+
+    Los métodos son síncronos y seguros entre hilos.
+    """
+    def __init__(
+        self,
+        data_dir: str,
+        layout: Optional[Any] = None,
+        encode: Optional[Callable[[bytes], bytes]] = None
+    ):
+        self.logger = LogManager.get_logger("artifact_store")
+        self.data_dir = str(data_dir)
+        self.layout = layout or FlatLayout(self.data_dir)
+        self.encode = encode
+        self.index_path = os.path.join(self.data_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(self.data_dir, BLOB_DIR), exist_ok=True)
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(INDEX_SCHEMA)
+
+    def blob_path(self, digest: str) -> str:
+        """
+        Obtiene la ruta del blob de un hash SHA-256
+        """
+        return os.path.join(self.data_dir, BLOB_DIR, digest[:2], digest)
+
+    def _write_blob(self, digest: str, content: bytes) -> int:
+        path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = self.encode(content) if self.encode else content
+        write_atomic(path, payload)
+        return len(payload)
+
+    def _link(self, digest: str, name: str) -> str:
+        path = self.layout.path_for(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Enlace con nombre temporal + rename: el nombre nunca queda a medias
+        tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        os.link(self.blob_path(digest), tmp_path)
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def _decref(self, digest: str) -> None:
+        self._conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?", (digest,))
+        row = self._conn.execute("SELECT refcount FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is not None and row[0] <= 0:
+            self._conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+            try:
+                # Los nombres que aún enlacen el inode conservan sus datos
+                os.unlink(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _is_linked(self, name: str, digest: str) -> bool:
+        try:
+            return os.path.samestat(os.stat(self.layout.path_for(name)), os.stat(self.blob_path(digest)))
+        except FileNotFoundError:
+            return False
+
+    def put(self, name: str, content: bytes) -> Dict[str, Any]:
+        """
+        Guarda un artefacto bajo un nombre
+
+        Args:
+            name: Nombre lógico en DATA_DIR
+            content: Contenido del artefacto
+
+        Returns:
+            Dict con name, path, hash, size y status: "stored" (blob nuevo),
+            "deduplicated" (contenido ya existente, solo se enlaza) o
+            "unchanged" (el nombre ya tenía ese contenido)
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.layout.path_for(name)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT hash FROM names WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] == digest and self._is_linked(name, digest):
+                self._conn.execute("UPDATE names SET updated_at = ? WHERE name = ?", (time.time(), name))
+                return {"name": name, "path": path, "hash": digest, "size": len(content), "status": UNCHANGED}
+
+            blob = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if blob is not None and os.path.exists(self.blob_path(digest)):
+                status = DEDUPLICATED
+            else:
+                stored_size = self._write_blob(digest, content)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs (hash, size, stored_size, refcount) VALUES (?, ?, ?, 0)",
+                    (digest, len(content), stored_size)
+                )
+                status = STORED
+
+            self._link(digest, name)
+            self._conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO names (name, hash, updated_at) VALUES (?, ?, ?)",
+                (name, digest, time.time())
+            )
+            if row is not None:
+                self._decref(row[0])
+        self.layout.record(name)
+        return {"name": name, "path": path, "hash": digest, "size": len(content), "status": status}
+
+    def release(self, name: str) -> bool:
+        """
+        Deja de asociar un nombre a su blob (el nombre se borró o se va a
+        modificar); el blob se elimina si era la última referencia
+
+        Returns:
+            True si el nombre estaba en el índice
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT hash FROM names WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM names WHERE name = ?", (name,))
+            self._decref(row[0])
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del almacén
+
+        Returns:
+            Dict con nombres, blobs, bytes lógicos (suma por nombre), bytes
+            almacenados y la razón de deduplicación (lógicos / almacenados)
+        """
+        with self._lock:
+            names, logical = self._conn.execute(
+                "SELECT count(*), coalesce(sum(b.size), 0) FROM names n JOIN blobs b ON b.hash = n.hash"
+            ).fetchone()
+            blobs, stored = self._conn.execute(
+                "SELECT count(*), coalesce(sum(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "names": names,
+            "blobs": blobs,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "dedup_ratio": round(logical / stored, 2) if stored else 1.0
+        }
+
+    def close(self) -> None:
+        """
+        Cierra la conexión con el índice
+        """
+        with self._lock:
+            self._conn.close()
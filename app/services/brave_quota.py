@@ -0,0 +1,217 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.cache import get_cache, CacheError
+from app.core.exceptions import SearchRateLimitError
+from app.core.metrics import search_metrics
+
+# Ventanas de las cabeceras X-RateLimit-* de Brave, en el orden en que aparecen
+QUOTA_WINDOWS = ("second", "month")
+
+# Token bucket atómico en Redis; equivalente a take_token()
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if now < blocked_until then
+    return {0, tostring(blocked_until - now)}
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    granted = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return {granted, tostring(wait)}
+"""
+
+def take_token(state: Dict[str, float], rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+    """
+    Intenta tomar un token del bucket
+
+    Args:
+        state: Estado del bucket (tokens, ts, blocked_until); se modifica
+        rate: Tokens que se reponen por segundo
+        capacity: Máximo de tokens acumulables (ráfaga)
+        now: Instante actual en segundos
+
+    Returns:
+        Tupla (concedido, segundos a esperar antes de reintentar)
+    """
+    blocked_until = state.get("blocked_until", 0.0)
+    if now < blocked_until:
+        return False, blocked_until - now
+
+    tokens = state.get("tokens", capacity)
+    elapsed = max(0.0, now - state.get("ts", now))
+    tokens = min(capacity, tokens + elapsed * rate)
+
+    granted = tokens >= 1
+    wait = 0.0 if granted else (1 - tokens) / rate
+    state["tokens"] = tokens - 1 if granted else tokens
+    state["ts"] = now
+    return granted, wait
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Optional[int]]:
+    """
+    Interpreta una cabecera X-RateLimit-* ("1, 15000") como lista de enteros
+    """
+    if not value:
+        return []
+    parsed = []
+    for part in value.split(","):
+        try:
+            parsed.append(int(float(part.strip())))
+        except ValueError:
+            parsed.append(None)
+    return parsed
+
+class BraveQuota:
+    """
+    Cuota de Brave Search compartida entre workers.
+
+    Un token bucket en Redis limita las peticiones por segundo de todos los
+    procesos. Las cabeceras X-RateLimit-Limit/Remaining/Reset de cada
+    respuesta sincronizan el bucket con la cuota real: si Brave indica que
+    no quedan peticiones en la ventana actual (o responde 429) el bucket se
+    bloquea hasta el reinicio. Las peticiones esperan turno hasta
+    BRAVE_QUOTA_MAX_WAIT segundos en lugar de fallar; si la espera sería
+    mayor se lanza SearchRateLimitError sin gastar una petición.
+
+    Sin Redis el bucket funciona de forma local al proceso.
+    """
+    def __init__(self, cache=None):
+        self.logger = LogManager.get_logger("brave_quota")
+        self.rate = settings.BRAVE_RATE_LIMIT_PER_SECOND
+        self.capacity = max(1.0, float(settings.BRAVE_RATE_LIMIT_BURST))
+        self.max_wait = settings.BRAVE_QUOTA_MAX_WAIT
+        self._local: Dict[str, float] = {}
+        self._quota: Dict[str, Dict[str, Optional[int]]] = {}
+        self._redis = None
+        self._script = None
+
+        try:
+            cache = cache if cache is not None else get_cache()
+            self._redis = cache.redis
+            self._key = f"{cache.prefix}brave:quota:bucket"
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        except (CacheError, RedisError, AttributeError) as e:
+            self.logger.warning(f"Cuota de Brave local al proceso (Redis no disponible): {str(e)}")
+            self._redis = None
+
+    def _take(self, now: float) -> Tuple[bool, float]:
+        if self._redis is not None:
+            try:
+                granted, wait = self._script(keys=[self._key], args=[self.rate, self.capacity, now])
+                return bool(int(granted)), float(wait)
+            except RedisError as e:
+                self.logger.warning(f"Token bucket en Redis no disponible, se usa el local: {str(e)}")
+                self._redis = None
+        return take_token(self._local, self.rate, self.capacity, now)
+
+    def _block(self, seconds: float) -> None:
+        """
+        Bloquea el bucket durante `seconds` para todos los workers
+        """
+        until = time.time() + seconds
+        self._local["blocked_until"] = max(self._local.get("blocked_until", 0.0), until)
+        self._local["tokens"] = 0.0
+        if self._redis is not None:
+            try:
+                current = float(self._redis.hget(self._key, "blocked_until") or 0)
+                self._redis.hset(self._key, mapping={"blocked_until": max(current, until), "tokens": 0})
+                self._redis.expire(self._key, math.ceil(seconds) + 60)
+            except RedisError as e:
+                self.logger.warning(f"No se pudo bloquear el bucket en Redis: {str(e)}")
+
+    async def acquire(self) -> float:
+        """
+        Espera un token para llamar a Brave Search
+
+        Returns:
+            Segundos esperados
+
+        Raises:
+            SearchRateLimitError: Si no habrá cuota antes de BRAVE_QUOTA_MAX_WAIT
+        """
+        start = time.time()
+        deadline = start + self.max_wait
+
+        while True:
+            now = time.time()
+            granted, wait = self._take(now)
+            if granted:
+                waited = now - start
+                search_metrics.track_wait(waited)
+                return waited
+            if now + wait > deadline:
+                search_metrics.track_rate_limited("local")
+                raise SearchRateLimitError(
+                    f"Cuota de Brave Search agotada; disponible en {wait:.1f}s",
+                    details={"retry_after": round(wait, 3)}
+                )
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str], status: int) -> None:
+        """
+        Sincroniza la cuota con las cabeceras de una respuesta de Brave
+
+        Args:
+            headers: Cabeceras de la respuesta
+            status: Código de estado HTTP
+        """
+        limits = parse_rate_limit_header(headers.get("X-RateLimit-Limit"))
+        remaining = parse_rate_limit_header(headers.get("X-RateLimit-Remaining"))
+        resets = parse_rate_limit_header(headers.get("X-RateLimit-Reset"))
+
+        block_for = 0.0
+        for i, window in enumerate(QUOTA_WINDOWS):
+            limit = limits[i] if i < len(limits) else None
+            left = remaining[i] if i < len(remaining) else None
+            reset = resets[i] if i < len(resets) else None
+            if limit is None and left is None:
+                continue
+            self._quota[window] = {"limit": limit, "remaining": left, "reset": reset}
+            search_metrics.update_quota(window, limit, left)
+            if left == 0 and reset:
+                block_for = max(block_for, float(reset))
+
+        if status == 429:
+            search_metrics.track_rate_limited("upstream")
+            try:
+                retry_after = float(headers.get("Retry-After") or 1)
+            except ValueError:
+                retry_after = 1.0
+            block_for = max(block_for, retry_after)
+
+        if block_for > 0:
+            self.logger.warning(f"Cuota de Brave agotada; bucket bloqueado {block_for:.0f}s")
+            self._block(block_for)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene la última cuota conocida y la configuración del bucket
+
+        Returns:
+            Dict con la cuota por ventana y los parámetros del bucket
+        """
+        return {
+            "shared": self._redis is not None,
+            "rate_per_second": self.rate,
+            "burst": self.capacity,
+            "max_wait": self.max_wait,
+            "windows": dict(self._quota)
+        }
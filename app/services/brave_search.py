@@ -1,36 +1,148 @@
+import re
+import asyncio
+import sqlite3
+import unicodedata
 import aiohttp
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from app.core.config import settings
 from app.core.logging import LogManager
-from app.schemas.search import SearchResult, SearchResponse, SearchAnalysis
+from app.core.admission import get_admission_controller
+from app.core.exceptions import SearchRateLimitError
+from app.core.markdown_logger import MarkdownLogger
+from app.schemas.search import (
+    SearchResult, SearchResponse, SearchAnalysis, MergedSearchResult, BatchSearchResponse
+)
 from app.core.prompts import PromptTemplates
 from app.services.claude_service import ClaudeService
+from app.services.search_cache import SearchResultCache, normalize_search_params, normalize_query
+from app.services.brave_quota import BraveQuota
+from app.services.artifact_store import UNCHANGED
+from app.services.data_watcher import CHANGED, get_data_watcher
+from app.services.document_index import get_document_index
+from app.services.filesystem_service import get_artifact_store
+from app.services.persistence_queue import PersistenceQueue, get_persistence_queue
+from app.utils.search_fusion import reciprocal_rank_fusion
+from app.utils.extractive_summary import summarize, normalize_word
+from app.utils.progress import is_listening, report_partial, report_progress
 
 class BraveSearch:
     """
     Servicio para realizar búsquedas usando Brave Search API
+    
+    Mantiene una única sesión HTTP con pool de conexiones keep-alive y caché
+    de DNS, de modo que las búsquedas sucesivas reutilizan conexiones TLS ya
+    abiertas. La sesión se abre en el arranque de la aplicación (o en la
+    primera búsqueda) y se cierra en el apagado.
     """
-    BASE_URL = "https://api.search.brave.com/res/v1/web/search"
+    BASE_URL = settings.BRAVE_SEARCH_BASE_URL
     
-    def __init__(self):
+    def __init__(
+        self,
+        claude_service: Optional[ClaudeService] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        quota: Optional[BraveQuota] = None,
+        persistence_queue: Optional[PersistenceQueue] = None
+    ):
+        self.logger = LogManager.get_logger("brave_search")
         self.api_key = settings.BRAVE_SEARCH_API_KEY
         self.headers = {
             "X-Subscription-Token": self.api_key,
-            "Accept": "application/json"
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip"
         }
-        self.claude_service = ClaudeService()
+        self._claude_service = claude_service
+        self._result_cache = result_cache
+        self._quota = quota
+        self._markdown_logger: Optional[MarkdownLogger] = None
+        
+        # Los análisis se escriben en segundo plano, fuera del camino de la respuesta
+        self.persistence_queue = persistence_queue or get_persistence_queue()
+        self.persistence_queue.register_writer("search_analysis", self._write_analysis_files)
+        self.persistence_queue.register_writer("search_log", self._write_search_log)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        # Límite de peticiones simultáneas a la API (las respuestas en caché no cuentan)
+        self._upstream_semaphore = asyncio.Semaphore(settings.BRAVE_MAX_CONCURRENCY)
+    
+    @property
+    def claude_service(self) -> ClaudeService:
+        """Servicio de Claude para el análisis, creado sólo si se usa"""
+        if self._claude_service is None:
+            self._claude_service = ClaudeService()
+        return self._claude_service
+    
+    @property
+    def result_cache(self) -> SearchResultCache:
+        """Caché de resultados de búsqueda, creada sólo si se usa"""
+        if self._result_cache is None:
+            self._result_cache = SearchResultCache()
+        return self._result_cache
+    
+    @property
+    def quota(self) -> BraveQuota:
+        """Cuota de la API compartida entre workers, creada sólo si se usa"""
+        if self._quota is None:
+            self._quota = BraveQuota()
+        return self._quota
+    
+    async def start(self) -> None:
+        """
+        Abre la sesión HTTP compartida si no está abierta
+        """
+        async with self._session_lock:
+            if self._session is not None and not self._session.closed:
+                return
+            connector = aiohttp.TCPConnector(
+                limit=settings.BRAVE_POOL_LIMIT,
+                limit_per_host=settings.BRAVE_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.BRAVE_DNS_CACHE_TTL,
+                keepalive_timeout=settings.BRAVE_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.BRAVE_REQUEST_TIMEOUT,
+                    connect=settings.BRAVE_CONNECT_TIMEOUT
+                ),
+                raise_for_status=False
+            )
+            self.logger.info("Sesión HTTP de Brave Search abierta")
+    
+    async def close(self) -> None:
+        """
+        Cierra la sesión HTTP compartida y sus conexiones
+        """
+        async with self._session_lock:
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+                self.logger.info("Sesión HTTP de Brave Search cerrada")
+            self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Obtiene la sesión compartida, abriéndola si es necesario
+        """
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
     
     async def search(
         self,
         query: str,
-        num_results: int = 5,
-        country: str = "ES",
-        language: str = "es",
+        num_results: Optional[int] = None,
+        country: Optional[str] = None,
+        language: Optional[str] = None,
         analyze: bool = False
     ) -> SearchResponse:
         """
         Realiza una búsqueda usando Brave Search API
         
+        Los resultados se cachean por consulta normalizada; los parámetros
+        omitidos toman los valores DEFAULT_SEARCH_* de la configuración.
+        
         Args:
             query: Término de búsqueda
             num_results: Número de resultados a devolver
@@ -43,23 +155,73 @@ class BraveSearch:
         """
         try:
             # Registrar la búsqueda
-            LogManager.log_search(query, [])
-            
-            # Construir parámetros de búsqueda
-            params = {
-                "q": query,
-                "count": num_results,
-                "country": country,
-                "language": language
-            }
-            
-            # Realizar la búsqueda
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.BASE_URL,
-                    headers=self.headers,
-                    params=params
-                ) as response:
+            self.logger.info(f"Búsqueda en Brave: {query}")
+            
+            # Normalizar parámetros (también son la clave de caché)
+            params = normalize_search_params(query, num_results, country, language)
+            
+            items, cache_status = await self.result_cache.get_or_fetch(
+                params,
+                lambda: self._fetch_results(params)
+            )
+            results = [SearchResult(**item) for item in items]
+            
+            # Crear respuesta
+            search_response = SearchResponse(
+                query=query,
+                results=results,
+                total_results=len(results),
+                cache_status=cache_status
+            )
+            
+            # Analizar resultados si se solicita; los resultados se adelantan
+            # como parcial mientras Claude los analiza
+            if analyze and results:
+                report_progress(1, 2, "Resultados obtenidos, analizando")
+                if is_listening():
+                    report_partial({"query": query, "results": [r.dict() for r in results]})
+                analysis = await self._analyze_results(query, results)
+                search_response.analysis = analysis
+                report_progress(2, 2, "Análisis completado")
+                
+                # Encolar el análisis para guardarlo en Markdown sin esperar al disco
+                await self._save_analysis_to_markdown(query, analysis, results)
+            
+            return search_response
+                    
+        except Exception as e:
+            LogManager.log_error("brave_search", str(e))
+            raise
+    
+    async def _fetch_results(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Consulta Brave Search API con la sesión compartida
+        
+        Args:
+            params: Parámetros normalizados de la búsqueda
+            
+        Returns:
+            Resultados serializables (dicts de SearchResult)
+            
+        Raises:
+            SearchRateLimitError: Si la cuota no se recupera a tiempo
+        """
+        session = await self._get_session()
+        async with self._upstream_semaphore:
+            # Un 429 bloquea el bucket hasta el reinicio indicado por Brave;
+            # se reintenta una vez si la espera cabe en BRAVE_QUOTA_MAX_WAIT
+            for attempt in range(2):
+                await self.quota.acquire()
+                
+                # La conexión vuelve al pool en cuanto se lee la respuesta
+                async with session.get(self.BASE_URL, params=params) as response:
+                    self.quota.update_from_headers(response.headers, response.status)
+                    
+                    if response.status == 429:
+                        if attempt == 0:
+                            continue
+                        raise SearchRateLimitError(details={"status": 429})
+                    
                     if response.status != 200:
                         error_text = await response.text()
                         LogManager.log_error(
@@ -69,40 +231,129 @@ class BraveSearch:
                         raise Exception(f"Error en búsqueda: {error_text}")
                     
                     data = await response.json()
-                    
-                    # Procesar resultados
-                    results = []
-                    for item in data.get("web", {}).get("results", []):
-                        result = SearchResult(
-                            title=item.get("title", ""),
-                            url=item.get("url", ""),
-                            description=item.get("description", ""),
-                            source=item.get("source", ""),
-                            published_date=item.get("published_date"),
-                            snippet=item.get("snippet")
-                        )
-                        results.append(result)
-                    
-                    # Crear respuesta
-                    search_response = SearchResponse(
-                        query=query,
-                        results=results,
-                        total_results=len(results)
-                    )
-                    
-                    # Analizar resultados si se solicita
-                    if analyze and results:
-                        analysis = await self._analyze_results(query, results)
-                        search_response.analysis = analysis
-                        
-                        # Guardar análisis en archivo Markdown
-                        await self._save_analysis_to_markdown(query, analysis)
-                    
-                    return search_response
-                    
-        except Exception as e:
-            LogManager.log_error("brave_search", str(e))
-            raise
+                    break
+        
+        return [
+            SearchResult(
+                title=item.get("title", ""),
+                url=item.get("url", ""),
+                description=item.get("description", ""),
+                source=item.get("source", ""),
+                published_date=item.get("published_date"),
+                snippet=item.get("snippet")
+            ).dict()
+            for item in data.get("web", {}).get("results", [])
+        ]
+    
+    async def iter_search_many(
+        self,
+        queries: List[str],
+        num_results: Optional[int] = None,
+        country: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Optional[SearchResponse], Optional[str]]]:
+        """
+        Ejecuta varias búsquedas en paralelo y las devuelve según terminan
+        
+        Las consultas equivalentes tras normalizar se ejecutan una sola vez.
+        Si el consumidor deja de iterar, las búsquedas pendientes se cancelan.
+        
+        Args:
+            queries: Consultas a ejecutar
+            num_results: Número de resultados por consulta
+            country: Código de país para resultados
+            language: Código de idioma para resultados
+            
+        Yields:
+            Tuplas (consulta, respuesta o None, error o None)
+            
+        Raises:
+            ValueError: Si no hay consultas o se supera SEARCH_BATCH_MAX_QUERIES
+        """
+        unique = list({normalize_query(q): q for q in reversed(queries) if q.strip()}.values())[::-1]
+        if not unique:
+            raise ValueError("Se requiere al menos una consulta")
+        if len(unique) > settings.SEARCH_BATCH_MAX_QUERIES:
+            raise ValueError(f"Máximo {settings.SEARCH_BATCH_MAX_QUERIES} consultas por búsqueda múltiple")
+        
+        async def run(query: str) -> Tuple[str, Optional[SearchResponse], Optional[str]]:
+            try:
+                return query, await self.search(query, num_results, country, language), None
+            except Exception as e:
+                return query, None, str(e)
+        
+        tasks = [asyncio.ensure_future(run(query)) for query in unique]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def merge_responses(
+        responses: List[Tuple[str, SearchResponse]],
+        max_results: Optional[int] = None
+    ) -> List[MergedSearchResult]:
+        """
+        Deduplica y ordena por Reciprocal Rank Fusion los resultados de varias consultas
+        
+        Args:
+            responses: Pares (consulta, respuesta)
+            max_results: Número máximo de resultados a devolver
+            
+        Returns:
+            Resultados combinados ordenados por puntuación
+        """
+        fused = reciprocal_rank_fusion(
+            [(query, [r.dict() for r in response.results]) for query, response in responses],
+            k=settings.SEARCH_FUSION_K,
+            similarity_threshold=settings.SEARCH_DEDUP_THRESHOLD
+        )
+        merged = [
+            MergedSearchResult(**entry.item, score=round(entry.score, 6), queries=entry.queries)
+            for entry in fused
+        ]
+        return merged[:max_results] if max_results else merged
+    
+    async def batch_search(
+        self,
+        queries: List[str],
+        num_results: Optional[int] = None,
+        country: Optional[str] = None,
+        language: Optional[str] = None,
+        max_results: Optional[int] = None
+    ) -> BatchSearchResponse:
+        """
+        Ejecuta varias búsquedas en paralelo y combina sus resultados
+        
+        Args:
+            queries: Consultas a ejecutar
+            num_results: Número de resultados por consulta
+            country: Código de país para resultados
+            language: Código de idioma para resultados
+            max_results: Número máximo de resultados combinados
+            
+        Returns:
+            BatchSearchResponse con los resultados fusionados y los errores por consulta
+        """
+        completed: Dict[str, SearchResponse] = {}
+        errors: Dict[str, str] = {}
+        async for query, response, error in self.iter_search_many(queries, num_results, country, language):
+            if error is not None:
+                errors[query] = error
+            else:
+                completed[query] = response
+        
+        # Fusionar en el orden de las consultas para que el resultado sea determinista
+        executed = [q for q in dict.fromkeys(queries) if q in completed or q in errors]
+        results = self.merge_responses([(q, completed[q]) for q in executed if q in completed], max_results)
+        return BatchSearchResponse(
+            queries=executed,
+            results=results,
+            total_results=len(results),
+            errors=errors
+        )
     
     async def _analyze_results(
         self,
@@ -119,6 +370,10 @@ class BraveSearch:
         Returns:
             SearchAnalysis con el análisis de los resultados
         """
+        # Bajo carga se resume localmente en lugar de esperar a Claude
+        if get_admission_controller().should_degrade("analysis"):
+            return self._extractive_analysis(query, results)
+        
         try:
             # Formatear resultados para el prompt
             results_text = "\n\n".join([
@@ -147,18 +402,62 @@ class BraveSearch:
             LogManager.log_error("brave_search", f"Error en análisis: {str(e)}")
             raise
             
-    async def _save_analysis_to_markdown(self, query: str, analysis: SearchAnalysis):
+    def _extractive_analysis(self, query: str, results: List[SearchResult]) -> SearchAnalysis:
+        """
+        Analiza los resultados localmente con un resumen extractivo (TextRank)
+        
+        La relevancia es la proporción de resultados que contienen algún
+        término de la consulta en el título o la descripción.
+        
+        Args:
+            query: Término de búsqueda original
+            results: Lista de resultados a analizar
+            
+        Returns:
+            SearchAnalysis marcado como degradado
         """
-        Guarda el análisis en un archivo Markdown
+        sentences = summarize(
+            "\n\n".join(r.description for r in results if r.description),
+            max_sentences=settings.EXTRACTIVE_SUMMARY_SENTENCES
+        )
+        
+        terms = {normalize_word(t) for t in re.findall(r"\w+", query) if len(t) > 2}
+        matching = [
+            r for r in results
+            if terms & {normalize_word(w) for w in re.findall(r"\w+", f"{r.title} {r.description}")}
+        ]
+        
+        self.logger.info(f"Análisis extractivo local de '{query}' (modo degradado)")
+        return SearchAnalysis(
+            summary=" ".join(sentences) or "; ".join(r.title for r in results),
+            key_points=[r.title for r in results if r.title],
+            relevance_score=round(len(matching) / len(results), 2) if results else 0.0,
+            suggested_queries=[],
+            degraded=True,
+            source="extractive"
+        )
+    
+    async def _save_analysis_to_markdown(
+        self,
+        query: str,
+        analysis: SearchAnalysis,
+        results: Optional[List[SearchResult]] = None
+    ):
+        """
+        Encola el análisis para guardarlo en un archivo Markdown
+        
+        La escritura la realiza la cola de persistencia en segundo plano;
+        la búsqueda responde en cuanto el análisis está disponible.
         
         Args:
             query: Término de búsqueda original
             analysis: Análisis a guardar
+            results: Resultados analizados, para el registro de operaciones
         """
         try:
             # Crear contenido Markdown
             content = f"""# Análisis de búsqueda: {query}
-
+{chr(10) + "> Análisis degradado: resumen extractivo local generado sin Claude." + chr(10) if analysis.degraded else ""}
 ## Resumen
 {analysis.summary}
 
@@ -172,13 +471,61 @@ class BraveSearch:
 {chr(10).join([f"- {query}" for query in analysis.suggested_queries])}
 """
             
-            # Guardar archivo
-            filename = f"search_analysis_{query.replace(' ', '_')}.md"
-            with open(f"{settings.DATA_DIR}/{filename}", "w", encoding="utf-8") as f:
-                f.write(content)
-                
-            LogManager.log_info(f"Análisis guardado en {filename}")
+            # Nombre de archivo seguro a partir de la consulta: solo ASCII
+            # (las letras acentuadas pierden el acento, el resto se sustituye)
+            ascii_query = unicodedata.normalize("NFKD", query).encode("ascii", "ignore").decode("ascii")
+            slug = re.sub(r"[^A-Za-z0-9_-]+", "_", ascii_query).strip("_")[:100] or "consulta"
+            filename = f"search_analysis_{slug}.md"
+            await self.persistence_queue.submit("search_analysis", {"filename": filename, "content": content})
+            
+            if results is not None:
+                await self.persistence_queue.submit("search_log", {
+                    "query": query,
+                    "num_results": len(results),
+                    "results": [r.dict() for r in results]
+                })
             
         except Exception as e:
             LogManager.log_error("brave_search", f"Error al guardar análisis: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def _write_analysis_files(self, payloads: List[Dict[str, str]]) -> None:
+        """
+        Guarda un lote de análisis en el almacén deduplicado de DATA_DIR
+        
+        Los análisis repetidos (misma consulta y resultado) no vuelven a
+        escribirse: el contenido se guarda una sola vez por hash.
+        
+        Args:
+            payloads: Dicts con filename y content
+        """
+        store = get_artifact_store()
+        for payload in payloads:
+            result = store.put(payload["filename"], payload["content"].encode("utf-8"))
+            self.logger.info(f"Análisis guardado en {payload['filename']} ({result['status']})")
+            if result["status"] == UNCHANGED:
+                continue
+            if store.layout.sharded:
+                get_data_watcher().notify(CHANGED, payload["filename"])
+            try:
+                get_document_index().index_file(payload["filename"], payload["content"])
+            except sqlite3.Error as e:
+                self.logger.warning(f"No se pudo indexar {payload['filename']}: {str(e)}")
+    
+    def _write_search_log(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Añade un lote de búsquedas al registro Markdown de operaciones
+        
+        Args:
+            entries: Entradas de búsqueda para MarkdownLogger.log_searches
+        """
+        if self._markdown_logger is None:
+            self._markdown_logger = MarkdownLogger()
+        self._markdown_logger.log_searches(entries)
+
+@lru_cache()
+def get_brave_search() -> BraveSearch:
+    """
+    Obtiene el cliente de búsqueda compartido (una sesión HTTP por proceso)
+    """
+    return BraveSearch()
@@ -1,7 +1,7 @@
 import time
 from typing import Any, Optional, Dict
 from app.core.config import settings
-from app.core.exceptions import CacheError
+from app.core.cache import CacheError
 
 class CacheService:
     """Servicio de caché para MCP-Claude"""
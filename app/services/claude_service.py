@@ -11,14 +11,24 @@ from app.core.prompts import PromptTemplates
 from app.schemas.search import SearchAnalysis
 from app.core.markdown_logger import MarkdownLogger
 from app.core.claude_client import get_claude_client
+from app.core.admission import get_admission_controller
 from app.core.cache import get_cache
-from app.core.metrics import MetricsCollector
+from app.core.metrics import APIMetric, MetricsCollector
 from app.schemas.claude import ClaudeRequest, ClaudeResponse, ClaudeAnalysis
+from app.services.filesystem_service import FileSystemService
+from app.utils.markdown_patch import PatchError, split_sections, select_sections, parse_patch, apply_patch
+from app.utils.micro_batcher import MicroBatcher, BatchParseError, parse_batch_results
+from app.utils.tokens import estimate_tokens
+from app.utils.extractive_summary import summarize
+from app.utils.progress import report_partial, report_progress
 
 class ClaudeService:
     """
     Servicio para interactuar con Claude API con soporte para caché y reintentos
     """
+    # Análisis que admiten una respuesta extractiva local bajo carga
+    DEGRADABLE_ANALYSES = ("summary",)
+    
     def __init__(self):
         self.logger = LogManager.get_logger("claude_service")
         self.client = get_claude_client()
@@ -29,6 +39,14 @@ class ClaudeService:
         self.max_tokens = settings.CLAUDE_MAX_TOKENS
         self.temperature = settings.CLAUDE_TEMPERATURE
         self.markdown_logger = MarkdownLogger()
+        self._admission = get_admission_controller()
+        
+        # Micro-batching opcional de análisis pequeños
+        self._batcher = MicroBatcher(
+            self._analyze_batch,
+            window_ms=settings.CLAUDE_MICROBATCH_WINDOW_MS,
+            max_batch_size=settings.CLAUDE_MICROBATCH_MAX_SIZE
+        ) if settings.CLAUDE_MICROBATCH_ENABLED else None
     
     @backoff.on_exception(
         backoff.expo,
@@ -59,12 +77,12 @@ class ClaudeService:
             )
             
             # Registrar métricas
-            await self._metrics.record_api_call(
+            await self._metrics.record_api_call(APIMetric(
                 endpoint="mcp_completion",
                 method="POST",
                 status_code=200,
                 response_time=time.time() - start_time
-            )
+            ))
             
             # Formatear respuesta
             result = ClaudeResponse(
@@ -82,12 +100,12 @@ class ClaudeService:
             
         except Exception as e:
             # Registrar error en métricas
-            await self._metrics.record_api_call(
+            await self._metrics.record_api_call(APIMetric(
                 endpoint="mcp_completion",
                 method="POST",
                 status_code=500,
                 response_time=time.time() - start_time
-            )
+            ))
             
             self.logger.error(f"Error al procesar solicitud de completado: {str(e)}")
             raise
@@ -111,21 +129,30 @@ class ClaudeService:
         """
         start_time = time.time()
         
+        # Bajo carga, los resúmenes se sirven localmente para no incumplir el SLO
+        if analysis_type in self.DEGRADABLE_ANALYSES and self._admission.should_degrade("analysis"):
+            return await self._extractive_analysis(text, start_time)
+        
         try:
-            # Generar análisis con Claude
-            response = await self.client.analyze_text(text, analysis_type)
+            # Generar análisis con Claude (las solicitudes pequeñas se agrupan si está activo)
+            if self._batcher and estimate_tokens(text) <= settings.CLAUDE_MICROBATCH_MAX_TOKENS:
+                content = await self._batcher.submit(analysis_type, text)
+            else:
+                async with self._admission.slot("analysis"):
+                    response = await self.client.analyze_text(text, analysis_type)
+                content = response["content"]
             
             # Registrar métricas
-            await self._metrics.record_api_call(
+            await self._metrics.record_api_call(APIMetric(
                 endpoint="analyze_text",
                 method="POST",
                 status_code=200,
                 response_time=time.time() - start_time
-            )
+            ))
             
             # Formatear resultado
             result = ClaudeAnalysis(
-                summary=response["content"],
+                summary=content,
                 key_points=[],  # TODO: Extraer puntos clave del contenido
                 sentiment="neutral",  # TODO: Extraer sentimiento del contenido
                 topics=[],  # TODO: Extraer temas del contenido
@@ -136,16 +163,91 @@ class ClaudeService:
             
         except Exception as e:
             # Registrar error en métricas
-            await self._metrics.record_api_call(
+            await self._metrics.record_api_call(APIMetric(
                 endpoint="analyze_text",
                 method="POST",
                 status_code=500,
                 response_time=time.time() - start_time
-            )
+            ))
             
             self.logger.error(f"Error al analizar texto: {str(e)}")
             raise
     
+    async def _extractive_analysis(self, text: str, start_time: float) -> ClaudeAnalysis:
+        """
+        Genera un resumen extractivo local (TextRank) sin llamar a Claude
+        
+        Args:
+            text: Texto a resumir
+            start_time: Inicio de la solicitud, para las métricas
+            
+        Returns:
+            ClaudeAnalysis marcado como degradado
+        """
+        sentences = summarize(text, max_sentences=settings.EXTRACTIVE_SUMMARY_SENTENCES)
+        
+        await self._metrics.record_api_call(APIMetric(
+            endpoint="analyze_text_degraded",
+            method="POST",
+            status_code=200,
+            response_time=time.time() - start_time
+        ))
+        self.logger.info(f"Resumen extractivo local de {len(sentences)} oraciones (modo degradado)")
+        
+        return ClaudeAnalysis(
+            summary=" ".join(sentences) or text.strip()[:500] or "(sin contenido)",
+            key_points=sentences,
+            sentiment="neutral",
+            degraded=True,
+            source="extractive"
+        )
+    
+    async def _analyze_batch(self, analysis_type: str, texts: List[str]) -> List[str]:
+        """
+        Analiza un lote de textos pequeños con una sola llamada a Claude
+        
+        Si la respuesta empaquetada no se puede repartir, cada texto se
+        analiza por separado.
+        
+        Args:
+            analysis_type: Tipo de análisis común al lote
+            texts: Textos a analizar
+            
+        Returns:
+            Resultado de cada texto, en el mismo orden
+        """
+        if len(texts) == 1:
+            async with self._admission.slot("analysis"):
+                response = await self.client.analyze_text(texts[0], analysis_type)
+            return [response["content"]]
+        
+        items = json.dumps(
+            [{"id": i, "text": text} for i, text in enumerate(texts)],
+            ensure_ascii=False
+        )
+        prompt = PromptTemplates.get_batch_analysis_prompt(analysis_type, items)
+        
+        try:
+            async with self._admission.slot("analysis"):
+                response = await self.client.generate_chat_response(
+                    [{"role": "user", "content": prompt}],
+                    temperature=0.0
+                )
+            results = parse_batch_results(response["content"], len(texts))
+            self.logger.info(f"Lote de {len(texts)} análisis '{analysis_type}' resuelto en una llamada")
+            return results
+        except BatchParseError as e:
+            self.logger.warning(
+                f"Respuesta de lote no válida, se analizan {len(texts)} textos por separado: {str(e)}"
+            )
+        
+        async def analyze_one(text: str) -> Dict[str, Any]:
+            async with self._admission.slot("analysis"):
+                return await self.client.analyze_text(text, analysis_type)
+        
+        responses = await asyncio.gather(*[analyze_one(text) for text in texts])
+        return [response["content"] for response in responses]
+    
     @backoff.on_exception(
         backoff.expo,
         Exception,
@@ -167,7 +269,9 @@ class ClaudeService:
                 "max_tokens": self.client.max_tokens,
                 "temperature": self.client.temperature,
                 "cache_enabled": True,
-                "cache_ttl": self._cache_ttl
+                "cache_ttl": self._cache_ttl,
+                "microbatch_enabled": self._batcher is not None,
+                "admission": self._admission.get_status()
             }
             
             return status
@@ -202,25 +306,27 @@ class ClaudeService:
                 format_type=format_type
             )
             
-            # Generar contenido con Claude
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            # Extraer contenido generado
-            generated_content = response.content[0].text
+            # Generar contenido con Claude en streaming: los transportes que
+            # escuchan (SSE, stdio) reciben el texto según se produce
+            parts: List[str] = []
+            generated_chars = 0
+            async with self._admission.slot("generate_markdown"):
+                async for delta in self.client.stream_message(
+                    [{"role": "user", "content": prompt}],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature
+                ):
+                    parts.append(delta)
+                    generated_chars += len(delta)
+                    report_partial(delta)
+                    report_progress(generated_chars, message="Generando Markdown")
+            generated_content = "".join(parts)
             
             # Registrar operación
-            LogManager.log_claude_operation(
-                "generate_markdown",
-                prompt,
-                generated_content
-            )
+            self.markdown_logger.log_claude_operation("generate_markdown", {
+                "prompt": prompt,
+                "response": generated_content
+            })
             
             result = {
                 "content": generated_content,
@@ -228,30 +334,147 @@ class ClaudeService:
                 "model": self.model
             }
             
-            # Guardar archivo si se solicita
+            # Guardar archivo si se solicita (almacén deduplicado: las
+            # salidas repetidas no vuelven a escribirse)
             if save and filename:
-                await self.markdown_logger.log_file_operation(
-                    operation="create",
-                    filename=filename,
-                    content=generated_content
-                )
-                result["saved"] = True
+                saved = await FileSystemService().save_artifact(filename, generated_content)
+                result["saved"] = saved.success
                 result["filename"] = filename
+                if not saved.success:
+                    result["error"] = saved.message
             
             return result
             
         except Exception as e:
-            LogManager.log_error("claude", str(e))
+            self.logger.error(f"Error al generar Markdown: {str(e)}")
             raise
     
     async def edit_markdown(
         self,
         content: str,
-        instructions: str
+        instructions: str,
+        mode: str = "auto"
     ) -> Dict[str, Any]:
         """
         Edita contenido Markdown usando Claude
         
+        En modo parcial solo se envían las secciones relevantes y Claude
+        devuelve un parche que se valida y aplica localmente. Si el parche
+        no se puede aplicar se reescribe el documento completo.
+        
+        Args:
+            content: Contenido original
+            instructions: Instrucciones de edición
+            mode: "full", "targeted" o "auto" (parcial en documentos grandes)
+            
+        Returns:
+            Dict con el contenido editado y metadata
+        """
+        if mode not in ("auto", "full", "targeted"):
+            raise ValueError(f"Modo de edición no válido: {mode}")
+        
+        fallback_reason = None
+        use_targeted = mode == "targeted" or (
+            mode == "auto" and len(content) >= settings.EDIT_TARGETED_MIN_SIZE
+        )
+        
+        if use_targeted:
+            try:
+                return await self._edit_markdown_targeted(content, instructions)
+            except PatchError as e:
+                fallback_reason = str(e)
+                self.logger.warning(f"Parche no aplicable, se reescribe el documento: {fallback_reason}")
+        
+        result = await self._edit_markdown_full(content, instructions)
+        if fallback_reason:
+            result["fallback_reason"] = fallback_reason
+        return result
+    
+    async def _edit_markdown_targeted(
+        self,
+        content: str,
+        instructions: str
+    ) -> Dict[str, Any]:
+        """
+        Edita solo las secciones relevantes mediante un parche estructurado
+        
+        Args:
+            content: Contenido original
+            instructions: Instrucciones de edición
+            
+        Returns:
+            Dict con el contenido editado y metadata
+            
+        Raises:
+            PatchError: Si no hay secciones relevantes o el parche no es válido
+        """
+        sections = split_sections(content)
+        selected = select_sections(
+            content,
+            sections,
+            instructions,
+            max_sections=settings.EDIT_TARGETED_MAX_SECTIONS
+        )
+        if not selected:
+            raise PatchError("No se encontraron secciones relevantes para las instrucciones")
+        
+        # Cada sección se envía con los títulos vecinos como contexto
+        excerpts = []
+        for section in selected:
+            previous = sections[section.index - 1].title if section.index > 0 else None
+            following = sections[section.index + 1].title if section.index + 1 < len(sections) else None
+            context = ", ".join(filter(None, [
+                f"tras «{previous}»" if previous else None,
+                f"antes de «{following}»" if following else None
+            ]))
+            excerpts.append(
+                f"--- Sección «{section.title or 'Preámbulo'}» ({context or 'documento completo'}) ---\n"
+                f"{content[section.start:section.end]}"
+            )
+        
+        prompt = PromptTemplates.get_file_patch_prompt(
+            sections="\n\n".join(excerpts),
+            instructions=instructions
+        )
+        
+        async with self._admission.slot("edit_markdown"):
+            response = await self.client.generate_chat_response(
+                [{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens
+            )
+        
+        edits = parse_patch(response["content"])
+        edited_content = apply_patch(
+            content,
+            edits,
+            allowed_spans=[(s.start, s.end) for s in selected]
+        )
+        
+        # Registrar operación
+        self.markdown_logger.log_claude_operation(
+            "edit_markdown",
+            {"mode": "targeted", "prompt": prompt, "response": response["content"]}
+        )
+        
+        return {
+            "content": edited_content,
+            "original_content": content,
+            "instructions": instructions,
+            "model": self.model,
+            "mode": "targeted",
+            "sections": [s.title for s in selected],
+            "edits_applied": len(edits),
+            "tokens_used": response["tokens_used"]
+        }
+    
+    async def _edit_markdown_full(
+        self,
+        content: str,
+        instructions: str
+    ) -> Dict[str, Any]:
+        """
+        Reescribe el documento completo según las instrucciones
+        
         Args:
             content: Contenido original
             instructions: Instrucciones de edición
@@ -267,34 +490,31 @@ class ClaudeService:
             )
             
             # Generar edición con Claude
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            # Extraer contenido editado
-            edited_content = response.content[0].text
+            async with self._admission.slot("edit_markdown"):
+                response = await self.client.generate_chat_response(
+                    [{"role": "user", "content": prompt}],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature
+                )
+            edited_content = response["content"]
             
             # Registrar operación
-            LogManager.log_claude_operation(
+            self.markdown_logger.log_claude_operation(
                 "edit_markdown",
-                prompt,
-                edited_content
+                {"mode": "full", "prompt": prompt, "response": edited_content}
             )
             
             return {
                 "content": edited_content,
                 "original_content": content,
                 "instructions": instructions,
-                "model": self.model
+                "model": self.model,
+                "mode": "full",
+                "tokens_used": response["tokens_used"]
             }
             
         except Exception as e:
-            LogManager.log_error("claude", str(e))
+            self.logger.error(f"Error al editar Markdown: {str(e)}")
             raise
 
 # Instancia global del servicio Claude
@@ -0,0 +1,374 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+
+MANIFEST_NAME = ".manifest.sqlite3"
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL
+);
+"""
+
+# Metadatos guardados en el manifiesto, con los mismos nombres que os.stat_result
+ManifestStat = namedtuple("ManifestStat", "st_ino st_size st_mtime_ns st_mtime st_ctime")
+
+Entry = Tuple[str, str, Any]
+
+def _is_data_file(name: str) -> bool:
+    return not name.startswith(".") and not name.endswith((".tmp", ".part", "~"))
+
+class FlatLayout:
+    """
+    Disposición plana: cada archivo está directamente en DATA_DIR
+    """
+    sharded = False
+
+    def __init__(self, data_dir: str):
+        self.data_dir = str(data_dir)
+
+    def path_for(self, name: str) -> str:
+        """
+        Obtiene la ruta física de un nombre lógico
+        """
+        return os.path.join(self.data_dir, name)
+
+    def record(self, name: str) -> None:
+        """Sin manifiesto: no hay nada que registrar"""
+
+    def forget(self, name: str) -> None:
+        """Sin manifiesto: no hay nada que olvidar"""
+
+    def entries(self, accept: Optional[Callable[[str], bool]] = None) -> Iterator[Entry]:
+        """
+        Recorre los archivos del directorio con os.scandir
+
+        Args:
+            accept: Filtro por nombre, aplicado antes de hacer stat
+
+        Returns:
+            Iterador de (nombre, ruta, stat)
+        """
+        try:
+            with os.scandir(self.data_dir) as it:
+                for entry in it:
+                    if accept is not None and not accept(entry.name):
+                        continue
+                    try:
+                        if entry.is_file():
+                            yield entry.name, entry.path, entry.stat()
+                    except FileNotFoundError:
+                        # Eliminado durante el recorrido
+                        continue
+        except FileNotFoundError:
+            return
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de la disposición
+        """
+        return {"layout": "flat", "directory": self.data_dir}
+
+class ShardedLayout:
+    """
+    Disposición por subdirectorios con prefijo de hash, para millones de archivos.
+
+    Cada nombre lógico se guarda en DATA_DIR/ab/cd/<nombre>, donde ab y cd
+    son los primeros caracteres del hash BLAKE2b del nombre: con depth=2 y
+    width=2 hay 65536 directorios y, con 10^6 archivos, unos 15 por
+    directorio, así que abrir, crear o borrar no degrada con el tamaño.
+    La ruta se calcula a partir del nombre, de modo que stat y open no
+    consultan el manifiesto.
+
+    El manifiesto (SQLite en DATA_DIR/.manifest.sqlite3) guarda nombre
+    lógico, ruta física y metadatos de cada archivo y es lo que se recorre
+    para listar, en lugar de los 65536 directorios. FileSystemService lo
+    mantiene al escribir o borrar; `rebuild()` lo reconstruye desde disco.
+    El espacio de nombres que ven los clientes sigue siendo plano.
+
+    Los métodos son síncronos y seguros entre hilos.
+    """
+    sharded = True
+
+    def __init__(self, data_dir: str, depth: int = 2, width: int = 2):
+        if depth < 1 or width < 1 or depth * width > 32:
+            raise ValueError("Parámetros de fragmentación inválidos")
+        self.logger = LogManager.get_logger("data_layout")
+        self.data_dir = str(data_dir)
+        self.depth = depth
+        self.width = width
+        self.manifest_path = os.path.join(self.data_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.executescript(MANIFEST_SCHEMA)
+        expected = {"depth": str(depth), "width": str(width)}
+        with self._conn:
+            stored = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if not stored:
+                self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+                stored = expected
+        if {k: stored.get(k) for k in expected} != expected:
+            self._conn.close()
+            raise ValueError(
+                f"El manifiesto usa depth={stored.get('depth')} width={stored.get('width')}; "
+                "ejecute la migración para cambiar la disposición"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.manifest_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def shard_for(self, name: str) -> str:
+        """
+        Obtiene el subdirectorio relativo de un nombre lógico (p. ej. "3f/a2")
+        """
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(*(digest[i * self.width:(i + 1) * self.width] for i in range(self.depth)))
+
+    def path_for(self, name: str) -> str:
+        """
+        Obtiene la ruta física de un nombre lógico
+        """
+        return os.path.join(self.data_dir, self.shard_for(name), name)
+
+    def record(self, name: str) -> None:
+        """
+        Registra (o actualiza) un archivo en el manifiesto tras escribirlo
+        """
+        path = self.path_for(name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.forget(name)
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (name, path, size, mtime_ns, ctime_ns, ino) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, os.path.relpath(path, self.data_dir), st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+            )
+
+    def forget(self, name: str) -> None:
+        """
+        Elimina un archivo del manifiesto
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def entries(self, accept: Optional[Callable[[str], bool]] = None) -> Iterator[Entry]:
+        """
+        Recorre los archivos registrados en el manifiesto, sin tocar el disco
+
+        Se usa una conexión propia: la lectura ve una instantánea (WAL) y no
+        bloquea las escrituras mientras se consume el iterador.
+
+        Args:
+            accept: Filtro por nombre
+
+        Returns:
+            Iterador de (nombre, ruta, ManifestStat)
+        """
+        conn = sqlite3.connect(self.manifest_path)
+        try:
+            rows = conn.execute("SELECT name, path, size, mtime_ns, ctime_ns, ino FROM files")
+            for name, path, size, mtime_ns, ctime_ns, ino in rows:
+                if accept is not None and not accept(name):
+                    continue
+                yield name, os.path.join(self.data_dir, path), ManifestStat(
+                    st_ino=ino,
+                    st_size=size,
+                    st_mtime_ns=mtime_ns,
+                    st_mtime=mtime_ns / 1e9,
+                    st_ctime=ctime_ns / 1e9
+                )
+        finally:
+            conn.close()
+
+    def walk(self) -> Iterator[Tuple[str, str]]:
+        """
+        Recorre los subdirectorios en disco
+
+        Returns:
+            Iterador de (nombre, ruta) de cada archivo
+        """
+        def walk(directory: str, level: int) -> Iterator[Tuple[str, str]]:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if level < self.depth:
+                        if entry.is_dir() and len(entry.name) == self.width:
+                            yield from walk(entry.path, level + 1)
+                    elif entry.is_file() and _is_data_file(entry.name):
+                        yield entry.name, entry.path
+        yield from walk(self.data_dir, 0)
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Reconstruye el manifiesto recorriendo los subdirectorios
+
+        Returns:
+            Dict con archivos registrados y entradas huérfanas eliminadas
+        """
+        found = set()
+        with self._lock, self._conn:
+            for name, path in self.walk():
+                if path != self.path_for(name):
+                    self.logger.warning(f"Archivo fuera de su subdirectorio: {path}")
+                    continue
+                st = os.stat(path)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (name, path, size, mtime_ns, ctime_ns, ino) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, os.path.relpath(path, self.data_dir), st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+                )
+                found.add(name)
+            stale = [name for (name,) in self._conn.execute("SELECT name FROM files") if name not in found]
+            self._conn.executemany("DELETE FROM files WHERE name = ?", [(name,) for name in stale])
+        return {"recorded": len(found), "removed": len(stale)}
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de la disposición
+        """
+        with self._lock:
+            files = self._conn.execute("SELECT count(*) FROM files").fetchone()[0]
+        return {
+            "layout": "sharded",
+            "directory": self.data_dir,
+            "depth": self.depth,
+            "width": self.width,
+            "files": files
+        }
+
+    def close(self) -> None:
+        """
+        Cierra la conexión con el manifiesto
+        """
+        with self._lock:
+            self._conn.close()
+
+def migrate_to_sharded(data_dir: str, depth: int = 2, width: int = 2) -> Dict[str, int]:
+    """
+    Mueve los archivos de DATA_DIR a la disposición fragmentada
+
+    Cada archivo se mueve con un rename (atómico en el mismo sistema de
+    archivos) y se registra en el manifiesto. Es reanudable: si se
+    interrumpe, volver a ejecutarla mueve lo que quedó en la raíz y
+    `rebuild()` reconcilia el manifiesto. Debe ejecutarse con la API parada.
+
+    Args:
+        data_dir: Directorio de datos
+        depth: Niveles de subdirectorios
+        width: Caracteres del hash por nivel
+
+    Returns:
+        Dict con archivos movidos y registrados
+    """
+    layout = ShardedLayout(data_dir, depth=depth, width=width)
+    moved = 0
+    try:
+        for name, path, _ in FlatLayout(data_dir).entries(accept=_is_data_file):
+            target = layout.path_for(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(path, target)
+            moved += 1
+        stats = layout.rebuild()
+    finally:
+        layout.close()
+    return {"moved": moved, "recorded": stats["recorded"]}
+
+def migrate_to_flat(data_dir: str, depth: int = 2, width: int = 2) -> Dict[str, int]:
+    """
+    Devuelve los archivos fragmentados a la raíz de DATA_DIR
+
+    Elimina los subdirectorios vacíos y el manifiesto al terminar. Debe
+    ejecutarse con la API parada.
+
+    Args:
+        data_dir: Directorio de datos
+        depth: Niveles de subdirectorios usados
+        width: Caracteres del hash por nivel usados
+
+    Returns:
+        Dict con archivos movidos
+
+    Raises:
+        FileExistsError: Si un archivo de la raíz tiene el mismo nombre
+    """
+    layout = ShardedLayout(data_dir, depth=depth, width=width)
+    moved = 0
+    try:
+        for name, path in list(layout.walk()):
+            target = os.path.join(str(data_dir), name)
+            if os.path.exists(target):
+                raise FileExistsError(f"Ya existe {target}")
+            os.rename(path, target)
+            layout.forget(name)
+            moved += 1
+    finally:
+        layout.close()
+
+    for root, dirs, files in os.walk(str(data_dir), topdown=False):
+        if root != str(data_dir) and not os.listdir(root):
+            os.rmdir(root)
+    for suffix in ("", "-wal", "-shm"):
+        manifest = os.path.join(str(data_dir), MANIFEST_NAME + suffix)
+        if os.path.exists(manifest):
+            os.unlink(manifest)
+    return {"moved": moved}
+
+@lru_cache()
+def get_data_layout():
+    """
+    Obtiene la disposición de DATA_DIR configurada en DATA_DIR_LAYOUT
+    """
+    if settings.DATA_DIR_LAYOUT == "sharded":
+        return ShardedLayout(settings.DATA_DIR, depth=settings.DATA_SHARD_DEPTH, width=settings.DATA_SHARD_WIDTH)
+    if os.path.exists(os.path.join(str(settings.DATA_DIR), MANIFEST_NAME)):
+        LogManager.get_logger("data_layout").warning(
+            "DATA_DIR tiene un manifiesto de disposición fragmentada pero DATA_DIR_LAYOUT=flat"
+        )
+    return FlatLayout(settings.DATA_DIR)
+
+def main(argv: Optional[list] = None) -> None:
+    """
+    Herramienta de migración: python -m app.services.data_layout {sharded,flat,rebuild}
+    """
+    parser = argparse.ArgumentParser(description="Cambia la disposición de DATA_DIR")
+    parser.add_argument("action", choices=["sharded", "flat", "rebuild"])
+    parser.add_argument("--data-dir", default=str(settings.DATA_DIR))
+    parser.add_argument("--depth", type=int, default=settings.DATA_SHARD_DEPTH)
+    parser.add_argument("--width", type=int, default=settings.DATA_SHARD_WIDTH)
+    args = parser.parse_args(argv)
+
+    if args.action == "sharded":
+        result = migrate_to_sharded(args.data_dir, args.depth, args.width)
+    elif args.action == "flat":
+        result = migrate_to_flat(args.data_dir, args.depth, args.width)
+    else:
+        layout = ShardedLayout(args.data_dir, args.depth, args.width)
+        try:
+            result = layout.rebuild()
+        finally:
+            layout.close()
+    print(result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.services.data_layout import get_data_layout
+
+# Máscaras de inotify (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+CHANGED = "changed"
+DELETED = "deleted"
+RESCAN = "rescan"
+
+@dataclass
+class ChangeEvent:
+    """Cambio de un archivo del directorio vigilado"""
+    seq: int
+    kind: str
+    filename: Optional[str]
+    timestamp: float
+
+def is_ignored(filename: str) -> bool:
+    """
+    Indica si un nombre corresponde a un archivo temporal u oculto
+    """
+    return filename.startswith(".") or filename.endswith((".tmp", ".part", "~"))
+
+class InotifyBackend:
+    """
+    Vigila un directorio con inotify (Linux) a través de libc
+
+    El descriptor es no bloqueante y se integra en el event loop con
+    `add_reader`, así que no necesita hilos.
+    """
+    def __init__(self, directory: str, emit: Callable[[str, Optional[str]], None]):
+        self.directory = directory
+        self._emit = emit
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Indica si inotify está disponible en este sistema
+        """
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def start(self) -> None:
+        """
+        Crea la instancia de inotify y empieza a leer eventos
+
+        Raises:
+            OSError: Si no se puede crear la vigilancia
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        if libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch falló para {self.directory}")
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        for mask, name in self.parse(data):
+            if mask & IN_Q_OVERFLOW:
+                self._emit(RESCAN, None)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                self._emit(RESCAN, None)
+            elif name and not mask & IN_ISDIR:
+                self._emit(DELETED if mask & (IN_DELETE | IN_MOVED_FROM) else CHANGED, name)
+
+    @staticmethod
+    def parse(data: bytes) -> List[Tuple[int, Optional[str]]]:
+        """
+        Decodifica un bloque de estructuras inotify_event
+
+        Returns:
+            Lista de pares (máscara, nombre)
+        """
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((mask, os.fsdecode(raw) if raw else None))
+        return events
+
+    def stop(self) -> None:
+        """
+        Deja de vigilar el directorio
+        """
+        if self._fd is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+class PollingBackend:
+    """
+    Vigila un directorio comparando instantáneas periódicas de `os.scandir`
+    """
+    def __init__(self, directory: str, emit: Callable[[str, Optional[str]], None], interval: float = 2.0):
+        self.directory = directory
+        self.interval = interval
+        self._emit = emit
+        self._snapshot: Dict[str, Tuple[int, int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Obtiene (inode, mtime_ns, tamaño) de cada archivo del directorio
+        """
+        state = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            state[entry.name] = (st.st_ino, st.st_mtime_ns, st.st_size)
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return state
+
+    def start(self) -> None:
+        """
+        Toma la instantánea inicial y arranca el sondeo
+        """
+        self._snapshot = self.snapshot()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            current = await asyncio.to_thread(self.snapshot)
+            for name, key in current.items():
+                if self._snapshot.get(name) != key:
+                    self._emit(CHANGED, name)
+            for name in self._snapshot.keys() - current.keys():
+                self._emit(DELETED, name)
+            self._snapshot = current
+
+    def stop(self) -> None:
+        """
+        Detiene el sondeo
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+class DataDirWatcher:
+    """
+    Feed de cambios de un directorio de datos.
+
+    Usa inotify en Linux y, si no está disponible, sondeo periódico. Los
+    eventos de un mismo archivo se agrupan durante `debounce` segundos y se
+    publican en lotes: cada suscriptor (una función síncrona que recibe la
+    lista de ChangeEvent) se ejecuta en un hilo, en orden. Un evento RESCAN
+    indica que se pudieron perder cambios (desbordamiento de la cola de
+    inotify) y que el consumidor debe volver a recorrer el directorio.
+
+    Además se guarda un historial acotado con número de secuencia para que
+    los clientes consulten los cambios desde su última lectura, y un
+    contador `generation` que aumenta con cada lote.
+
+    Con backend="none" no se vigila el sistema de archivos: los cambios
+    llegan solo por `notify()`, que es lo que usa la disposición
+    fragmentada de DATA_DIR (inotify no es recursivo).
+    """
+    def __init__(
+        self,
+        directory: str,
+        backend: str = "auto",
+        poll_interval: float = 2.0,
+        debounce: float = 0.2,
+        history: int = 1000
+    ):
+        self.logger = LogManager.get_logger("data_watcher")
+        self.directory = str(directory)
+        self.backend_name = backend
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.generation = 0
+        self._seq = 0
+        self._history: Deque[ChangeEvent] = deque(maxlen=history)
+        self._subscribers: List[Callable[[List[ChangeEvent]], None]] = []
+        self._pending: Dict[Optional[str], str] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._backend = None
+
+    @property
+    def running(self) -> bool:
+        """Si el watcher está activo"""
+        return self._dispatcher is not None
+
+    def subscribe(self, callback: Callable[[List[ChangeEvent]], None]) -> None:
+        """
+        Registra un consumidor del feed de cambios
+
+        Args:
+            callback: Función síncrona que recibe cada lote de eventos
+        """
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def notify(self, kind: str, filename: Optional[str]) -> None:
+        """
+        Publica un cambio hecho por la propia aplicación
+
+        Se puede llamar desde cualquier hilo; no hace nada si el watcher
+        no está activo.
+
+        Args:
+            kind: CHANGED, DELETED o RESCAN
+            filename: Nombre del archivo
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._emit(kind, filename)
+        else:
+            loop.call_soon_threadsafe(self._emit, kind, filename)
+
+    def _emit(self, kind: str, filename: Optional[str]) -> None:
+        if filename is not None and is_ignored(filename):
+            return
+        if kind == RESCAN:
+            self._pending = {None: RESCAN}
+        elif None not in self._pending:
+            self._pending[filename] = kind
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.debounce, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if not self._pending:
+            return
+        now = time.time()
+        batch = []
+        for filename, kind in self._pending.items():
+            self._seq += 1
+            event = ChangeEvent(seq=self._seq, kind=kind, filename=filename, timestamp=now)
+            self._history.append(event)
+            batch.append(event)
+        self._pending = {}
+        self.generation += 1
+        self._batches.put_nowait(batch)
+
+    async def _dispatch(self) -> None:
+        while True:
+            batch = await self._batches.get()
+            for callback in list(self._subscribers):
+                try:
+                    await asyncio.to_thread(callback, batch)
+                except Exception as e:
+                    self.logger.error(f"Error en consumidor del feed de cambios: {str(e)}")
+
+    async def start(self) -> None:
+        """
+        Empieza a vigilar el directorio con el mejor backend disponible
+        """
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        self._batches = asyncio.Queue()
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        if self.backend_name == "none":
+            self.logger.info(f"Feed de cambios de {self.directory} sin vigilancia del sistema de archivos")
+            return
+        if self.backend_name in ("auto", "inotify") and InotifyBackend.available():
+            try:
+                backend = InotifyBackend(self.directory, self._emit)
+                backend.start()
+                self._backend = backend
+            except OSError as e:
+                self.logger.warning(f"inotify no disponible, se usa sondeo: {str(e)}")
+        if self._backend is None:
+            backend = PollingBackend(self.directory, self._emit, self.poll_interval)
+            backend.start()
+            self._backend = backend
+        self.logger.info(f"Vigilando {self.directory} con {type(self._backend).__name__}")
+
+    async def stop(self) -> None:
+        """
+        Deja de vigilar el directorio
+        """
+        if self._backend is not None:
+            self._backend.stop()
+            self._backend = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        self._loop = None
+
+    def changes_since(self, seq: int = 0) -> Tuple[List[ChangeEvent], int, bool]:
+        """
+        Obtiene los cambios posteriores a un número de secuencia
+
+        Args:
+            seq: Último número de secuencia leído por el cliente
+
+        Returns:
+            Tupla (eventos, secuencia actual, reset); reset indica que el
+            historial ya no cubre `seq` y el cliente debe volver a listar
+        """
+        reset = bool(self._history) and seq + 1 < self._history[0].seq
+        events = [event for event in self._history if event.seq > seq]
+        return events, self._seq, reset
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del watcher
+
+        Returns:
+            Dict con backend, secuencia y generación
+        """
+        return {
+            "directory": self.directory,
+            "backend": type(self._backend).__name__ if self._backend else None,
+            "seq": self._seq,
+            "generation": self.generation,
+            "subscribers": len(self._subscribers)
+        }
+
+@lru_cache()
+def get_data_watcher() -> DataDirWatcher:
+    """
+    Obtiene el watcher compartido de DATA_DIR
+    """
+    return DataDirWatcher(
+        settings.DATA_DIR,
+        backend="none" if get_data_layout().sharded else settings.DATA_WATCHER_BACKEND,
+        poll_interval=settings.DATA_WATCHER_POLL_INTERVAL,
+        debounce=settings.DATA_WATCHER_DEBOUNCE,
+        history=settings.DATA_WATCHER_HISTORY
+    )
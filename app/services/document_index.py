@@ -0,0 +1,301 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.services.data_layout import FlatLayout, get_data_layout
+from app.utils.seekable_zstd import read_logical
+from app.utils.text_search import build_match_query, query_terms
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    filename TEXT PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    filename UNINDEXED,
+    body,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+"""
+
+class DocumentIndex:
+    """
+    Índice de texto completo de los documentos de DATA_DIR.
+
+    Se guarda en disco en una base SQLite con una tabla FTS5: el índice
+    invertido, la puntuación BM25 y los fragmentos los resuelve SQLite en C.
+    El tokenizador unicode61 pliega mayúsculas y acentos, y la consulta se
+    reduce a raíces que se buscan como prefijo (ver app.utils.text_search),
+    lo que cubre plurales y derivaciones habituales en español e inglés.
+
+    FileSystemService actualiza el índice al guardar, actualizar o eliminar.
+    Para los archivos escritos por otras vías, `sync()` compara el directorio
+    con el índice (mtime y tamaño) y reindexa solo lo que cambió; `search()`
+    lo invoca si la última sincronización es más antigua que
+    DOCUMENT_INDEX_SYNC_INTERVAL.
+
+    Las rutas y el recorrido de `sync()` pasan por la disposición de
+    DATA_DIR (plana o fragmentada, ver app.services.data_layout).
+
+    Los métodos son síncronos y seguros entre hilos; desde el event loop
+    deben llamarse con asyncio.to_thread.
+    """
+    def __init__(
+        self,
+        db_path: str,
+        data_dir: str,
+        allowed_extensions: Iterable[str],
+        max_document_size: int = 10 * 1024 * 1024,
+        sync_interval: float = 30.0,
+        layout: Optional[Any] = None
+    ):
+        self.logger = LogManager.get_logger("document_index")
+        self.db_path = str(db_path)
+        self.data_dir = str(data_dir)
+        self.layout = layout or FlatLayout(self.data_dir)
+        self.allowed_extensions = {ext.lower() for ext in allowed_extensions}
+        self.max_document_size = max_document_size
+        self.sync_interval = sync_interval
+        self._last_sync = 0.0
+        self._live = False
+        self._lock = threading.RLock()
+
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _indexable(self, filename: str) -> bool:
+        return "." in filename and filename.rsplit(".", 1)[1].lower() in self.allowed_extensions
+
+    def _read(self, path: str) -> Optional[str]:
+        try:
+            data = read_logical(path, self.max_document_size)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"No se pudo leer {path} para indexarlo: {str(e)}")
+            return None
+        return data.decode("utf-8", errors="replace")
+
+    def _upsert(self, filename: str, text: str, mtime_ns: int, size: int) -> None:
+        row = self._conn.execute("SELECT doc_id FROM files WHERE filename = ?", (filename,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+        cursor = self._conn.execute("INSERT INTO documents (filename, body) VALUES (?, ?)", (filename, text))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (filename, doc_id, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (filename, cursor.lastrowid, mtime_ns, size)
+        )
+
+    def _delete(self, filename: str) -> bool:
+        row = self._conn.execute("SELECT doc_id FROM files WHERE filename = ?", (filename,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+        self._conn.execute("DELETE FROM files WHERE filename = ?", (filename,))
+        return True
+
+    def index_file(self, filename: str, text: Optional[str] = None) -> bool:
+        """
+        Indexa (o reindexa) un archivo de DATA_DIR
+
+        Args:
+            filename: Nombre del archivo
+            text: Contenido ya conocido; si se omite se lee del disco
+
+        Returns:
+            True si el archivo quedó indexado
+        """
+        if not self._indexable(filename):
+            return False
+        path = self.layout.path_for(filename)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return self.remove_file(filename)
+        if text is None:
+            text = self._read(path)
+            if text is None:
+                return False
+
+        with self._lock, self._conn:
+            self._upsert(filename, text, st.st_mtime_ns, st.st_size)
+        return True
+
+    def remove_file(self, filename: str) -> bool:
+        """
+        Elimina un archivo del índice
+
+        Returns:
+            True si estaba indexado
+        """
+        with self._lock, self._conn:
+            return self._delete(filename)
+
+    def refresh_file(self, filename: str) -> bool:
+        """
+        Reindexa un archivo solo si cambió desde que se indexó
+
+        Returns:
+            True si se reindexó o eliminó del índice
+        """
+        if not self._indexable(filename):
+            return False
+        try:
+            st = os.stat(self.layout.path_for(filename))
+        except FileNotFoundError:
+            return self.remove_file(filename)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size FROM files WHERE filename = ?", (filename,)
+            ).fetchone()
+        if row is not None and tuple(row) == (st.st_mtime_ns, st.st_size):
+            return False
+        return self.index_file(filename)
+
+    def apply_changes(self, events: List[Any]) -> None:
+        """
+        Aplica un lote del feed de cambios de DataDirWatcher
+
+        Mientras llegan eventos, `search()` deja de sincronizar por intervalo.
+
+        Args:
+            events: ChangeEvent con kind "changed", "deleted" o "rescan"
+        """
+        for event in events:
+            if event.kind == "rescan":
+                self.sync()
+            elif event.kind == "deleted":
+                self.remove_file(event.filename)
+            else:
+                self.refresh_file(event.filename)
+
+    def set_live(self, live: bool) -> None:
+        """
+        Indica si un feed de cambios mantiene el índice actualizado
+        """
+        self._live = live
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Sincroniza el índice con el contenido actual de DATA_DIR
+
+        Returns:
+            Dict con archivos añadidos o actualizados, eliminados y sin cambios
+        """
+        with self._lock:
+            indexed = {
+                filename: (mtime_ns, size)
+                for filename, mtime_ns, size in self._conn.execute("SELECT filename, mtime_ns, size FROM files")
+            }
+            stats = {"indexed": 0, "removed": 0, "unchanged": 0}
+
+            with self._conn:
+                present = set()
+                for name, path, st in list(self.layout.entries(accept=self._indexable)):
+                    present.add(name)
+                    if indexed.get(name) == (st.st_mtime_ns, st.st_size):
+                        stats["unchanged"] += 1
+                        continue
+                    text = self._read(path)
+                    if text is not None:
+                        self._upsert(name, text, st.st_mtime_ns, st.st_size)
+                        stats["indexed"] += 1
+
+                for filename in indexed.keys() - present:
+                    self._delete(filename)
+                    stats["removed"] += 1
+
+            self._last_sync = time.monotonic()
+        if stats["indexed"] or stats["removed"]:
+            self.logger.info(f"Índice de documentos sincronizado: {stats}")
+        return stats
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        match_all: bool = False,
+        snippet_tokens: int = 24
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Busca documentos ordenados por relevancia BM25
+
+        Args:
+            query: Consulta en lenguaje natural
+            limit: Máximo de resultados
+            offset: Resultados a saltar
+            match_all: Exigir todos los términos
+            snippet_tokens: Longitud del fragmento en palabras
+
+        Returns:
+            Tupla (resultados con filename, score y snippet; total de coincidencias)
+        """
+        if not self._live and time.monotonic() - self._last_sync > self.sync_interval:
+            self.sync()
+
+        terms = query_terms(query)
+        if not terms:
+            return [], 0
+        match = build_match_query(terms, match_all=match_all)
+
+        with self._lock:
+            total = self._conn.execute(
+                "SELECT count(*) FROM documents WHERE documents MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT filename, bm25(documents) AS rank, "
+                "snippet(documents, 1, '**', '**', '…', ?) "
+                "FROM documents WHERE documents MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (max(1, min(snippet_tokens, 64)), match, limit, offset)
+            ).fetchall()
+
+        return [
+            {"filename": filename, "score": -rank, "snippet": snippet}
+            for filename, rank, snippet in rows
+        ], total
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del índice
+
+        Returns:
+            Dict con número de documentos y ruta de la base
+        """
+        with self._lock:
+            documents = self._conn.execute("SELECT count(*) FROM files").fetchone()[0]
+        return {
+            "path": self.db_path,
+            "documents": documents,
+            "live": self._live,
+            "last_sync_seconds_ago": round(time.monotonic() - self._last_sync, 1) if self._last_sync else None
+        }
+
+    def close(self) -> None:
+        """
+        Cierra la conexión con la base del índice
+        """
+        with self._lock:
+            self._conn.close()
+
+@lru_cache()
+def get_document_index() -> DocumentIndex:
+    """
+    Obtiene el índice de documentos compartido
+    """
+    return DocumentIndex(
+        settings.DOCUMENT_INDEX_PATH,
+        settings.DATA_DIR,
+        settings.ALLOWED_EXTENSIONS,
+        max_document_size=settings.MAX_FILE_SIZE,
+        sync_interval=settings.DOCUMENT_INDEX_SYNC_INTERVAL,
+        layout=get_data_layout()
+    )
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from fnmatch import fnmatch
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import magic
+from app.core.config import settings
+from app.services.data_layout import FlatLayout, get_data_layout
+from app.utils.seekable_zstd import SeekableReader, is_compressed
+
+# Bytes iniciales que se pasan a libmagic para detectar el tipo de contenido
+MIME_SNIFF_BYTES = 2048
+
+SORT_FIELDS = ("filename", "size", "created_at", "modified_at", "content_type")
+
+class FileMetadataIndex:
+    """
+    Índice en memoria de los metadatos de un directorio.
+
+    Cada pasada usa `os.scandir`, que aprovecha el tipo de entrada que ya
+    devuelve el sistema y un único `stat` por archivo. Los metadatos de un
+    archivo se reutilizan mientras no cambie su clave (inode, mtime, tamaño),
+    de modo que un directorio sin cambios se lista sin abrir ningún archivo.
+
+    El tipo MIME se detecta con libmagic sobre los primeros bytes del archivo
+    y se memoiza por (extensión, hash de esos bytes): archivos distintos con
+    la misma cabecera no vuelven a pasar por libmagic.
+
+    Con la disposición fragmentada de DATA_DIR (app.services.data_layout)
+    el recorrido lee el manifiesto en lugar del directorio.
+    """
+    def __init__(
+        self,
+        directory: str,
+        allowed_extensions: Iterable[str],
+        mime_cache_size: int = 4096,
+        layout: Optional[Any] = None
+    ):
+        self.directory = str(directory)
+        self.layout = layout or FlatLayout(self.directory)
+        self.allowed_extensions = {ext.lower() for ext in allowed_extensions}
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+        self._mime_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._mime_cache_size = mime_cache_size
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        # Con un feed de cambios activo el índice se mantiene por eventos
+        self._live = False
+        self._complete = False
+
+    def _extension(self, name: str) -> Optional[str]:
+        if "." not in name:
+            return None
+        ext = name.rsplit(".", 1)[1].lower()
+        return ext if ext in self.allowed_extensions else None
+
+    def _read_head(self, path: str) -> Tuple[bytes, Optional[int]]:
+        """
+        Lee los primeros bytes lógicos y, si está comprimido, el tamaño lógico
+        """
+        with open(path, "rb") as f:
+            head = f.read(MIME_SNIFF_BYTES)
+            if is_compressed(head):
+                with SeekableReader(f) as reader:
+                    return reader.read(0, MIME_SNIFF_BYTES), reader.size
+        return head, None
+
+    def _sniff_mime(self, head: bytes, extension: str) -> str:
+        key = (extension, hashlib.blake2b(head, digest_size=16).hexdigest())
+
+        mime = self._mime_cache.get(key)
+        if mime is not None:
+            self._mime_cache.move_to_end(key)
+            return mime
+
+        mime = magic.from_buffer(head, mime=True)
+        self._mime_cache[key] = mime
+        if len(self._mime_cache) > self._mime_cache_size:
+            self._mime_cache.popitem(last=False)
+        return mime
+
+    def _build_entry(self, name: str, path: str, extension: str, st: os.stat_result) -> Dict[str, Any]:
+        head, logical_size = self._read_head(path)
+        return {
+            "filename": name,
+            "path": path,
+            "size": st.st_size if logical_size is None else logical_size,
+            "stored_size": st.st_size,
+            "created_at": datetime.fromtimestamp(st.st_ctime),
+            "modified_at": datetime.fromtimestamp(st.st_mtime),
+            "content_type": self._sniff_mime(head, extension),
+            "extension": extension
+        }
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene los metadatos actuales del directorio
+
+        Con un feed de cambios activo y el índice completo se devuelven sin
+        tocar el disco; en otro caso se recorre el directorio.
+        """
+        with self._lock:
+            if self._live and self._complete:
+                self._hits += len(self._entries)
+                return [meta for _, meta in self._entries.values()]
+        return self.scan()
+
+    def set_live(self, live: bool) -> None:
+        """
+        Indica si un feed de cambios mantiene el índice actualizado
+        """
+        with self._lock:
+            self._live = live
+            self._complete = False
+
+    def apply_changes(self, events: List[Any]) -> None:
+        """
+        Aplica un lote del feed de cambios de DataDirWatcher
+
+        Args:
+            events: ChangeEvent con kind "changed", "deleted" o "rescan"
+        """
+        for event in events:
+            if event.kind == "rescan":
+                with self._lock:
+                    self._complete = False
+                continue
+            extension = self._extension(event.filename)
+            if extension is None:
+                continue
+            with self._lock:
+                if event.kind == "deleted":
+                    self._entries.pop(event.filename, None)
+                    continue
+                path = self.layout.path_for(event.filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    self._entries.pop(event.filename, None)
+                    continue
+                key = (st.st_ino, st.st_mtime_ns, st.st_size)
+                cached = self._entries.get(event.filename)
+                if cached is None or cached[0] != key:
+                    self._misses += 1
+                    self._entries[event.filename] = (key, self._build_entry(event.filename, path, extension, st))
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """
+        Recorre el directorio y actualiza el índice
+
+        Returns:
+            Metadatos de los archivos con extensión permitida
+        """
+        with self._lock:
+            seen: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+            for name, path, st in self.layout.entries(accept=lambda n: self._extension(n) is not None):
+                key = (st.st_ino, st.st_mtime_ns, st.st_size)
+                cached = self._entries.get(name)
+                if cached is not None and cached[0] == key:
+                    self._hits += 1
+                    seen[name] = cached
+                    continue
+                try:
+                    self._misses += 1
+                    seen[name] = (key, self._build_entry(name, path, self._extension(name), st))
+                except FileNotFoundError:
+                    # Eliminado durante el recorrido
+                    continue
+            self._entries = seen
+            self._complete = True
+            return [meta for _, meta in seen.values()]
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Descarta los metadatos de un archivo, o de todos si no se indica
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def query(
+        self,
+        pattern: Optional[str] = None,
+        extension: Optional[str] = None,
+        content_type: Optional[str] = None,
+        sort_by: str = "filename",
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Lista los archivos del directorio con filtros, orden y paginación
+
+        Args:
+            pattern: Patrón tipo glob sobre el nombre (p. ej. "*.md")
+            extension: Extensión exacta
+            content_type: Prefijo del tipo MIME (p. ej. "text/")
+            sort_by: Campo de orden (filename, size, created_at, modified_at, content_type)
+            descending: Orden descendente
+            offset: Número de archivos a saltar
+            limit: Máximo de archivos a devolver
+
+        Returns:
+            Tupla (página de metadatos, total tras filtrar)
+
+        Raises:
+            ValueError: Si el campo de orden no es válido
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Campo de orden inválido: {sort_by}. Válidos: {', '.join(SORT_FIELDS)}")
+
+        entries = self.entries()
+        if pattern:
+            entries = [e for e in entries if fnmatch(e["filename"], pattern)]
+        if extension:
+            extension = extension.lower().lstrip(".")
+            entries = [e for e in entries if e["extension"] == extension]
+        if content_type:
+            entries = [e for e in entries if e["content_type"].startswith(content_type)]
+
+        entries.sort(key=lambda e: (e[sort_by], e["filename"]), reverse=descending)
+        total = len(entries)
+        end = None if limit is None else offset + limit
+        return entries[offset:end], total
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del índice
+
+        Returns:
+            Dict con tamaño del índice y aciertos de la caché de metadatos
+        """
+        return {
+            "directory": self.directory,
+            "indexed": len(self._entries),
+            "live": self._live,
+            "hits": self._hits,
+            "misses": self._misses,
+            "mime_cache": len(self._mime_cache)
+        }
+
+@lru_cache()
+def get_file_index(directory: str) -> FileMetadataIndex:
+    """
+    Obtiene el índice compartido de un directorio
+    """
+    layout = get_data_layout() if directory == str(settings.DATA_DIR) else None
+    return FileMetadataIndex(directory, settings.ALLOWED_EXTENSIONS, layout=layout)
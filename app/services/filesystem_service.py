@@ -1,16 +1,80 @@
+import io
 import os
+import stat
+import asyncio
+import weakref
 import aiofiles
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from app.core.config import settings
 from app.core.logging import LogManager
 from app.core.markdown_logger import MarkdownLogger
-from app.schemas.filesystem import FileInfo, FileOperation, FileResponse
+from app.schemas.filesystem import (
+    FileInfo, FileOperation, FileResponse, FileListResponse, FilePatchRequest, UploadedFile,
+    FileSearchHit, FileSearchResponse, BulkFileOperation, BulkFileResult, BulkFileResponse
+)
+from app.services.artifact_store import ArtifactStore, UNCHANGED, detach
+from app.services.data_layout import get_data_layout
+from app.services.data_watcher import CHANGED, DELETED, get_data_watcher
+from app.services.file_index import get_file_index
+from app.services.document_index import get_document_index
+from app.utils.chunking import TextChunk, chunk_text
+from app.utils.file_patch import FilePatchError, append_to_file, apply_edits, diff_to_edits, rewrite_file
+from app.utils.http_cache import etag_for_stat, etag_matches
+from app.utils.range_response import CompressedRangeResponse, RangeFileResponse
+from app.utils.seekable_zstd import DecompressionCache, SeekableReader, is_compressed, maybe_compress, write_atomic
+from app.utils.streaming_upload import StreamingUploadWriter, iter_multipart, part_filename
 import magic
 import json
 from pathlib import Path
 import re
 
+# Un lock por archivo compartido entre instancias: serializa todas las
+# escrituras sobre un mismo archivo (guardar, crear, actualizar, parchear,
+# borrar, también dentro de un lote) para que las comprobaciones previas, como
+# la del ETag o la existencia, y la escritura sean atómicas
+_file_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _file_lock(path: str) -> asyncio.Lock:
+    lock = _file_locks.get(path)
+    if lock is None:
+        lock = asyncio.Lock()
+        _file_locks[path] = lock
+    return lock
+
+@lru_cache()
+def get_decompression_cache() -> DecompressionCache:
+    """
+    Obtiene la caché compartida de documentos descomprimidos
+    """
+    return DecompressionCache(settings.DATA_DECOMPRESSION_CACHE_SIZE)
+
+def encode_document(data: bytes) -> bytes:
+    """
+    Prepara un documento para guardarlo con la compresión configurada
+    (DATA_COMPRESSION y parámetros asociados)
+    """
+    if settings.DATA_COMPRESSION != "zstd":
+        return data
+    return maybe_compress(
+        data,
+        settings.DATA_COMPRESSION_MIN_SIZE,
+        level=settings.DATA_COMPRESSION_LEVEL,
+        frame_size=settings.DATA_COMPRESSION_FRAME_SIZE
+    )
+
+@lru_cache()
+def get_artifact_store() -> ArtifactStore:
+    """
+    Obtiene el almacén deduplicado de artefactos generados
+    """
+    return ArtifactStore(settings.DATA_DIR, layout=get_data_layout(), encode=encode_document)
+
+def _decode_text(data: bytes) -> str:
+    # Mismas reglas que leer en modo texto (saltos de línea universales)
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8").read()
+
 class FileSystemService:
     def __init__(self):
         self.data_dir = settings.DATA_DIR
@@ -18,13 +82,18 @@ class FileSystemService:
         self.temp_dir = settings.TEMP_DIR
         self.max_file_size = settings.MAX_FILE_SIZE
         self.allowed_extensions = settings.ALLOWED_EXTENSIONS
+        self.compression = settings.DATA_COMPRESSION == "zstd"
         
         # Crear directorios si no existen
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.log_dir, exist_ok=True)
         os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
         
         self.logger = MarkdownLogger()
+        self.layout = get_data_layout()
+        self.index = get_file_index(str(self.data_dir))
+        self.search_index = get_document_index()
     
     def _get_file_path(self, filename: str) -> str:
         """
@@ -45,7 +114,7 @@ class FileSystemService:
             
         # Prevenir directory traversal
         safe_filename = os.path.basename(filename)
-        return os.path.join(self.data_dir, safe_filename)
+        return self.layout.path_for(safe_filename)
     
     def _is_valid_filename(self, filename: str) -> bool:
         """
@@ -94,10 +163,26 @@ class FileSystemService:
             
         Returns:
             FileResponse con información del archivo guardado
+        """
+        try:
+            file_path = self._get_file_path(filename)
+        except ValueError:
+            # Nombre inválido: _save_file devuelve el error de validación
+            return await self._save_file(content, filename)
+        
+        async with _file_lock(file_path):
+            return await self._save_file(content, filename)
+    
+    async def _save_file(self, content: str, filename: str) -> FileResponse:
+        """
+        Guarda un archivo; el llamador debe tener el lock del archivo
+        
+        Args:
+            content: Contenido del archivo
+            filename: Nombre del archivo
             
-        Raises:
-            ValueError: Si el contenido o nombre del archivo es inválido
-            Exception: Si hay un error al guardar el archivo
+        Returns:
+            FileResponse con información del archivo guardado o del error
         """
         try:
             # Validar tamaño
@@ -109,33 +194,48 @@ class FileSystemService:
                 raise ValueError(f"Nombre de archivo inválido. Extensiones permitidas: {', '.join(self.allowed_extensions)}")
             
             file_path = self._get_file_path(filename)
+            if self.layout.sharded:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            await asyncio.to_thread(self._detach_artifact, filename, file_path)
             
             # Guardar archivo
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(content)
+            if self.compression:
+                encoded = content.encode('utf-8')
+                await asyncio.to_thread(self._write_document, file_path, encoded)
+                content_type = magic.from_buffer(encoded[:2048], mime=True)
+            else:
+                async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
+                    await f.write(content)
+                content_type = magic.from_file(file_path, mime=True)
+            await self._track_change(filename)
             
             # Obtener información del archivo
             file_info = FileInfo(
                 filename=filename,
                 path=file_path,
                 size=len(content),
+                stored_size=os.path.getsize(file_path),
                 created_at=datetime.now().isoformat(),
                 modified_at=datetime.now().isoformat(),
-                content_type=magic.from_file(file_path, mime=True),
+                content_type=content_type,
                 extension=filename.rsplit('.', 1)[1].lower()
             )
             
             # Registrar operación
-            await self.logger.log_file_operation(
-                operation="create",
-                filename=filename,
-                content=content[:100] + "..." if len(content) > 100 else content
+            self.logger.log_file_operation(
+                "create",
+                filename,
+                details={"preview": content[:100] + "..." if len(content) > 100 else content}
             )
             
+            # Actualizar el índice de texto completo
+            await self._index_document(filename, content)
+            
             return FileResponse(
                 success=True,
                 message="Archivo guardado correctamente",
-                file_info=file_info
+                file_info=file_info,
+                etag=etag_for_stat(os.stat(file_path))
             )
             
         except Exception as e:
@@ -146,6 +246,499 @@ class FileSystemService:
                 error=str(e)
             )
     
+    async def save_artifact(self, filename: str, content: str) -> FileResponse:
+        """
+        Guarda un artefacto generado en el almacén deduplicado.
+        
+        El contenido se guarda una sola vez por hash SHA-256 y el nombre es
+        un enlace a ese blob, así que volver a guardar un contenido ya
+        existente no escribe datos. El archivo se lee, lista y modifica
+        como cualquier otro.
+        
+        Args:
+            filename: Nombre del archivo
+            content: Contenido generado
+            
+        Returns:
+            FileResponse con información del archivo y en message si el
+            contenido era nuevo, estaba deduplicado o no cambió
+        """
+        try:
+            encoded = content.encode('utf-8')
+            if len(encoded) > self.max_file_size:
+                raise ValueError(f"Archivo demasiado grande. Máximo: {self.max_file_size} bytes")
+            if not self._is_valid_filename(filename):
+                raise ValueError(f"Nombre de archivo inválido. Extensiones permitidas: {', '.join(self.allowed_extensions)}")
+            
+            async with _file_lock(self._get_file_path(filename)):
+                result = await asyncio.to_thread(get_artifact_store().put, filename, encoded)
+                # Sin cambios: ni datos ni metadatos que actualizar
+                if result["status"] != UNCHANGED:
+                    if self.layout.sharded:
+                        get_data_watcher().notify(CHANGED, filename)
+                    await self._index_document(filename, content)
+                
+                file_stat = os.stat(result["path"])
+                file_info = await asyncio.to_thread(self._file_info, filename, result["path"], file_stat)
+            self.logger.log_file_operation("artifact", filename, details={"hash": result["hash"], "status": result["status"]})
+            return FileResponse(
+                success=True,
+                message=f"Artefacto guardado ({result['status']})",
+                file_info=file_info,
+                etag=etag_for_stat(file_stat)
+            )
+            
+        except Exception as e:
+            LogManager.log_error("filesystem", str(e))
+            return FileResponse(
+                success=False,
+                message=f"Error al guardar artefacto: {str(e)}",
+                error=str(e)
+            )
+    
+    async def create_file(self, filename: str, content: str) -> FileResponse:
+        """
+        Crea un archivo nuevo.
+        
+        Args:
+            filename: Nombre del archivo
+            content: Contenido del archivo
+            
+        Returns:
+            FileResponse con información del archivo creado
+        """
+        file_path = self._get_file_path(filename)
+        async with _file_lock(file_path):
+            if os.path.exists(file_path):
+                return FileResponse(
+                    success=False,
+                    message=f"El archivo ya existe: {filename}",
+                    error="FILE_EXISTS"
+                )
+            return await self._save_file(content, filename)
+    
+    async def update_file(self, filename: str, content: str) -> FileResponse:
+        """
+        Reemplaza el contenido de un archivo existente.
+        
+        Args:
+            filename: Nombre del archivo
+            content: Nuevo contenido
+            
+        Returns:
+            FileResponse con información del archivo actualizado
+        """
+        file_path = self._get_file_path(filename)
+        async with _file_lock(file_path):
+            if not os.path.exists(file_path):
+                return FileResponse(
+                    success=False,
+                    message=f"Archivo no encontrado: {filename}",
+                    error="FILE_NOT_FOUND"
+                )
+            return await self._save_file(content, filename)
+    
+    def _file_info(self, filename: str, file_path: str, file_stat: os.stat_result) -> FileInfo:
+        with open(file_path, "rb") as f:
+            head = f.read(2048)
+            size = file_stat.st_size
+            if is_compressed(head):
+                with SeekableReader(f) as reader:
+                    head, size = reader.read(0, 2048), reader.size
+        return FileInfo(
+            filename=filename,
+            path=file_path,
+            size=size,
+            stored_size=file_stat.st_size,
+            created_at=datetime.fromtimestamp(file_stat.st_ctime),
+            modified_at=datetime.fromtimestamp(file_stat.st_mtime),
+            content_type=magic.from_buffer(head, mime=True),
+            extension=filename.rsplit('.', 1)[1].lower()
+        )
+    
+    def _load_document(self, file_path: str) -> Tuple[bytes, os.stat_result, bool]:
+        """
+        Lee el contenido lógico de un archivo, comprimido o no.
+        
+        El contenido descomprimido se guarda en una caché LRU compartida
+        (DATA_DECOMPRESSION_CACHE_SIZE) con clave (ruta, inode, mtime,
+        tamaño), de modo que los archivos consultados a menudo no se
+        descomprimen en cada lectura.
+        
+        Returns:
+            Tupla (contenido, stat del archivo leído, si estaba comprimido)
+        """
+        with open(file_path, "rb") as f:
+            file_stat = os.fstat(f.fileno())
+            head = f.read(4)
+            if not is_compressed(head):
+                return head + f.read(), file_stat, False
+            
+            cache = get_decompression_cache()
+            key = (file_path, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+            data = cache.get(key)
+            if data is None:
+                with SeekableReader(f) as reader:
+                    data = reader.read()
+                cache.put(key, data)
+            return data, file_stat, True
+    
+    def _write_document(self, file_path: str, data: bytes) -> None:
+        """
+        Escribe un documento de forma atómica, comprimido si compensa.
+        
+        Con DATA_COMPRESSION=zstd los documentos de al menos
+        DATA_COMPRESSION_MIN_SIZE bytes se guardan en formato zstd seekable
+        (frames independientes de DATA_COMPRESSION_FRAME_SIZE bytes y tabla
+        de saltos), salvo que no reduzcan tamaño.
+        """
+        write_atomic(file_path, encode_document(data) if self.compression else data)
+    
+    def _detach_artifact(self, filename: str, file_path: str, copy: bool = True) -> None:
+        """
+        Libera un artefacto deduplicado antes de modificarlo o borrarlo.
+        
+        Los archivos con más de un enlace comparten blob con otros
+        nombres (ver app.services.artifact_store): se quitan del índice de
+        artefactos y, si se van a modificar, se sustituyen por una copia.
+        """
+        try:
+            if os.stat(file_path).st_nlink <= 1:
+                return
+        except FileNotFoundError:
+            return
+        get_artifact_store().release(filename)
+        if copy:
+            detach(file_path)
+    
+    def _apply_patch(self, file_path: str, patch: FilePatchRequest) -> int:
+        with open(file_path, "rb") as f:
+            compressed = is_compressed(f.read(4))
+        
+        if patch.type == "append":
+            if patch.content is None:
+                raise FilePatchError("append requiere content")
+            if not compressed:
+                return append_to_file(file_path, patch.content.encode("utf-8"), self.max_file_size)
+        
+        original = self._load_document(file_path)[0] if compressed or patch.type == "diff" else None
+        if patch.type == "append":
+            edits = [(len(original), len(original), patch.content.encode("utf-8"))]
+        elif patch.type == "replace":
+            if patch.offset is None or patch.content is None:
+                raise FilePatchError("replace requiere offset y content")
+            start = patch.offset
+            edits = [(start, start + (patch.length or 0), patch.content.encode("utf-8"))]
+        else:
+            if not patch.diff:
+                raise FilePatchError("diff requiere un diff unificado")
+            edits = diff_to_edits(original, patch.diff)
+        
+        if not compressed:
+            return rewrite_file(file_path, edits, self.max_file_size)
+        # Los archivos comprimidos se editan en memoria y se recomprimen
+        updated = apply_edits(original, edits, self.max_file_size)
+        self._write_document(file_path, updated)
+        return len(updated)
+    
+    async def patch_file(
+        self,
+        filename: str,
+        patch: FilePatchRequest,
+        if_match: Optional[str] = None
+    ) -> FileResponse:
+        """
+        Modifica parcialmente un archivo existente.
+        
+        El cliente envía solo el cambio: un diff unificado, la sustitución de
+        un rango de bytes o un texto a añadir al final. Los diff y rangos se
+        aplican sobre un temporal que copia en el kernel los tramos sin
+        cambios y sustituye el archivo con un rename atómico; los append se
+        escriben con O_APPEND sin reescribir el archivo.
+        
+        Args:
+            filename: Nombre del archivo
+            patch: Parche a aplicar
+            if_match: ETag que debe tener el archivo (concurrencia optimista);
+                si se omite se usa patch.if_match
+            
+        Returns:
+            FileResponse con la información y el nuevo ETag del archivo; en
+            caso de fallo error es FILE_NOT_FOUND, PRECONDITION_FAILED o
+            INVALID_PATCH
+        """
+        if_match = if_match or patch.if_match
+        try:
+            file_path = self._get_file_path(filename)
+        except ValueError as e:
+            return FileResponse(success=False, message=str(e), error="INVALID_FILENAME")
+        
+        async with _file_lock(file_path):
+            try:
+                _, current = self.stat_file(filename)
+            except FileNotFoundError as e:
+                return FileResponse(success=False, message=str(e), error="FILE_NOT_FOUND")
+            
+            current_etag = etag_for_stat(current)
+            if if_match and not etag_matches(if_match, current_etag, weak=False):
+                return FileResponse(
+                    success=False,
+                    message=f"El archivo cambió: ETag actual {current_etag}",
+                    error="PRECONDITION_FAILED",
+                    etag=current_etag
+                )
+            
+            try:
+                await asyncio.to_thread(self._detach_artifact, filename, file_path)
+                await asyncio.to_thread(self._apply_patch, file_path, patch)
+            except FilePatchError as e:
+                return FileResponse(success=False, message=str(e), error="INVALID_PATCH", etag=current_etag)
+            new_stat = os.stat(file_path)
+            # Bajo el lock para que la información corresponda a new_stat; en
+            # un hilo porque puede descomprimir el inicio del archivo
+            file_info = await asyncio.to_thread(self._file_info, filename, file_path, new_stat)
+        
+        self.logger.log_file_operation("patch", filename, details={"type": patch.type, "size": new_stat.st_size})
+        await self._track_change(filename)
+        await self._index_document(filename)
+        
+        return FileResponse(
+            success=True,
+            message="Archivo modificado correctamente",
+            file_info=file_info,
+            etag=etag_for_stat(new_stat)
+        )
+    
+    async def _track_change(self, filename: str, deleted: bool = False) -> None:
+        """
+        Actualiza el manifiesto y el feed de cambios tras una escritura.
+        
+        Solo hace falta con la disposición fragmentada: en la plana el
+        watcher ve los cambios directamente en el directorio.
+        """
+        if not self.layout.sharded:
+            return
+        await asyncio.to_thread(self.layout.forget if deleted else self.layout.record, filename)
+        get_data_watcher().notify(DELETED if deleted else CHANGED, filename)
+    
+    async def _index_document(self, filename: str, content: Optional[str] = None) -> None:
+        try:
+            await asyncio.to_thread(self.search_index.index_file, filename, content)
+        except Exception as e:
+            LogManager.log_error("filesystem", f"Error al indexar {filename}: {str(e)}")
+    
+    async def _remove_document(self, filename: str) -> None:
+        try:
+            await asyncio.to_thread(self.search_index.remove_file, filename)
+        except Exception as e:
+            LogManager.log_error("filesystem", f"Error al desindexar {filename}: {str(e)}")
+    
+    async def search_files(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        match_all: bool = False
+    ) -> FileSearchResponse:
+        """
+        Busca texto en los documentos del directorio de datos.
+        
+        Args:
+            query: Consulta en lenguaje natural (español o inglés)
+            limit: Máximo de resultados
+            offset: Resultados a saltar
+            match_all: Exigir todos los términos de la consulta
+            
+        Returns:
+            FileSearchResponse con los documentos ordenados por relevancia (BM25)
+        """
+        limit = max(1, min(limit, settings.FILE_LIST_MAX_LIMIT))
+        hits, total = await asyncio.to_thread(
+            self.search_index.search,
+            query,
+            limit=limit,
+            offset=max(0, offset),
+            match_all=match_all
+        )
+        return FileSearchResponse(
+            query=query,
+            results=[FileSearchHit(**hit) for hit in hits],
+            total=total,
+            offset=offset,
+            limit=limit
+        )
+    
+    async def iter_bulk(
+        self,
+        operations: List[BulkFileOperation],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[BulkFileResult]:
+        """
+        Ejecuta operaciones de archivo en paralelo y las devuelve según terminan.
+        
+        Las operaciones sobre un mismo archivo se ejecutan en el orden de la
+        petición; las de archivos distintos, en paralelo bajo un semáforo de
+        E/S. El fallo de una operación no detiene las demás. Si el consumidor
+        deja de iterar, las operaciones pendientes se cancelan.
+        
+        Args:
+            operations: Operaciones a ejecutar
+            concurrency: Operaciones simultáneas (máximo FILE_BULK_CONCURRENCY)
+            
+        Yields:
+            BulkFileResult de cada operación
+            
+        Raises:
+            ValueError: Si no hay operaciones o se supera FILE_BULK_MAX_OPERATIONS
+        """
+        if not operations:
+            raise ValueError("Se requiere al menos una operación")
+        if len(operations) > settings.FILE_BULK_MAX_OPERATIONS:
+            raise ValueError(f"Máximo {settings.FILE_BULK_MAX_OPERATIONS} operaciones por lote")
+        
+        semaphore = asyncio.Semaphore(min(concurrency or settings.FILE_BULK_CONCURRENCY, settings.FILE_BULK_CONCURRENCY))
+        results: asyncio.Queue = asyncio.Queue()
+        
+        # Agrupar por archivo para conservar el orden entre operaciones del mismo archivo
+        groups: Dict[str, List[Tuple[int, BulkFileOperation]]] = {}
+        for index, op in enumerate(operations):
+            groups.setdefault(op.filename, []).append((index, op))
+        
+        async def run_group(group: List[Tuple[int, BulkFileOperation]]) -> None:
+            for index, op in group:
+                async with semaphore:
+                    results.put_nowait(await self._run_bulk_operation(index, op))
+        
+        tasks = [asyncio.ensure_future(run_group(group)) for group in groups.values()]
+        try:
+            for _ in range(len(operations)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_bulk_operation(self, index: int, op: BulkFileOperation) -> BulkFileResult:
+        try:
+            if op.operation == "create":
+                response = await self.create_file(op.filename, op.content or "")
+            elif op.operation == "read":
+                response = await self.read_file(op.filename)
+            elif op.operation == "update":
+                response = await self.update_file(op.filename, op.content or "")
+            elif op.operation == "delete":
+                response = await self.delete_file(op.filename)
+            else:
+                raise ValueError(f"Operación no válida: {op.operation}")
+        except Exception as e:
+            response = FileResponse(success=False, message=str(e), error=str(e))
+        
+        return BulkFileResult(
+            index=index,
+            operation=op.operation,
+            filename=op.filename,
+            success=response.success,
+            message=response.message,
+            file_info=response.file_info,
+            content=response.content,
+            error=response.error
+        )
+    
+    async def bulk(
+        self,
+        operations: List[BulkFileOperation],
+        concurrency: Optional[int] = None
+    ) -> BulkFileResponse:
+        """
+        Ejecuta operaciones de archivo en lote y espera a todas.
+        
+        Args:
+            operations: Operaciones a ejecutar
+            concurrency: Operaciones simultáneas
+            
+        Returns:
+            BulkFileResponse con los resultados en el orden de la petición
+            
+        Raises:
+            ValueError: Si no hay operaciones o se supera FILE_BULK_MAX_OPERATIONS
+        """
+        results = [result async for result in self.iter_bulk(operations, concurrency)]
+        results.sort(key=lambda r: r.index)
+        succeeded = sum(1 for r in results if r.success)
+        return BulkFileResponse(
+            results=results,
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded
+        )
+    
+    async def save_upload(self, stream: AsyncIterator[bytes], content_type: str) -> List[UploadedFile]:
+        """
+        Guarda en UPLOAD_DIR los archivos de un cuerpo multipart a medida que llega.
+        
+        Cada bloque se escribe directamente en un temporal, calculando el
+        hash y comprobando MAX_FILE_SIZE sobre la marcha; al terminar la
+        parte el archivo se mueve atómicamente a su destino. Si algo falla
+        se borran los temporales y no queda ningún archivo a medias.
+        
+        Args:
+            stream: Iterador asíncrono del cuerpo de la petición
+            content_type: Cabecera Content-Type de la petición
+            
+        Returns:
+            Lista de UploadedFile con los archivos guardados
+            
+        Raises:
+            UploadTooLargeError: Si un archivo supera MAX_FILE_SIZE
+            MultipartFormatError: Si el cuerpo no es multipart válido
+            ValueError: Si un nombre de archivo es inválido o no hay archivos
+        """
+        upload_dir = str(settings.UPLOAD_DIR)
+        uploaded: List[UploadedFile] = []
+        writer: Optional[StreamingUploadWriter] = None
+        filename: Optional[str] = None
+        
+        try:
+            async for event, headers, data in iter_multipart(stream, content_type):
+                if event == "begin":
+                    _, filename = part_filename(headers)
+                    if filename is None:
+                        continue
+                    if not self._is_valid_filename(filename):
+                        raise ValueError(
+                            f"Nombre de archivo inválido: {filename}. "
+                            f"Extensiones permitidas: {', '.join(self.allowed_extensions)}"
+                        )
+                    writer = await asyncio.to_thread(StreamingUploadWriter, upload_dir, self.max_file_size)
+                elif event == "data" and writer is not None:
+                    await asyncio.to_thread(writer.write, data)
+                elif event == "end" and writer is not None:
+                    destination = os.path.join(upload_dir, filename)
+                    result = await asyncio.to_thread(writer.commit, destination)
+                    writer = None
+                    now = datetime.now()
+                    uploaded.append(UploadedFile(
+                        filename=filename,
+                        path=result.path,
+                        size=result.size,
+                        created_at=now,
+                        modified_at=now,
+                        content_type=result.content_type,
+                        extension=filename.rsplit('.', 1)[1].lower(),
+                        sha256=result.sha256
+                    ))
+                    self.logger.log_file_operation(
+                        "upload",
+                        filename,
+                        details={"size": result.size, "sha256": result.sha256}
+                    )
+        finally:
+            if writer is not None:
+                await asyncio.to_thread(writer.abort)
+        
+        if not uploaded:
+            raise ValueError("La petición no contiene archivos")
+        return uploaded
+    
     async def read_file(self, filename: str) -> FileResponse:
         """
         Lee un archivo del sistema.
@@ -166,32 +759,31 @@ class FileSystemService:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Archivo no encontrado: {filename}")
             
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            # El stat se toma del archivo abierto: el ETag corresponde al contenido leído
+            data, file_stat, compressed = await asyncio.to_thread(self._load_document, file_path)
+            content = _decode_text(data)
             
             # Obtener información del archivo
             file_info = FileInfo(
                 filename=filename,
                 path=file_path,
                 size=len(content),
-                created_at=datetime.fromtimestamp(os.path.getctime(file_path)).isoformat(),
-                modified_at=datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-                content_type=magic.from_file(file_path, mime=True),
+                stored_size=file_stat.st_size,
+                created_at=datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
+                modified_at=datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+                content_type=magic.from_buffer(data[:2048], mime=True) if compressed else magic.from_file(file_path, mime=True),
                 extension=filename.rsplit('.', 1)[1].lower()
             )
             
             # Registrar operación
-            await self.logger.log_file_operation(
-                operation="read",
-                filename=filename,
-                content=content[:100] + "..." if len(content) > 100 else content
-            )
+            self.logger.log_file_operation("read", filename)
             
             return FileResponse(
                 success=True,
                 message="Archivo leído correctamente",
                 file_info=file_info,
-                content=content
+                content=content,
+                etag=etag_for_stat(file_stat)
             )
             
         except Exception as e:
@@ -202,27 +794,154 @@ class FileSystemService:
                 error=str(e)
             )
     
-    async def list_files(self) -> List[FileInfo]:
+    def stat_file(self, filename: str) -> Tuple[str, os.stat_result]:
+        """
+        Obtiene la ruta y los metadatos de un archivo existente.
+        
+        Args:
+            filename: Nombre del archivo
+            
+        Returns:
+            Tupla (ruta, stat) del archivo
+            
+        Raises:
+            ValueError: Si el nombre del archivo es inválido
+            FileNotFoundError: Si el archivo no existe
+        """
+        file_path = self._get_file_path(filename)
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Archivo no encontrado: {filename}")
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise FileNotFoundError(f"Archivo no encontrado: {filename}")
+        return file_path, file_stat
+    
+    def stream_file(self, filename: str, download: bool = False) -> RangeFileResponse:
         """
-        Lista todos los archivos en el directorio de datos.
+        Prepara la respuesta que sirve un archivo en crudo.
+        
+        El contenido se envía tal cual, sin decodificarlo ni envolverlo en
+        JSON, por bloques o sin copia si el servidor lo admite, y con
+        soporte de peticiones Range.
         
+        Args:
+            filename: Nombre del archivo
+            download: Si se sirve como adjunto en lugar de en línea
+            
         Returns:
-            Lista de FileInfo con metadatos de los archivos
+            RangeFileResponse del archivo
+            
+        Raises:
+            ValueError: Si el nombre del archivo es inválido
+            FileNotFoundError: Si el archivo no existe
         """
-        files = []
-        for filename in os.listdir(self.data_dir):
-            if self._is_allowed_extension(filename):
-                file_path = self._get_file_path(filename)
-                files.append(FileInfo(
+        file_path, file_stat = self.stat_file(filename)
+        with open(file_path, "rb") as f:
+            if is_compressed(f.read(4)):
+                # Se descomprimen solo los frames que cubren el rango pedido
+                with SeekableReader(f) as reader:
+                    size = reader.size
+                return CompressedRangeResponse(
+                    file_path,
+                    stat_result=file_stat,
+                    size=size,
+                    chunk_size=settings.FILE_STREAM_CHUNK_SIZE,
                     filename=filename,
-                    path=file_path,
-                    size=os.path.getsize(file_path),
-                    created_at=datetime.fromtimestamp(os.path.getctime(file_path)).isoformat(),
-                    modified_at=datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-                    content_type=magic.from_file(file_path, mime=True),
-                    extension=filename.rsplit('.', 1)[1].lower()
-                ))
-        return files
+                    content_disposition_type="attachment" if download else "inline"
+                )
+        return RangeFileResponse(
+            file_path,
+            stat_result=file_stat,
+            chunk_size=settings.FILE_STREAM_CHUNK_SIZE,
+            filename=filename,
+            content_disposition_type="attachment" if download else "inline"
+        )
+    
+    async def get_file_chunks(self, filename: str) -> List[TextChunk]:
+        """
+        Divide un archivo en fragmentos definidos por su contenido.
+        
+        Los límites dependen solo del texto cercano, por lo que una edición
+        local solo altera los fragmentos que la contienen.
+        
+        Args:
+            filename: Nombre del archivo
+            
+        Returns:
+            Lista de TextChunk en orden de aparición
+            
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+        """
+        file_path = self._get_file_path(filename)
+        
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Archivo no encontrado: {filename}")
+        
+        data, _, _ = await asyncio.to_thread(self._load_document, file_path)
+        content = _decode_text(data)
+        
+        return chunk_text(
+            content,
+            min_size=settings.CHUNK_MIN_SIZE,
+            avg_size=settings.CHUNK_AVG_SIZE,
+            max_size=settings.CHUNK_MAX_SIZE
+        )
+    
+    async def list_files(
+        self,
+        pattern: Optional[str] = None,
+        extension: Optional[str] = None,
+        content_type: Optional[str] = None,
+        sort_by: str = "filename",
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> FileListResponse:
+        """
+        Lista los archivos del directorio de datos.
+        
+        Los metadatos salen del índice compartido del directorio, que solo
+        vuelve a leer los archivos nuevos o modificados.
+        
+        Args:
+            pattern: Patrón tipo glob sobre el nombre
+            extension: Extensión exacta
+            content_type: Prefijo del tipo MIME
+            sort_by: Campo de orden (filename, size, created_at, modified_at, content_type)
+            descending: Orden descendente
+            offset: Número de archivos a saltar
+            limit: Máximo de archivos a devolver (por defecto FILE_LIST_DEFAULT_LIMIT)
+            
+        Returns:
+            FileListResponse con la página de archivos y el total filtrado
+            
+        Raises:
+            ValueError: Si el campo de orden o la paginación no son válidos
+        """
+        if offset < 0:
+            raise ValueError("offset no puede ser negativo")
+        limit = settings.FILE_LIST_DEFAULT_LIMIT if limit is None else limit
+        limit = max(1, min(limit, settings.FILE_LIST_MAX_LIMIT))
+        
+        entries, total = await asyncio.to_thread(
+            self.index.query,
+            pattern=pattern,
+            extension=extension,
+            content_type=content_type,
+            sort_by=sort_by,
+            descending=descending,
+            offset=offset,
+            limit=limit
+        )
+        return FileListResponse(
+            files=[FileInfo(**entry) for entry in entries],
+            total=total,
+            path=str(self.data_dir),
+            offset=offset,
+            limit=limit
+        )
     
     async def delete_file(self, filename: str) -> FileResponse:
         """
@@ -241,28 +960,24 @@ class FileSystemService:
         try:
             file_path = self._get_file_path(filename)
             
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Archivo no encontrado: {filename}")
-            
-            # Obtener información del archivo antes de eliminarlo
-            file_info = FileInfo(
-                filename=filename,
-                path=file_path,
-                size=os.path.getsize(file_path),
-                created_at=datetime.fromtimestamp(os.path.getctime(file_path)).isoformat(),
-                modified_at=datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-                content_type=magic.from_file(file_path, mime=True),
-                extension=filename.rsplit('.', 1)[1].lower()
-            )
-            
-            # Eliminar archivo
-            os.remove(file_path)
-            
-            # Registrar operación
-            await self.logger.log_file_operation(
-                operation="delete",
-                filename=filename
-            )
+            async with _file_lock(file_path):
+                if not os.path.exists(file_path):
+                    raise FileNotFoundError(f"Archivo no encontrado: {filename}")
+                
+                # Obtener información del archivo antes de eliminarlo (tamaño y
+                # tipo del contenido lógico aunque esté comprimido)
+                file_info = await asyncio.to_thread(self._file_info, filename, file_path, os.stat(file_path))
+                
+                # Eliminar archivo
+                self._detach_artifact(filename, file_path, copy=False)
+                os.remove(file_path)
+                await self._track_change(filename, deleted=True)
+                
+                # Registrar operación
+                self.logger.log_file_operation("delete", filename)
+                
+                # Actualizar el índice de texto completo
+                await self._remove_document(filename)
             
             return FileResponse(
                 success=True,
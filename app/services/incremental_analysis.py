@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.cache import get_cache
+from app.services.filesystem_service import FileSystemService
+from app.services.claude_service import get_claude_service
+from app.utils.chunking import TextChunk
+
+class IncrementalAnalysisService:
+    """
+    Servicio de análisis incremental de archivos.
+
+    Cada archivo se divide en fragmentos definidos por su contenido y el
+    análisis de cada fragmento se guarda en caché por su hash. Al reanalizar
+    un archivo solo se envían a Claude los fragmentos nuevos o modificados.
+    """
+    def __init__(self):
+        self.logger = LogManager.get_logger("incremental_analysis")
+        self.filesystem_service = FileSystemService()
+        self.claude_service = get_claude_service()
+        self._cache = get_cache()
+        self._cache_ttl = settings.CHUNK_ANALYSIS_CACHE_TTL
+        self._semaphore = asyncio.Semaphore(settings.CHUNK_ANALYSIS_CONCURRENCY)
+
+    @staticmethod
+    def _chunk_cache_key(analysis_type: str, digest: str) -> str:
+        return f"analysis:chunk:{analysis_type}:{digest}"
+
+    async def _analyze_chunk(self, chunk: TextChunk, analysis_type: str) -> Dict[str, Any]:
+        """
+        Analiza un único fragmento con Claude respetando el límite de concurrencia
+        """
+        async with self._semaphore:
+            analysis = await self.claude_service.analyze_text(chunk.text, analysis_type)
+        return analysis.dict()
+
+    async def analyze_file(self, filename: str, analysis_type: str = "summary") -> Dict[str, Any]:
+        """
+        Analiza un archivo reutilizando los resultados de fragmentos sin cambios
+
+        Args:
+            filename: Nombre del archivo en DATA_DIR
+            analysis_type: Tipo de análisis a realizar
+
+        Returns:
+            Dict con el análisis combinado y estadísticas de reutilización
+        """
+        start_time = time.time()
+
+        try:
+            chunks = await self.filesystem_service.get_file_chunks(filename)
+
+            # Buscar resultados previos por hash de fragmento
+            keys = {c.digest: self._chunk_cache_key(analysis_type, c.digest) for c in chunks}
+            cached = self._cache.get_many(list(keys.values()))
+            results: Dict[str, Dict[str, Any]] = {
+                digest: cached[key] for digest, key in keys.items() if key in cached
+            }
+
+            # Analizar solo fragmentos nuevos (un mismo hash se analiza una vez)
+            pending = {c.digest: c for c in chunks if c.digest not in results}
+            if pending:
+                analyses = await asyncio.gather(*[
+                    self._analyze_chunk(chunk, analysis_type) for chunk in pending.values()
+                ])
+                fresh = dict(zip(pending.keys(), analyses))
+                results.update(fresh)
+                self._cache.set_many(
+                    {keys[digest]: value for digest, value in fresh.items()},
+                    ttl=self._cache_ttl
+                )
+
+            ordered = [results[c.digest] for c in chunks]
+            merged = self._merge_analyses(ordered)
+
+            self.logger.info(
+                f"Análisis incremental de {filename}: {len(pending)}/{len(chunks)} "
+                f"fragmentos enviados a Claude"
+            )
+
+            return {
+                "filename": filename,
+                "analysis_type": analysis_type,
+                "analysis": merged,
+                "chunks_total": len(chunks),
+                "chunks_analyzed": len(pending),
+                "chunks_cached": len(chunks) - len(pending),
+                "execution_time": time.time() - start_time
+            }
+
+        except Exception as e:
+            LogManager.log_error("incremental_analysis", str(e))
+            raise
+
+    @staticmethod
+    def _merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combina localmente los análisis por fragmento en orden de documento
+
+        Args:
+            analyses: Análisis de cada fragmento, en orden
+
+        Returns:
+            Dict con la forma de ClaudeAnalysis
+        """
+        def _unique(field: str) -> List[str]:
+            seen: Dict[str, None] = {}
+            for analysis in analyses:
+                for item in analysis.get(field, []):
+                    seen.setdefault(item, None)
+            return list(seen)
+
+        sentiments = Counter(a.get("sentiment", "neutral") for a in analyses)
+
+        return {
+            "summary": "\n\n".join(a["summary"] for a in analyses if a.get("summary")),
+            "key_points": _unique("key_points"),
+            "sentiment": sentiments.most_common(1)[0][0] if sentiments else "neutral",
+            "topics": _unique("topics"),
+            "suggestions": _unique("suggestions")
+        }
+
+# Instancia global del servicio de análisis incremental
+@lru_cache()
+def get_incremental_analysis_service() -> IncrementalAnalysisService:
+    """
+    Obtiene una instancia global del servicio de análisis incremental
+
+    Returns:
+        IncrementalAnalysisService: Instancia del servicio
+    """
+    return IncrementalAnalysisService()
@@ -0,0 +1,187 @@
+import json
+import asyncio
+from typing import Any, Callable, Dict, Optional
+from app.core.mcp_config import mcp_config, mcp_tools, tool_input_schema
+from app.schemas.mcp import MCPRequest
+from app.utils.progress import progress_listener
+
+PROTOCOL_VERSION = "2024-11-05"
+RESOURCE_URI_PREFIX = "mcp-claude://resources/"
+
+# Códigos de error de JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class JSONRPCError(Exception):
+    """Error que se devuelve al cliente como respuesta JSON-RPC"""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+def notification(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye una notificación JSON-RPC
+    """
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+class MCPProtocol:
+    """
+    Métodos del protocolo MCP (initialize, tools/*, resources/*) sobre
+    MCPService, comunes a todos los transportes nativos (stdio, SSE).
+
+    Las herramientas que informan de su avance (ver app.utils.progress)
+    generan notificaciones `notifications/progress` y
+    `notifications/partial_result` con el progressToken de la petición;
+    el transporte decide cómo enviarlas con el callback `notify`.
+    """
+    def __init__(self, service: Optional[Any] = None):
+        self._service = service
+        self._tools: Optional[list] = None
+        self._handlers: Dict[str, Callable] = {
+            "initialize": self._initialize,
+            "ping": self._ping,
+            "tools/list": self._list_tools,
+            "tools/call": self._call_tool,
+            "resources/list": self._list_resources,
+            "resources/read": self._read_resource
+        }
+
+    @property
+    def service(self):
+        """MCPService compartido, creado en la primera llamada que lo necesita"""
+        if self._service is None:
+            # Importación diferida: initialize y tools/list responden sin
+            # esperar a cargar los clientes de Claude, Brave y Redis
+            from app.services.mcp_service import MCPService
+            self._service = MCPService()
+        return self._service
+
+    @property
+    def started(self) -> bool:
+        """Si ya se creó MCPService"""
+        return self._service is not None
+
+    def supports(self, method: str) -> bool:
+        """
+        Indica si el método está implementado
+        """
+        return method in self._handlers
+
+    async def handle(
+        self,
+        method: str,
+        params: Dict[str, Any],
+        notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+        progress_token: Any = None
+    ) -> Any:
+        """
+        Ejecuta un método del protocolo
+
+        Args:
+            method: Método JSON-RPC
+            params: Parámetros de la petición
+            notify: Callback para las notificaciones de progreso
+            progress_token: Token por defecto si la petición no trae
+                _meta.progressToken (sin token no se notifica)
+
+        Returns:
+            Resultado JSON-RPC
+
+        Raises:
+            JSONRPCError: Si el método no existe o los parámetros no son válidos
+        """
+        handler = self._handlers.get(method)
+        if handler is None:
+            raise JSONRPCError(METHOD_NOT_FOUND, f"Método no soportado: {method}")
+
+        token = (params.get("_meta") or {}).get("progressToken", progress_token)
+        if notify is None or token is None:
+            return await handler(params)
+
+        def forward(event: Dict[str, Any]) -> None:
+            if event["type"] == "progress":
+                payload = {"progressToken": token, "progress": event["progress"]}
+                for key in ("total", "message"):
+                    if event[key] is not None:
+                        payload[key] = event[key]
+                notify(notification("notifications/progress", payload))
+            else:
+                notify(notification("notifications/partial_result", {"progressToken": token, "data": event["data"]}))
+
+        with progress_listener(forward):
+            return await handler(params)
+
+    async def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "protocolVersion": params.get("protocolVersion") or PROTOCOL_VERSION,
+            "capabilities": {"tools": {"listChanged": False}, "resources": {"listChanged": False}},
+            "serverInfo": {"name": "mcp-claude", "version": "1.1.0"}
+        }
+
+    async def _ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    async def _list_tools(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self._tools is None:
+            self._tools = [
+                {"name": config.name, "description": config.description, "inputSchema": tool_input_schema(config)}
+                for config in mcp_tools.values()
+            ]
+        return {"tools": self._tools}
+
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get("name")
+        if not name:
+            raise JSONRPCError(INVALID_PARAMS, "El parámetro 'name' es requerido")
+        if name not in mcp_tools:
+            raise JSONRPCError(INVALID_PARAMS, f"Herramienta no encontrada: {name}")
+
+        try:
+            response = await asyncio.wait_for(
+                self.service.process_request(MCPRequest(
+                    method="execute",
+                    params={"tool": name, "params": params.get("arguments") or {}}
+                )),
+                timeout=mcp_tools[name].timeout or mcp_config.timeout
+            )
+        except asyncio.TimeoutError:
+            return {"content": [{"type": "text", "text": f"Tiempo de espera agotado ejecutando {name}"}], "isError": True}
+
+        # Los errores de la herramienta se devuelven como resultado para que el modelo los vea
+        if response.error:
+            return {"content": [{"type": "text", "text": response.error.message}], "isError": True}
+        text = response.result if isinstance(response.result, str) else json.dumps(response.result, ensure_ascii=False, default=str)
+        return {"content": [{"type": "text", "text": text}], "isError": False}
+
+    async def _list_resources(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.service.resources_service.list_resources()
+        return {
+            "resources": [
+                {
+                    "uri": RESOURCE_URI_PREFIX + resource.name,
+                    "name": resource.name,
+                    "description": resource.description,
+                    "mimeType": "application/json"
+                }
+                for resource in response.resources
+            ]
+        }
+
+    async def _read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = params.get("uri") or ""
+        if not uri.startswith(RESOURCE_URI_PREFIX):
+            raise JSONRPCError(INVALID_PARAMS, f"URI de recurso no válida: {uri}")
+        resource = await self.service.resources_service.get_resource(uri[len(RESOURCE_URI_PREFIX):])
+        if resource is None:
+            raise JSONRPCError(INVALID_PARAMS, f"Recurso no encontrado: {uri}")
+        return {
+            "contents": [{
+                "uri": uri,
+                "mimeType": "application/json",
+                "text": json.dumps(resource.dict(), ensure_ascii=False, default=str)
+            }]
+        }
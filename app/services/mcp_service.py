@@ -3,6 +3,7 @@ import time
 import json
 from datetime import datetime, timedelta
 import logging
+from pydantic import BaseModel
 
 from app.core.mcp_config import (
     mcp_config, mcp_resources, mcp_tools, 
@@ -12,9 +13,12 @@ from app.schemas.mcp import (
     MCPRequest, MCPResponse, MCPError, MCPStatus, 
     MCPOperation, MCPExecuteRequest, MCPExecuteResponse, MCPMethod
 )
+from app.schemas.filesystem import BulkFileOperation
 from app.services.resources_service import ResourcesService
 from app.services.filesystem_service import FileSystemService
+from app.services.data_watcher import get_data_watcher
 from app.services.claude_service import ClaudeService
+from app.services.brave_search import get_brave_search
 from app.services.cache import CacheService
 from app.core.logging import LogManager
 from app.core.cache import cache
@@ -50,85 +54,23 @@ class MCPService:
         cached_status = cache.get(cache_key)
         
         if cached_status:
-            LogManager.log_info("mcp", "Estado MCP obtenido del caché")
+            logger.info("Estado MCP obtenido del caché")
             return MCPStatus(**cached_status)
         
-        # Si no está en caché, crear nuevo estado
+        # Si no está en caché, crear nuevo estado a partir de los registros
+        # de recursos y herramientas
         status = MCPStatus(
             version=MCPVersion.V1_1,
             features=["resources", "tools", "filesystem", "cache", "logging", "prompts"],
             resource_types=["filesystem", "claude", "search", "cache"],
             access_levels=["read", "write", "admin"],
-            resources={
-                "filesystem": {
-                    "type": "filesystem",
-                    "operations": ["create", "read", "update", "delete", "list"],
-                    "access_level": "write"
-                },
-                "claude": {
-                    "type": "claude",
-                    "operations": ["completion", "analyze", "generate"],
-                    "access_level": "read"
-                },
-                "search": {
-                    "type": "search",
-                    "operations": ["execute", "analyze"],
-                    "access_level": "read"
-                },
-                "cache": {
-                    "type": "cache",
-                    "operations": ["get", "set", "delete", "clear"],
-                    "access_level": "write"
-                }
-            },
-            tools={
-                "buscar_en_brave": {
-                    "name": "buscar_en_brave",
-                    "description": "Realiza una búsqueda web usando Brave Search",
-                    "parameters": {
-                        "query": {"type": "string", "description": "Consulta de búsqueda", "required": True},
-                        "num_results": {"type": "integer", "description": "Número de resultados", "required": False, "default": 5},
-                        "analysis": {"type": "boolean", "description": "Analizar resultados", "required": False, "default": False}
-                    },
-                    "required_resources": ["search"],
-                    "cache_enabled": True,
-                    "cache_ttl": 3600,
-                    "rate_limit": 10,
-                    "timeout": 30
-                },
-                "generar_markdown": {
-                    "name": "generar_markdown",
-                    "description": "Genera contenido en formato Markdown",
-                    "parameters": {
-                        "content": {"type": "string", "description": "Contenido a formatear", "required": True},
-                        "format": {"type": "string", "description": "Tipo de formato", "required": False, "default": "basic"},
-                        "save": {"type": "boolean", "description": "Guardar archivo", "required": False, "default": False},
-                        "filename": {"type": "string", "description": "Nombre del archivo", "required": False}
-                    },
-                    "required_resources": ["filesystem"],
-                    "cache_enabled": False,
-                    "rate_limit": 20,
-                    "timeout": 15
-                },
-                "analizar_texto": {
-                    "name": "analizar_texto",
-                    "description": "Analiza texto usando Claude",
-                    "parameters": {
-                        "text": {"type": "string", "description": "Texto a analizar", "required": True},
-                        "analysis_type": {"type": "string", "description": "Tipo de análisis", "required": False, "default": "general"}
-                    },
-                    "required_resources": ["claude"],
-                    "cache_enabled": True,
-                    "cache_ttl": 86400,
-                    "rate_limit": 5,
-                    "timeout": 60
-                }
-            },
+            resources={name: config.dict() for name, config in mcp_resources.items()},
+            tools={name: config.dict() for name, config in mcp_tools.items()},
             timestamp=datetime.now().isoformat()
         )
         
         # Guardar en caché por 5 minutos
-        cache.set(cache_key, status.dict(), expire=300)
+        cache.set(cache_key, status.dict(), ttl=300)
         
         return status
     
@@ -189,7 +131,8 @@ class MCPService:
         if not request.method:
             return MCPError(code=400, message="El campo 'method' es requerido")
         
-        if not request.params:
+        # status y list_resources no necesitan parámetros: basta con {}
+        if request.params is None:
             return MCPError(code=400, message="El campo 'params' es requerido")
         
         # Verificar tamaño de la solicitud
@@ -236,7 +179,10 @@ class MCPService:
         try:
             result = None
             
-            if request.method == "list_resources":
+            if request.method == "status":
+                result = await self.get_status()
+            
+            elif request.method == "list_resources":
                 result = await self.resources_service.list_resources()
             
             elif request.method == "access":
@@ -266,8 +212,11 @@ class MCPService:
             else:
                 raise ValueError(f"Método no soportado: {request.method}")
             
+            if isinstance(result, BaseModel):
+                result = result.dict()
+            
             # Verificar tamaño de la respuesta
-            response_size = len(json.dumps(result).encode())
+            response_size = len(json.dumps(result, default=str).encode())
             if response_size > mcp_config.max_response_size:
                 raise ValueError(
                     f"La respuesta excede el tamaño máximo permitido de {mcp_config.max_response_size} bytes"
@@ -306,10 +255,13 @@ class MCPService:
             if resource_name not in mcp_resources:
                 raise ValueError(f"Recurso requerido no encontrado: {resource_name}")
         
-        # Verificar caché
+        # Verificar caché; los resultados que dependen de DATA_DIR caducan con
+        # cada lote del feed de cambios
+        cache_key = f"tool:{tool_name}:{json.dumps(params, sort_keys=True)}"
+        if "filesystem" in tool_config.required_resources:
+            cache_key = f"tool:{tool_name}:fs{get_data_watcher().generation}:{json.dumps(params, sort_keys=True)}"
         if tool_config.cache_enabled:
-            cache_key = f"tool:{tool_name}:{json.dumps(params, sort_keys=True)}"
-            cached_result = await self.cache_service.get(cache_key)
+            cached_result = self.cache_service.get(cache_key)
             if cached_result:
                 return cached_result
         
@@ -319,6 +271,15 @@ class MCPService:
         if tool_name == "buscar_en_brave":
             result = await self._execute_search(params)
         
+        elif tool_name == "buscar_en_brave_multiple":
+            result = await self._execute_batch_search(params)
+        
+        elif tool_name == "buscar_en_archivos":
+            result = await self._execute_file_search(params)
+        
+        elif tool_name == "gestionar_archivos_lote":
+            result = await self._execute_bulk_files(params)
+        
         elif tool_name == "generar_markdown":
             result = await self._execute_markdown(params)
         
@@ -330,9 +291,8 @@ class MCPService:
         
         # Guardar en caché
         if tool_config.cache_enabled and result:
-            cache_key = f"tool:{tool_name}:{json.dumps(params, sort_keys=True)}"
             cache_ttl = tool_config.cache_ttl or mcp_config.cache_ttl
-            await self.cache_service.set(cache_key, result, cache_ttl)
+            self.cache_service.set(cache_key, result, cache_ttl)
         
         return result
     
@@ -347,22 +307,58 @@ class MCPService:
         if not query:
             raise ValueError("El parámetro 'query' es requerido")
         
-        # Realizar búsqueda
-        search_results = await self.resources_service.access_resource(
-            "search", "search", {"query": query, "num_results": num_results}
+        # Realizar búsqueda (con análisis informa del progreso y adelanta
+        # los resultados a los transportes que escuchan)
+        response = await get_brave_search().search(
+            query,
+            num_results=num_results,
+            analyze=analyze
         )
+        return response.dict()
+    
+    async def _execute_batch_search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ejecuta la herramienta de búsqueda múltiple
+        """
+        queries = params.get("queries")
+        if not queries or not isinstance(queries, list):
+            raise ValueError("El parámetro 'queries' debe ser una lista no vacía")
+        
+        response = await get_brave_search().batch_search(
+            queries,
+            num_results=params.get("num_results"),
+            max_results=params.get("max_results")
+        )
+        return response.dict()
+    
+    async def _execute_file_search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ejecuta la herramienta de búsqueda en archivos
+        """
+        query = params.get("query")
+        if not query:
+            raise ValueError("El parámetro 'query' es requerido")
         
-        # Analizar resultados si se solicita
-        if analyze and search_results:
-            analysis = await self.resources_service.access_resource(
-                "search", "analyze", {"results": search_results}
-            )
-            return {
-                "results": search_results,
-                "analysis": analysis
-            }
+        response = await self.filesystem_service.search_files(
+            query,
+            limit=params.get("limit", 10),
+            match_all=params.get("match_all", False)
+        )
+        return response.dict()
+    
+    async def _execute_bulk_files(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ejecuta la herramienta de operaciones de archivo en lote
+        """
+        operations = params.get("operations")
+        if not operations or not isinstance(operations, list):
+            raise ValueError("El parámetro 'operations' debe ser una lista no vacía")
         
-        return {"results": search_results}
+        response = await self.filesystem_service.bulk(
+            [BulkFileOperation(**op) for op in operations],
+            concurrency=params.get("concurrency")
+        )
+        return response.dict()
     
     async def _execute_markdown(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -376,29 +372,18 @@ class MCPService:
         if not content:
             raise ValueError("El parámetro 'content' es requerido")
         
-        # Generar Markdown
-        markdown = await self.resources_service.access_resource(
-            "claude", "generate", {
-                "text": content,
-                "format": format_type
-            }
+        # Generar Markdown (en streaming) y guardarlo si se solicita
+        result = await self.claude_service.generate_markdown(
+            content,
+            format_type=format_type,
+            save=save,
+            filename=filename
         )
-        
-        # Guardar en archivo si se solicita
-        if save:
-            await self.resources_service.access_resource(
-                "filesystem", "write", {
-                    "filename": filename,
-                    "content": markdown
-                }
-            )
-            return {
-                "markdown": markdown,
-                "saved": True,
-                "filename": filename
-            }
-        
-        return {"markdown": markdown, "saved": False}
+        return {
+            "markdown": result["content"],
+            "saved": result.get("saved", False),
+            "filename": filename if save else None
+        }
     
     async def _execute_analysis(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -410,15 +395,10 @@ class MCPService:
         if not text:
             raise ValueError("El parámetro 'text' es requerido")
         
-        # Analizar texto
-        analysis = await self.resources_service.access_resource(
-            "claude", "analyze", {
-                "text": text,
-                "analysis_type": analysis_type
-            }
-        )
+        # Analizar texto (con admisión, agrupación y degradación del servicio)
+        analysis = await self.claude_service.analyze_text(text, analysis_type)
         
-        return {"analysis": analysis}
+        return {"analysis": analysis.dict()}
     
     async def get_recent_operations(self, limit: int = 10) -> List[MCPOperation]:
         """
@@ -0,0 +1,168 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+
+class PersistenceQueue:
+    """
+    Cola en segundo plano para persistir artefactos fuera del camino crítico.
+
+    Los productores encolan (tipo, datos) y continúan; un worker agrupa los
+    trabajos pendientes y ejecuta en un hilo el escritor registrado para cada
+    tipo, con un lote por tipo. La cola está acotada: si está llena, el
+    productor espera hasta `put_timeout` segundos y, si sigue llena, escribe
+    él mismo su trabajo (nunca se descartan artefactos). `stop()` vacía la
+    cola antes de terminar.
+    """
+    def __init__(
+        self,
+        max_size: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        put_timeout: float = 1.0
+    ):
+        self.logger = LogManager.get_logger("persistence_queue")
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._put_timeout = put_timeout
+        self._writers: Dict[str, Callable[[List[Any]], None]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._written = 0
+        self._failed = 0
+        self._inline = 0
+
+    def register_writer(self, kind: str, writer: Callable[[List[Any]], None]) -> None:
+        """
+        Registra el escritor (síncrono) de un tipo de artefacto
+
+        Args:
+            kind: Tipo de artefacto
+            writer: Función que persiste una lista de datos de ese tipo
+        """
+        self._writers[kind] = writer
+
+    def start(self) -> None:
+        """
+        Arranca el worker si no está en marcha
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self._max_size)
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def submit(self, kind: str, payload: Any) -> None:
+        """
+        Encola un artefacto para persistirlo en segundo plano
+
+        Args:
+            kind: Tipo de artefacto (debe tener escritor registrado)
+            payload: Datos a persistir
+
+        Raises:
+            ValueError: Si el tipo no tiene escritor
+        """
+        if kind not in self._writers:
+            raise ValueError(f"Tipo de artefacto sin escritor: {kind}")
+        self.start()
+
+        try:
+            await asyncio.wait_for(self._queue.put((kind, payload)), timeout=self._put_timeout)
+        except asyncio.TimeoutError:
+            self._inline += 1
+            self.logger.warning("Cola de persistencia llena; el artefacto se escribe en línea")
+            await asyncio.to_thread(self._write_batch, [(kind, payload)])
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+
+            # Esperar un poco para agrupar si el lote no está ya completo
+            if queue.qsize() < self._batch_size - 1 and self._flush_interval > 0:
+                await asyncio.sleep(self._flush_interval)
+            while len(batch) < self._batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, Any]]) -> None:
+        grouped: Dict[str, List[Any]] = {}
+        for kind, payload in batch:
+            grouped.setdefault(kind, []).append(payload)
+
+        for kind, payloads in grouped.items():
+            try:
+                self._writers[kind](payloads)
+                self._written += len(payloads)
+            except Exception as e:
+                self._failed += len(payloads)
+                self.logger.error(f"Error al persistir {len(payloads)} artefactos '{kind}': {str(e)}")
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que se persistan todos los artefactos encolados
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            True si la cola quedó vacía
+        """
+        if self._queue is None or self._worker is None or self._worker.done():
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Vacía la cola y detiene el worker
+
+        Args:
+            timeout: Tiempo máximo para vaciar la cola
+        """
+        if not await self.flush(timeout):
+            self.logger.warning(f"Apagado con {self._queue.qsize()} artefactos sin persistir")
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de la cola
+
+        Returns:
+            Dict con pendientes, capacidad y contadores
+        """
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "pending": self._queue.qsize() if self._queue else 0,
+            "max_size": self._max_size,
+            "written": self._written,
+            "failed": self._failed,
+            "written_inline": self._inline
+        }
+
+@lru_cache()
+def get_persistence_queue() -> PersistenceQueue:
+    """
+    Obtiene la cola de persistencia compartida
+    """
+    return PersistenceQueue(
+        max_size=settings.PERSIST_QUEUE_MAX_SIZE,
+        batch_size=settings.PERSIST_BATCH_SIZE,
+        flush_interval=settings.PERSIST_FLUSH_INTERVAL,
+        put_timeout=settings.PERSIST_PUT_TIMEOUT
+    )
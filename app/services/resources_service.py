@@ -26,6 +26,7 @@ class ResourcesService:
         self.cache_service = CacheService()
         self.filesystem_service = FileSystemService()
         self.claude_service = ClaudeService()
+        self.logger = LogManager.get_logger("resources_service")
         self._load_resources()
     
     def _load_resources(self) -> None:
@@ -145,7 +146,7 @@ class ResourcesService:
         )
         
         # Registrar recursos cargados
-        LogManager.log_info(f"Cargados {len(self.resources)} recursos MCP")
+        self.logger.info(f"Cargados {len(self.resources)} recursos MCP")
     
     async def list_resources(self) -> ResourcesResponse:
         """
@@ -208,7 +209,7 @@ class ResourcesService:
                 )
                 
         except Exception as e:
-            LogManager.log_error("resources", str(e))
+            self.logger.error(f"Error al acceder al recurso: {str(e)}")
             return ResourceResponse(
                 success=False,
                 error={"code": 500, "message": f"Error al acceder al recurso: {str(e)}"}
@@ -239,7 +240,16 @@ class ResourcesService:
             elif operation == "read":
                 result = await self.filesystem_service.read_file(filename)
             elif operation == "list":
-                result = await self.filesystem_service.list_files()
+                listing = await self.filesystem_service.list_files(
+                    pattern=request.parameters.get("pattern"),
+                    extension=request.parameters.get("extension"),
+                    content_type=request.parameters.get("content_type"),
+                    sort_by=request.parameters.get("sort_by", "filename"),
+                    descending=request.parameters.get("order") == "desc",
+                    offset=request.parameters.get("offset", 0),
+                    limit=request.parameters.get("limit")
+                )
+                return ResourceResponse(success=True, data=listing.dict())
             elif operation == "update":
                 result = await self.filesystem_service.update_file(filename, content)
             elif operation == "delete":
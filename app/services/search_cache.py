@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.cache import get_cache, CacheError
+
+class CachedSearchError(Exception):
+    """Error de búsqueda reciente servido desde la caché negativa"""
+    pass
+
+def normalize_query(query: str) -> str:
+    """
+    Normaliza una consulta: Unicode NFKC, minúsculas y espacios colapsados
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+def normalize_search_params(
+    query: str,
+    num_results: Optional[int] = None,
+    country: Optional[str] = None,
+    language: Optional[str] = None,
+    **extra: Any
+) -> Dict[str, Any]:
+    """
+    Normaliza los parámetros de una búsqueda para usarlos como clave
+
+    Los valores ausentes toman los DEFAULT_SEARCH_* de la configuración, de
+    modo que omitir un parámetro o pasar su valor por defecto da la misma clave.
+
+    Args:
+        query: Término de búsqueda
+        num_results: Número de resultados
+        country: Código de país
+        language: Código de idioma
+        **extra: Otros parámetros que afectan al resultado
+
+    Returns:
+        Dict de parámetros normalizados
+    """
+    params = {
+        "q": normalize_query(query),
+        "count": int(num_results or settings.DEFAULT_SEARCH_RESULTS),
+        "country": (country or settings.DEFAULT_SEARCH_COUNTRY).strip().upper(),
+        "language": (language or settings.DEFAULT_SEARCH_LANGUAGE).strip().lower()
+    }
+    params.update({k: v for k, v in extra.items() if v is not None})
+    return params
+
+def search_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Genera la clave de caché de unos parámetros normalizados
+    """
+    digest = hashlib.sha1(
+        json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    return f"search:brave:{digest}"
+
+class SearchResultCache:
+    """
+    Caché de resultados de búsqueda con stale-while-revalidate.
+
+    - Entradas frescas: se sirven directamente.
+    - Entradas caducadas dentro de la ventana de obsolescencia: se sirven de
+      inmediato y se refrescan en segundo plano.
+    - Resultados vacíos y errores: se guardan con TTL corto y sin ventana de
+      obsolescencia, para no repetir en bucle consultas que fallan.
+
+    Las peticiones simultáneas de la misma clave comparten una sola descarga.
+    Si Redis no está disponible la búsqueda continúa sin caché.
+    """
+    def __init__(self, cache=None):
+        self.logger = LogManager.get_logger("search_cache")
+        self._cache = cache if cache is not None else get_cache()
+        self.enabled = settings.SEARCH_CACHE_ENABLED
+        self.ttl = settings.SEARCH_CACHE_TTL
+        self.stale_ttl = settings.SEARCH_CACHE_STALE_TTL
+        self.negative_ttl = settings.SEARCH_CACHE_NEGATIVE_TTL
+        self.error_ttl = settings.SEARCH_CACHE_ERROR_TTL
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._cache.get(key)
+        except CacheError as e:
+            self.logger.warning(f"Caché de búsqueda no disponible: {str(e)}")
+            return None
+
+    def _write(self, key: str, entry: Dict[str, Any], ttl: int) -> None:
+        try:
+            self._cache.set(key, entry, ttl=ttl)
+        except CacheError as e:
+            self.logger.warning(f"No se pudo guardar la búsqueda en caché: {str(e)}")
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.time()
+        try:
+            value = await fetch()
+        except Exception as e:
+            self._write(key, {"error": str(e), "fetched_at": now, "fresh_until": now + self.error_ttl}, self.error_ttl)
+            raise
+
+        ttl, stale = (self.ttl, self.stale_ttl) if value else (self.negative_ttl, 0)
+        self._write(key, {
+            "value": value,
+            "fetched_at": now,
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + stale
+        }, ttl + stale)
+        return value
+
+    def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._inflight:
+            return
+        task = self._single_flight(key, fetch)
+        self._refreshes.add(task)
+
+        def done(t: asyncio.Task) -> None:
+            self._refreshes.discard(t)
+            if not t.cancelled() and t.exception():
+                self.logger.warning(f"Error al refrescar búsqueda en caché: {str(t.exception())}")
+
+        task.add_done_callback(done)
+
+    async def get_or_fetch(
+        self,
+        params: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """
+        Obtiene el resultado de una búsqueda desde la caché o la red
+
+        Args:
+            params: Parámetros normalizados de la búsqueda
+            fetch: Corrutina que realiza la búsqueda y devuelve un valor serializable
+
+        Returns:
+            Tupla (valor, estado) con estado "hit", "stale", "miss" o "bypass"
+
+        Raises:
+            CachedSearchError: Si la misma búsqueda falló hace menos de SEARCH_CACHE_ERROR_TTL
+        """
+        if not self.enabled:
+            return await fetch(), "bypass"
+
+        key = search_cache_key(params)
+        entry = self._read(key)
+        now = time.time()
+
+        if entry is not None:
+            if "error" in entry:
+                if now < entry["fresh_until"]:
+                    raise CachedSearchError(entry["error"])
+            elif now < entry["fresh_until"]:
+                return entry["value"], "hit"
+            elif now < entry.get("stale_until", 0):
+                self._refresh_in_background(key, fetch)
+                return entry["value"], "stale"
+
+        return await asyncio.shield(self._single_flight(key, fetch)), "miss"
@@ -0,0 +1,282 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, AsyncIterator, List, Optional
+from app.core.config import settings
+from app.core.logging import LogManager
+from app.core.cache import get_cache
+from app.core.claude_client import get_claude_client
+from app.core.exceptions import ResourceNotFoundError
+from app.core.prompts import PromptTemplates
+from app.utils.tokens import estimate_tokens
+
+# Roles compactos para reducir el tamaño almacenado de cada turno
+_ROLES = {"u": "user", "a": "assistant"}
+
+class SessionService:
+    """
+    Servicio de sesiones de conversación almacenadas en Redis.
+
+    Cada sesión guarda sus turnos en una lista de Redis (se añaden de forma
+    incremental) y unos metadatos con el resumen acumulado. Cuando el
+    historial supera el umbral de tokens, los turnos antiguos se resumen y
+    se eliminan de la lista, de modo que el contexto enviado queda acotado.
+
+    Los turnos nuevos, el recorte y los metadatos se escriben en una sola
+    transacción, y cada sesión pertenece al usuario que la creó: para el
+    resto es como si no existiera.
+    """
+    def __init__(self):
+        self.logger = LogManager.get_logger("session_service")
+        self.client = get_claude_client()
+        self._cache = get_cache()
+        self._ttl = settings.SESSION_TTL
+        self._max_context_tokens = settings.SESSION_MAX_CONTEXT_TOKENS
+        # Se conservan pares usuario/asistente completos
+        self._keep_recent_turns = max(2, settings.SESSION_KEEP_RECENT_TURNS - settings.SESSION_KEEP_RECENT_TURNS % 2)
+        # Cerrojo y número de usuarios por sesión; solo existen mientras se usan
+        self._locks: Dict[str, List[Any]] = {}
+
+    @staticmethod
+    def _meta_key(session_id: str) -> str:
+        return f"session:{session_id}:meta"
+
+    @staticmethod
+    def _turns_key(session_id: str) -> str:
+        return f"session:{session_id}:turns"
+
+    @asynccontextmanager
+    async def _session_lock(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Serializa las operaciones de una sesión; el cerrojo se descarta en
+        cuanto nadie lo usa, así que no se acumulan los de sesiones
+        expiradas o eliminadas
+        """
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(session_id) is entry:
+                del self._locks[session_id]
+
+    def _load_meta(self, session_id: str, owner: Optional[str]) -> Dict[str, Any]:
+        meta = self._cache.get(self._meta_key(session_id))
+        # Una sesión de otro usuario se trata como inexistente
+        if not meta or meta.get("owner") != owner:
+            raise ResourceNotFoundError(f"Sesión no encontrada: {session_id}")
+        return meta
+
+    @staticmethod
+    def _public(meta: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in meta.items() if key != "owner"}
+
+    async def create_session(self, system: Optional[str] = None, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Crea una nueva sesión de conversación
+
+        Args:
+            system: Prompt de sistema para toda la sesión (opcional)
+            owner: Identificador del usuario propietario (ver principal_id)
+
+        Returns:
+            Dict con los metadatos de la sesión
+        """
+        session_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        meta = {
+            "session_id": session_id,
+            "owner": owner,
+            "system": system,
+            "summary": "",
+            "summary_tokens": 0,
+            "turn_tokens": 0,
+            "turns": 0,
+            "created_at": now,
+            "updated_at": now
+        }
+        self._cache.set(self._meta_key(session_id), meta, ttl=self._ttl)
+        self.logger.info(f"Sesión creada: {session_id}")
+        return self._public(meta)
+
+    async def get_session(self, session_id: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Obtiene los metadatos y los turnos vigentes de una sesión
+
+        Args:
+            session_id: Identificador de la sesión
+            owner: Identificador del usuario que la solicita
+
+        Returns:
+            Dict con metadatos y turnos no resumidos
+
+        Raises:
+            ResourceNotFoundError: Si la sesión no existe, ha expirado o es de otro usuario
+        """
+        meta = self._load_meta(session_id, owner)
+        turns = self._cache.get_list(self._turns_key(session_id))
+        return {
+            **self._public(meta),
+            "messages": [{"role": _ROLES[t["r"]], "content": t["c"]} for t in turns]
+        }
+
+    async def delete_session(self, session_id: str, owner: Optional[str] = None) -> bool:
+        """
+        Elimina una sesión y su historial
+
+        Args:
+            session_id: Identificador de la sesión
+            owner: Identificador del usuario que la solicita
+
+        Returns:
+            True si la sesión existía y era del usuario
+        """
+        # Con el cerrojo: un mensaje en curso no puede recrearla al terminar
+        async with self._session_lock(session_id):
+            try:
+                self._load_meta(session_id, owner)
+            except ResourceNotFoundError:
+                return False
+            return self._cache.delete_many([self._meta_key(session_id), self._turns_key(session_id)])
+
+    async def send_message(
+        self,
+        session_id: str,
+        message: str,
+        max_tokens: Optional[int] = None,
+        owner: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Envía un mensaje dentro de una sesión y guarda el nuevo turno
+
+        Si el resumen de los turnos antiguos falla, el turno se guarda igual
+        y el resumen se reintenta en el siguiente mensaje.
+
+        Args:
+            session_id: Identificador de la sesión
+            message: Nuevo mensaje del usuario
+            max_tokens: Número máximo de tokens de respuesta (opcional)
+            owner: Identificador del usuario que lo envía
+
+        Returns:
+            Dict con la respuesta de Claude y el estado de la sesión
+
+        Raises:
+            ResourceNotFoundError: Si la sesión no existe, ha expirado o es de otro usuario
+        """
+        if not message or not message.strip():
+            raise ValueError("El mensaje no puede estar vacío")
+
+        async with self._session_lock(session_id):
+            meta = self._load_meta(session_id, owner)
+            turns = self._cache.get_list(self._turns_key(session_id))
+
+            messages = [{"role": _ROLES[t["r"]], "content": t["c"]} for t in turns]
+            messages.append({"role": "user", "content": message})
+
+            response = await self.client.generate_chat_response(
+                messages,
+                system=self._build_system(meta),
+                max_tokens=max_tokens
+            )
+
+            new_turns = [
+                {"r": "u", "c": message, "t": estimate_tokens(message)},
+                {"r": "a", "c": response["content"], "t": estimate_tokens(response["content"])}
+            ]
+            meta["turns"] += len(new_turns)
+            meta["turn_tokens"] += sum(t["t"] for t in new_turns)
+            meta["updated_at"] = datetime.now().isoformat()
+
+            trimmed = 0
+            if meta["summary_tokens"] + meta["turn_tokens"] > self._max_context_tokens:
+                try:
+                    trimmed = await self._roll_up(session_id, meta, turns + new_turns)
+                except Exception as e:
+                    self.logger.warning(f"Sesión {session_id}: no se pudo resumir el historial: {str(e)}")
+
+            # Turnos, recorte y metadatos en una sola transacción
+            self._cache.append_to_list_and_set(
+                self._turns_key(session_id),
+                new_turns,
+                self._meta_key(session_id),
+                meta,
+                ttl=self._ttl,
+                trim_start=trimmed
+            )
+
+            return {
+                "session_id": session_id,
+                "content": response["content"],
+                "tokens_used": response["tokens_used"],
+                "model": response["model"],
+                "context_tokens": meta["summary_tokens"] + meta["turn_tokens"],
+                "summarized": trimmed > 0
+            }
+
+    def _build_system(self, meta: Dict[str, Any]) -> Optional[str]:
+        """
+        Combina el prompt de sistema de la sesión con el resumen acumulado
+        """
+        parts = [meta.get("system")]
+        if meta.get("summary"):
+            parts.append(f"Resumen de la conversación anterior:\n{meta['summary']}")
+        return "\n\n".join(p for p in parts if p) or None
+
+    async def _roll_up(self, session_id: str, meta: Dict[str, Any], turns: List[Dict[str, Any]]) -> int:
+        """
+        Resume los turnos más antiguos
+
+        No escribe en Redis: los metadatos se actualizan en sitio solo si el
+        resumen se genera, y quien llama recorta la lista en la misma
+        transacción en que guarda los metadatos.
+
+        Args:
+            session_id: Identificador de la sesión
+            meta: Metadatos de la sesión
+            turns: Turnos de la sesión, en orden, incluidos los nuevos
+
+        Returns:
+            Número de turnos resumidos que deben eliminarse del historial
+        """
+        count = len(turns) - self._keep_recent_turns
+        if count <= 0:
+            return 0
+
+        start_time = time.time()
+        old_turns, recent_turns = turns[:count], turns[count:]
+        transcript = "\n\n".join(f"{_ROLES[t['r']]}: {t['c']}" for t in old_turns)
+        prompt = PromptTemplates.get_conversation_summary_prompt(meta["summary"], transcript)
+
+        response = await self.client.generate_chat_response(
+            [{"role": "user", "content": prompt}],
+            max_tokens=settings.SESSION_SUMMARY_MAX_TOKENS,
+            temperature=0.0
+        )
+
+        meta["summary"] = response["content"]
+        meta["summary_tokens"] = estimate_tokens(response["content"])
+        meta["turn_tokens"] = sum(t["t"] for t in recent_turns)
+
+        self.logger.info(
+            f"Sesión {session_id}: {count} turnos resumidos en {time.time() - start_time:.2f}s"
+        )
+        return count
+
+# Instancia global del servicio de sesiones
+@lru_cache()
+def get_session_service() -> SessionService:
+    """
+    Obtiene una instancia global del servicio de sesiones
+
+    Returns:
+        SessionService: Instancia del servicio de sesiones
+    """
+    return SessionService()
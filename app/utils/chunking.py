@@ -0,0 +1,86 @@
+import hashlib
+import random
+from dataclasses import dataclass
+from typing import List
+
+# Tabla "gear" determinista: los mismos bytes producen siempre los mismos cortes
+_GEAR_SEED = 0x4D43505F434C4155
+_GEAR = [random.Random(_GEAR_SEED + i).getrandbits(64) for i in range(256)]
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+@dataclass(frozen=True)
+class TextChunk:
+    """
+    Fragmento de texto delimitado por contenido
+    """
+    index: int
+    offset: int
+    text: str
+    digest: str
+
+    @property
+    def length(self) -> int:
+        return len(self.text)
+
+def chunk_text(
+    text: str,
+    min_size: int = 1024,
+    avg_size: int = 4096,
+    max_size: int = 16384
+) -> List[TextChunk]:
+    """
+    Divide un texto en fragmentos usando límites definidos por el contenido.
+
+    Usa un hash rodante tipo "gear": un corte se produce cuando los bits bajos
+    del hash son cero, por lo que los límites dependen solo de los caracteres
+    cercanos. Editar un párrafo solo cambia los fragmentos que lo contienen.
+
+    Args:
+        text: Texto a dividir
+        min_size: Tamaño mínimo de fragmento en caracteres
+        avg_size: Tamaño medio esperado (se redondea a potencia de dos)
+        max_size: Tamaño máximo de fragmento en caracteres
+
+    Returns:
+        Lista de TextChunk en orden de aparición
+
+    Raises:
+        ValueError: Si los tamaños no son coherentes
+    """
+    if not 0 < min_size <= avg_size <= max_size:
+        raise ValueError("Se requiere 0 < min_size <= avg_size <= max_size")
+
+    bits = max(avg_size.bit_length() - 1, 1)
+    # Bits altos del hash: dependen de una ventana de ~64 caracteres
+    mask = ((1 << bits) - 1) << (64 - bits)
+    chunks: List[TextChunk] = []
+    length = len(text)
+    start = 0
+
+    while start < length:
+        end = min(start + max_size, length)
+        cut = end
+        h = 0
+
+        # No se buscan cortes antes de min_size
+        i = start + min_size
+        if i < end:
+            for ch in text[start:i][-64:]:
+                h = ((h << 1) + _GEAR[ord(ch) & 0xFF]) & _MASK_64
+            while i < end:
+                h = ((h << 1) + _GEAR[ord(text[i]) & 0xFF]) & _MASK_64
+                i += 1
+                if not h & mask:
+                    cut = i
+                    break
+
+        piece = text[start:cut]
+        chunks.append(TextChunk(
+            index=len(chunks),
+            offset=start,
+            text=piece,
+            digest=hashlib.sha256(piece.encode("utf-8")).hexdigest()
+        ))
+        start = cut
+
+    return chunks
@@ -0,0 +1,113 @@
+import math
+import re
+import unicodedata
+from typing import List
+
+import numpy as np
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?¡¿…])\s+|\n{2,}|\n(?=\s*[-*#>\d])")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Palabras vacías frecuentes en español e inglés
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante e el ella
+ellas ellos en entre era es esa esas ese eso esos esta estaba estan estas este esto estos fue fueron ha
+han hasta hay la las le les lo los mas me mi muy no nos o os otra otro para pero por porque que quien se
+sea ser si sin sobre son su sus tambien te tiene tienen todo todos tu un una uno unos y ya yo
+about above after again all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers him his how i if in into is it its itself just me more most my no nor not now of off on once
+only or other our out over own same she should so some such than that the their them then there these
+they this those through to too under until up very was we were what when where which while who whom why
+will with would you your
+""".split())
+
+def normalize_word(word: str) -> str:
+    """
+    Normaliza una palabra: minúsculas y sin acentos
+    """
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Divide un texto en oraciones (o elementos de lista)
+
+    Args:
+        text: Texto a dividir
+
+    Returns:
+        Oraciones no vacías, en orden
+    """
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+
+def _tokenize(sentence: str) -> List[str]:
+    words = (normalize_word(w) for w in _WORD_RE.findall(sentence))
+    return [w for w in words if len(w) > 2 and w not in STOPWORDS and not w.isdigit()]
+
+def rank_sentences(sentences: List[str], damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """
+    Puntúa oraciones con TextRank sobre vectores TF-IDF.
+
+    Args:
+        sentences: Oraciones a puntuar
+        damping: Factor de amortiguación de PageRank
+        iterations: Iteraciones máximas del método de potencias
+
+    Returns:
+        Vector de puntuaciones, una por oración
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+
+    tokens = [_tokenize(s) for s in sentences]
+    vocabulary = {w: i for i, w in enumerate(sorted({w for ts in tokens for w in ts}))}
+    if not vocabulary:
+        return np.full(n, 1.0 / n)
+
+    # Matriz TF-IDF (oraciones x términos) con normalización L2
+    tf = np.zeros((n, len(vocabulary)))
+    for row, words in enumerate(tokens):
+        for word in words:
+            tf[row, vocabulary[word]] += 1.0
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = tf * (np.log((1.0 + n) / (1.0 + df)) + 1.0)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
+
+    # Grafo de similitud coseno sin bucles, normalizado por filas
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1.0 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+def summarize(text: str, max_sentences: int = 5, ratio: float = 0.2) -> List[str]:
+    """
+    Genera un resumen extractivo seleccionando las oraciones más centrales
+
+    Args:
+        text: Texto a resumir
+        max_sentences: Número máximo de oraciones del resumen
+        ratio: Proporción de oraciones a conservar en textos largos
+
+    Returns:
+        Oraciones seleccionadas en el orden original del texto
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= 1:
+        return sentences
+
+    count = max(1, min(max_sentences, math.ceil(len(sentences) * ratio)))
+    scores = rank_sentences(sentences)
+    chosen = sorted(np.argsort(-scores, kind="stable")[:count])
+    return [sentences[i] for i in chosen]
@@ -0,0 +1,272 @@
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Líneas que se buscan alrededor de la posición indicada por el hunk
+MAX_FUZZ_LINES = 100
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# (inicio, fin, bytes nuevos): sustituye original[inicio:fin]
+Edit = Tuple[int, int, bytes]
+
+class FilePatchError(ValueError):
+    """Error al interpretar o aplicar un parche de archivo"""
+    pass
+
+@dataclass
+class Hunk:
+    """Bloque de un diff unificado"""
+    old_start: int
+    old_lines: List[bytes] = field(default_factory=list)
+    new_lines: List[bytes] = field(default_factory=list)
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """
+    Interpreta un diff unificado de un solo archivo
+
+    Las cabeceras ---/+++ son opcionales. Se respeta el marcador
+    "\\ No newline at end of file".
+
+    Args:
+        diff: Texto del diff
+
+    Returns:
+        Lista de hunks en orden
+
+    Raises:
+        FilePatchError: Si el diff no contiene hunks o está mal formado
+    """
+    hunks: List[Hunk] = []
+    current = None
+    last_kind = None
+
+    for line in diff.splitlines(keepends=True):
+        match = _HUNK_RE.match(line)
+        if match:
+            current = Hunk(old_start=int(match.group(1)))
+            hunks.append(current)
+            last_kind = None
+            continue
+        if current is None:
+            if line.startswith(("---", "+++", "diff ", "index ")) or not line.strip():
+                continue
+            raise FilePatchError(f"Línea fuera de un hunk: {line.rstrip()}")
+
+        if line.startswith("\\"):
+            # "\ No newline at end of file" se refiere a la línea anterior
+            if last_kind in (" ", "-"):
+                current.old_lines[-1] = current.old_lines[-1].rstrip(b"\r\n")
+            if last_kind in (" ", "+"):
+                current.new_lines[-1] = current.new_lines[-1].rstrip(b"\r\n")
+            continue
+
+        kind = line[0]
+        if line in ("\n", "\r\n"):
+            # Línea de contexto vacía cuyo espacio inicial se perdió
+            kind, body = " ", line.encode("utf-8")
+        elif kind in (" ", "-", "+"):
+            body = line[1:].encode("utf-8")
+        else:
+            raise FilePatchError(f"Línea de diff inválida: {line.rstrip()}")
+
+        if kind in (" ", "-"):
+            current.old_lines.append(body)
+        if kind in (" ", "+"):
+            current.new_lines.append(body)
+        last_kind = kind
+
+    if not hunks:
+        raise FilePatchError("El diff no contiene hunks")
+    return hunks
+
+def _line_offsets(lines: List[bytes]) -> List[int]:
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+def diff_to_edits(original: bytes, diff: str) -> List[Edit]:
+    """
+    Convierte un diff unificado en ediciones por rango de bytes
+
+    Cada hunk se busca primero en la línea indicada y, si el archivo se
+    desplazó, en hasta MAX_FUZZ_LINES líneas alrededor; las líneas de
+    contexto y eliminadas deben coincidir exactamente.
+
+    Args:
+        original: Contenido actual del archivo
+        diff: Diff unificado a aplicar
+
+    Returns:
+        Ediciones ordenadas y sin solapamientos
+
+    Raises:
+        FilePatchError: Si algún hunk no se puede ubicar
+    """
+    lines = original.splitlines(keepends=True)
+    offsets = _line_offsets(lines)
+    edits: List[Edit] = []
+    min_index = 0
+
+    for number, hunk in enumerate(parse_unified_diff(diff), start=1):
+        size = len(hunk.old_lines)
+        expected = hunk.old_start - 1 if size else hunk.old_start
+
+        candidates = [expected]
+        for delta in range(1, MAX_FUZZ_LINES + 1):
+            candidates.extend((expected - delta, expected + delta))
+
+        index = next(
+            (
+                i for i in candidates
+                if min_index <= i <= len(lines) - size and lines[i:i + size] == hunk.old_lines
+            ),
+            None
+        )
+        if index is None:
+            raise FilePatchError(f"El hunk {number} no coincide con el contenido actual")
+
+        edits.append((offsets[index], offsets[index + size], b"".join(hunk.new_lines)))
+        min_index = index + size
+    return edits
+
+def _copy_range(src_fd: int, dst_fd: int, offset: int, count: int) -> None:
+    """
+    Copia un tramo entre descriptores, en el kernel si es posible
+    """
+    while count > 0:
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                copied = os.copy_file_range(src_fd, dst_fd, count, offset)
+            except OSError:
+                copied = 0
+        if copied <= 0:
+            data = os.pread(src_fd, min(count, COPY_CHUNK_SIZE), offset)
+            if not data:
+                raise FilePatchError("El archivo cambió durante la escritura")
+            os.write(dst_fd, data)
+            copied = len(data)
+        offset += copied
+        count -= copied
+
+def _check_edits(size: int, edits: List[Edit], max_size: int) -> int:
+    position = 0
+    for start, end, _ in edits:
+        if start < position or end < start or end > size:
+            raise FilePatchError(f"Rango inválido {start}-{end} para un archivo de {size} bytes")
+        position = end
+    final_size = size + sum(len(data) - (end - start) for start, end, data in edits)
+    if final_size > max_size:
+        raise FilePatchError(f"Archivo demasiado grande. Máximo: {max_size} bytes")
+    return final_size
+
+def apply_edits(original: bytes, edits: List[Edit], max_size: int) -> bytes:
+    """
+    Aplica ediciones por rango a un contenido en memoria
+
+    Se usa con los archivos comprimidos, que no se pueden editar por tramos
+    en disco.
+
+    Args:
+        original: Contenido actual
+        edits: Ediciones (inicio, fin, bytes) ordenadas y sin solapamientos
+        max_size: Tamaño máximo del resultado
+
+    Returns:
+        Contenido resultante
+
+    Raises:
+        FilePatchError: Si las ediciones son inválidas o el resultado es demasiado grande
+    """
+    _check_edits(len(original), edits, max_size)
+    parts = []
+    position = 0
+    for start, end, data in edits:
+        parts.append(original[position:start])
+        parts.append(data)
+        position = end
+    parts.append(original[position:])
+    return b"".join(parts)
+
+def rewrite_file(path: str, edits: List[Edit], max_size: int) -> int:
+    """
+    Aplica ediciones por rango a un archivo de forma atómica
+
+    Se construye un temporal en el mismo directorio copiando los tramos sin
+    cambios con copy_file_range (sin pasar por Python y, en sistemas con
+    reflinks, sin duplicar bloques) y escribiendo solo los bytes nuevos;
+    después se sustituye el original con os.replace.
+
+    Args:
+        path: Ruta del archivo
+        edits: Ediciones (inicio, fin, bytes) ordenadas y sin solapamientos
+        max_size: Tamaño máximo del resultado
+
+    Returns:
+        Tamaño final del archivo
+
+    Raises:
+        FilePatchError: Si las ediciones son inválidas o el resultado es demasiado grande
+    """
+    size = os.path.getsize(path)
+    final_size = _check_edits(size, edits, max_size)
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        src_fd = os.open(path, os.O_RDONLY)
+        try:
+            position = 0
+            for start, end, data in edits:
+                _copy_range(src_fd, fd, position, start - position)
+                os.write(fd, data)
+                position = end
+            _copy_range(src_fd, fd, position, size - position)
+        finally:
+            os.close(src_fd)
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return final_size
+
+def append_to_file(path: str, data: bytes, max_size: int) -> int:
+    """
+    Añade bytes al final de un archivo con una única escritura O_APPEND
+
+    Args:
+        path: Ruta del archivo
+        data: Bytes a añadir
+        max_size: Tamaño máximo del resultado
+
+    Returns:
+        Tamaño final del archivo
+
+    Raises:
+        FilePatchError: Si el resultado supera el tamaño máximo
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        size = os.fstat(fd).st_size
+        if size + len(data) > max_size:
+            raise FilePatchError(f"Archivo demasiado grande. Máximo: {max_size} bytes")
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+        return size + len(data)
+    finally:
+        os.close(fd)
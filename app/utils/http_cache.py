@@ -0,0 +1,105 @@
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Mapping
+
+def etag_for_stat(stat_result: os.stat_result) -> str:
+    """
+    Genera un ETag fuerte a partir de los metadatos de un archivo
+
+    Se deriva de (inode, mtime en ns, tamaño): cualquier escritura, incluido
+    un reemplazo atómico por rename, cambia el ETag sin leer el contenido.
+
+    Args:
+        stat_result: Resultado de os.stat del archivo
+
+    Returns:
+        ETag entre comillas
+    """
+    key = f"{stat_result.st_ino}-{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+def http_date(timestamp: float) -> str:
+    """
+    Formatea un instante como fecha HTTP (RFC 9110)
+    """
+    return formatdate(timestamp, usegmt=True)
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    """
+    Comprueba si una cabecera If-Match / If-None-Match incluye un ETag
+
+    Admite listas separadas por comas y "*". If-None-Match usa la
+    comparación débil: los ETag W/ se comparan por su valor. If-Match
+    exige la comparación fuerte (RFC 9110, 13.1.1), en la que un ETag
+    débil nunca coincide.
+
+    Args:
+        header: Valor de la cabecera
+        etag: ETag actual del recurso
+        weak: False para usar la comparación fuerte
+
+    Returns:
+        True si algún candidato coincide
+    """
+    if etag.startswith("W/"):
+        if not weak:
+            # Solo "*" puede satisfacer la comparación fuerte
+            return any(candidate.strip() == "*" for candidate in header.split(","))
+        etag = etag[2:]
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def validator_headers(stat_result: os.stat_result) -> Dict[str, str]:
+    """
+    Cabeceras de validación (ETag y Last-Modified) de un archivo
+
+    Args:
+        stat_result: Resultado de os.stat del archivo
+
+    Returns:
+        Dict con las cabeceras
+    """
+    return {
+        "ETag": etag_for_stat(stat_result),
+        "Last-Modified": http_date(stat_result.st_mtime)
+    }
+
+def is_not_modified(headers: Mapping[str, str], stat_result: os.stat_result) -> bool:
+    """
+    Evalúa If-None-Match / If-Modified-Since contra los metadatos de un archivo
+
+    Si la petición trae If-None-Match, If-Modified-Since se ignora
+    (RFC 9110, 13.2.2). Solo se usa os.stat: el contenido no se lee.
+
+    Args:
+        headers: Cabeceras de la petición (sin distinguir mayúsculas)
+        stat_result: Resultado de os.stat del archivo
+
+    Returns:
+        True si se puede responder 304 Not Modified
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag_for_stat(stat_result))
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None or since.tzinfo is None:
+            return False
+        # Last-Modified tiene resolución de segundos
+        return int(stat_result.st_mtime) <= since.timestamp()
+    return False
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+class InvalidBatchEntry(ValueError):
+    """Un mensaje del lote no es una solicitud JSON-RPC válida"""
+    pass
+
+def message_id(message: Any) -> Any:
+    """
+    Obtiene el id de un mensaje JSON-RPC aunque no sea válido (None si no
+    se puede determinar), para responder al error con el mismo id
+    """
+    if isinstance(message, dict) and isinstance(message.get("id"), (str, int)):
+        return message["id"]
+    return None
+
+def is_notification(message: Any) -> bool:
+    """
+    Indica si un mensaje es una notificación (solicitud sin id): se ejecuta
+    pero no se responde
+    """
+    return isinstance(message, dict) and "id" not in message and isinstance(message.get("method"), str)
+
+def parse_entry(message: Any, model: Type[ModelT]) -> ModelT:
+    """
+    Valida un mensaje del lote con el modelo de solicitud
+
+    Raises:
+        InvalidBatchEntry: Si el mensaje no es un objeto o no cumple el modelo
+    """
+    if not isinstance(message, dict):
+        raise InvalidBatchEntry("Se esperaba un objeto JSON-RPC")
+    try:
+        return model(**message)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise InvalidBatchEntry(f"{field}: {error['msg']}" if field else error["msg"])
+
+async def run_batch(
+    messages: List[Any],
+    handler: Callable[[Any], Awaitable[Any]],
+    on_error: Callable[[Any, Exception], Any],
+    concurrency: int
+) -> List[Any]:
+    """
+    Ejecuta las llamadas de un lote JSON-RPC en paralelo
+
+    Las llamadas de un lote son independientes entre sí: se ejecutan a la
+    vez, como mucho `concurrency` simultáneas, y el fallo de una no cancela
+    las demás; su excepción se convierte en respuesta con `on_error`. Si el
+    lote se cancela (p. ej. el cliente se desconecta) se cancelan todas. Las
+    notificaciones se ejecutan igual pero no tienen respuesta.
+
+    Args:
+        messages: Mensajes del lote, sin validar
+        handler: Ejecuta un mensaje y devuelve su respuesta
+        on_error: Construye la respuesta de un mensaje cuya ejecución falló
+        concurrency: Llamadas simultáneas
+
+    Returns:
+        Respuestas en el orden de los mensajes, sin las de notificaciones
+        (lista vacía si todo el lote son notificaciones)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(message: Any) -> Any:
+        try:
+            async with semaphore:
+                return await handler(message)
+        except Exception as e:
+            return on_error(message, e)
+
+    responses = await asyncio.gather(*(run(message) for message in messages))
+    return [response for message, response in zip(messages, responses) if not is_notification(message)]
@@ -0,0 +1,196 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_WORD_RE = re.compile(r"\w{3,}", re.UNICODE)
+
+class PatchError(ValueError):
+    """Error al interpretar o aplicar un parche de Markdown"""
+    pass
+
+@dataclass(frozen=True)
+class MarkdownSection:
+    """
+    Sección de un documento Markdown delimitada por encabezados
+    """
+    index: int
+    title: str
+    level: int
+    start: int
+    end: int
+
+def split_sections(content: str) -> List[MarkdownSection]:
+    """
+    Divide un documento Markdown en secciones por encabezados.
+
+    Los encabezados dentro de bloques de código se ignoran. El texto anterior
+    al primer encabezado forma una sección de nivel 0.
+
+    Args:
+        content: Documento Markdown
+
+    Returns:
+        Lista de secciones que cubren todo el documento
+    """
+    boundaries: List[Tuple[int, str, int]] = [(0, "", 0)]
+    in_fence = False
+    offset = 0
+
+    for line in content.splitlines(keepends=True):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING_RE.match(line.rstrip("\r\n"))
+            if match:
+                boundaries.append((offset, match.group(2), len(match.group(1))))
+        offset += len(line)
+
+    # Eliminar el preámbulo vacío cuando el documento empieza con un encabezado
+    if len(boundaries) > 1 and boundaries[1][0] == 0:
+        boundaries.pop(0)
+
+    sections = []
+    for i, (start, title, level) in enumerate(boundaries):
+        end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(content)
+        sections.append(MarkdownSection(index=i, title=title, level=level, start=start, end=end))
+    return sections
+
+def select_sections(
+    content: str,
+    sections: List[MarkdownSection],
+    instructions: str,
+    max_sections: int = 3
+) -> List[MarkdownSection]:
+    """
+    Selecciona las secciones más relevantes para unas instrucciones de edición.
+
+    Un encabezado citado en las instrucciones tiene prioridad; en otro caso
+    se puntúa por solapamiento de términos con el cuerpo de la sección.
+
+    Args:
+        content: Documento Markdown
+        sections: Secciones del documento
+        instructions: Instrucciones de edición
+        max_sections: Número máximo de secciones a devolver
+
+    Returns:
+        Secciones seleccionadas en orden de documento (vacío si ninguna encaja)
+    """
+    lowered = instructions.lower()
+    terms = set(_WORD_RE.findall(lowered))
+    if not terms:
+        return []
+
+    scored = []
+    for section in sections:
+        score = 0.0
+        title = section.title.lower().strip()
+        if title and title in lowered:
+            score += 100.0
+        title_terms = set(_WORD_RE.findall(title))
+        score += 5.0 * len(terms & title_terms)
+        body_terms = set(_WORD_RE.findall(content[section.start:section.end].lower()))
+        if body_terms:
+            score += len(terms & body_terms) / len(terms)
+        if score > 0:
+            scored.append((score, section))
+
+    if not scored:
+        return []
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    best = scored[0][0]
+    # Descartar secciones muy por debajo de la mejor puntuación
+    chosen = [s for score, s in scored[:max_sections] if score >= best * 0.5]
+    return sorted(chosen, key=lambda s: s.index)
+
+def parse_patch(text: str) -> List[Dict[str, str]]:
+    """
+    Interpreta la respuesta de Claude como una lista de ediciones.
+
+    Acepta un objeto JSON con la clave "edits", opcionalmente dentro de un
+    bloque de código.
+
+    Args:
+        text: Respuesta de Claude
+
+    Returns:
+        Lista de ediciones {"search": ..., "replace": ...}
+
+    Raises:
+        PatchError: Si la respuesta no es un parche válido
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise PatchError("La respuesta no contiene un objeto JSON")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise PatchError(f"JSON de parche inválido: {str(e)}")
+
+    edits = data.get("edits") if isinstance(data, dict) else None
+    if not isinstance(edits, list):
+        raise PatchError("El parche debe contener una lista 'edits'")
+
+    for edit in edits:
+        if not isinstance(edit, dict) or not isinstance(edit.get("search"), str) \
+                or not isinstance(edit.get("replace"), str) or not edit["search"]:
+            raise PatchError("Cada edición requiere 'search' y 'replace' de tipo texto")
+    return edits
+
+def apply_patch(
+    content: str,
+    edits: List[Dict[str, str]],
+    allowed_spans: Optional[List[Tuple[int, int]]] = None
+) -> str:
+    """
+    Aplica ediciones de búsqueda/reemplazo validando cada una.
+
+    Cada texto buscado debe aparecer exactamente una vez y, si se indican
+    rangos permitidos, dentro de alguno de ellos. El resultado debe mantener
+    el balance de los bloques de código.
+
+    Args:
+        content: Documento original
+        edits: Ediciones a aplicar en orden
+        allowed_spans: Rangos (inicio, fin) del documento original editables
+
+    Returns:
+        Documento editado
+
+    Raises:
+        PatchError: Si alguna edición no se puede aplicar de forma segura
+    """
+    located = []
+    for edit in edits:
+        search = edit["search"]
+        position = content.find(search)
+        if position < 0:
+            raise PatchError(f"Texto no encontrado: {search[:60]!r}")
+        if content.find(search, position + 1) >= 0:
+            raise PatchError(f"Texto ambiguo (aparece varias veces): {search[:60]!r}")
+        if allowed_spans is not None and not any(
+            start <= position and position + len(search) <= end for start, end in allowed_spans
+        ):
+            raise PatchError(f"Edición fuera de las secciones enviadas: {search[:60]!r}")
+        located.append((position, position + len(search), edit["replace"]))
+
+    located.sort()
+    for (_, prev_end, _), (next_start, _, _) in zip(located, located[1:]):
+        if next_start < prev_end:
+            raise PatchError("Las ediciones se solapan")
+
+    # Aplicar de atrás hacia delante para conservar los desplazamientos
+    result = content
+    for start, end, replace in reversed(located):
+        result = result[:start] + replace + result[end:]
+
+    if _count_fences(result) % 2 != _count_fences(content) % 2:
+        raise PatchError("El resultado deja un bloque de código sin cerrar")
+    return result
+
+def _count_fences(content: str) -> int:
+    return sum(1 for line in content.splitlines() if _FENCE_RE.match(line))
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+class BatchParseError(ValueError):
+    """La respuesta de un lote no se pudo repartir entre sus solicitudes"""
+    pass
+
+class MicroBatcher:
+    """
+    Agrupa solicitudes pequeñas del mismo tipo durante una ventana corta.
+
+    La primera solicitud de cada clave abre una ventana de `window_ms`
+    milisegundos; al cerrarse (o al alcanzar `max_batch_size`) todas las
+    solicitudes acumuladas se procesan con una sola llamada a
+    `process_batch(clave, elementos)`, que debe devolver un resultado por
+    elemento y en el mismo orden.
+    """
+    def __init__(
+        self,
+        process_batch: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+        window_ms: float = 10.0,
+        max_batch_size: int = 16
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser al menos 1")
+        self._process_batch = process_batch
+        self._window = window_ms / 1000.0
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # El event loop solo guarda referencias débiles a las tareas
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Añade un elemento al lote de su clave y espera su resultado
+
+        Args:
+            key: Clave de agrupación (p. ej. el tipo de análisis)
+            item: Elemento a procesar
+
+        Returns:
+            Resultado correspondiente a este elemento
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+
+        if len(batch) >= self._max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self._window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._process_batch(key, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise BatchParseError(
+                    f"Se esperaban {len(batch)} resultados y se obtuvieron {len(results)}"
+                )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+def parse_batch_results(text: str, expected: int) -> List[str]:
+    """
+    Reparte una respuesta JSON empaquetada entre las solicitudes del lote.
+
+    Se espera un objeto {"results": [{"id": 0, "result": "..."}, ...]}
+    con exactamente un resultado por identificador 0..expected-1.
+
+    Args:
+        text: Respuesta de Claude
+        expected: Número de solicitudes del lote
+
+    Returns:
+        Resultados en el orden de los identificadores
+
+    Raises:
+        BatchParseError: Si falta algún resultado o el JSON es inválido
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise BatchParseError("La respuesta no contiene un objeto JSON")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise BatchParseError(f"JSON de lote inválido: {str(e)}")
+
+    items = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise BatchParseError("La respuesta debe contener una lista 'results'")
+
+    results: Dict[int, str] = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("result"), str):
+            raise BatchParseError("Cada resultado requiere 'id' y 'result'")
+        try:
+            results[int(item.get("id"))] = item["result"]
+        except (TypeError, ValueError):
+            raise BatchParseError(f"Identificador de resultado inválido: {item.get('id')!r}")
+
+    if sorted(results) != list(range(expected)):
+        raise BatchParseError(f"Se esperaban resultados para los ids 0..{expected - 1}")
+    return [results[i] for i in range(expected)]
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Receptor de eventos de la petición en curso; las tareas creadas dentro
+# de la petición heredan el contexto y por tanto el receptor
+_listener: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar("progress_listener", default=None)
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+    """
+    Informa del avance de la operación en curso
+
+    No hace nada si el transporte no escucha (p. ej. /mcp/execute). Debe
+    llamarse desde el event loop, no desde hilos de asyncio.to_thread.
+
+    Args:
+        progress: Avance acumulado (creciente)
+        total: Total esperado, si se conoce
+        message: Descripción de la fase actual
+    """
+    listener = _listener.get()
+    if listener is not None:
+        listener({"type": "progress", "progress": progress, "total": total, "message": message})
+
+def report_partial(data: Any) -> None:
+    """
+    Envía un resultado parcial de la operación en curso (p. ej. un
+    fragmento de texto generado o resultados previos al análisis)
+
+    Args:
+        data: Contenido serializable a JSON
+    """
+    listener = _listener.get()
+    if listener is not None:
+        listener({"type": "partial", "data": data})
+
+def is_listening() -> bool:
+    """
+    Indica si algún transporte recibe los eventos de la operación en curso
+    """
+    return _listener.get() is not None
+
+@contextmanager
+def progress_listener(callback: Callable[[Dict[str, Any]], None]) -> Iterator[None]:
+    """
+    Dirige los eventos de progreso del contexto actual a `callback`
+
+    Args:
+        callback: Función que recibe cada evento (dict con type "progress"
+            o "partial")
+    """
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
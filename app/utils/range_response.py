@@ -0,0 +1,192 @@
+import os
+from typing import Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse as StarletteFileResponse
+from starlette.types import Receive, Scope, Send
+from app.utils.http_cache import etag_for_stat, is_not_modified
+from app.utils.seekable_zstd import SeekableReader
+
+class RangeNotSatisfiable(ValueError):
+    """Rango fuera del tamaño del archivo"""
+    pass
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta una cabecera Range de un único rango de bytes
+
+    Admite "bytes=inicio-fin", "bytes=inicio-" y "bytes=-sufijo". Las
+    cabeceras que no se entienden o piden varios rangos se ignoran, como
+    permite RFC 9110, y se sirve el archivo completo.
+
+    Args:
+        header: Valor de la cabecera Range
+        size: Tamaño del archivo en bytes
+
+    Returns:
+        Tupla (inicio, fin) inclusiva, o None para servir el archivo completo
+
+    Raises:
+        RangeNotSatisfiable: Si el rango no se solapa con el archivo
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        first_value = int(first) if first else None
+        last_value = int(last) if last else None
+    except ValueError:
+        return None
+
+    if first_value is None:
+        if last_value is None:
+            return None
+        if last_value <= 0:
+            raise RangeNotSatisfiable(header)
+        start, end = max(0, size - last_value), size - 1
+    else:
+        start = first_value
+        end = last_value if last_value is not None else size - 1
+
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+class RangeFileResponse(StarletteFileResponse):
+    """
+    Respuesta de archivo con soporte de peticiones Range.
+
+    Sin Range (o con un If-Range que no coincide) se comporta como la
+    FileResponse de Starlette: usa `http.response.pathsend` para que el
+    servidor envíe el archivo sin copiarlo si lo admite, y si no lo lee por
+    bloques en un hilo. Con un rango válido responde 206 enviando solo ese
+    tramo por bloques, y 416 si el rango queda fuera del archivo. La memoria
+    usada es constante: como mucho un bloque de `chunk_size` bytes.
+
+    El ETag es el de app.utils.http_cache; con If-None-Match o
+    If-Modified-Since que coinciden responde 304 sin abrir el archivo.
+    """
+    def __init__(self, path: str, stat_result: os.stat_result, chunk_size: int = 64 * 1024, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.chunk_size = chunk_size
+        self.headers.setdefault("accept-ranges", "bytes")
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        self.headers.setdefault("etag", etag_for_stat(stat_result))
+        super().set_stat_headers(stat_result)
+
+    @property
+    def content_size(self) -> int:
+        """Tamaño del contenido que se sirve"""
+        return self.stat_result.st_size
+
+    def _requested_range(self, headers: Headers) -> Optional[Tuple[int, int]]:
+        if_range = headers.get("if-range")
+        if if_range and if_range not in (self.headers.get("etag"), self.headers.get("last-modified")):
+            return None
+        return parse_range_header(headers.get("range"), self.content_size)
+
+    async def _send_full(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await super().__call__(scope, receive, send)
+
+    async def _send_range(self, start: int, end: int, send: Send) -> None:
+        remaining = end - start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # El archivo se acortó durante el envío
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        size = self.content_size
+        headers = Headers(scope=scope)
+        if scope["method"].upper() in ("GET", "HEAD") and is_not_modified(headers, self.stat_result):
+            not_modified = [
+                (name, value) for name, value in self.raw_headers
+                if name in (b"etag", b"last-modified", b"cache-control", b"accept-ranges")
+            ]
+            await send({"type": "http.response.start", "status": 304, "headers": not_modified})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        try:
+            requested = self._requested_range(headers)
+        except RangeNotSatisfiable:
+            await send({
+                "type": "http.response.start",
+                "status": 416,
+                "headers": [(b"content-range", f"bytes */{size}".encode()), (b"content-length", b"0")]
+            })
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if requested is None or requested == (0, size - 1):
+            await self._send_full(scope, receive, send)
+            return
+
+        start, end = requested
+        self.status_code = 206
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_range(start, end, send)
+        if self.background is not None:
+            await self.background()
+
+class CompressedRangeResponse(RangeFileResponse):
+    """
+    Respuesta de un archivo guardado en formato zstd seekable.
+
+    Se sirve el contenido descomprimido: Content-Length y los rangos se
+    refieren al tamaño lógico, y solo se descomprimen los frames que
+    cubren el tramo pedido (en un hilo, un frame cada vez). El ETag sigue
+    derivándose del archivo en disco.
+    """
+    def __init__(self, path: str, stat_result: os.stat_result, size: int, **kwargs):
+        self._content_size = size
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.headers["content-length"] = str(size)
+
+    @property
+    def content_size(self) -> int:
+        return self._content_size
+
+    async def _send_full(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self._content_size == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_range(0, self._content_size - 1, send)
+        if self.background is not None:
+            await self.background()
+
+    async def _send_range(self, start: int, end: int, send: Send) -> None:
+        reader = await anyio.to_thread.run_sync(SeekableReader, str(self.path))
+        try:
+            frames = reader.iter_range(start, end + 1)
+            while True:
+                chunk = await anyio.to_thread.run_sync(next, frames, None)
+                if chunk is None:
+                    break
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            reader.close()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
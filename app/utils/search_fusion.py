@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parámetros de seguimiento que no cambian el documento enlazado
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "yclid"
+})
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def canonical_url(url: str) -> str:
+    """
+    Normaliza una URL para detectar el mismo documento con distinta forma
+
+    Ignora esquema http/https, "www.", puertos por defecto, fragmento, barra
+    final, parámetros de seguimiento (utm_*, gclid, ...) y el orden de la query.
+
+    Args:
+        url: URL original
+
+    Returns:
+        URL canónica
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit(("", host, path, query, ""))[2:]
+
+def shingles(text: str, size: int = 3) -> FrozenSet[Tuple[str, ...]]:
+    """
+    Obtiene los n-gramas de palabras de un texto (en minúsculas)
+    """
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    if len(words) < size:
+        return frozenset([tuple(words)]) if words else frozenset()
+    return frozenset(tuple(words[i:i + size]) for i in range(len(words) - size + 1))
+
+def jaccard(a: FrozenSet, b: FrozenSet) -> float:
+    """
+    Similitud de Jaccard entre dos conjuntos
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+@dataclass
+class FusedResult:
+    """Resultado combinado de varias consultas"""
+    item: Dict[str, Any]
+    score: float = 0.0
+    queries: List[str] = field(default_factory=list)
+    best_rank: int = 0
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Tuple[str, Sequence[Dict[str, Any]]]],
+    k: int = 60,
+    similarity_threshold: float = 0.8
+) -> List[FusedResult]:
+    """
+    Combina listas de resultados con Reciprocal Rank Fusion
+
+    Cada aparición de un documento suma 1 / (k + rango) a su puntuación.
+    Se consideran el mismo documento los resultados con la misma URL
+    canónica o con descripciones casi idénticas (Jaccard de 3-gramas de
+    palabras >= similarity_threshold).
+
+    Args:
+        ranked_lists: Pares (consulta, resultados ordenados) con dicts que tienen "url" y "description"
+        k: Constante de suavizado de RRF
+        similarity_threshold: Umbral para considerar duplicadas dos descripciones
+
+    Returns:
+        Resultados fusionados ordenados por puntuación descendente
+    """
+    fused: List[FusedResult] = []
+    by_url: Dict[str, FusedResult] = {}
+    signatures: List[Tuple[FrozenSet, FusedResult]] = []
+
+    for query, results in ranked_lists:
+        seen_in_query = set()
+        for rank, item in enumerate(results, start=1):
+            url_key = canonical_url(item.get("url", ""))
+            signature = shingles(item.get("description", ""))
+
+            entry = by_url.get(url_key)
+            if entry is None and signature:
+                entry = next(
+                    (e for sig, e in signatures if jaccard(signature, sig) >= similarity_threshold),
+                    None
+                )
+            if entry is None:
+                entry = FusedResult(item=item, best_rank=rank)
+                fused.append(entry)
+                if signature:
+                    signatures.append((signature, entry))
+            by_url.setdefault(url_key, entry)
+
+            # Un documento repetido dentro de la misma consulta sólo puntúa una vez
+            if id(entry) in seen_in_query:
+                continue
+            seen_in_query.add(id(entry))
+
+            entry.score += 1.0 / (k + rank)
+            entry.best_rank = min(entry.best_rank, rank)
+            if query not in entry.queries:
+                entry.queries.append(query)
+
+    return sorted(fused, key=lambda e: (-e.score, e.best_rank))
@@ -0,0 +1,237 @@
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import zstandard
+
+# Formato "seekable" de zstd (contrib/seekable_format): frames independientes
+# seguidos de un frame saltable con la tabla de tamaños de cada frame
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+DEFAULT_FRAME_SIZE = 64 * 1024
+
+_SKIPPABLE_HEADER = struct.Struct("<II")
+_ENTRY = struct.Struct("<II")
+_FOOTER = struct.Struct("<IBI")
+
+class SeekableFormatError(ValueError):
+    """Archivo comprimido sin una tabla de saltos válida"""
+    pass
+
+def is_compressed(head: bytes) -> bool:
+    """
+    Indica si unos bytes iniciales corresponden a un frame zstd
+
+    Los documentos de texto permitidos (md, txt, json) no pueden empezar por
+    esta secuencia: no es UTF-8 válido.
+    """
+    return head[:4] == ZSTD_MAGIC
+
+def compress(data: bytes, level: int = 3, frame_size: int = DEFAULT_FRAME_SIZE) -> bytes:
+    """
+    Comprime en frames independientes de `frame_size` bytes con tabla de saltos
+
+    Args:
+        data: Contenido lógico
+        level: Nivel de compresión de zstd
+        frame_size: Bytes lógicos por frame
+
+    Returns:
+        Contenido comprimido en formato seekable
+    """
+    cctx = zstandard.ZstdCompressor(level=level)
+    frames: List[bytes] = []
+    table: List[bytes] = []
+    for offset in range(0, max(len(data), 1), frame_size):
+        chunk = data[offset:offset + frame_size]
+        frame = cctx.compress(chunk)
+        frames.append(frame)
+        table.append(_ENTRY.pack(len(frame), len(chunk)))
+    table.append(_FOOTER.pack(len(frames), 0, SEEKABLE_MAGIC))
+    seek_table = b"".join(table)
+    return b"".join(frames) + _SKIPPABLE_HEADER.pack(SKIPPABLE_MAGIC, len(seek_table)) + seek_table
+
+def maybe_compress(data: bytes, min_size: int, level: int = 3, frame_size: int = DEFAULT_FRAME_SIZE) -> bytes:
+    """
+    Comprime solo si el contenido alcanza `min_size` bytes y se reduce
+
+    Returns:
+        Contenido comprimido en formato seekable o el original sin cambios
+    """
+    if len(data) < min_size:
+        return data
+    payload = compress(data, level=level, frame_size=frame_size)
+    return payload if len(payload) < len(data) else data
+
+def write_atomic(path: str, payload: bytes) -> None:
+    """
+    Escribe un archivo de forma atómica (temporal en el mismo directorio + rename)
+
+    Args:
+        path: Ruta del archivo
+        payload: Bytes a escribir
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+class SeekableReader:
+    """
+    Lector de un archivo zstd seekable
+
+    Lee solo la tabla de saltos al abrir; `read` y `iter_range`
+    descomprimen únicamente los frames que se solapan con el rango pedido.
+    """
+    def __init__(self, source: Union[str, BinaryIO]):
+        self._owned = isinstance(source, str)
+        self._file: BinaryIO = open(source, "rb") if self._owned else source
+        self._dctx = zstandard.ZstdDecompressor()
+        try:
+            self._frames = self._read_seek_table()
+        except Exception:
+            self.close()
+            raise
+        last = self._frames[-1] if self._frames else (0, 0, 0, 0)
+        self.size = last[2] + last[3]
+
+    def _read_seek_table(self) -> List[Tuple[int, int, int, int]]:
+        f = self._file
+        end = f.seek(0, os.SEEK_END)
+        if end < _FOOTER.size + _SKIPPABLE_HEADER.size:
+            raise SeekableFormatError("Archivo demasiado corto")
+        f.seek(end - _FOOTER.size)
+        count, descriptor, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic != SEEKABLE_MAGIC:
+            raise SeekableFormatError("Falta la tabla de saltos")
+        entry_size = _ENTRY.size + (4 if descriptor & 0x80 else 0)
+        table_size = count * entry_size + _FOOTER.size
+        table_start = end - table_size
+        if table_start - _SKIPPABLE_HEADER.size < 0:
+            raise SeekableFormatError("Tabla de saltos inválida")
+        f.seek(table_start - _SKIPPABLE_HEADER.size)
+        skippable, length = _SKIPPABLE_HEADER.unpack(f.read(_SKIPPABLE_HEADER.size))
+        if skippable != SKIPPABLE_MAGIC or length != table_size:
+            raise SeekableFormatError("Tabla de saltos inválida")
+        raw = f.read(count * entry_size)
+
+        frames = []
+        compressed_offset = decompressed_offset = 0
+        for i in range(count):
+            compressed_size, decompressed_size = _ENTRY.unpack_from(raw, i * entry_size)
+            frames.append((compressed_offset, compressed_size, decompressed_offset, decompressed_size))
+            compressed_offset += compressed_size
+            decompressed_offset += decompressed_size
+        return frames
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Descomprime un rango lógico frame a frame
+
+        Args:
+            start: Byte lógico inicial
+            end: Byte lógico final (exclusivo); por defecto el final
+
+        Returns:
+            Iterador de bloques de como mucho un frame
+        """
+        end = self.size if end is None else min(end, self.size)
+        for c_offset, c_size, d_offset, d_size in self._frames:
+            if d_offset + d_size <= start or d_size == 0:
+                continue
+            if d_offset >= end:
+                break
+            self._file.seek(c_offset)
+            try:
+                data = self._dctx.decompress(self._file.read(c_size), max_output_size=d_size)
+            except zstandard.ZstdError as e:
+                raise SeekableFormatError(f"Frame corrupto en {c_offset}: {str(e)}")
+            yield data[max(0, start - d_offset):end - d_offset]
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        """
+        Descomprime un rango lógico completo
+        """
+        return b"".join(self.iter_range(start, end))
+
+    def close(self) -> None:
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self) -> "SeekableReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_logical(path: str, limit: Optional[int] = None) -> bytes:
+    """
+    Lee el contenido lógico de un archivo, comprimido o no
+
+    Args:
+        path: Ruta del archivo
+        limit: Máximo de bytes lógicos a leer
+
+    Returns:
+        Contenido (o su prefijo si se indica limit)
+    """
+    with open(path, "rb") as f:
+        head = f.read(4)
+        if not is_compressed(head):
+            if limit is None:
+                return head + f.read()
+            return head[:limit] + f.read(max(0, limit - len(head)))
+        with SeekableReader(f) as reader:
+            return reader.read(0, limit)
+
+class DecompressionCache:
+    """
+    Caché LRU en memoria del contenido descomprimido, acotada en bytes
+
+    La clave incluye inode, mtime y tamaño del archivo comprimido, así que
+    cualquier reescritura invalida la entrada sin avisos explícitos.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get_status(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import magic
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Bytes iniciales que se pasan a libmagic para detectar el tipo de contenido
+MIME_SNIFF_BYTES = 2048
+
+class UploadTooLargeError(ValueError):
+    """El archivo subido supera el tamaño máximo"""
+    pass
+
+class MultipartFormatError(ValueError):
+    """Cuerpo multipart mal formado"""
+    pass
+
+@dataclass
+class UploadResult:
+    """Archivo subido y movido a su destino"""
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+
+class StreamingUploadWriter:
+    """
+    Escribe una subida por bloques en un archivo temporal.
+
+    Cada bloque se cuenta, se añade al hash SHA-256 y se escribe a disco al
+    llegar; se rechaza en cuanto el total supera `max_size`, sin esperar al
+    final del cuerpo. Los primeros bytes se guardan para detectar el tipo
+    MIME. `commit()` sincroniza el archivo y lo mueve atómicamente a su
+    destino; el temporal se crea en el mismo directorio para que el rename
+    no cruce sistemas de archivos.
+    """
+    def __init__(self, directory: str, max_size: int):
+        self.directory = str(directory)
+        self.max_size = max_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = bytearray()
+        os.makedirs(self.directory, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=self.directory, prefix=".upload-", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        """
+        Añade un bloque a la subida
+
+        Raises:
+            UploadTooLargeError: Si el total supera el tamaño máximo
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLargeError(f"Archivo demasiado grande. Máximo: {self.max_size} bytes")
+        if len(self._head) < MIME_SNIFF_BYTES:
+            self._head.extend(data[:MIME_SNIFF_BYTES - len(self._head)])
+        self._hash.update(data)
+        self._file.write(data)
+
+    def commit(self, destination: str) -> UploadResult:
+        """
+        Mueve la subida completa a su destino
+
+        Args:
+            destination: Ruta final del archivo
+
+        Returns:
+            UploadResult con tamaño, hash y tipo MIME
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, destination)
+        return UploadResult(
+            path=destination,
+            size=self.size,
+            sha256=self._hash.hexdigest(),
+            content_type=magic.from_buffer(bytes(self._head), mime=True)
+        )
+
+    def abort(self) -> None:
+        """
+        Descarta la subida y borra el temporal
+        """
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+async def iter_multipart(
+    stream: AsyncIterator[bytes],
+    content_type: str
+) -> AsyncIterator[Tuple[str, Optional[Dict[str, str]], bytes]]:
+    """
+    Recorre un cuerpo multipart/form-data a medida que llega
+
+    Produce eventos ("begin", cabeceras, b""), ("data", None, bloque) y
+    ("end", None, b"") por cada parte. Solo se mantiene en memoria el bloque
+    de red actual.
+
+    Args:
+        stream: Iterador asíncrono del cuerpo de la petición
+        content_type: Cabecera Content-Type de la petición
+
+    Returns:
+        Iterador asíncrono de eventos
+
+    Raises:
+        MultipartFormatError: Si falta el boundary o el cuerpo está mal formado
+    """
+    mime, options = parse_options_header(content_type or "")
+    boundary = options.get(b"boundary")
+    if mime != b"multipart/form-data" or not boundary:
+        raise MultipartFormatError("Se esperaba multipart/form-data con boundary")
+
+    events: List[Tuple[str, Optional[Dict[str, str]], bytes]] = []
+    headers: Dict[str, str] = {}
+    field = bytearray()
+    value = bytearray()
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        value.extend(data[start:end])
+
+    def on_header_end():
+        headers[field.decode("latin-1").lower()] = value.decode("latin-1")
+        field.clear()
+        value.clear()
+
+    def on_headers_finished():
+        events.append(("begin", dict(headers), b""))
+
+    def on_part_data(data, start, end):
+        events.append(("data", None, bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None, b""))
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    async for chunk in stream:
+        if not chunk:
+            continue
+        try:
+            parser.write(chunk)
+        except Exception as e:
+            raise MultipartFormatError(f"Cuerpo multipart inválido: {str(e)}")
+        for event in events:
+            yield event
+        events.clear()
+
+    parser.finalize()
+    for event in events:
+        yield event
+
+def part_filename(headers: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Obtiene el nombre del campo y del archivo de una parte multipart
+
+    Returns:
+        Tupla (campo, nombre de archivo); el nombre es None si la parte no es un archivo
+    """
+    _, options = parse_options_header(headers.get("content-disposition", ""))
+    name = options.get(b"name")
+    filename = options.get(b"filename")
+    return (
+        name.decode("utf-8", "replace") if name is not None else None,
+        os.path.basename(filename.decode("utf-8", "replace")) if filename else None
+    )
@@ -0,0 +1,77 @@
+import re
+from typing import List
+
+from app.utils.extractive_summary import STOPWORDS, normalize_word
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Sufijos flexivos y derivativos frecuentes, de más largo a más corto
+_SUFFIXES = (
+    # Español
+    "amientos", "imientos", "aciones", "uciones", "amiento", "imiento", "idades", "mente",
+    "acion", "ucion", "ables", "ibles", "istas", "ancia", "encia", "idad", "able", "ible",
+    "ista", "osos", "osas", "ivos", "ivas", "oso", "osa", "ivo", "iva", "ar", "er", "ir",
+    # Inglés
+    "ations", "ation", "ness", "ment", "ings", "ing", "ies", "ied", "ed", "ly",
+    # Plurales y vocales finales comunes a ambos
+    "es", "s", "a", "o", "e"
+)
+
+MIN_STEM_LENGTH = 3
+
+def stem(word: str) -> str:
+    """
+    Reduce una palabra normalizada a una raíz aproximada
+
+    Elimina el sufijo conocido más largo dejando al menos MIN_STEM_LENGTH
+    caracteres. No es un lematizador: busca que "búsqueda", "búsquedas" y
+    "busquedas" o "index", "indexes" e "indexing" compartan raíz.
+
+    Args:
+        word: Palabra en minúsculas y sin acentos
+
+    Returns:
+        Raíz de la palabra
+    """
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+def query_terms(query: str) -> List[str]:
+    """
+    Obtiene las raíces de una consulta, sin palabras vacías ni repetidas
+
+    Args:
+        query: Consulta en lenguaje natural
+
+    Returns:
+        Raíces en orden de aparición
+    """
+    terms: List[str] = []
+    for raw in _WORD_RE.findall(query):
+        word = normalize_word(raw)
+        if word in STOPWORDS or (len(word) < 2 and not word.isdigit()):
+            continue
+        term = stem(word)
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+def build_match_query(terms: List[str], match_all: bool = False) -> str:
+    """
+    Construye una expresión MATCH de FTS5 a partir de raíces
+
+    Cada raíz se busca como prefijo ("raíz"*), de modo que encuentra todas
+    sus formas; las raíces van entre comillas para que ningún carácter de la
+    consulta se interprete como sintaxis de FTS5.
+
+    Args:
+        terms: Raíces obtenidas con query_terms
+        match_all: Exigir todas las raíces (AND) en lugar de cualquiera (OR)
+
+    Returns:
+        Expresión MATCH
+    """
+    operator = " AND " if match_all else " OR "
+    return operator.join('"' + term.replace('"', '""') + '"*' for term in terms)
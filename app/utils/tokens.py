@@ -0,0 +1,16 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Estima el número de tokens de un texto sin llamar a la API.
+
+    Usa la aproximación habitual de ~4 caracteres por token, suficiente
+    para decidir umbrales y presupuestos.
+
+    Args:
+        text: Texto a medir
+
+    Returns:
+        Número estimado de tokens (mínimo 1 si hay texto)
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
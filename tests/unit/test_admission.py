@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.admission import AdmissionController
+
+class TestAdmissionController:
+    """Pruebas unitarias para el control de admisión de llamadas a Claude"""
+
+    def test_latency_ewma(self):
+        """Prueba la actualización de la media móvil de latencia"""
+        controller = AdmissionController(max_concurrency=2, latency_slo=5, initial_latency=1.0, alpha=0.5)
+        controller.record_latency(3.0)
+        assert controller.latency == 2.0
+
+    @pytest.mark.asyncio
+    async def test_degrades_when_queue_exceeds_slo(self):
+        """Prueba que se degrada sólo cuando la cola haría incumplir el SLO"""
+        controller = AdmissionController(max_concurrency=1, latency_slo=1.5, initial_latency=1.0)
+        assert not controller.should_degrade()
+
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.slot():
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert controller.estimated_latency() == 2.0
+        assert controller.should_degrade()
+
+        release.set()
+        await task
+        assert not controller.should_degrade()
+        assert controller.get_status()["degraded_total"] == 1
+
+    def test_disabled(self):
+        """Prueba que desactivado nunca degrada"""
+        controller = AdmissionController(max_concurrency=1, latency_slo=0.0, enabled=False)
+        assert not controller.should_degrade()
+
+    @pytest.mark.asyncio
+    async def test_never_degrades_with_free_slot(self):
+        """Prueba que con un hueco libre no se degrada aunque la media supere el SLO"""
+        controller = AdmissionController(max_concurrency=2, latency_slo=1.0, initial_latency=5.0)
+        assert not controller.should_degrade()
+
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.slot():
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert not controller.should_degrade()
+        release.set()
+        await task
+        assert controller.get_status()["degraded_total"] == 0
+
+    def test_latency_by_call_class(self):
+        """Prueba que las llamadas largas de una clase no alteran la media de otra"""
+        controller = AdmissionController(max_concurrency=1, latency_slo=5, initial_latency=1.0, alpha=0.5)
+        controller.record_latency(9.0, "generate_markdown")
+        controller.record_latency(1.0, "analysis")
+
+        assert controller.class_latency("generate_markdown") == 5.0
+        assert controller.class_latency("analysis") == 1.0
+        # La espera en la cola sí depende de todas las llamadas
+        assert controller.latency == 3.0
+        assert controller.get_status()["latency_ewma_by_class"] == {"generate_markdown": 5.0, "analysis": 1.0}
+
+    @pytest.mark.asyncio
+    async def test_periodic_probe(self):
+        """Prueba que mientras se degrada se deja pasar una sonda por intervalo"""
+        controller = AdmissionController(
+            max_concurrency=1, latency_slo=1.5, initial_latency=1.0, probe_interval=30
+        )
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.slot("generate_markdown"):
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with patch("app.core.admission.time.monotonic", return_value=1000.0):
+            assert controller.should_degrade("analysis")
+        with patch("app.core.admission.time.monotonic", return_value=1029.0):
+            assert controller.should_degrade("analysis")
+        with patch("app.core.admission.time.monotonic", return_value=1030.0):
+            assert not controller.should_degrade("analysis")
+            assert controller.should_degrade("analysis")
+
+        release.set()
+        await task
+        assert controller.get_status()["probes_total"] == 1
+        assert controller.get_status()["degraded_total"] == 3
@@ -0,0 +1,47 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from app.core.claude_client import ClaudeClient
+
+def make_client(statuses):
+    """Cliente cuyas peticiones responden con los códigos indicados, en orden"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        status_code = statuses[min(len(calls), len(statuses)) - 1]
+        body = {"content": [{"type": "text", "text": "ok"}], "usage": {}} if status_code == 200 else {}
+        return httpx.Response(status_code, json=body)
+
+    client = ClaudeClient()
+    client.async_http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, calls
+
+class TestCreateMessageRetries:
+    """Pruebas de los reintentos de create_message"""
+
+    @pytest.fixture(autouse=True)
+    def no_wait(self):
+        with patch("asyncio.sleep"):
+            yield
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code", [400, 401, 413])
+    async def test_client_errors_are_not_retried(self, status_code):
+        """Prueba que los errores 4xx (salvo 429) fallan sin reintentar"""
+        client, calls = make_client([status_code])
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.create_message([{"role": "user", "content": "Hola"}])
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code", [429, 529])
+    async def test_transient_errors_are_retried(self, status_code):
+        """Prueba que 429 y 5xx se reintentan"""
+        client, calls = make_client([status_code, 200])
+
+        result = await client.create_message([{"role": "user", "content": "Hola"}])
+
+        assert result["content"][0]["text"] == "ok"
+        assert len(calls) == 2
@@ -0,0 +1,108 @@
+import uuid
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.api.endpoints import claude as claude_endpoints
+from app.core.config import settings
+from app.schemas.claude import SessionCreateRequest, SessionMessageRequest
+from app.services.claude_service import get_claude_service
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.incremental_analysis import get_incremental_analysis_service
+from app.services.session_service import get_session_service
+
+USER = {"api_key": "clave-a"}
+
+def make_document(paragraphs: int = 40) -> list:
+    """Párrafos únicos en cada ejecución para no reutilizar análisis de la caché"""
+    run = uuid.uuid4().hex
+    return [
+        f"## Sección {i} ({run})\n\n" + " ".join(f"palabra{i}-{j}-{run}" for j in range(60))
+        for i in range(paragraphs)
+    ]
+
+class TestAnalyzeFileEndpoint:
+    """Análisis incremental de /claude/analyze-file con el servicio real"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def claude(self, tmp_path, monkeypatch):
+        """Fixture con DATA_DIR temporal y el cliente de Claude simulado"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        (tmp_path / "data").mkdir()
+
+        client = MagicMock()
+        client.analyze_text = AsyncMock(side_effect=lambda text, analysis_type: {"content": f"Resumen de {len(text)} caracteres"})
+        get_claude_service.cache_clear()
+        get_incremental_analysis_service.cache_clear()
+        with patch("app.services.claude_service.get_claude_client", return_value=client):
+            yield client
+        get_claude_service.cache_clear()
+        get_incremental_analysis_service.cache_clear()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_only_changed_chunks_reach_claude(self, claude, tmp_path):
+        """Prueba que tras editar un párrafo solo sus fragmentos se vuelven a enviar a Claude"""
+        path = tmp_path / "data" / "informe.md"
+        paragraphs = make_document()
+        path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+        first = await claude_endpoints.analyze_file("informe.md", "summary", current_user=USER)
+        first_texts = {call.args[0] for call in claude.analyze_text.await_args_list}
+        assert first["chunks_total"] > 2
+        assert first["chunks_analyzed"] == first["chunks_total"] == claude.analyze_text.await_count
+
+        paragraphs[len(paragraphs) // 2] += " Frase añadida en la revisión."
+        path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+        claude.analyze_text.reset_mock()
+
+        second = await claude_endpoints.analyze_file("informe.md", "summary", current_user=USER)
+        sent = [call.args[0] for call in claude.analyze_text.await_args_list]
+        assert 0 < second["chunks_analyzed"] == len(sent) < second["chunks_total"]
+        assert second["chunks_cached"] == second["chunks_total"] - second["chunks_analyzed"]
+        assert any("Frase añadida en la revisión." in text for text in sent)
+        assert not first_texts.intersection(sent)
+
+class TestSessionEndpoints:
+    """Sesiones de conversación a través de los endpoints con el servicio real"""
+
+    @pytest.fixture(autouse=True)
+    def claude(self):
+        """Fixture con el cliente de Claude simulado"""
+        client = MagicMock()
+        client.generate_chat_response = AsyncMock(return_value={
+            "content": "Hola, ¿en qué puedo ayudarte?",
+            "tokens_used": 12,
+            "model": "claude-test"
+        })
+        get_session_service.cache_clear()
+        with patch("app.services.session_service.get_claude_client", return_value=client):
+            yield client
+        get_session_service.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_create_and_reply(self, claude):
+        """Prueba crear una sesión, enviar un mensaje y recibir la respuesta"""
+        session = await claude_endpoints.create_session(SessionCreateRequest(system="Responde en español"), current_user=USER)
+
+        reply = await claude_endpoints.send_session_message(
+            session["session_id"],
+            SessionMessageRequest(message="Hola"),
+            current_user=USER
+        )
+
+        assert reply.session_id == session["session_id"]
+        assert reply.content == "Hola, ¿en qué puedo ayudarte?"
+        assert reply.tokens_used == 12
+        assert reply.context_tokens > 0
+        messages = claude.generate_chat_response.await_args.args[0]
+        assert messages == [{"role": "user", "content": "Hola"}]
+        assert claude.generate_chat_response.await_args.kwargs["system"] == "Responde en español"
+
+        stored = await claude_endpoints.get_session(session["session_id"], current_user=USER)
+        assert [m["role"] for m in stored["messages"]] == ["user", "assistant"]
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import patch
+from app.core.config import settings
+from app.api.endpoints import mcp as mcp_endpoints
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.mcp_protocol import INVALID_REQUEST
+from app.services.mcp_service import MCPService
+
+class TestMCPExecuteBatch:
+    """Lotes JSON-RPC de /mcp/execute contra el MCPService real"""
+
+    @pytest.fixture(autouse=True)
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con DATA_DIR temporal, un documento y la caché de estado vacía"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "notas.md").write_text("# Notas\n\nEl lote se ejecuta en paralelo.\n", encoding="utf-8")
+        service = MCPService()
+        with patch.object(mcp_endpoints, "mcp_service", service):
+            yield service
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_mixed_batch(self):
+        """Prueba un lote con status, list_resources, execute, una notificación y una entrada no válida"""
+        responses = await mcp_endpoints._execute_batch([
+            {"method": "status", "params": {}, "id": "estado"},
+            {"method": "list_resources", "params": {}, "id": 2},
+            {"method": "execute", "params": {"tool": "buscar_en_archivos", "params": {"query": "lote"}}, "id": 3},
+            {"method": "execute", "params": {"tool": "buscar_en_archivos", "params": {"query": "lote"}}},
+            {"params": {}, "id": 5}
+        ])
+
+        assert [response.id for response in responses] == ["estado", 2, 3, 5]
+        status, resources, search, invalid = responses
+        assert status.error is None
+        assert "analizar_texto" in status.result["tools"]
+        assert resources.error is None
+        assert search.error is None
+        assert [r["filename"] for r in search.result["results"]] == ["notas.md"]
+        assert invalid.error.code == INVALID_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_only_notifications(self):
+        """Prueba que un lote de solo notificaciones se ejecuta y responde 202 sin cuerpo"""
+        with patch.object(MCPService, "get_status", wraps=mcp_endpoints.mcp_service.get_status) as get_status:
+            response = await mcp_endpoints._execute_batch([{"method": "status", "params": {}}])
+
+        assert response.status_code == 202
+        assert response.body == b""
+        get_status.assert_awaited_once()
@@ -0,0 +1,166 @@
+import io
+import os
+import json
+import asyncio
+import pytest
+from app.core.config import settings
+from app.mcp_stdio import MCPStdioServer
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.mcp_protocol import INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR
+from app.schemas.mcp import MCPError, MCPResponse
+from app.utils.progress import report_partial, report_progress
+
+class FakeMCPService:
+    """MCPService mínimo: la herramienta espera lo que indique `delay`"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def process_request(self, request):
+        params = request.params["params"]
+        self.calls.append(request.params["tool"])
+        await asyncio.sleep(params.get("delay", 0))
+        for i, chunk in enumerate(params.get("chunks", [])):
+            report_partial(chunk)
+            report_progress(i + 1, len(params["chunks"]))
+        if params.get("fail"):
+            return MCPResponse(id=request.id, error=MCPError(code=500, message="fallo"), execution_time=0)
+        return MCPResponse(id=request.id, result={"eco": params.get("query")}, execution_time=0)
+
+class TestMCPStdioServer:
+    """Pruebas unitarias para el transporte MCP por stdio"""
+
+    async def _exchange(self, messages, service=None):
+        output = io.BytesIO()
+        server = MCPStdioServer(service=service or FakeMCPService(), output=output)
+        reader = asyncio.StreamReader()
+        for message in messages:
+            reader.feed_data((message if isinstance(message, str) else json.dumps(message)).encode() + b"\n")
+        reader.feed_eof()
+        await server.serve(reader)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    @pytest.mark.asyncio
+    async def test_initialize_and_list_tools(self):
+        """Prueba el saludo inicial y el listado desde el registro de herramientas"""
+        responses = await self._exchange([
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2024-11-05"}},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+        ])
+        by_id = {r["id"]: r for r in responses}
+        assert len(responses) == 2
+        assert by_id[1]["result"]["protocolVersion"] == "2024-11-05"
+        tools = {tool["name"]: tool for tool in by_id[2]["result"]["tools"]}
+        assert tools["buscar_en_archivos"]["inputSchema"]["required"] == ["query"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_keep_ids(self):
+        """Prueba que las llamadas en curso se solapan y cada respuesta lleva su id"""
+        responses = await self._exchange([
+            {"jsonrpc": "2.0", "id": "lenta", "method": "tools/call",
+             "params": {"name": "buscar_en_archivos", "arguments": {"query": "a", "delay": 0.05}}},
+            {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+             "params": {"name": "buscar_en_archivos", "arguments": {"query": "b"}}}
+        ])
+        assert [r["id"] for r in responses] == [7, "lenta"]
+        assert json.loads(responses[1]["result"]["content"][0]["text"]) == {"eco": "a"}
+
+    @pytest.mark.asyncio
+    async def test_cancellation(self):
+        """Prueba que una petición cancelada no responde"""
+        service = FakeMCPService()
+        output = io.BytesIO()
+        server = MCPStdioServer(service=service, output=output)
+        server.handle_line(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                                       "params": {"name": "buscar_en_archivos", "arguments": {"delay": 10}}}).encode())
+        await asyncio.sleep(0)
+        assert server.in_flight == 1
+        server.handle_line(json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled",
+                                       "params": {"requestId": 1}}).encode())
+        await asyncio.sleep(0.01)
+        assert server.in_flight == 0
+        assert output.getvalue() == b""
+
+    @pytest.mark.asyncio
+    async def test_errors(self):
+        """Prueba los errores de protocolo y los de herramienta"""
+        responses = await self._exchange([
+            "{no es json",
+            {"jsonrpc": "2.0", "id": 1, "method": "desconocido"},
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "no_existe"}},
+            {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+             "params": {"name": "buscar_en_archivos", "arguments": {"fail": True}}},
+            {"jsonrpc": "2.0", "id": [4], "method": "tools/list"},
+            {"jsonrpc": "2.0", "id": {"n": 5}, "method": "tools/list"},
+            {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": [3]}},
+            {"jsonrpc": "2.0", "id": 6, "method": "tools/list"}
+        ])
+        errors = [r["error"]["code"] for r in responses if r["id"] is None]
+        by_id = {r["id"]: r for r in responses if r["id"] is not None}
+        assert errors.count(PARSE_ERROR) == 1
+        # Los ids no válidos se rechazan sin detener el bucle de lectura
+        assert errors.count(INVALID_REQUEST) == 2
+        assert "tools" in by_id[6]["result"]
+        assert by_id[1]["error"]["code"] == METHOD_NOT_FOUND
+        assert by_id[2]["error"]["code"] == INVALID_PARAMS
+        assert by_id[3]["result"]["isError"] is True
+
+    @pytest.mark.asyncio
+    async def test_progress_notifications(self):
+        """Prueba que con progressToken se notifican avance y parciales antes de la respuesta"""
+        call = {"name": "generar_markdown", "arguments": {"chunks": ["# Tí", "tulo"]}}
+        responses = await self._exchange([
+            {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {**call, "_meta": {"progressToken": "p1"}}},
+        ])
+        assert [r.get("method") for r in responses] == [
+            "notifications/partial_result", "notifications/progress",
+            "notifications/partial_result", "notifications/progress", None
+        ]
+        assert responses[2]["params"] == {"progressToken": "p1", "data": "tulo"}
+        assert responses[3]["params"] == {"progressToken": "p1", "progress": 2, "total": 2}
+        assert responses[4]["id"] == 1
+
+        # Sin token no se envían notificaciones
+        responses = await self._exchange([{"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": call}])
+        assert [r["id"] for r in responses] == [2]
+
+class TestMCPStdioServerEndToEnd:
+    """Prueba de humo del transporte stdio con el MCPService real"""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        """Fixture con DATA_DIR temporal y un documento"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        os.makedirs(settings.DATA_DIR)
+        with open(os.path.join(settings.DATA_DIR, "notas.md"), "w", encoding="utf-8") as f:
+            f.write("# Notas\n\nEl servidor stdio responde a tools/call.\n")
+        yield settings.DATA_DIR
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_tools_call(self, data_dir):
+        """Prueba tools/call de principio a fin: stdin, MCPService y respuesta por stdout"""
+        from app.services.mcp_service import MCPService
+
+        output = io.BytesIO()
+        server = MCPStdioServer(service=MCPService(), output=output)
+        reader = asyncio.StreamReader()
+        reader.feed_data(json.dumps({
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "buscar_en_archivos", "arguments": {"query": "servidor"}}
+        }).encode() + b"\n")
+        reader.feed_eof()
+        await server.serve(reader)
+
+        [response] = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert response["id"] == 1
+        assert response["result"]["isError"] is False
+        result = json.loads(response["result"]["content"][0]["text"])
+        assert [r["filename"] for r in result["results"]] == ["notas.md"]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from starlette.requests import Request
+from app.api.endpoints import mcp as mcp_endpoints
+
+def make_request(message, session_id=None, api_key="clave-a"):
+    """Construye la petición HTTP a /mcp/stream con las cabeceras del cliente"""
+    headers = {"content-type": "application/json", "x-api-key": api_key}
+    if session_id:
+        headers["mcp-session-id"] = session_id
+    body = json.dumps(message).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/mcp/stream",
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()]
+    }, receive)
+
+def call(request_id):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": "buscar_en_archivos", "arguments": {"query": "x"}}}
+
+def cancel(request_id):
+    return {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": request_id}}
+
+class TestMCPStreamCancellation:
+    """Pruebas del ámbito de las peticiones en curso del transporte SSE"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def slow_protocol(self):
+        async def handle(method, params, notify=None, progress_token=None):
+            await asyncio.sleep(10)
+
+        with patch.object(mcp_endpoints.mcp_protocol, "handle", side_effect=handle):
+            yield
+        tasks = list(mcp_endpoints._stream_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert mcp_endpoints._stream_tasks == {}
+
+    async def _running_tasks(self):
+        await asyncio.sleep(0)
+        return [task for task in mcp_endpoints._stream_tasks.values() if not task.done()]
+
+    @pytest.mark.asyncio
+    async def test_same_id_in_other_sessions(self):
+        """Prueba que dos sesiones pueden usar el mismo id sin conflicto"""
+        first = await mcp_endpoints.stream_mcp(make_request(call(1), session_id="s1"))
+        second = await mcp_endpoints.stream_mcp(make_request(call(1), session_id="s2"))
+        duplicate = await mcp_endpoints.stream_mcp(make_request(call(1), session_id="s1"))
+
+        assert first.media_type == second.media_type == "text/event-stream"
+        assert duplicate.status_code == 409
+        assert len(await self._running_tasks()) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_only_from_same_scope(self):
+        """Prueba que solo se cancela desde la misma sesión y API key"""
+        await mcp_endpoints.stream_mcp(make_request(call("tarea"), session_id="s1"))
+        [task] = await self._running_tasks()
+
+        for other in (make_request(cancel("tarea"), session_id="s2"),
+                      make_request(cancel("tarea"), session_id="s1", api_key="clave-b"),
+                      make_request(cancel("tarea"))):
+            response = await mcp_endpoints.stream_mcp(other)
+            assert response.status_code == 202
+        await asyncio.sleep(0)
+        assert not task.done()
+
+        await mcp_endpoints.stream_mcp(make_request(cancel("tarea"), session_id="s1"))
+        await asyncio.wait([task], timeout=1)
+        assert task.done()
+        assert mcp_endpoints._stream_tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_invalid_ids(self):
+        """Prueba que los ids no escalares se rechazan sin lanzar TypeError"""
+        response = await mcp_endpoints.stream_mcp(make_request(call([1])))
+        assert response.status_code == 400
+        assert json.loads(response.body)["error"]["code"] == mcp_endpoints.INVALID_REQUEST
+
+        response = await mcp_endpoints.stream_mcp(make_request(cancel({"id": 1})))
+        assert response.status_code == 202
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from app.schemas.mcp import MCPAgentRequest, MCPResponse, MCPError
+from app.services.agent_service import AgentService
+
+def tool_use_response(*blocks):
+    return {
+        "content": [{"type": "tool_use", "id": f"tu_{i}", "name": name, "input": params}
+                    for i, (name, params) in enumerate(blocks)],
+        "stop_reason": "tool_use",
+        "usage": {"input_tokens": 10, "output_tokens": 5}
+    }
+
+FINAL_RESPONSE = {
+    "content": [{"type": "text", "text": "Respuesta final"}],
+    "stop_reason": "end_turn",
+    "usage": {"input_tokens": 20, "output_tokens": 8}
+}
+
+class TestAgentService:
+    """Pruebas unitarias para el bucle de agente"""
+
+    @pytest.fixture
+    def mock_client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def mock_mcp_service(self):
+        service = MagicMock()
+        service.process_request = AsyncMock(side_effect=lambda request: MCPResponse(
+            id=request.id,
+            result={"tool": request.params["tool"]},
+            execution_time=0.0
+        ))
+        return service
+
+    @pytest.fixture
+    def agent(self, mock_client, mock_mcp_service):
+        with patch("app.services.agent_service.get_claude_client", return_value=mock_client):
+            yield AgentService(mock_mcp_service)
+
+    def test_tool_schema(self, agent):
+        """Prueba la conversión de mcp_tools al formato de Claude"""
+        tools = {t["name"]: t for t in agent.get_tools()}
+
+        search = tools["buscar_en_brave"]["input_schema"]
+        assert search["type"] == "object"
+        assert search["required"] == ["query"]
+        assert "num_results" in search["properties"]
+
+    @pytest.mark.asyncio
+    async def test_runs_tools_in_parallel(self, agent, mock_client, mock_mcp_service):
+        """Prueba que los tool_use de una ronda se ejecutan en paralelo"""
+        both_started = asyncio.Event()
+        running = []
+
+        async def process_request(request):
+            running.append(request.id)
+            if len(running) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return MCPResponse(id=request.id, result={"ok": True}, execution_time=0.0)
+
+        mock_mcp_service.process_request = AsyncMock(side_effect=process_request)
+        mock_client.create_message = AsyncMock(side_effect=[
+            tool_use_response(("buscar_en_brave", {"query": "a"}), ("analizar_texto", {"text": "b"})),
+            FINAL_RESPONSE
+        ])
+
+        response = await agent.run(MCPAgentRequest(prompt="Investiga"))
+
+        assert response.content == "Respuesta final"
+        assert response.iterations == 2
+        assert response.tokens_used == 43
+        assert [c.name for c in response.tool_calls] == ["buscar_en_brave", "analizar_texto"]
+
+        # La segunda llamada a Claude incluye los resultados de ambas herramientas
+        messages = mock_client.create_message.call_args_list[1].args[0]
+        assert [b["tool_use_id"] for b in messages[-1]["content"]] == ["tu_0", "tu_1"]
+
+    @pytest.mark.asyncio
+    async def test_tool_errors_are_reported(self, agent, mock_client, mock_mcp_service):
+        """Prueba que los errores de herramienta se devuelven a Claude"""
+        mock_mcp_service.process_request = AsyncMock(return_value=MCPResponse(
+            error=MCPError(code=500, message="fallo"),
+            execution_time=0.0
+        ))
+        mock_client.create_message = AsyncMock(side_effect=[
+            tool_use_response(("analizar_texto", {"text": "x"}), ("desconocida", {})),
+            FINAL_RESPONSE
+        ])
+
+        response = await agent.run(MCPAgentRequest(prompt="Analiza"))
+
+        assert all(call.is_error for call in response.tool_calls)
+        results = mock_client.create_message.call_args_list[1].args[0][-1]["content"]
+        assert results[0]["content"] == "fallo"
+        assert "desconocida" in results[1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_max_iterations(self, agent, mock_client):
+        """Prueba que el bucle se detiene al alcanzar el máximo de rondas"""
+        mock_client.create_message = AsyncMock(
+            return_value=tool_use_response(("analizar_texto", {"text": "x"}))
+        )
+
+        response = await agent.run(MCPAgentRequest(prompt="Bucle", max_iterations=2))
+
+        assert response.stop_reason == "max_iterations"
+        assert mock_client.create_message.call_count == 2
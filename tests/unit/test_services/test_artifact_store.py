@@ -0,0 +1,96 @@
+import os
+import pytest
+from app.core.config import settings
+from app.services.artifact_store import BLOB_DIR, DEDUPLICATED, STORED, UNCHANGED, ArtifactStore
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.filesystem_service import FileSystemService, get_artifact_store
+from app.schemas.filesystem import FilePatchRequest
+
+class TestArtifactStore:
+    """Pruebas unitarias para el almacén deduplicado de artefactos"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Fixture con un almacén sobre un directorio temporal"""
+        store = ArtifactStore(str(tmp_path))
+        yield store
+        store.close()
+
+    def _blobs(self, tmp_path):
+        return [name for _, _, files in os.walk(tmp_path / BLOB_DIR) for name in files]
+
+    def test_identical_content_stored_once(self, store, tmp_path):
+        """Prueba que el mismo contenido bajo varios nombres ocupa un blob"""
+        assert store.put("a.md", b"# Informe\n")["status"] == STORED
+        assert store.put("b.md", b"# Informe\n")["status"] == DEDUPLICATED
+        assert store.put("a.md", b"# Informe\n")["status"] == UNCHANGED
+
+        assert (tmp_path / "b.md").read_bytes() == b"# Informe\n"
+        assert len(self._blobs(tmp_path)) == 1
+        status = store.get_status()
+        assert status["names"] == 2
+        assert status["blobs"] == 1
+        assert status["dedup_ratio"] == 2.0
+
+    def test_unchanged_does_not_write(self, store, tmp_path):
+        """Prueba que guardar un contenido existente no toca el archivo"""
+        store.put("a.md", b"contenido")
+        before = os.stat(tmp_path / "a.md")
+        store.put("a.md", b"contenido")
+        after = os.stat(tmp_path / "a.md")
+        assert (before.st_ino, before.st_mtime_ns) == (after.st_ino, after.st_mtime_ns)
+
+    def test_refcount(self, store, tmp_path):
+        """Prueba que el blob se elimina con la última referencia"""
+        store.put("a.md", b"uno")
+        store.put("b.md", b"uno")
+        store.put("a.md", b"dos")
+        assert len(self._blobs(tmp_path)) == 2
+        assert store.release("b.md")
+        assert len(self._blobs(tmp_path)) == 1
+        # El nombre liberado conserva su contenido
+        assert (tmp_path / "b.md").read_bytes() == b"uno"
+        assert not store.release("b.md")
+        assert store.get_status()["names"] == 1
+
+class TestFileSystemArtifacts:
+    """Pruebas de integración del servicio de archivos con artefactos"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con el servicio de archivos sobre directorios temporales"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path / "logs"))
+        monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        get_artifact_store.cache_clear()
+        yield FileSystemService()
+        get_artifact_store().close()
+        get_artifact_store.cache_clear()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_modifying_one_name_keeps_the_other(self, service):
+        """Prueba que modificar un artefacto no altera los que comparten blob"""
+        await service.save_artifact("a.md", "# Igual\n")
+        second = await service.save_artifact("b.md", "# Igual\n")
+        assert second.message == "Artefacto guardado (deduplicated)"
+
+        await service.patch_file("a.md", FilePatchRequest(type="append", content="más\n"))
+        await service.update_file("b.md", "otro")
+        await service.save_artifact("c.md", "# Igual\n")
+
+        assert (await service.read_file("a.md")).content == "# Igual\nmás\n"
+        assert (await service.read_file("b.md")).content == "otro"
+        assert (await service.read_file("c.md")).content == "# Igual\n"
+        assert get_artifact_store().get_status()["names"] == 1
+
+        assert (await service.delete_file("c.md")).success
+        assert get_artifact_store().get_status()["blobs"] == 0
+        assert [f.filename for f in (await service.list_files()).files] == ["a.md", "b.md"]
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from app.core.exceptions import SearchRateLimitError
+from app.services.brave_quota import BraveQuota, take_token, parse_rate_limit_header
+
+class TestBraveQuota:
+    """Pruebas unitarias para la cuota de Brave Search"""
+
+    @pytest.fixture
+    def quota(self):
+        """Cuota con bucket local (sin Redis)"""
+        quota = BraveQuota(cache=object())
+        quota.rate, quota.capacity, quota.max_wait = 10.0, 2.0, 0.5
+        return quota
+
+    def test_take_token(self):
+        """Prueba la ráfaga, la reposición y el bloqueo del bucket"""
+        state = {}
+        assert take_token(state, rate=1.0, capacity=2.0, now=0.0) == (True, 0.0)
+        assert take_token(state, rate=1.0, capacity=2.0, now=0.0) == (True, 0.0)
+        granted, wait = take_token(state, rate=1.0, capacity=2.0, now=0.0)
+        assert not granted and wait == pytest.approx(1.0)
+        assert take_token(state, rate=1.0, capacity=2.0, now=1.0)[0]
+
+        state["blocked_until"] = 5.0
+        assert take_token(state, rate=1.0, capacity=2.0, now=3.0) == (False, 2.0)
+
+    def test_parse_rate_limit_header(self):
+        """Prueba el formato de ventanas separado por comas"""
+        assert parse_rate_limit_header("1, 15000") == [1, 15000]
+        assert parse_rate_limit_header(None) == []
+
+    @pytest.mark.asyncio
+    async def test_acquire_queues_briefly(self, quota):
+        """Prueba que sin tokens se espera en lugar de fallar"""
+        await quota.acquire()
+        await quota.acquire()
+        waited = await quota.acquire()
+        assert 0.05 <= waited <= 0.5
+
+    @pytest.mark.asyncio
+    async def test_exhausted_quota_fails_fast(self, quota):
+        """Prueba que una cuota mensual agotada falla sin esperar"""
+        quota.update_from_headers({
+            "X-RateLimit-Limit": "1, 15000",
+            "X-RateLimit-Remaining": "1, 0",
+            "X-RateLimit-Reset": "1, 86400"
+        }, 200)
+
+        assert quota.get_status()["windows"]["month"]["remaining"] == 0
+        with patch("app.services.brave_quota.asyncio.sleep") as sleep:
+            with pytest.raises(SearchRateLimitError) as exc_info:
+                await quota.acquire()
+        sleep.assert_not_called()
+        assert exc_info.value.status_code == 429
+
+    @pytest.mark.asyncio
+    async def test_429_blocks_bucket(self, quota):
+        """Prueba que un 429 bloquea el bucket durante Retry-After"""
+        quota.update_from_headers({"Retry-After": "0.2"}, 429)
+        waited = await quota.acquire()
+        assert waited >= 0.15
@@ -0,0 +1,167 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.services.brave_search import BraveSearch
+from app.services.search_cache import SearchResultCache
+from app.services.brave_quota import BraveQuota
+from app.schemas.search import SearchAnalysis
+
+BRAVE_RESPONSE = {
+    "web": {
+        "results": [
+            {"title": "Python", "url": "https://python.org", "description": "Lenguaje", "source": "python.org"}
+        ]
+    }
+}
+
+RESULTS_BY_QUERY = {
+    "python async": [
+        {"title": "asyncio", "url": "https://docs.python.org/3/library/asyncio.html", "description": "E/S asíncrona", "source": "python.org"},
+        {"title": "aiohttp", "url": "https://docs.aiohttp.org", "description": "Cliente HTTP", "source": "aiohttp.org"}
+    ],
+    "python concurrencia": [
+        {"title": "asyncio", "url": "http://www.docs.python.org/3/library/asyncio.html/", "description": "E/S asíncrona", "source": "python.org"},
+        {"title": "threading", "url": "https://docs.python.org/3/library/threading.html", "description": "Hilos", "source": "python.org"}
+    ]
+}
+
+class FakeCache:
+    """Caché en memoria con la interfaz get/set de Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.values[key] = value
+        return True
+
+class TestBraveSearch:
+    """Pruebas unitarias para el cliente de Brave Search"""
+
+    @pytest_asyncio.fixture
+    async def brave_server(self):
+        """Servidor local que imita la API y registra las conexiones usadas"""
+        peers = []
+
+        async def handler(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            assert request.headers["X-Subscription-Token"] == "test-key"
+            query = request.query["q"]
+            if query == "limite" and len(peers) == 1:
+                return web.json_response({}, status=429, headers={"Retry-After": "0.1"})
+            if query == "falla":
+                return web.json_response({"error": "fallo"}, status=500)
+            if query in RESULTS_BY_QUERY:
+                return web.json_response({"web": {"results": RESULTS_BY_QUERY[query]}})
+            return web.json_response(BRAVE_RESPONSE)
+
+        app = web.Application()
+        app.router.add_get("/search", handler)
+        server = TestServer(app)
+        await server.start_server()
+        yield server, peers
+        await server.close()
+
+    @pytest_asyncio.fixture
+    async def brave_search(self, brave_server):
+        server, _ = brave_server
+        quota = BraveQuota(cache=object())
+        quota.rate, quota.capacity = 100.0, 10.0
+        service = BraveSearch(result_cache=SearchResultCache(FakeCache()), quota=quota)
+        service.api_key = "test-key"
+        service.headers["X-Subscription-Token"] = "test-key"
+        service.BASE_URL = str(server.make_url("/search"))
+        yield service
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_searches_reuse_connection(self, brave_search, brave_server):
+        """Prueba que búsquedas sucesivas reutilizan la conexión keep-alive"""
+        _, peers = brave_server
+
+        for query in ("python", "redis", "fastapi"):
+            response = await brave_search.search(query)
+            assert response.total_results == 1
+            assert response.results[0].url == "https://python.org"
+
+        assert len(peers) == 3
+        assert len(set(peers)) == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_served_from_cache(self, brave_search, brave_server):
+        """Prueba que una consulta equivalente no vuelve a la red"""
+        _, peers = brave_server
+
+        first = await brave_search.search("Python  Async")
+        second = await brave_search.search("python async", country="es")
+
+        assert (first.cache_status, second.cache_status) == ("miss", "hit")
+        assert second.query == "python async"
+        assert len(peers) == 1
+
+    @pytest.mark.asyncio
+    async def test_close_and_reopen(self, brave_search):
+        """Prueba que la sesión se reabre tras cerrarse"""
+        await brave_search.start()
+        session = brave_search._session
+        await brave_search.close()
+        assert session.closed
+
+        response = await brave_search.search("reabrir")
+        assert response.total_results == 1
+        assert brave_search._session is not session
+
+    @pytest.mark.asyncio
+    async def test_batch_search_merges_and_isolates_errors(self, brave_search):
+        """Prueba la fusión de varias consultas y el aislamiento de errores"""
+        response = await brave_search.batch_search(["python async", "python concurrencia", "falla"])
+
+        assert response.queries == ["python async", "python concurrencia", "falla"]
+        assert "falla" in response.errors
+        assert [r.title for r in response.results][0] == "asyncio"
+        assert response.results[0].queries == ["python async", "python concurrencia"]
+        assert response.total_results == 3
+
+    @pytest.mark.asyncio
+    async def test_iter_search_many_limits(self, brave_search):
+        """Prueba la validación del número de consultas"""
+        with pytest.raises(ValueError):
+            async for _ in brave_search.iter_search_many(["  "]):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_429_waits_and_retries(self, brave_search, brave_server):
+        """Prueba que un 429 bloquea la cuota y la búsqueda se reintenta"""
+        _, peers = brave_server
+
+        response = await brave_search.search("limite")
+
+        assert response.total_results == 1
+        assert len(peers) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query,filename", [
+        ("análisis de código", "search_analysis_analisis_de_codigo.md"),
+        ("日本語 ٣ ../etc", "search_analysis_etc.md"),
+        ("日本語", "search_analysis_consulta.md")
+    ])
+    async def test_analysis_filename_is_ascii(self, brave_search, query, filename):
+        """Prueba que el nombre del archivo de análisis solo contiene caracteres ASCII seguros"""
+        submitted = []
+
+        class FakeQueue:
+            async def submit(self, kind, payload):
+                submitted.append((kind, payload))
+
+        brave_search.persistence_queue = FakeQueue()
+        analysis = SearchAnalysis(summary="Resumen", key_points=[], relevance_score=1.0, suggested_queries=[])
+
+        await brave_search._save_analysis_to_markdown(query, analysis)
+
+        kind, payload = submitted[0]
+        assert kind == "search_analysis"
+        assert payload["filename"] == filename
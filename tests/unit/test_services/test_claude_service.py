@@ -0,0 +1,91 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from app.core.config import settings
+from app.services.claude_service import ClaudeService
+
+# Documento por encima de EDIT_TARGETED_MIN_SIZE: en modo auto se edita por parches
+FILLER = "Texto de relleno que no cambia. " * 60
+LARGE_DOCUMENT = f"""# Instalación
+
+Ejecuta pip install.
+
+{FILLER}
+
+# Uso
+
+Arranca el servidor con run.py.
+
+{FILLER * 2}
+"""
+
+def chat_response(content):
+    return {"content": content, "input_tokens": 7, "output_tokens": 3, "tokens_used": 10, "model": "test-model"}
+
+class TestClaudeServiceEditMarkdown:
+    """Pruebas de edit_markdown con un cliente de Claude simulado"""
+
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.generate_chat_response = AsyncMock()
+        return client
+
+    @pytest.fixture
+    def service(self, client):
+        with patch("app.services.claude_service.get_claude_client", return_value=client), \
+                patch("app.services.claude_service.get_cache", return_value=MagicMock()), \
+                patch("app.services.claude_service.MetricsCollector"), \
+                patch("app.services.claude_service.MarkdownLogger"):
+            yield ClaudeService()
+
+    def prompts(self, client):
+        return [call.args[0][0]["content"] for call in client.generate_chat_response.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_targeted_patch(self, service, client):
+        """Prueba que en documentos grandes solo se envía la sección y se aplica el parche"""
+        assert len(LARGE_DOCUMENT) >= settings.EDIT_TARGETED_MIN_SIZE
+        client.generate_chat_response.return_value = chat_response(json.dumps({
+            "edits": [{"search": "Arranca el servidor con run.py.", "replace": "Arranca el servidor con `python run.py`."}]
+        }))
+
+        result = await service.edit_markdown(LARGE_DOCUMENT, "En la sección Uso, formatea el comando como código")
+
+        assert result["mode"] == "targeted"
+        assert result["sections"] == ["Uso"]
+        assert result["tokens_used"] == 10
+        assert result["content"] == LARGE_DOCUMENT.replace("con run.py.", "con `python run.py`.")
+        prompts = self.prompts(client)
+        assert len(prompts) == 1
+        assert "Ejecuta pip install." not in prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_unapplicable_patch_falls_back_to_full(self, service, client):
+        """Prueba que un parche que no encaja provoca la reescritura completa"""
+        rewritten = LARGE_DOCUMENT.replace("run.py", "run.py --reload")
+        client.generate_chat_response.side_effect = [
+            chat_response(json.dumps({"edits": [{"search": "texto que no existe", "replace": "x"}]})),
+            chat_response(rewritten)
+        ]
+
+        result = await service.edit_markdown(LARGE_DOCUMENT, "En la sección Uso, añade --reload")
+
+        assert result["mode"] == "full"
+        assert result["content"] == rewritten
+        assert "fallback_reason" in result
+        assert client.generate_chat_response.await_count == 2
+        # La reescritura recibe el documento completo
+        assert "Ejecuta pip install." in self.prompts(client)[1]
+
+    @pytest.mark.asyncio
+    async def test_small_document_uses_full_rewrite(self, service, client):
+        """Prueba que en modo auto los documentos pequeños se reescriben completos"""
+        client.generate_chat_response.return_value = chat_response("# Título\n\nNuevo texto.\n")
+
+        result = await service.edit_markdown("# Título\n\nTexto.\n", "Cambia el texto")
+
+        assert result["mode"] == "full"
+        assert result["content"] == "# Título\n\nNuevo texto.\n"
+        assert "fallback_reason" not in result
+        assert client.generate_chat_response.await_count == 1
@@ -0,0 +1,158 @@
+import os
+import pytest
+from app.core.config import settings
+from app.services.data_layout import (
+    MANIFEST_NAME,
+    FlatLayout,
+    ShardedLayout,
+    get_data_layout,
+    migrate_to_flat,
+    migrate_to_sharded
+)
+from app.services.document_index import get_document_index
+from app.services.file_index import FileMetadataIndex
+from app.services.filesystem_service import FileSystemService
+
+class TestShardedLayout:
+    """Pruebas unitarias para la disposición fragmentada de DATA_DIR"""
+
+    @pytest.fixture
+    def layout(self, tmp_path):
+        """Fixture con una disposición fragmentada sobre un directorio temporal"""
+        layout = ShardedLayout(str(tmp_path), depth=2, width=2)
+        yield layout
+        layout.close()
+
+    def _write(self, layout, name, content="x"):
+        path = layout.path_for(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        layout.record(name)
+        return path
+
+    def test_path_is_deterministic(self, layout, tmp_path):
+        """Prueba que la ruta depende solo del nombre y tiene depth niveles"""
+        path = layout.path_for("notas.md")
+        assert path == layout.path_for("notas.md")
+        relative = os.path.relpath(path, tmp_path).split(os.sep)
+        assert len(relative) == 3
+        assert all(len(part) == 2 for part in relative[:2])
+        assert relative[2] == "notas.md"
+
+    def test_manifest_entries(self, layout):
+        """Prueba que el manifiesto refleja escrituras y borrados"""
+        path = self._write(layout, "a.md", "hola")
+        self._write(layout, "b.txt")
+
+        entries = {name: (p, st) for name, p, st in layout.entries()}
+        assert set(entries) == {"a.md", "b.txt"}
+        assert entries["a.md"][0] == path
+        assert entries["a.md"][1].st_size == 4
+        assert entries["a.md"][1].st_mtime_ns == os.stat(path).st_mtime_ns
+
+        os.remove(path)
+        layout.forget("a.md")
+        assert [name for name, _, _ in layout.entries()] == ["b.txt"]
+
+    def test_rebuild(self, layout):
+        """Prueba que rebuild recupera archivos sin registrar y elimina huérfanos"""
+        self._write(layout, "a.md")
+        layout.forget("a.md")
+        orphan = self._write(layout, "b.md")
+        os.remove(orphan)
+
+        assert layout.rebuild() == {"recorded": 1, "removed": 1}
+        assert [name for name, _, _ in layout.entries()] == ["a.md"]
+
+    def test_parameters_must_match_manifest(self, layout, tmp_path):
+        """Prueba que no se abre un manifiesto con otros parámetros"""
+        with pytest.raises(ValueError):
+            ShardedLayout(str(tmp_path), depth=3, width=2)
+
+class TestMigration:
+    """Pruebas unitarias para la migración entre disposiciones"""
+
+    def test_round_trip(self, tmp_path):
+        """Prueba la migración a fragmentada y de vuelta a plana"""
+        names = [f"doc{i}.md" for i in range(50)]
+        for name in names:
+            (tmp_path / name).write_text(name)
+        (tmp_path / "escritura.tmp").write_text("temporal")
+
+        assert migrate_to_sharded(str(tmp_path)) == {"moved": 50, "recorded": 50}
+        layout = ShardedLayout(str(tmp_path))
+        assert sorted(name for name, _, _ in layout.entries()) == sorted(names)
+        assert open(layout.path_for("doc7.md")).read() == "doc7.md"
+        layout.close()
+        # Reanudable: una segunda pasada no mueve nada
+        assert migrate_to_sharded(str(tmp_path))["moved"] == 0
+
+        assert migrate_to_flat(str(tmp_path)) == {"moved": 50}
+        assert sorted(os.listdir(tmp_path)) == sorted(names + ["escritura.tmp"])
+        assert (tmp_path / "doc7.md").read_text() == "doc7.md"
+
+class TestShardedFileSystem:
+    """Pruebas de integración del servicio de archivos con la disposición fragmentada"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con el servicio de archivos en modo fragmentado"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path / "logs"))
+        monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        monkeypatch.setattr(settings, "DATA_DIR_LAYOUT", "sharded")
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        yield FileSystemService()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout().close()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_flat_namespace(self, service):
+        """Prueba que los clientes siguen viendo nombres planos"""
+        for i in range(20):
+            assert (await service.create_file(f"nota{i}.md", f"contenido número {i}")).success
+
+        assert not any(name.endswith(".md") for name in os.listdir(settings.DATA_DIR))
+        assert (await service.read_file("nota3.md")).content == "contenido número 3"
+
+        listing = await service.list_files(pattern="nota1*.md")
+        assert sorted(f.filename for f in listing.files) == ["nota1.md"] + [f"nota1{i}.md" for i in range(10)]
+
+        assert (await service.delete_file("nota3.md")).success
+        assert "nota3.md" not in {name for name, _, _ in service.layout.entries()}
+
+        assert service.search_index.sync() == {"indexed": 0, "removed": 0, "unchanged": 19}
+
+    def test_file_index_reads_manifest(self, tmp_path):
+        """Prueba que el índice de metadatos lista desde el manifiesto"""
+        layout = ShardedLayout(str(tmp_path))
+        path = layout.path_for("a.md")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("# Hola")
+        layout.record("a.md")
+
+        index = FileMetadataIndex(str(tmp_path), ["md"], layout=layout)
+        page, total = index.query()
+        assert total == 1
+        assert page[0]["path"] == path
+        layout.close()
+
+class TestFlatLayout:
+    """Pruebas unitarias para la disposición plana"""
+
+    def test_entries(self, tmp_path):
+        """Prueba el recorrido con filtro por nombre"""
+        (tmp_path / "a.md").write_text("a")
+        (tmp_path / "b.bin").write_text("b")
+        (tmp_path / "sub").mkdir()
+        layout = FlatLayout(str(tmp_path))
+        assert [name for name, _, _ in layout.entries(accept=lambda n: n.endswith(".md"))] == ["a.md"]
+        assert layout.path_for("a.md") == str(tmp_path / "a.md")
+        assert not os.path.exists(tmp_path / MANIFEST_NAME)
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import pytest
+import pytest_asyncio
+from app.services.data_watcher import DataDirWatcher, InotifyBackend, PollingBackend
+from app.services.file_index import FileMetadataIndex
+
+async def wait_for(predicate, timeout=3.0):
+    """Espera a que se cumpla una condición"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Tiempo de espera agotado")
+        await asyncio.sleep(0.02)
+
+class TestDataDirWatcher:
+    """Pruebas unitarias para el feed de cambios de DATA_DIR"""
+
+    @pytest_asyncio.fixture(params=["inotify", "polling"])
+    async def watcher(self, request, tmp_path):
+        """Fixture con un watcher en marcha sobre un directorio temporal"""
+        if request.param == "inotify" and not InotifyBackend.available():
+            pytest.skip("inotify no disponible")
+        watcher = DataDirWatcher(str(tmp_path), backend=request.param, poll_interval=0.05, debounce=0.05)
+        await watcher.start()
+        yield watcher
+        await watcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_backend_selection(self, watcher):
+        """Prueba que se usa el backend pedido"""
+        expected = InotifyBackend if watcher.backend_name == "inotify" else PollingBackend
+        assert isinstance(watcher._backend, expected)
+
+    @pytest.mark.asyncio
+    async def test_publishes_changes(self, watcher, tmp_path):
+        """Prueba que creaciones, modificaciones y borrados llegan al feed"""
+        batches = []
+        watcher.subscribe(batches.append)
+
+        (tmp_path / "nota.md").write_text("hola")
+        await wait_for(lambda: any(e.filename == "nota.md" for b in batches for e in b))
+
+        os.remove(tmp_path / "nota.md")
+        await wait_for(lambda: any(e.kind == "deleted" for b in batches for e in b))
+
+        events, seq, reset = watcher.changes_since(0)
+        assert [e.kind for e in events if e.filename == "nota.md"][-1] == "deleted"
+        assert seq == events[-1].seq and not reset
+        assert watcher.generation >= 2
+
+    @pytest.mark.asyncio
+    async def test_ignores_temporary_files(self, watcher, tmp_path):
+        """Prueba que los temporales de escritura atómica no generan eventos"""
+        (tmp_path / "x.tmp").write_text("a")
+        os.replace(tmp_path / "x.tmp", tmp_path / "final.md")
+        await wait_for(lambda: watcher.changes_since(0)[0])
+        await asyncio.sleep(0.15)
+        assert {e.filename for e in watcher.changes_since(0)[0]} == {"final.md"}
+
+    @pytest.mark.asyncio
+    async def test_live_metadata_index(self, watcher, tmp_path):
+        """Prueba que el índice de metadatos se actualiza por eventos sin recorrer el directorio"""
+        (tmp_path / "a.md").write_text("uno")
+        index = FileMetadataIndex(str(tmp_path), ["md"])
+        index.set_live(True)
+        watcher.subscribe(index.apply_changes)
+        assert [e["filename"] for e in index.entries()] == ["a.md"]
+
+        (tmp_path / "b.md").write_text("dos")
+        await wait_for(lambda: len(index.entries()) == 2)
+        os.remove(tmp_path / "a.md")
+        await wait_for(lambda: [e["filename"] for e in index.entries()] == ["b.md"])
+
+class TestChangeHistory:
+    """Pruebas unitarias para el historial del feed de cambios"""
+
+    @pytest.mark.asyncio
+    async def test_reset_when_history_overflows(self, tmp_path):
+        """Prueba que un cliente demasiado atrasado recibe reset"""
+        watcher = DataDirWatcher(str(tmp_path), history=2, debounce=0)
+        watcher._batches = asyncio.Queue()
+        for name in ("a.md", "b.md", "c.md"):
+            watcher._emit("changed", name)
+            watcher._flush()
+
+        events, seq, reset = watcher.changes_since(0)
+        assert seq == 3 and reset
+        assert [e.filename for e in events] == ["b.md", "c.md"]
+        assert watcher.changes_since(1)[2] is False
+        assert watcher.changes_since(3) == ([], 3, False)
+
+    def test_parse_inotify_events(self):
+        """Prueba la decodificación de estructuras inotify_event"""
+        import struct
+        data = struct.pack("iIII", 1, 0x8, 0, 16) + b"nota.md".ljust(16, b"\0")
+        data += struct.pack("iIII", 1, 0x4000, 0, 0)
+        assert InotifyBackend.parse(data) == [(0x8, "nota.md"), (0x4000, None)]
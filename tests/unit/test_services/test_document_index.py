@@ -0,0 +1,77 @@
+import os
+import time
+import pytest
+from app.services.document_index import DocumentIndex
+
+class TestDocumentIndex:
+    """Pruebas unitarias para el índice de texto completo"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        """Fixture con un directorio de datos y su índice en disco"""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "redis.md").write_text("# Caché\n\nLa caché de Redis acelera las búsquedas repetidas.")
+        (data_dir / "claude.md").write_text("Claude analiza textos y genera resúmenes en Markdown.")
+        (data_dir / "english.txt").write_text("Indexing documents makes full text searches fast.")
+        (data_dir / "binario.exe").write_text("búsquedas")
+        index = DocumentIndex(str(tmp_path / "index.sqlite3"), str(data_dir), ["md", "txt"], sync_interval=3600)
+        index.sync()
+        yield index
+        index.close()
+
+    def test_accents_and_inflections(self, index):
+        """Prueba que se encuentran formas con y sin acento y en plural"""
+        hits, total = index.search("busqueda")
+        assert total == 1
+        assert hits[0]["filename"] == "redis.md"
+        assert "**búsquedas**" in hits[0]["snippet"]
+
+        hits, _ = index.search("index searching")
+        assert [h["filename"] for h in hits] == ["english.txt"]
+
+    def test_bm25_ranking_and_match_all(self, index):
+        """Prueba el orden por relevancia y la búsqueda con todos los términos"""
+        hits, total = index.search("caché claude")
+        assert total == 2
+        assert hits[0]["score"] >= hits[1]["score"]
+
+        _, total = index.search("caché claude", match_all=True)
+        assert total == 0
+
+    def test_incremental_updates(self, index, tmp_path):
+        """Prueba la indexación, actualización y borrado de un documento"""
+        path = tmp_path / "data" / "nuevo.md"
+        path.write_text("Documento sobre tokenización")
+        index.index_file("nuevo.md")
+        assert index.search("tokenizacion")[1] == 1
+
+        path.write_text("Documento sobre compresión")
+        index.index_file("nuevo.md", path.read_text())
+        assert index.search("tokenizacion")[1] == 0
+        assert index.search("compresion")[1] == 1
+
+        os.remove(path)
+        assert index.remove_file("nuevo.md")
+        assert index.search("compresion")[1] == 0
+
+    def test_sync_detects_external_changes(self, index, tmp_path):
+        """Prueba que la sincronización solo reindexa lo que cambió"""
+        os.remove(tmp_path / "data" / "claude.md")
+        (tmp_path / "data" / "otro.txt").write_text("texto nuevo")
+        stats = index.sync()
+        assert stats == {"indexed": 1, "removed": 1, "unchanged": 2}
+        assert index.get_status()["documents"] == 3
+
+    def test_persists_on_disk(self, index, tmp_path):
+        """Prueba que el índice sobrevive a un reinicio"""
+        index.close()
+        reopened = DocumentIndex(str(tmp_path / "index.sqlite3"), str(tmp_path / "data"), ["md", "txt"], sync_interval=3600)
+        reopened._last_sync = time.monotonic()
+        assert reopened.search("resumenes")[1] == 1
+        reopened.close()
+
+    def test_query_without_terms(self, index):
+        """Prueba que una consulta solo con palabras vacías no falla"""
+        assert index.search("de la y") == ([], 0)
+        assert index.search('"*) OR (') == ([], 0)
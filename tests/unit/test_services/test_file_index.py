@@ -0,0 +1,72 @@
+import os
+import pytest
+from unittest.mock import patch
+from app.services.file_index import FileMetadataIndex
+
+class TestFileMetadataIndex:
+    """Pruebas unitarias para el índice de metadatos de archivos"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        """Fixture con un directorio de datos y su índice"""
+        (tmp_path / "b.md").write_text("# B\n\ncontenido largo " * 10)
+        (tmp_path / "a.txt").write_text("hola")
+        (tmp_path / "c.json").write_text('{"x": 1}')
+        (tmp_path / "ignorado.exe").write_bytes(b"MZ")
+        (tmp_path / "subdir.md").mkdir()
+        return FileMetadataIndex(str(tmp_path), ["md", "txt", "json"])
+
+    def test_scan_filters_extensions_and_directories(self, index):
+        """Prueba que solo se indexan archivos con extensión permitida"""
+        names = sorted(e["filename"] for e in index.scan())
+        assert names == ["a.txt", "b.md", "c.json"]
+
+    def test_unchanged_files_are_not_reopened(self, index, tmp_path):
+        """Prueba que un directorio sin cambios no vuelve a leer archivos"""
+        index.scan()
+        with patch("app.services.file_index.magic.from_buffer") as sniff, \
+             patch.object(index, "_sniff_mime", wraps=index._sniff_mime) as reopen:
+            index.scan()
+            reopen.assert_not_called()
+            sniff.assert_not_called()
+        assert index.get_status()["hits"] == 3
+
+        (tmp_path / "a.txt").write_text("hola de nuevo")
+        entries = {e["filename"]: e for e in index.scan()}
+        assert entries["a.txt"]["size"] == len("hola de nuevo")
+        assert index.get_status()["misses"] == 4
+
+    def test_mime_memoized_by_content(self, tmp_path):
+        """Prueba que la detección MIME se memoiza por extensión y contenido"""
+        for i in range(5):
+            (tmp_path / f"copia{i}.txt").write_text("mismo contenido")
+        index = FileMetadataIndex(str(tmp_path), ["txt"])
+        with patch("app.services.file_index.magic.from_buffer", return_value="text/plain") as sniff:
+            index.scan()
+        assert sniff.call_count == 1
+
+    def test_deleted_files_drop_out(self, index, tmp_path):
+        """Prueba que los archivos eliminados desaparecen del índice"""
+        index.scan()
+        os.remove(tmp_path / "c.json")
+        assert "c.json" not in {e["filename"] for e in index.scan()}
+
+    def test_query_sort_filter_paginate(self, index):
+        """Prueba el orden, los filtros y la paginación"""
+        page, total = index.query(sort_by="size", descending=True, limit=2)
+        assert total == 3
+        assert [e["filename"] for e in page] == ["b.md", "c.json"]
+
+        page, total = index.query(sort_by="filename", offset=1, limit=1)
+        assert [e["filename"] for e in page] == ["b.md"]
+
+        page, total = index.query(pattern="*.md")
+        assert total == 1 and page[0]["filename"] == "b.md"
+
+        page, total = index.query(extension=".TXT")
+        assert [e["filename"] for e in page] == ["a.txt"]
+
+    def test_invalid_sort_field(self, index):
+        """Prueba que un campo de orden desconocido se rechaza"""
+        with pytest.raises(ValueError):
+            index.query(sort_by="path")
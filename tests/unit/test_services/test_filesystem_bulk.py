@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.schemas.filesystem import BulkFileOperation
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.filesystem_service import FileSystemService
+
+class TestFileSystemBulk:
+    """Pruebas unitarias para las operaciones de archivo en lote"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con el servicio de archivos sobre directorios temporales"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path / "logs"))
+        monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        monkeypatch.setattr(settings, "FILE_BULK_CONCURRENCY", 4)
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        yield FileSystemService()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_results_in_request_order(self, service):
+        """Prueba que las operaciones de un mismo archivo respetan el orden de la petición"""
+        operations = [BulkFileOperation(operation="create", filename=f"f{i}.md", content=f"v{i}") for i in range(20)]
+        operations += [
+            BulkFileOperation(operation="update", filename="f0.md", content="nuevo"),
+            BulkFileOperation(operation="read", filename="f0.md"),
+            BulkFileOperation(operation="delete", filename="f1.md"),
+            BulkFileOperation(operation="read", filename="f1.md"),
+        ]
+        response = await service.bulk(operations)
+
+        assert [r.index for r in response.results] == list(range(24))
+        assert response.results[21].content == "nuevo"
+        assert response.results[22].success
+        assert not response.results[23].success
+        assert response.succeeded == 23 and response.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_isolated(self, service):
+        """Prueba que una operación inválida no afecta a las demás"""
+        response = await service.bulk([
+            BulkFileOperation(operation="create", filename="../fuera.exe", content="x"),
+            BulkFileOperation(operation="create", filename="bien.md", content="x"),
+        ])
+        assert [r.success for r in response.results] == [False, True]
+        assert response.results[0].error
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, service, monkeypatch):
+        """Prueba que no se superan las operaciones simultáneas permitidas"""
+        active = 0
+        peak = 0
+
+        async def slow_read(filename):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return await original(filename)
+
+        original = service.read_file
+        monkeypatch.setattr(service, "read_file", slow_read)
+        operations = [BulkFileOperation(operation="read", filename=f"n{i}.md") for i in range(30)]
+        results = [r async for r in service.iter_bulk(operations, concurrency=100)]
+
+        assert len(results) == 30
+        assert peak == 4
+
+    @pytest.mark.asyncio
+    async def test_limits(self, service, monkeypatch):
+        """Prueba el rechazo de lotes vacíos o demasiado grandes"""
+        monkeypatch.setattr(settings, "FILE_BULK_MAX_OPERATIONS", 2)
+        with pytest.raises(ValueError):
+            await service.bulk([])
+        with pytest.raises(ValueError):
+            await service.bulk([BulkFileOperation(operation="read", filename="a.md")] * 3)
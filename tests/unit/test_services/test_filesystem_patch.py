@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import pytest
+from app.core.config import settings
+from app.schemas.filesystem import BulkFileOperation, FilePatchRequest
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+from app.services.filesystem_service import FileSystemService, _file_lock
+from app.utils.seekable_zstd import is_compressed
+
+class TestFileSystemPatch:
+    """Pruebas unitarias para las modificaciones parciales de archivos"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con el servicio de archivos sobre directorios temporales"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path / "logs"))
+        monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        yield FileSystemService()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_diff_updates_content_and_index(self, service):
+        """Prueba que el diff se aplica, cambia el ETag y se reindexa"""
+        await service.create_file("notas.md", "hola\nmundo\n")
+        diff = "@@ -2 +2 @@\n-mundo\n+planeta\n"
+
+        response = await service.patch_file("notas.md", FilePatchRequest(type="diff", diff=diff))
+
+        assert response.success
+        assert response.etag
+        assert (await service.read_file("notas.md")).content == "hola\nplaneta\n"
+        hits, _ = service.search_index.search("planeta")
+        assert [hit["filename"] for hit in hits] == ["notas.md"]
+
+    @pytest.mark.asyncio
+    async def test_if_match(self, service):
+        """Prueba la concurrencia optimista con If-Match"""
+        await service.create_file("notas.md", "a\n")
+        first = await service.patch_file("notas.md", FilePatchRequest(type="append", content="b\n"))
+
+        stale = await service.patch_file("notas.md", FilePatchRequest(type="append", content="x\n"), if_match='"otro"')
+        assert not stale.success
+        assert stale.error == "PRECONDITION_FAILED"
+        assert stale.etag == first.etag
+
+        weak = await service.patch_file("notas.md", FilePatchRequest(type="append", content="x\n"), if_match=f"W/{first.etag}")
+        assert weak.error == "PRECONDITION_FAILED"
+
+        ok = await service.patch_file("notas.md", FilePatchRequest(type="append", content="c\n"), if_match=first.etag)
+        assert ok.success
+        assert ok.etag != first.etag
+        assert (await service.read_file("notas.md")).content == "a\nb\nc\n"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_appends(self, service):
+        """Prueba que los append simultáneos no se pierden"""
+        await service.create_file("log.md", "")
+        await asyncio.gather(*(
+            service.patch_file("log.md", FilePatchRequest(type="append", content=f"{i}\n"))
+            for i in range(50)
+        ))
+        lines = (await service.read_file("log.md")).content.splitlines()
+        assert sorted(lines, key=int) == [str(i) for i in range(50)]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates(self, service):
+        """Prueba que de varias creaciones simultáneas del mismo archivo solo una tiene éxito"""
+        responses = await asyncio.gather(*(service.create_file("unico.md", f"v{i}") for i in range(10)))
+        assert sum(r.success for r in responses) == 1
+        assert {r.error for r in responses if not r.success} == {"FILE_EXISTS"}
+
+    @pytest.mark.asyncio
+    async def test_writes_wait_for_file_lock(self, service):
+        """Prueba que guardar, actualizar, borrar y los lotes esperan al lock del archivo"""
+        await service.create_file("notas.md", "a\n")
+        writes = {
+            "save": lambda: service.save_file("b\n", "notas.md"),
+            "update": lambda: service.update_file("notas.md", "c\n"),
+            "bulk": lambda: service.bulk([BulkFileOperation(operation="update", filename="notas.md", content="d\n")]),
+            "delete": lambda: service.delete_file("notas.md"),
+        }
+        for name, write in writes.items():
+            lock = _file_lock(service._get_file_path("notas.md"))
+            async with lock:
+                task = asyncio.ensure_future(write())
+                await asyncio.sleep(0.05)
+                assert not task.done(), name
+            await asyncio.wait_for(task, timeout=5)
+        assert not (await service.read_file("notas.md")).success
+
+    @pytest.mark.asyncio
+    async def test_errors(self, service):
+        """Prueba los códigos de error de archivo inexistente y parche inválido"""
+        missing = await service.patch_file("nada.md", FilePatchRequest(type="append", content="x"))
+        assert missing.error == "FILE_NOT_FOUND"
+
+        await service.create_file("notas.md", "abc")
+        invalid = await service.patch_file("notas.md", FilePatchRequest(type="replace", offset=10, length=1, content="x"))
+        assert invalid.error == "INVALID_PATCH"
+        assert (await service.read_file("notas.md")).content == "abc"
+
+    @pytest.mark.asyncio
+    async def test_file_info_off_event_loop(self, service):
+        """Prueba que la información del archivo parcheado se obtiene fuera del bucle de eventos"""
+        await service.create_file("notas.md", "uno\n")
+        file_info = service._file_info
+        threads = []
+
+        def record_thread(*args):
+            threads.append(threading.get_ident())
+            return file_info(*args)
+
+        service._file_info = record_thread
+        result = await service.patch_file("notas.md", FilePatchRequest(type="append", content="dos\n"))
+
+        assert result.success
+        assert result.file_info.size == 8
+        assert threads and threading.get_ident() not in threads
+
+class TestCompressedFileSystem(TestFileSystemPatch):
+    """Pruebas del servicio de archivos con compresión zstd en disco"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con el servicio de archivos y compresión activada"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path / "logs"))
+        monkeypatch.setattr(settings, "TEMP_DIR", str(tmp_path / "temp"))
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        monkeypatch.setattr(settings, "DATA_COMPRESSION", "zstd")
+        monkeypatch.setattr(settings, "DATA_COMPRESSION_MIN_SIZE", 0)
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        yield FileSystemService()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_transparent_read(self, service):
+        """Prueba que el archivo se guarda comprimido y se lee descomprimido"""
+        content = "".join(f"# Sección {i}\n\ntexto repetido\n" for i in range(500))
+        saved = await service.create_file("largo.md", content)
+        assert saved.file_info.stored_size < saved.file_info.size
+
+        with open(saved.file_info.path, "rb") as f:
+            assert is_compressed(f.read(4))
+        read = await service.read_file("largo.md")
+        assert read.content == content
+        assert read.file_info.size == len(content)
+        hits, _ = service.search_index.search("repetido")
+        assert [hit["filename"] for hit in hits] == ["largo.md"]
+
+    @pytest.mark.asyncio
+    async def test_delete_reports_logical_file(self, service):
+        """Prueba que al eliminar se informa del tamaño y tipo del contenido, no del archivo comprimido"""
+        content = "# Notas\n\n" + "texto repetido\n" * 500
+        saved = await service.create_file("notas.md", content)
+
+        deleted = await service.delete_file("notas.md")
+
+        assert deleted.success
+        assert deleted.file_info.size == len(content)
+        assert deleted.file_info.stored_size == saved.file_info.stored_size
+        assert deleted.file_info.content_type == saved.file_info.content_type
+        assert deleted.file_info.content_type != "application/zstd"
@@ -0,0 +1,101 @@
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from app.core.claude_client import ClaudeClient
+from app.core.config import settings
+from app.core.mcp_config import mcp_tools, tool_input_schema
+from app.schemas.mcp import MCPRequest
+from app.schemas.search import BatchSearchResponse, SearchResponse
+from app.services.data_layout import get_data_layout
+from app.services.document_index import get_document_index
+
+# Argumentos de ejemplo de cada herramienta registrada
+TOOL_ARGUMENTS = {
+    "buscar_en_brave": {"query": "fastapi"},
+    "buscar_en_brave_multiple": {"queries": ["fastapi", "starlette"]},
+    "gestionar_archivos_lote": {"operations": [
+        {"operation": "create", "filename": "nuevo.md", "content": "# Nuevo"},
+        {"operation": "read", "filename": "notas.md"}
+    ]},
+    "buscar_en_archivos": {"query": "servidor"},
+    "generar_markdown": {"content": "Notas sueltas del servidor"},
+    "analizar_texto": {"text": "El servidor responde rápido.", "analysis_type": "general"}
+}
+
+def anthropic_handler(request):
+    """Simula la API de mensajes de Anthropic, con y sin streaming"""
+    body = json.loads(request.content)
+    if body.get("stream"):
+        events = [
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "# Notas\n\n"}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Texto."}},
+            {"type": "message_stop"}
+        ]
+        return httpx.Response(200, text="".join(f"data: {json.dumps(event)}\n\n" for event in events))
+    return httpx.Response(200, json={
+        "content": [{"type": "text", "text": "Análisis de prueba"}],
+        "usage": {"input_tokens": 5, "output_tokens": 3}
+    })
+
+class FakeBraveSearch:
+    """Sustituye a Brave Search sin acceder a la red"""
+
+    async def search(self, query, num_results=5, analyze=False):
+        return SearchResponse(query=query, results=[], total_results=0)
+
+    async def batch_search(self, queries, num_results=None, max_results=None):
+        return BatchSearchResponse(queries=queries, results=[], total_results=0)
+
+class TestMCPToolsDispatch:
+    """Ejecuta cada herramienta registrada con el MCPService real"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Fixture con DATA_DIR temporal y las APIs externas simuladas"""
+        monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setattr(settings, "DOCUMENT_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+        get_data_layout.cache_clear()
+        get_document_index.cache_clear()
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "notas.md").write_text("# Notas\n\nEl servidor arranca.\n", encoding="utf-8")
+
+        client = ClaudeClient()
+        client.async_http_client = httpx.AsyncClient(transport=httpx.MockTransport(anthropic_handler))
+        with patch("app.services.claude_service.get_claude_client", return_value=client), \
+                patch("app.services.mcp_service.get_brave_search", return_value=FakeBraveSearch()):
+            from app.services.mcp_service import MCPService
+            yield MCPService()
+        get_document_index().close()
+        get_document_index.cache_clear()
+        get_data_layout.cache_clear()
+
+    def test_every_tool_has_arguments(self):
+        """Prueba que las herramientas nuevas se añaden también a esta prueba"""
+        assert set(TOOL_ARGUMENTS) == set(mcp_tools)
+        for name, arguments in TOOL_ARGUMENTS.items():
+            assert set(tool_input_schema(mcp_tools[name])["required"]) <= set(arguments)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tool", sorted(TOOL_ARGUMENTS))
+    async def test_execute_tool(self, service, tool):
+        """Prueba que la herramienta se ejecuta sin error con sus argumentos del esquema"""
+        response = await service.process_request(MCPRequest(
+            method="execute",
+            params={"tool": tool, "params": TOOL_ARGUMENTS[tool]},
+            id=tool
+        ))
+
+        assert response.error is None, response.error
+        assert response.result
+
+    @pytest.mark.asyncio
+    async def test_analysis_result(self, service):
+        """Prueba que analizar_texto devuelve el análisis de ClaudeService"""
+        response = await service.process_request(MCPRequest(
+            method="execute",
+            params={"tool": "analizar_texto", "params": TOOL_ARGUMENTS["analizar_texto"]},
+            id=1
+        ))
+
+        assert response.result["analysis"]["summary"] == "Análisis de prueba"
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import pytest
+from app.services.persistence_queue import PersistenceQueue
+
+class TestPersistenceQueue:
+    """Pruebas unitarias para la cola de persistencia en segundo plano"""
+
+    @pytest.mark.asyncio
+    async def test_batches_and_flushes_on_stop(self):
+        """Prueba que los artefactos se agrupan y se escriben al detener la cola"""
+        batches = []
+        queue = PersistenceQueue(batch_size=10, flush_interval=0.05)
+        queue.register_writer("doc", lambda payloads: batches.append(list(payloads)))
+
+        for i in range(5):
+            await queue.submit("doc", i)
+        assert batches == []
+
+        await queue.stop(timeout=1)
+
+        assert batches == [[0, 1, 2, 3, 4]]
+        assert queue.get_status()["written"] == 5
+        assert not queue.get_status()["running"]
+
+    @pytest.mark.asyncio
+    async def test_backpressure_writes_inline(self):
+        """Prueba que con la cola llena el productor escribe en línea"""
+        release = threading.Event()
+        written = []
+
+        def slow_writer(payloads):
+            if "a" in payloads:
+                release.wait(timeout=2)
+            written.extend(payloads)
+
+        queue = PersistenceQueue(max_size=1, batch_size=1, flush_interval=0, put_timeout=0.05)
+        queue.register_writer("doc", slow_writer)
+
+        await queue.submit("doc", "a")      # el worker lo toma y se bloquea
+        await asyncio.sleep(0.05)
+        await queue.submit("doc", "b")      # ocupa el único hueco
+        await queue.submit("doc", "c")      # cola llena: se escribe en línea
+        assert "c" in written
+        release.set()
+
+        await queue.stop(timeout=1)
+        assert sorted(written) == ["a", "b", "c"]
+        assert queue.get_status()["written_inline"] == 1
+
+    @pytest.mark.asyncio
+    async def test_writer_errors_do_not_stop_worker(self):
+        """Prueba que un escritor que falla no detiene la cola"""
+        written = []
+
+        def failing(payloads):
+            raise OSError("disco lleno")
+
+        queue = PersistenceQueue(flush_interval=0)
+        queue.register_writer("bad", failing)
+        queue.register_writer("good", written.extend)
+
+        await queue.submit("bad", 1)
+        await queue.submit("good", 2)
+        await queue.stop(timeout=1)
+
+        assert written == [2]
+        assert queue.get_status()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind(self):
+        """Prueba que un tipo sin escritor se rechaza"""
+        with pytest.raises(ValueError):
+            await PersistenceQueue().submit("desconocido", {})
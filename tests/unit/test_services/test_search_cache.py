@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services.search_cache import (
+    SearchResultCache, CachedSearchError, normalize_search_params, search_cache_key
+)
+
+class FakeCache:
+    """Caché en memoria con la interfaz get/set de Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.values[key] = value
+        return True
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestSearchResultCache:
+    """Pruebas unitarias para la caché de resultados de búsqueda"""
+
+    @pytest.fixture
+    def clock(self):
+        clock = Clock()
+        with patch("app.services.search_cache.time.time", clock):
+            yield clock
+
+    @pytest.fixture
+    def search_cache(self, clock):
+        cache = SearchResultCache(FakeCache())
+        cache.enabled = True
+        cache.ttl, cache.stale_ttl, cache.negative_ttl, cache.error_ttl = 60, 600, 10, 5
+        return cache
+
+    def test_query_normalization(self):
+        """Prueba que mayúsculas, espacios y valores por defecto dan la misma clave"""
+        a = normalize_search_params("  Python   ASYNC ")
+        b = normalize_search_params("python async", country="es", language="ES")
+        assert a["q"] == "python async"
+        assert search_cache_key(a) == search_cache_key(b)
+        assert search_cache_key(a) != search_cache_key(normalize_search_params("python async", num_results=20))
+
+    @pytest.mark.asyncio
+    async def test_fresh_stale_and_refresh(self, search_cache, clock):
+        """Prueba servir entradas frescas y obsoletas con refresco en segundo plano"""
+        calls = []
+
+        async def fetch():
+            calls.append(clock.now)
+            return [{"n": len(calls)}]
+
+        params = normalize_search_params("python")
+        assert await search_cache.get_or_fetch(params, fetch) == ([{"n": 1}], "miss")
+        assert await search_cache.get_or_fetch(params, fetch) == ([{"n": 1}], "hit")
+
+        clock.now += 120
+        assert await search_cache.get_or_fetch(params, fetch) == ([{"n": 1}], "stale")
+        await asyncio.sleep(0)
+        assert await search_cache.get_or_fetch(params, fetch) == ([{"n": 2}], "hit")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_fetch(self, search_cache):
+        """Prueba que las búsquedas simultáneas iguales hacen una sola petición"""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [{"n": 1}]
+
+        params = normalize_search_params("redis")
+        results = await asyncio.gather(*[search_cache.get_or_fetch(params, fetch) for _ in range(5)])
+        assert all(value == [{"n": 1}] for value, _ in results)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_negative_and_error_ttls(self, search_cache, clock):
+        """Prueba los TTL cortos de resultados vacíos y errores"""
+        async def empty():
+            return []
+
+        async def failing():
+            raise RuntimeError("HTTP 500")
+
+        params = normalize_search_params("sin resultados")
+        await search_cache.get_or_fetch(params, empty)
+        assert (await search_cache.get_or_fetch(params, empty))[1] == "hit"
+        clock.now += 11
+        assert (await search_cache.get_or_fetch(params, empty))[1] == "miss"
+
+        params = normalize_search_params("falla")
+        with pytest.raises(RuntimeError):
+            await search_cache.get_or_fetch(params, failing)
+        with pytest.raises(CachedSearchError):
+            await search_cache.get_or_fetch(params, failing)
+        clock.now += 6
+        with pytest.raises(RuntimeError):
+            await search_cache.get_or_fetch(params, failing)
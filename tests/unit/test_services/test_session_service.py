@@ -0,0 +1,157 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from app.core.exceptions import ResourceNotFoundError
+from app.services.session_service import SessionService
+
+class FakeCache:
+    """Caché en memoria con la interfaz de listas usada por las sesiones"""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.values[key] = value
+        return True
+
+    def append_to_list(self, key, values, ttl=None):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def append_to_list_and_set(self, list_key, values, key, value, ttl=None, trim_start=0):
+        items = self.lists.setdefault(list_key, [])
+        items.extend(values)
+        del items[:trim_start]
+        self.values[key] = value
+        return len(items)
+
+    def get_list(self, key, start=0, end=-1):
+        return list(self.lists.get(key, []))
+
+    def trim_list(self, key, start, end=-1):
+        self.lists[key] = self.lists.get(key, [])[start:]
+        return True
+
+    def delete_many(self, keys):
+        found = any(k in self.values or k in self.lists for k in keys)
+        for key in keys:
+            self.values.pop(key, None)
+            self.lists.pop(key, None)
+        return found
+
+class TestSessionService:
+    """Pruebas unitarias para el servicio de sesiones"""
+
+    @pytest.fixture
+    def fake_cache(self):
+        return FakeCache()
+
+    @pytest.fixture
+    def mock_client(self):
+        client = MagicMock()
+        client.generate_chat_response = AsyncMock(side_effect=lambda messages, **kwargs: {
+            "content": f"respuesta {len(messages)}",
+            "tokens_used": 10,
+            "model": "test-model"
+        })
+        return client
+
+    @pytest.fixture
+    def service(self, fake_cache, mock_client):
+        with patch("app.services.session_service.get_cache", return_value=fake_cache), \
+                patch("app.services.session_service.get_claude_client", return_value=mock_client):
+            yield SessionService()
+
+    @pytest.mark.asyncio
+    async def test_send_message_appends_turns(self, service, fake_cache, mock_client):
+        """Prueba que cada mensaje añade un par de turnos a la sesión"""
+        session = await service.create_session(system="Eres útil")
+
+        await service.send_message(session["session_id"], "Hola")
+        result = await service.send_message(session["session_id"], "¿Qué tal?")
+
+        assert result["content"] == "respuesta 3"
+        sent = mock_client.generate_chat_response.call_args_list[-1]
+        assert [m["role"] for m in sent.args[0]] == ["user", "assistant", "user"]
+        assert sent.kwargs["system"] == "Eres útil"
+        assert len(fake_cache.lists[f"session:{session['session_id']}:turns"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_history_rolled_into_summary(self, service, fake_cache, mock_client):
+        """Prueba que los turnos antiguos se resumen al superar el umbral"""
+        service._max_context_tokens = 50
+        service._keep_recent_turns = 2
+        session = await service.create_session()
+        session_id = session["session_id"]
+
+        for i in range(3):
+            result = await service.send_message(session_id, "mensaje largo " * 20)
+
+        assert result["summarized"] is True
+        assert len(fake_cache.lists[f"session:{session_id}:turns"]) == 2
+        meta = fake_cache.values[f"session:{session_id}:meta"]
+        assert meta["summary"]
+
+        service._max_context_tokens = 10000
+        await service.send_message(session_id, "sigue")
+        sent = mock_client.generate_chat_response.call_args_list[-1]
+        assert "Resumen de la conversación anterior" in sent.kwargs["system"]
+        assert len(sent.args[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_unknown_session(self, service):
+        """Prueba que una sesión inexistente lanza error"""
+        with pytest.raises(ResourceNotFoundError):
+            await service.send_message("no-existe", "Hola")
+
+    @pytest.mark.asyncio
+    async def test_failed_roll_up_keeps_session_consistent(self, service, fake_cache, mock_client):
+        """Prueba que si falla el resumen el turno se guarda junto con sus metadatos"""
+        service._max_context_tokens = 50
+        service._keep_recent_turns = 2
+        session_id = (await service.create_session())["session_id"]
+        await service.send_message(session_id, "mensaje largo " * 20)
+
+        mock_client.generate_chat_response.side_effect = [
+            {"content": "respuesta", "tokens_used": 10, "model": "test-model"},
+            RuntimeError("fallo al resumir")
+        ]
+        result = await service.send_message(session_id, "otro mensaje largo " * 20)
+
+        assert result["summarized"] is False
+        meta = fake_cache.values[f"session:{session_id}:meta"]
+        turns = fake_cache.lists[f"session:{session_id}:turns"]
+        assert len(turns) == meta["turns"] == 4
+        assert meta["turn_tokens"] == sum(t["t"] for t in turns)
+        assert meta["summary"] == ""
+
+    @pytest.mark.asyncio
+    async def test_locks_are_released(self, service):
+        """Prueba que no quedan cerrojos de sesiones que ya no se usan"""
+        session_id = (await service.create_session())["session_id"]
+        await service.send_message(session_id, "Hola")
+        with pytest.raises(ResourceNotFoundError):
+            await service.send_message("no-existe", "Hola")
+        await service.delete_session(session_id)
+
+        assert service._locks == {}
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_private_to_owner(self, service, fake_cache):
+        """Prueba que otro usuario no puede leer, escribir ni borrar la sesión"""
+        session = await service.create_session(owner="alice")
+        session_id = session["session_id"]
+        assert "owner" not in session
+
+        with pytest.raises(ResourceNotFoundError):
+            await service.get_session(session_id, owner="bob")
+        with pytest.raises(ResourceNotFoundError):
+            await service.send_message(session_id, "Hola", owner="bob")
+        assert await service.delete_session(session_id, owner="bob") is False
+
+        await service.send_message(session_id, "Hola", owner="alice")
+        assert len((await service.get_session(session_id, owner="alice"))["messages"]) == 2
+        assert await service.delete_session(session_id, owner="alice") is True
@@ -0,0 +1,37 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.api.endpoints import tools as tools_endpoints
+from app.core.config import settings
+from app.services.claude_service import get_claude_service
+
+class TestAnalyzeTextTool:
+    """Despacho de analizar_texto desde /tools con el ClaudeService compartido"""
+
+    @pytest.fixture(autouse=True)
+    def claude(self, monkeypatch):
+        """Fixture con micro-batching activo y el cliente de Claude simulado"""
+        monkeypatch.setattr(settings, "CLAUDE_MICROBATCH_ENABLED", True)
+        monkeypatch.setattr(settings, "CLAUDE_MICROBATCH_WINDOW_MS", 50)
+        client = MagicMock()
+        client.analyze_text = AsyncMock(return_value={"content": "individual"})
+        client.generate_chat_response = AsyncMock(return_value={"content": json.dumps({
+            "results": [{"id": 0, "result": "primero"}, {"id": 1, "result": "segundo"}]
+        })})
+        get_claude_service.cache_clear()
+        with patch("app.services.claude_service.get_claude_client", return_value=client):
+            yield client
+        get_claude_service.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_batch(self, claude):
+        """Prueba que dos llamadas simultáneas se agrupan en una sola petición a Claude"""
+        first, second = await asyncio.gather(
+            tools_endpoints._execute_tool_by_name("analizar_texto", {"text": "Texto uno", "analysis_type": "sentiment"}),
+            tools_endpoints._execute_tool_by_name("analizar_texto", {"text": "Texto dos", "analysis_type": "sentiment"})
+        )
+
+        assert (first.summary, second.summary) == ("primero", "segundo")
+        claude.generate_chat_response.assert_awaited_once()
+        claude.analyze_text.assert_not_awaited()
@@ -0,0 +1,54 @@
+import random
+import pytest
+from app.utils.chunking import chunk_text
+
+class TestChunkText:
+    """Pruebas unitarias para la fragmentación definida por contenido"""
+
+    @pytest.fixture
+    def paragraphs(self):
+        """Fixture con párrafos de texto pseudoaleatorio"""
+        rng = random.Random(42)
+        words = ["datos", "archivo", "análisis", "claude", "texto", "markdown", "índice", "resumen"]
+        return [" ".join(rng.choice(words) for _ in range(60)) for _ in range(300)]
+
+    def test_chunks_cover_text(self, paragraphs):
+        """Prueba que los fragmentos reconstruyen el texto original"""
+        text = "\n\n".join(paragraphs)
+        chunks = chunk_text(text)
+
+        assert "".join(c.text for c in chunks) == text
+        assert [c.index for c in chunks] == list(range(len(chunks)))
+        assert all(chunks[i].offset + chunks[i].length == chunks[i + 1].offset for i in range(len(chunks) - 1))
+
+    def test_chunk_size_bounds(self, paragraphs):
+        """Prueba que se respetan los tamaños mínimo y máximo"""
+        chunks = chunk_text("\n\n".join(paragraphs), min_size=512, avg_size=2048, max_size=8192)
+
+        assert all(c.length <= 8192 for c in chunks)
+        assert all(c.length >= 512 for c in chunks[:-1])
+
+    def test_deterministic(self, paragraphs):
+        """Prueba que el mismo texto produce los mismos fragmentos"""
+        text = "\n\n".join(paragraphs)
+        assert [c.digest for c in chunk_text(text)] == [c.digest for c in chunk_text(text)]
+
+    def test_local_edit_changes_few_chunks(self, paragraphs):
+        """Prueba que editar un párrafo solo altera los fragmentos cercanos"""
+        original = chunk_text("\n\n".join(paragraphs))
+
+        paragraphs[150] = "Párrafo reescrito por completo. " + paragraphs[150]
+        edited = chunk_text("\n\n".join(paragraphs))
+
+        known = {c.digest for c in original}
+        changed = [c for c in edited if c.digest not in known]
+        assert 1 <= len(changed) <= 2
+
+    def test_empty_text(self):
+        """Prueba que un texto vacío no produce fragmentos"""
+        assert chunk_text("") == []
+
+    def test_invalid_sizes(self):
+        """Prueba que tamaños incoherentes lanzan error"""
+        with pytest.raises(ValueError):
+            chunk_text("texto", min_size=4096, avg_size=1024, max_size=8192)
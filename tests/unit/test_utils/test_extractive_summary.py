@@ -0,0 +1,41 @@
+from app.utils.extractive_summary import split_sentences, rank_sentences, summarize
+
+TEXT = (
+    "Redis es un almacén de datos en memoria muy rápido. "
+    "Redis se usa como caché de datos en memoria para aplicaciones web. "
+    "El gato duerme en el sofá. "
+    "Las aplicaciones web usan una caché en memoria para reducir la latencia. "
+    "Hoy hace sol."
+)
+
+class TestExtractiveSummary:
+    """Pruebas unitarias para el resumen extractivo local"""
+
+    def test_split_sentences(self):
+        """Prueba la división en oraciones y elementos de lista"""
+        sentences = split_sentences("Primera frase. ¿Segunda?\n- elemento uno\n- elemento dos")
+        assert sentences == ["Primera frase.", "¿Segunda?", "- elemento uno", "- elemento dos"]
+
+    def test_central_sentences_rank_higher(self):
+        """Prueba que las oraciones conectadas puntúan más que las aisladas"""
+        sentences = split_sentences(TEXT)
+        scores = rank_sentences(sentences)
+
+        assert len(scores) == 5
+        assert abs(scores.sum() - 1.0) < 1e-6
+        assert scores[1] > scores[2] and scores[1] > scores[4]
+
+    def test_summary_keeps_original_order(self):
+        """Prueba que el resumen respeta el orden y el límite de oraciones"""
+        summary = summarize(TEXT, max_sentences=2, ratio=0.4)
+
+        assert len(summary) == 2
+        assert "El gato duerme en el sofá." not in summary
+        positions = [TEXT.index(s) for s in summary]
+        assert positions == sorted(positions)
+
+    def test_short_and_empty_texts(self):
+        """Prueba textos sin oraciones suficientes"""
+        assert summarize("") == []
+        assert summarize("Una sola oración.") == ["Una sola oración."]
+        assert summarize("a. b. c.", max_sentences=1) == ["a."]
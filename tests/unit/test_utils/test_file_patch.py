@@ -0,0 +1,128 @@
+import os
+import pytest
+from app.utils.file_patch import (
+    FilePatchError,
+    append_to_file,
+    diff_to_edits,
+    parse_unified_diff,
+    rewrite_file
+)
+
+ORIGINAL = b"uno\ndos\ntres\ncuatro\ncinco\n"
+
+DIFF = """--- a/notas.md
++++ b/notas.md
+@@ -2,3 +2,3 @@
+ dos
+-tres
++TRES
+ cuatro
+"""
+
+def _write(tmp_path, data: bytes) -> str:
+    path = tmp_path / "notas.md"
+    path.write_bytes(data)
+    return str(path)
+
+class TestParseUnifiedDiff:
+    """Pruebas unitarias para el parser de diff unificado"""
+
+    def test_hunk_lines(self):
+        """Prueba que se separan las líneas antiguas y nuevas"""
+        hunks = parse_unified_diff(DIFF)
+        assert len(hunks) == 1
+        assert hunks[0].old_start == 2
+        assert hunks[0].old_lines == [b"dos\n", b"tres\n", b"cuatro\n"]
+        assert hunks[0].new_lines == [b"dos\n", b"TRES\n", b"cuatro\n"]
+
+    def test_no_newline_marker(self):
+        """Prueba el marcador de fin de archivo sin salto de línea"""
+        diff = "@@ -1 +1 @@\n-fin\n\\ No newline at end of file\n+FIN\n\\ No newline at end of file\n"
+        hunk = parse_unified_diff(diff)[0]
+        assert hunk.old_lines == [b"fin"]
+        assert hunk.new_lines == [b"FIN"]
+
+    def test_without_hunks(self):
+        """Prueba que un diff sin hunks se rechaza"""
+        with pytest.raises(FilePatchError):
+            parse_unified_diff("--- a\n+++ b\n")
+
+class TestDiffToEdits:
+    """Pruebas unitarias para la conversión de diff a ediciones"""
+
+    def test_edit_covers_hunk(self):
+        """Prueba que la edición sustituye solo el rango del hunk"""
+        edits = diff_to_edits(ORIGINAL, DIFF)
+        assert edits == [(4, 20, b"dos\nTRES\ncuatro\n")]
+
+    def test_shifted_hunk(self):
+        """Prueba que un hunk desplazado se localiza por su contexto"""
+        shifted = b"cero\nmenos uno\n" + ORIGINAL
+        start, end, _ = diff_to_edits(shifted, DIFF)[0]
+        assert shifted[start:end] == b"dos\ntres\ncuatro\n"
+
+    def test_mismatch(self):
+        """Prueba que un hunk que no coincide se rechaza"""
+        with pytest.raises(FilePatchError):
+            diff_to_edits(b"otra\ncosa\n", DIFF)
+
+    def test_insertion(self):
+        """Prueba un hunk que solo inserta líneas"""
+        edits = diff_to_edits(ORIGINAL, "@@ -1,0 +2 @@\n+uno y medio\n")
+        assert edits == [(4, 4, b"uno y medio\n")]
+
+class TestRewriteFile:
+    """Pruebas unitarias para la reescritura atómica por rangos"""
+
+    def test_apply_diff(self, tmp_path):
+        """Prueba que el diff se aplica y el archivo se sustituye"""
+        path = _write(tmp_path, ORIGINAL)
+        inode = os.stat(path).st_ino
+
+        size = rewrite_file(path, diff_to_edits(ORIGINAL, DIFF), max_size=1024)
+
+        assert open(path, "rb").read() == b"uno\ndos\nTRES\ncuatro\ncinco\n"
+        assert size == len(ORIGINAL)
+        assert os.stat(path).st_ino != inode
+        assert os.listdir(tmp_path) == ["notas.md"]
+
+    def test_range_replace(self, tmp_path):
+        """Prueba la sustitución de un rango de bytes de distinta longitud"""
+        path = _write(tmp_path, ORIGINAL)
+        rewrite_file(path, [(4, 7, b"DOS Y MEDIO")], max_size=1024)
+        assert open(path, "rb").read() == b"uno\nDOS Y MEDIO\ntres\ncuatro\ncinco\n"
+
+    def test_invalid_range(self, tmp_path):
+        """Prueba que un rango fuera del archivo no lo modifica"""
+        path = _write(tmp_path, ORIGINAL)
+        with pytest.raises(FilePatchError):
+            rewrite_file(path, [(20, 100, b"x")], max_size=1024)
+        assert open(path, "rb").read() == ORIGINAL
+
+    def test_max_size(self, tmp_path):
+        """Prueba que no se supera el tamaño máximo ni quedan temporales"""
+        path = _write(tmp_path, ORIGINAL)
+        with pytest.raises(FilePatchError):
+            rewrite_file(path, [(0, 0, b"x" * 100)], max_size=50)
+        assert os.listdir(tmp_path) == ["notas.md"]
+
+class TestAppendToFile:
+    """Pruebas unitarias para la escritura al final del archivo"""
+
+    def test_append_in_place(self, tmp_path):
+        """Prueba que el append conserva el archivo y añade los bytes"""
+        path = _write(tmp_path, ORIGINAL)
+        inode = os.stat(path).st_ino
+
+        size = append_to_file(path, b"seis\n", max_size=1024)
+
+        assert size == len(ORIGINAL) + 5
+        assert open(path, "rb").read().endswith(b"cinco\nseis\n")
+        assert os.stat(path).st_ino == inode
+
+    def test_append_max_size(self, tmp_path):
+        """Prueba que el append respeta el tamaño máximo"""
+        path = _write(tmp_path, ORIGINAL)
+        with pytest.raises(FilePatchError):
+            append_to_file(path, b"x" * 10, max_size=len(ORIGINAL) + 5)
+        assert open(path, "rb").read() == ORIGINAL
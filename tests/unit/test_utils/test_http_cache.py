@@ -0,0 +1,47 @@
+import os
+from app.utils.http_cache import etag_for_stat, etag_matches, http_date, is_not_modified
+
+class TestHttpCache:
+    """Pruebas unitarias para los validadores HTTP de archivos"""
+
+    def test_etag_changes_with_content(self, tmp_path):
+        """Prueba que el ETag cambia al modificar el archivo"""
+        path = tmp_path / "a.md"
+        path.write_text("uno")
+        first = etag_for_stat(os.stat(path))
+        assert first == etag_for_stat(os.stat(path))
+        assert first.startswith('"') and first.endswith('"')
+
+        path.write_text("uno dos")
+        assert etag_for_stat(os.stat(path)) != first
+
+    def test_etag_matches(self):
+        """Prueba listas, comodín y ETag débiles"""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+    def test_etag_matches_strong(self):
+        """Prueba que en la comparación fuerte un ETag débil nunca coincide"""
+        assert etag_matches('"a", "b"', '"b"', weak=False)
+        assert etag_matches("*", '"b"', weak=False)
+        assert not etag_matches('W/"b"', '"b"', weak=False)
+        assert not etag_matches('"b"', 'W/"b"', weak=False)
+        assert etag_matches('W/"b"', 'W/"b"')
+
+    def test_is_not_modified(self, tmp_path):
+        """Prueba la evaluación de If-None-Match e If-Modified-Since"""
+        path = tmp_path / "a.md"
+        path.write_text("uno")
+        st = os.stat(path)
+        etag = etag_for_stat(st)
+
+        assert is_not_modified({"if-none-match": etag}, st)
+        assert not is_not_modified({"if-none-match": '"otro"'}, st)
+        assert is_not_modified({"if-modified-since": http_date(st.st_mtime)}, st)
+        assert not is_not_modified({"if-modified-since": http_date(st.st_mtime - 10)}, st)
+        # If-None-Match tiene prioridad sobre If-Modified-Since
+        assert not is_not_modified({"if-none-match": '"otro"', "if-modified-since": http_date(st.st_mtime)}, st)
+        assert not is_not_modified({"if-modified-since": "no es una fecha"}, st)
+        assert not is_not_modified({}, st)
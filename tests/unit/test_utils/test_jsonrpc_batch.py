@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from app.schemas.mcp import MCPRequest
+from app.utils.jsonrpc_batch import InvalidBatchEntry, is_notification, message_id, parse_entry, run_batch
+
+class TestRunBatch:
+    """Pruebas unitarias para la ejecución de lotes JSON-RPC"""
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_and_keeps_order(self):
+        """Prueba que las llamadas van en paralelo y las respuestas conservan el orden"""
+        running = 0
+        peak = 0
+
+        async def handler(message):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            # Las primeras terminan las últimas
+            await asyncio.sleep(0.01 * (4 - message["id"]))
+            running -= 1
+            return {"id": message["id"]}
+
+        results = await run_batch([{"id": i} for i in range(4)], handler, lambda m, e: None, concurrency=2)
+
+        assert [r["id"] for r in results] == [0, 1, 2, 3]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_cancel_others(self):
+        """Prueba que el fallo de una llamada no cancela el resto del lote"""
+        async def handler(message):
+            if message["id"] == "bad":
+                raise RuntimeError("fallo")
+            await asyncio.sleep(0.01)
+            return {"id": message["id"], "ok": True}
+
+        results = await run_batch(
+            [{"id": "a"}, {"id": "bad"}, {"id": "b"}],
+            handler,
+            lambda message, error: {"id": message_id(message), "error": str(error)},
+            concurrency=4
+        )
+
+        assert results == [
+            {"id": "a", "ok": True},
+            {"id": "bad", "error": "fallo"},
+            {"id": "b", "ok": True}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_notifications_run_without_response(self):
+        """Prueba que las notificaciones se ejecutan pero no tienen respuesta"""
+        executed = []
+
+        async def handler(message):
+            executed.append(message.get("method"))
+            return {"id": message.get("id")}
+
+        messages = [
+            {"method": "a", "id": 1},
+            {"method": "b"},
+            {"method": "c", "id": None},
+            {"id": 2}
+        ]
+        results = await run_batch(messages, handler, lambda m, e: None, concurrency=2)
+
+        assert len(executed) == 4
+        assert [r["id"] for r in results] == [1, None, 2]
+        assert await run_batch([{"method": "b"}], handler, lambda m, e: None, concurrency=2) == []
+
+    @pytest.mark.asyncio
+    async def test_cancellation_cancels_pending_calls(self):
+        """Prueba que cancelar el lote cancela las llamadas en curso"""
+        cancelled = []
+
+        async def handler(message):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(message)
+                raise
+
+        task = asyncio.ensure_future(run_batch([1, 2], handler, lambda m, e: None, concurrency=2))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert sorted(cancelled) == [1, 2]
+
+class TestParseEntry:
+    """Pruebas unitarias para la validación de mensajes del lote"""
+
+    def test_valid_entry(self):
+        """Prueba que un mensaje válido se convierte en el modelo, con ids numéricos"""
+        request = parse_entry({"method": "status", "params": {}, "id": 7}, MCPRequest)
+        assert request.method == "status"
+        assert request.id == 7
+
+    def test_invalid_entries(self):
+        """Prueba que los mensajes no válidos lanzan InvalidBatchEntry"""
+        with pytest.raises(InvalidBatchEntry):
+            parse_entry(1, MCPRequest)
+        with pytest.raises(InvalidBatchEntry, match="method"):
+            parse_entry({"params": {}, "id": "x"}, MCPRequest)
+
+    def test_is_notification(self):
+        """Prueba que solo las solicitudes sin miembro id son notificaciones"""
+        assert is_notification({"method": "status", "params": {}})
+        assert not is_notification({"method": "status", "id": None})
+        assert not is_notification({"params": {}})
+        assert not is_notification([])
+
+    def test_message_id(self):
+        """Prueba que el id se recupera solo si es válido"""
+        assert message_id({"id": "x"}) == "x"
+        assert message_id({"id": [1]}) is None
+        assert message_id("texto") is None
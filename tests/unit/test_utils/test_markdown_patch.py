@@ -0,0 +1,98 @@
+import pytest
+from app.utils.markdown_patch import (
+    PatchError,
+    split_sections,
+    select_sections,
+    parse_patch,
+    apply_patch
+)
+
+DOCUMENT = """Introducción sin encabezado.
+
+# Instalación
+
+Ejecuta pip install.
+
+## Requisitos
+
+Python 3.11 y Redis.
+
+```bash
+# Esto no es un encabezado
+pip install -r requirements.txt
+```
+
+# Uso
+
+Arranca el servidor con run.py.
+"""
+
+class TestMarkdownPatch:
+    """Pruebas unitarias para la edición parcial de Markdown"""
+
+    def test_split_sections(self):
+        """Prueba la división por encabezados ignorando bloques de código"""
+        sections = split_sections(DOCUMENT)
+
+        assert [s.title for s in sections] == ["", "Instalación", "Requisitos", "Uso"]
+        assert sections[0].start == 0
+        assert sections[-1].end == len(DOCUMENT)
+        assert "".join(DOCUMENT[s.start:s.end] for s in sections) == DOCUMENT
+
+    def test_select_sections_by_heading(self):
+        """Prueba que un encabezado citado se selecciona primero"""
+        sections = split_sections(DOCUMENT)
+        selected = select_sections(DOCUMENT, sections, "En la sección Requisitos añade Docker")
+
+        assert [s.title for s in selected] == ["Requisitos"]
+
+    def test_select_sections_without_match(self):
+        """Prueba que instrucciones sin relación no seleccionan secciones"""
+        sections = split_sections(DOCUMENT)
+        assert select_sections(DOCUMENT, sections, "zzz qqq") == []
+
+    def test_parse_patch_in_code_block(self):
+        """Prueba interpretar un parche dentro de un bloque de código"""
+        edits = parse_patch('```json\n{"edits": [{"search": "Redis.", "replace": "Redis y Docker."}]}\n```')
+        assert edits == [{"search": "Redis.", "replace": "Redis y Docker."}]
+
+    def test_parse_patch_invalid(self):
+        """Prueba que respuestas sin parche válido lanzan error"""
+        with pytest.raises(PatchError):
+            parse_patch("No puedo hacer eso")
+        with pytest.raises(PatchError):
+            parse_patch('{"edits": [{"search": ""}]}')
+
+    def test_apply_patch(self):
+        """Prueba aplicar ediciones dentro de las secciones permitidas"""
+        sections = split_sections(DOCUMENT)
+        requisitos = sections[2]
+        edited = apply_patch(
+            DOCUMENT,
+            [{"search": "Python 3.11 y Redis.", "replace": "Python 3.11, Redis y Docker."}],
+            allowed_spans=[(requisitos.start, requisitos.end)]
+        )
+
+        assert "Python 3.11, Redis y Docker." in edited
+        assert edited.replace("Python 3.11, Redis y Docker.", "Python 3.11 y Redis.") == DOCUMENT
+
+    def test_apply_patch_rejects_unsafe_edits(self):
+        """Prueba que se rechazan ediciones ausentes, ambiguas o fuera de rango"""
+        sections = split_sections(DOCUMENT)
+        uso = sections[3]
+
+        with pytest.raises(PatchError):
+            apply_patch(DOCUMENT, [{"search": "no existe", "replace": "x"}])
+        with pytest.raises(PatchError):
+            apply_patch(DOCUMENT, [{"search": "pip install", "replace": "x"}])
+        with pytest.raises(PatchError):
+            apply_patch(
+                DOCUMENT,
+                [{"search": "Ejecuta pip install.", "replace": "x"}],
+                allowed_spans=[(uso.start, uso.end)]
+            )
+
+    def test_apply_patch_rejects_unbalanced_fences(self):
+        """Prueba que no se aceptan resultados con bloques de código abiertos"""
+        with pytest.raises(PatchError):
+            apply_patch(DOCUMENT, [{"search": "Arranca el servidor", "replace": "```\nArranca el servidor"}])
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from app.utils.micro_batcher import MicroBatcher, BatchParseError, parse_batch_results
+
+class TestMicroBatcher:
+    """Pruebas unitarias para el agrupador de solicitudes pequeñas"""
+
+    @pytest.mark.asyncio
+    async def test_groups_requests_by_key(self):
+        """Prueba que las solicitudes simultáneas de la misma clave van en un lote"""
+        calls = []
+
+        async def process(key, items):
+            calls.append((key, list(items)))
+            return [f"{key}:{item}" for item in items]
+
+        batcher = MicroBatcher(process, window_ms=5, max_batch_size=10)
+        results = await asyncio.gather(
+            batcher.submit("sentiment", "a"),
+            batcher.submit("sentiment", "b"),
+            batcher.submit("topics", "c")
+        )
+
+        assert results == ["sentiment:a", "sentiment:b", "topics:c"]
+        assert sorted(calls) == [("sentiment", ["a", "b"]), ("topics", ["c"])]
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_full(self):
+        """Prueba que un lote lleno se procesa sin esperar a la ventana"""
+        sizes = []
+
+        async def process(key, items):
+            sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(process, window_ms=10000, max_batch_size=2)
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("k", 1), batcher.submit("k", 2)),
+            timeout=1
+        )
+
+        assert results == [1, 2]
+        assert sizes == [2]
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_callers(self):
+        """Prueba que un fallo del lote llega a todas las solicitudes"""
+        async def process(key, items):
+            raise RuntimeError("fallo")
+
+        batcher = MicroBatcher(process, window_ms=1)
+        results = await asyncio.gather(
+            batcher.submit("k", 1),
+            batcher.submit("k", 2),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_keeps_reference_to_running_batches(self):
+        """Prueba que el lote en curso se conserva hasta terminar y luego se descarta"""
+        release = asyncio.Event()
+
+        async def process(key, items):
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(process, window_ms=10000, max_batch_size=1)
+        pending = asyncio.ensure_future(batcher.submit("k", 1))
+        await asyncio.sleep(0)
+        assert len(batcher._tasks) == 1
+
+        release.set()
+        assert await pending == 1
+        await asyncio.sleep(0)
+        assert batcher._tasks == set()
+
+    def test_parse_batch_results(self):
+        """Prueba repartir una respuesta empaquetada"""
+        text = 'Aquí tienes:\n{"results": [{"id": 1, "result": "b"}, {"id": 0, "result": "a"}]}'
+        assert parse_batch_results(text, 2) == ["a", "b"]
+
+    def test_parse_batch_results_missing_id(self):
+        """Prueba que falte un resultado provoca error de lote"""
+        with pytest.raises(BatchParseError):
+            parse_batch_results('{"results": [{"id": 0, "result": "a"}]}', 2)
+        with pytest.raises(BatchParseError):
+            parse_batch_results("sin json", 1)
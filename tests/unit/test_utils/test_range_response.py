@@ -0,0 +1,139 @@
+import os
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.utils.range_response import CompressedRangeResponse, RangeFileResponse, RangeNotSatisfiable, parse_range_header
+from app.utils.seekable_zstd import compress
+
+class TestParseRangeHeader:
+    """Pruebas unitarias para la interpretación de la cabecera Range"""
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=10-", (10, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=-500", (0, 99)),
+        ("bytes=50-500", (50, 99)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=abc", None),
+        ("bytes=9-3", None),
+    ])
+    def test_parse(self, header, expected):
+        """Prueba los formatos admitidos e ignorados"""
+        assert parse_range_header(header, 100) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+    def test_not_satisfiable(self, header):
+        """Prueba los rangos fuera del archivo"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header(header, 100)
+
+class TestRangeFileResponse:
+    """Pruebas unitarias para la respuesta de archivo con rangos"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        """Fixture con una app que sirve un archivo de prueba"""
+        path = tmp_path / "datos.txt"
+        path.write_bytes(bytes(range(256)) * 40)
+
+        async def endpoint(request):
+            return RangeFileResponse(str(path), stat_result=os.stat(path), chunk_size=1000)
+
+        app = Starlette(routes=[Route("/f", endpoint, methods=["GET", "HEAD"])])
+        return TestClient(app), path.read_bytes()
+
+    def test_full_file(self, client):
+        """Prueba que sin Range se sirve el archivo completo"""
+        http, data = client
+        response = http.get("/f")
+        assert response.status_code == 200
+        assert response.content == data
+        assert response.headers["accept-ranges"] == "bytes"
+
+    def test_partial_content(self, client):
+        """Prueba una petición de un tramo del archivo"""
+        http, data = client
+        response = http.get("/f", headers={"Range": "bytes=1500-4499"})
+        assert response.status_code == 206
+        assert response.content == data[1500:4500]
+        assert response.headers["content-range"] == f"bytes 1500-4499/{len(data)}"
+        assert response.headers["content-length"] == "3000"
+
+    def test_suffix_range(self, client):
+        """Prueba un rango por sufijo"""
+        http, data = client
+        response = http.get("/f", headers={"Range": "bytes=-10"})
+        assert response.status_code == 206
+        assert response.content == data[-10:]
+
+    def test_range_not_satisfiable(self, client):
+        """Prueba la respuesta 416"""
+        http, data = client
+        response = http.get("/f", headers={"Range": f"bytes={len(data)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+    def test_if_range_mismatch_serves_full_file(self, client):
+        """Prueba que un If-Range obsoleto devuelve el archivo completo"""
+        http, data = client
+        response = http.get("/f", headers={"Range": "bytes=0-9", "If-Range": '"otra-version"'})
+        assert response.status_code == 200
+        assert response.content == data
+
+        etag = http.head("/f").headers["etag"]
+        response = http.get("/f", headers={"Range": "bytes=0-9", "If-Range": etag})
+        assert response.status_code == 206
+        assert response.content == data[:10]
+
+    def test_if_none_match_not_modified(self, client):
+        """Prueba que un ETag vigente devuelve 304 sin cuerpo"""
+        http, _ = client
+        etag = http.get("/f").headers["etag"]
+        response = http.get("/f", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_if_modified_since(self, client):
+        """Prueba If-Modified-Since con la fecha de Last-Modified"""
+        http, data = client
+        last_modified = http.get("/f").headers["last-modified"]
+        assert http.get("/f", headers={"If-Modified-Since": last_modified}).status_code == 304
+        response = http.get("/f", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+        assert response.status_code == 200
+        assert response.content == data
+
+class TestCompressedRangeResponse:
+    """Pruebas unitarias para la respuesta de archivos comprimidos"""
+
+    DATA = bytes(range(256)) * 40
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        """Fixture con una app que sirve un archivo zstd seekable"""
+        path = tmp_path / "datos.txt"
+        path.write_bytes(compress(self.DATA, frame_size=1000))
+
+        async def endpoint(request):
+            return CompressedRangeResponse(str(path), stat_result=os.stat(path), size=len(self.DATA))
+
+        app = Starlette(routes=[Route("/f", endpoint, methods=["GET", "HEAD"])])
+        return TestClient(app)
+
+    def test_full_file(self, client):
+        """Prueba que se sirve el contenido descomprimido"""
+        response = client.get("/f")
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(self.DATA))
+        assert response.content == self.DATA
+
+    def test_range(self, client):
+        """Prueba un rango lógico que cruza varios frames"""
+        response = client.get("/f", headers={"Range": "bytes=950-3100"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 950-3100/{len(self.DATA)}"
+        assert response.content == self.DATA[950:3101]
@@ -0,0 +1,47 @@
+from app.utils.search_fusion import canonical_url, reciprocal_rank_fusion
+
+def result(url, description=""):
+    return {"url": url, "description": description}
+
+class TestSearchFusion:
+    """Pruebas unitarias para la fusión de resultados de búsqueda"""
+
+    def test_canonical_url(self):
+        """Prueba que variantes de la misma URL tienen la misma forma canónica"""
+        base = canonical_url("https://example.com/docs?a=1&b=2")
+        assert canonical_url("http://www.Example.com:80/docs/?b=2&a=1#intro") == base
+        assert canonical_url("https://example.com/docs?a=1&b=2&utm_source=x&gclid=y") == base
+        assert canonical_url("https://example.com/other") != base
+        assert canonical_url("https://example.com:8443/docs") != canonical_url("https://example.com/docs")
+
+    def test_rrf_ranks_results_found_by_several_queries(self):
+        """Prueba que un resultado presente en varias consultas sube en el ranking"""
+        fused = reciprocal_rank_fusion([
+            ("q1", [result("https://a.com"), result("https://b.com")]),
+            ("q2", [result("https://c.com"), result("https://www.b.com/")]),
+        ])
+
+        assert [f.item["url"] for f in fused] == ["https://b.com", "https://a.com", "https://c.com"]
+        assert fused[0].queries == ["q1", "q2"]
+        assert abs(fused[0].score - 2 / 62) < 1e-9
+
+    def test_near_duplicate_descriptions_are_merged(self):
+        """Prueba la deduplicación por descripción casi idéntica"""
+        text = "FastAPI es un framework web moderno y rápido para construir APIs con Python"
+        fused = reciprocal_rank_fusion([
+            ("q1", [result("https://fastapi.tiangolo.com", text)]),
+            ("q2", [result("https://mirror.example.org/fastapi", text + ".")]),
+            ("q3", [result("https://other.org", "Documentación de Django, otro framework")]),
+        ])
+
+        assert len(fused) == 2
+        assert fused[0].item["url"] == "https://fastapi.tiangolo.com"
+        assert fused[0].queries == ["q1", "q2"]
+
+    def test_duplicate_within_query_scores_once(self):
+        """Prueba que un duplicado dentro de una misma consulta puntúa una vez"""
+        fused = reciprocal_rank_fusion([
+            ("q1", [result("https://a.com"), result("https://a.com/?utm_medium=x")]),
+        ])
+        assert len(fused) == 1
+        assert abs(fused[0].score - 1 / 61) < 1e-9
@@ -0,0 +1,71 @@
+import pytest
+from app.utils.seekable_zstd import (
+    DecompressionCache,
+    SeekableFormatError,
+    SeekableReader,
+    compress,
+    is_compressed,
+    read_logical,
+    write_atomic
+)
+
+class TestSeekableZstd:
+    """Pruebas unitarias para el formato zstd seekable"""
+
+    def _data(self):
+        return b"".join(f"linea {i}\n".encode() for i in range(5000))
+
+    def test_round_trip(self, tmp_path):
+        """Prueba que el contenido comprimido se recupera íntegro"""
+        data = self._data()
+        payload = compress(data, frame_size=4096)
+        assert is_compressed(payload)
+        assert len(payload) < len(data)
+
+        path = tmp_path / "a.md"
+        write_atomic(str(path), payload)
+        with SeekableReader(str(path)) as reader:
+            assert reader.size == len(data)
+            assert reader.read() == data
+        assert read_logical(str(path)) == data
+        assert read_logical(str(path), limit=10) == data[:10]
+
+    def test_ranges_across_frames(self, tmp_path):
+        """Prueba rangos que empiezan y terminan en frames distintos"""
+        data = self._data()
+        path = tmp_path / "a.md"
+        path.write_bytes(compress(data, frame_size=1000))
+        with SeekableReader(str(path)) as reader:
+            for start, end in [(0, 1), (999, 1001), (1500, 7300), (len(data) - 5, len(data) + 10)]:
+                assert reader.read(start, end) == data[start:end]
+            assert all(len(block) <= 1000 for block in reader.iter_range(10, 5000))
+
+    def test_empty(self, tmp_path):
+        """Prueba que un documento vacío sigue siendo legible"""
+        path = tmp_path / "a.md"
+        path.write_bytes(compress(b""))
+        with SeekableReader(str(path)) as reader:
+            assert reader.size == 0
+            assert reader.read() == b""
+
+    def test_plain_file(self, tmp_path):
+        """Prueba que los archivos sin comprimir se leen tal cual"""
+        path = tmp_path / "a.md"
+        path.write_bytes(b"# Hola\n")
+        assert not is_compressed(path.read_bytes())
+        assert read_logical(str(path)) == b"# Hola\n"
+        with pytest.raises(SeekableFormatError):
+            SeekableReader(str(path))
+
+    def test_cache_is_bounded(self):
+        """Prueba la expulsión LRU por tamaño total"""
+        cache = DecompressionCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        assert cache.get("a") == b"12345"
+        cache.put("c", b"12345")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"12345"
+        cache.put("grande", b"x" * 11)
+        assert cache.get("grande") is None
+        assert cache.get_status()["bytes"] == 10
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import pytest
+from app.utils.streaming_upload import (
+    MultipartFormatError,
+    StreamingUploadWriter,
+    UploadTooLargeError,
+    iter_multipart,
+    part_filename
+)
+
+BOUNDARY = "limite123"
+
+def build_body(parts):
+    """Construye un cuerpo multipart a partir de (campo, nombre, contenido)"""
+    body = b""
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+async def chunked(data, size):
+    """Simula el cuerpo de una petición llegando por bloques"""
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+class TestStreamingUploadWriter:
+    """Pruebas unitarias para la escritura de subidas por bloques"""
+
+    def test_commit_moves_file_atomically(self, tmp_path):
+        """Prueba que el archivo aparece completo en su destino con su hash"""
+        writer = StreamingUploadWriter(str(tmp_path), max_size=1000)
+        writer.write(b"hola ")
+        writer.write(b"mundo")
+        destination = str(tmp_path / "saludo.txt")
+        assert not os.path.exists(destination)
+
+        result = writer.commit(destination)
+
+        assert open(destination, "rb").read() == b"hola mundo"
+        assert result.size == 10
+        assert result.sha256 == hashlib.sha256(b"hola mundo").hexdigest()
+        assert result.content_type == "text/plain"
+        assert os.listdir(tmp_path) == ["saludo.txt"]
+
+    def test_size_enforced_while_streaming(self, tmp_path):
+        """Prueba que se rechaza la subida en cuanto supera el máximo"""
+        writer = StreamingUploadWriter(str(tmp_path), max_size=8)
+        writer.write(b"12345")
+        with pytest.raises(UploadTooLargeError):
+            writer.write(b"6789")
+        writer.abort()
+        assert os.listdir(tmp_path) == []
+
+class TestIterMultipart:
+    """Pruebas unitarias para el recorrido incremental de multipart"""
+
+    @pytest.mark.asyncio
+    async def test_parts_across_chunks(self):
+        """Prueba que las partes se reconstruyen aunque lleguen en bloques pequeños"""
+        body = build_body([("nota", None, b"texto"), ("file", "a.md", b"# A\n" * 50)])
+        parts = []
+        async for event, headers, data in iter_multipart(chunked(body, 7), f"multipart/form-data; boundary={BOUNDARY}"):
+            if event == "begin":
+                parts.append([part_filename(headers), b""])
+            elif event == "data":
+                parts[-1][1] += data
+
+        assert parts == [[("nota", None), b"texto"], [("file", "a.md"), b"# A\n" * 50]]
+
+    @pytest.mark.asyncio
+    async def test_requires_boundary(self):
+        """Prueba que se rechaza un Content-Type sin boundary"""
+        with pytest.raises(MultipartFormatError):
+            async for _ in iter_multipart(chunked(b"", 1), "application/json"):
+                pass
+
+    def test_part_filename_strips_directories(self):
+        """Prueba que el nombre de archivo no puede incluir rutas"""
+        headers = {"content-disposition": 'form-data; name="file"; filename="../../etc/passwd.txt"'}
+        assert part_filename(headers) == ("file", "passwd.txt")
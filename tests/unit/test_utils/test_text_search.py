@@ -0,0 +1,26 @@
+import pytest
+from app.utils.text_search import build_match_query, query_terms, stem
+
+class TestTextSearch:
+    """Pruebas unitarias para la preparación de consultas de texto completo"""
+
+    @pytest.mark.parametrize("forms", [
+        ("busqueda", "busquedas"),
+        ("index", "indexes", "indexing"),
+        ("configuracion", "configuraciones"),
+    ])
+    def test_stem_is_prefix_of_all_forms(self, forms):
+        """Prueba que la raíz de cada forma es prefijo de las demás"""
+        for form in forms:
+            root = stem(form)
+            assert all(other.startswith(root) for other in forms)
+
+    def test_query_terms(self):
+        """Prueba la normalización, las palabras vacías y los duplicados"""
+        assert query_terms("Las BÚSQUEDAS de la búsqueda") == ["busqueda", "busqued"]
+        assert query_terms("the and of") == []
+
+    def test_build_match_query_quotes_terms(self):
+        """Prueba que la sintaxis de FTS5 de la consulta queda neutralizada"""
+        assert build_match_query(["abc", 'x"y']) == '"abc"* OR "x""y"*'
+        assert build_match_query(["a", "b"], match_all=True) == '"a"* AND "b"*'